@@ -0,0 +1,255 @@
+"""
+Off-Loop Call Recording
+=======================
+Optional (RECORD_CALLS=1) QA recording of the caller's and Sarah's audio.
+
+The event loop only does a non-blocking queue put per 10-20ms frame: the
+queue holds references to the AudioFrame objects the streams hand us (no
+PCM copy on the loop). A per-call writer thread drains the queue and feeds
+an encoder:
+
+- opus: ffmpeg child process (libopus, RECORDING_OPUS_BITRATE) - the
+  encoding CPU is not even in the agent process
+- flac: `soundfile` (libsndfile), in the writer thread
+- wav:  stdlib fallback when neither is available
+
+Files are rotated every RECORDING_ROTATE_SECONDS of audio and land in
+RECORDING_DIR/<lead_id>/<track>-<segment>.<ext> (the room name until the
+lead is saved). When the queue is full, frames are dropped and counted -
+the session is never blocked.
+
+Usage:
+    recorder = CallRecorder(room_name)
+    asyncio.create_task(tap_audio(rtc.AudioStream(track), recorder, "caller"))
+    recorder.set_lead_id(lead_id)
+    stats = recorder.close()               # in a thread - joins the writer
+"""
+
+import os
+import time
+import wave
+import queue
+import shutil
+import logging
+import threading
+import subprocess
+
+try:
+    import soundfile
+except ImportError:  # Optional - flac needs libsndfile
+    soundfile = None
+
+try:
+    import psutil   # Installed with livekit-agents
+except ImportError:  # Optional - only the ffmpeg CPU figure needs it
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+RECORD_CALLS = os.getenv("RECORD_CALLS", "0") == "1"
+RECORDING_DIR = os.getenv("RECORDING_DIR", "recordings")
+RECORDING_FORMAT = os.getenv("RECORDING_FORMAT", "opus").lower()  # opus | flac | wav
+RECORDING_OPUS_BITRATE = os.getenv("RECORDING_OPUS_BITRATE", "24k")
+RECORDING_ROTATE_SECONDS = float(os.getenv("RECORDING_ROTATE_SECONDS", "600"))
+RECORDING_QUEUE_FRAMES = int(os.getenv("RECORDING_QUEUE_FRAMES", "3000"))  # ~60s of 20ms frames per track pair
+
+EXTENSIONS = {"opus": "ogg", "flac": "flac", "wav": "wav"}
+ENCODER_EXIT_POLL_SECONDS = 0.02  # ffmpeg CPU is sampled this often while it finishes a file
+
+
+def available_format(requested: str = RECORDING_FORMAT) -> str:
+    """The requested format if its encoder is present, else wav"""
+    if requested == "opus" and shutil.which("ffmpeg"):
+        return "opus"
+    if requested == "flac" and soundfile is not None:
+        return "flac"
+    if requested != "wav":
+        logger.warning(f"Recording format {requested!r} unavailable (needs ffmpeg / soundfile) - using wav")
+    return "wav"
+
+
+# =============================================================================
+# ENCODERS (writer thread only)
+# =============================================================================
+
+class WavSegment:
+    def __init__(self, path: str, sample_rate: int, channels: int):
+        self.file = wave.open(path, "wb")
+        self.file.setnchannels(channels)
+        self.file.setsampwidth(2)
+        self.file.setframerate(sample_rate)
+
+    def write(self, pcm: memoryview) -> None:
+        self.file.writeframesraw(pcm)
+
+    def close(self) -> float:
+        self.file.close()
+        return 0.0
+
+
+class FlacSegment:
+    def __init__(self, path: str, sample_rate: int, channels: int):
+        self.file = soundfile.SoundFile(path, "w", samplerate=sample_rate, channels=channels,
+                                        format="FLAC", subtype="PCM_16")
+        self.channels = channels
+
+    def write(self, pcm: memoryview) -> None:
+        self.file.buffer_write(pcm, dtype="int16")
+
+    def close(self) -> float:
+        self.file.close()
+        return 0.0
+
+
+class OpusSegment:
+    """Raw PCM piped into an ffmpeg child; close() returns the child's CPU seconds
+    (as last sampled before it exited; 0 without psutil)"""
+    def __init__(self, path: str, sample_rate: int, channels: int):
+        self.process = subprocess.Popen(
+            ["ffmpeg", "-loglevel", "error", "-y", "-f", "s16le", "-ar", str(sample_rate),
+             "-ac", str(channels), "-i", "-", "-c:a", "libopus", "-b:a", RECORDING_OPUS_BITRATE,
+             "-application", "voip", path],
+            stdin=subprocess.PIPE,
+        )
+        self.usage = psutil.Process(self.process.pid) if psutil is not None else None
+
+    def write(self, pcm: memoryview) -> None:
+        self.process.stdin.write(pcm)
+
+    def close(self) -> float:
+        self.process.stdin.close()
+        if self.usage is None:
+            self.process.wait()
+            return 0.0
+        cpu_seconds = 0.0
+        while True:
+            try:
+                times = self.usage.cpu_times()
+                cpu_seconds = times.user + times.system
+            except psutil.Error:
+                pass
+            try:
+                self.process.wait(timeout=ENCODER_EXIT_POLL_SECONDS)
+                return cpu_seconds
+            except subprocess.TimeoutExpired:
+                pass
+
+
+ENCODERS = {"opus": OpusSegment, "flac": FlacSegment, "wav": WavSegment}
+
+
+# =============================================================================
+# RECORDER
+# =============================================================================
+
+class CallRecorder:
+    """Per-call recorder: bounded frame queue + one writer thread"""
+    def __init__(self, room_name: str, directory: str = RECORDING_DIR, audio_format: str | None = None,
+                 rotate_seconds: float = RECORDING_ROTATE_SECONDS, queue_frames: int = RECORDING_QUEUE_FRAMES):
+        self.room_name = room_name
+        self.directory = directory
+        self.audio_format = audio_format or available_format()
+        self.rotate_seconds = rotate_seconds
+        self.lead_id: str | None = None
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_frames)
+
+        self._segments: dict[str, tuple[object, int, float]] = {}  # track -> (encoder, index, seconds written)
+        self._counters: dict[str, int] = {}
+        self.stats = {"frames": 0, "dropped": 0, "files": 0, "audio_seconds": 0.0,
+                      "writer_cpu_seconds": 0.0, "encoder_cpu_seconds": 0.0, "loop_seconds": 0.0}
+        self._thread = threading.Thread(target=self._run, name=f"recorder-{room_name}", daemon=True)
+        self._thread.start()
+
+    # --- event loop side -----------------------------------------------------
+
+    def write(self, track: str, frame) -> None:
+        """Queue a frame reference; drops (and counts) instead of blocking"""
+        started = time.perf_counter()
+        try:
+            self.queue.put_nowait((track, frame))
+        except queue.Full:
+            self.stats["dropped"] += 1
+        self.stats["loop_seconds"] += time.perf_counter() - started
+
+    def set_lead_id(self, lead_id: str) -> None:
+        self.lead_id = lead_id
+
+    def close(self) -> dict:
+        """Flush and finish all files (blocking - call from a thread)"""
+        self.queue.put((None, None))
+        self._thread.join()
+        return self.stats
+
+    # --- writer thread -------------------------------------------------------
+
+    def _folder(self) -> str:
+        return os.path.join(self.directory, self.lead_id or self.room_name)
+
+    def _open(self, track: str, frame):
+        index = self._counters.get(track, 0) + 1
+        self._counters[track] = index
+        os.makedirs(self._folder(), exist_ok=True)
+        path = os.path.join(self._folder(), f"{track}-{index:03d}.{EXTENSIONS[self.audio_format]}")
+        encoder = ENCODERS[self.audio_format](path, frame.sample_rate, frame.num_channels)
+        self.stats["files"] += 1
+        return encoder
+
+    def _finish(self, track: str) -> None:
+        encoder, _, _ = self._segments.pop(track)
+        self.stats["encoder_cpu_seconds"] += encoder.close()
+
+    def _write_frame(self, track: str, frame) -> None:
+        segment = self._segments.get(track)
+        if segment and segment[2] >= self.rotate_seconds:
+            self._finish(track)
+            segment = None
+        if segment is None:
+            segment = (self._open(track, frame), self._counters[track], 0.0)
+
+        encoder, index, seconds = segment
+        encoder.write(frame.data.cast("B"))
+        duration = frame.samples_per_channel / frame.sample_rate
+        self._segments[track] = (encoder, index, seconds + duration)
+        self.stats["frames"] += 1
+        self.stats["audio_seconds"] += duration
+
+    def _move_to_lead_folder(self) -> None:
+        """Segments written before the lead was saved live under the room name"""
+        if not self.lead_id:
+            return
+        early = os.path.join(self.directory, self.room_name)
+        if os.path.isdir(early):
+            os.makedirs(self._folder(), exist_ok=True)
+            for name in os.listdir(early):
+                os.replace(os.path.join(early, name), os.path.join(self._folder(), f"early-{name}"))
+            os.rmdir(early)
+
+    def _run(self) -> None:
+        cpu_started = time.thread_time()
+        try:
+            while True:
+                track, frame = self.queue.get()
+                if track is None:
+                    break
+                try:
+                    self._write_frame(track, frame)
+                except Exception as e:
+                    self.stats["dropped"] += 1
+                    logger.warning(f"Recording frame dropped ({track}): {e}")
+            for track in list(self._segments):
+                self._finish(track)
+            self._move_to_lead_folder()
+        finally:
+            self.stats["writer_cpu_seconds"] = time.thread_time() - cpu_started
+
+
+async def tap_audio(stream, recorder: CallRecorder, track: str) -> None:
+    """Feed every frame of an rtc.AudioStream to the recorder"""
+    try:
+        async for event in stream:
+            recorder.write(track, event.frame)
+    finally:
+        await stream.aclose()
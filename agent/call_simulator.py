@@ -0,0 +1,373 @@
+"""
+Offline Call Simulator
+======================
+Replays a scripted, complete intake call (all 7 phases, the 21-question
+assessment and every spell-back) without LiveKit, OpenAI or Supabase, so
+context size and latency work can be measured locally.
+
+soak() replays thousands of calls through the same per-call objects and
+event-handler closures as the entrypoint, under memory accounting
+(agent/memory_accounting.py), to show memory stays flat across sessions.
+
+Usage:
+    from agent.call_simulator import INTAKE_SCRIPT, iter_events
+
+    for event in iter_events():
+        ...
+"""
+
+import gc
+import json
+import tracemalloc
+
+from livekit.agents.llm import ChatContext, ChatMessage, FunctionCall, FunctionCallOutput
+
+from agent.context_compaction import ContextCompactor, context_tokens
+from agent.memory_accounting import MemoryLedger, SessionMemory
+from agent.usage_accounting import CallUsage
+
+SIMULATED_LEAD_ID = "5f0c2a9e-6d1b-4c1e-9a57-3b8e2f4d7c10"
+
+PERSONAL_INFO_ARGS = {
+    "care_recipient_name": "Margaret Johnson",
+    "estimated_age": 82,
+    "relationship": "daughter",
+    "michigan_location": "Royal Oak",
+    "current_living_situation": "lives alone in her own home",
+    "lead_name": "Linda Johnson",
+    "phone_number": "248-555-0147",
+    "email": "linda.johnson@example.com",
+    "best_time_to_contact": "mornings",
+}
+
+CARE_DETAILS_ARGS = {
+    "lead_id": SIMULATED_LEAD_ID,
+    "bathing_hygiene": "needs some help getting in and out of the tub",
+    "dressing_grooming": "mostly fine on her own",
+    "mobility": "uses a walker",
+    "safety_concerns": "she fell in the kitchen last week",
+    "companionship_frequency": "a few times a week",
+    "preferred_activities": "quiet, she likes reading",
+    "meal_preparation": "cooking",
+    "housekeeping": "yes please",
+    "transportation_needed": "yes, for doctor visits",
+    "transportation_frequency": "weekly",
+    "preferred_care_schedule": "mornings",
+    "start_care_timing": "as soon as possible",
+    "sms_consent": True,
+}
+
+# (phase, [(sarah, caller), ...], tool call fired at the end of the phase or None)
+INTAKE_SCRIPT = [
+    ("opener", [
+        ("Thank you for calling Med Help USA... this is Sarah. How can I help you today?",
+         "Hi Sarah, yes, I'm calling about my mother. I think she needs some help at home."),
+    ], None),
+    ("safety", [
+        ("Of course... I'm so glad you called. May I have your full name, please?",
+         "It's Linda Johnson."),
+        ("Thank you, Linda. Let me spell that back... L-I-N-D-A... J-O-H-N-S-O-N. Is that right?",
+         "Yes, that's right."),
+        ("And what's the best number to call you back on, just in case we get disconnected?",
+         "It's 248 555 0147."),
+        ("Let me read that back... two... four... eight... five... five... five... zero... one... four... seven. Is that correct?",
+         "Yes, that's correct."),
+        ("Thank you... So, Linda, what made you pick up the phone today?",
+         "Well, my mom fell in the kitchen last week. She's okay, but it really scared me, and I live forty minutes away."),
+    ], None),
+    ("empathy", [
+        ("Oh, Linda... that sounds so frightening. I'm really glad she's alright. Is this care for yourself... or for a loved one?",
+         "It's for my mom."),
+        ("And how old is she?",
+         "She's eighty-two."),
+    ], None),
+    ("solution", [
+        ("Hmm... you know, this is exactly what we help families with every day. What's the best email to send you some information?",
+         "linda.johnson@example.com"),
+        ("Let me spell that back... l-i-n-d-a... dot... j-o-h-n-s-o-n... at... example... dot... com. All lowercase. Is that right?",
+         "Yes, all lowercase."),
+        ("Perfect. And is it alright if our Care Manager sends you text messages?",
+         "Yes, texting is fine."),
+    ], None),
+    ("assessment_personal", [
+        ("To help our Care Manager prepare the right plan... I need to ask a few gentle questions. What is your mother's full name?",
+         "Margaret Johnson."),
+        ("Margaret... M-A-R-G-A-R-E-T... Johnson, same spelling as yours. Is that right?",
+         "Yes."),
+        ("And what is your relationship to her?",
+         "I'm her daughter."),
+        ("Which city in Michigan is she located in?",
+         "Royal Oak."),
+        ("And what is her living situation right now?",
+         "She lives alone in her own home."),
+        ("And what's the best time to reach you?",
+         "Mornings are best."),
+    ], ("save_personal_info", PERSONAL_INFO_ARGS,
+        f"Personal information saved. Lead ID: {SIMULATED_LEAD_ID}. Now continue with care assessment.")),
+    ("assessment_care", [
+        ("Thank you... Now, how is she doing with bathing and personal hygiene?",
+         "She needs some help getting in and out of the tub."),
+        ("And with dressing and grooming?",
+         "Mostly fine on her own."),
+        ("How does she get around... does she walk on her own, use a walker or cane, or a wheelchair?",
+         "She uses a walker."),
+        ("Are there any safety concerns at home?",
+         "Just the fall last week, in the kitchen."),
+        ("How often would she like companionship?",
+         "Maybe a few times a week."),
+        ("Does she enjoy more social activities... or quieter ones?",
+         "Quiet, she likes reading."),
+        ("How about meals... does she need help with planning, cooking, reheating or cleanup?",
+         "Cooking, mostly."),
+        ("Would light housekeeping be helpful?",
+         "Yes please."),
+        ("Do they need any help with transportation?",
+         "Yes, for doctor visits."),
+        ("How often would that be?",
+         "About once a week."),
+        ("What time of day works best for care?",
+         "Mornings."),
+        ("And when would you like care to start?",
+         "As soon as possible, honestly."),
+    ], ("save_care_details", CARE_DETAILS_ARGS,
+        "Complete intake saved successfully. The Care Manager will be notified.")),
+    ("brand", [
+        ("Linda... I want you to know Med Help USA has supported families since 2009, and we're here 24/7. Do you have any questions for me?",
+         "No, I think that covers it. Thank you so much."),
+    ], None),
+    ("closing", [
+        ("I'm sending all of this to our Care Manager now... We will text you shortly. Take care of yourself, Linda.",
+         "Thank you, Sarah. Bye."),
+    ], None),
+]
+
+
+# =============================================================================
+# EVENT STREAM
+# =============================================================================
+
+def iter_events(script=INTAKE_SCRIPT):
+    """Yield (phase, kind, payload) for every turn of the scripted call.
+
+    kind is "assistant" / "user" (payload = text) or "tool"
+    (payload = (name, arguments dict, output text)).
+    """
+    for phase, exchanges, tool_call in script:
+        for sarah, caller in exchanges:
+            yield phase, "assistant", sarah
+            yield phase, "user", caller
+        if tool_call:
+            yield phase, "tool", tool_call
+
+
+def build_initial_context(system_prompt: str, instructions: str = "") -> ChatContext:
+    """Same pinned system context the live agent starts with"""
+    items = [ChatMessage(role="system", content=[system_prompt])]
+    if instructions:
+        items.append(ChatMessage(role="system", content=[instructions]))
+    return ChatContext(items=items)
+
+
+def simulate_context_tokens(system_prompt: str, instructions: str = "", compactor: ContextCompactor | None = None) -> list[dict]:
+    """Replay the call and record estimated model input tokens per turn.
+
+    A model turn starts after every caller utterance and after every tool
+    result, which is when the realtime session re-reads the context.
+    """
+    chat_ctx = build_initial_context(system_prompt, instructions)
+    turns = []
+    call_index = 0
+
+    for phase, kind, payload in iter_events():
+        if kind == "tool":
+            name, arguments, output = payload
+            call_index += 1
+            call_id = f"call_{call_index}"
+            arguments_json = json.dumps(arguments)
+            chat_ctx.items.append(FunctionCall(call_id=call_id, name=name, arguments=arguments_json))
+            chat_ctx.items.append(FunctionCallOutput(call_id=call_id, name=name, output=output, is_error=False))
+            if compactor:
+                compactor.record_tool_result(name, arguments_json, output)
+        else:
+            chat_ctx.items.append(ChatMessage(role=kind, content=[payload]))
+            if kind == "assistant":
+                continue
+
+        if compactor and compactor.should_compact(chat_ctx):
+            chat_ctx = compactor.compact(chat_ctx)
+
+        turns.append({
+            "turn": len(turns) + 1,
+            "phase": phase,
+            "input_tokens": context_tokens(chat_ctx),
+            "items": len(chat_ctx.items),
+        })
+
+    return turns
+
+
+# =============================================================================
+# TOOL-CALL SILENCE (filler speech)
+# =============================================================================
+FUNCTION_CALL_SECONDS = 0.7   # Caller stops talking -> model has emitted the tool call
+REPLY_TTFT_SECONDS = 0.6      # Response requested -> first audio (reply or filler)
+FILLER_SECONDS = 1.8          # Spoken length of a filler line
+HELLO_GAP_SECONDS = 2.0       # Silence after which seniors tend to say "hello?"
+
+
+def tool_call_gaps(save_seconds: float, threshold_s: float | None, policy: str = "interrupt") -> tuple[list[float], float]:
+    """Silent gaps the caller hears from the end of their turn to Sarah's reply,
+    and seconds of filler played, for one tool call taking `save_seconds`.
+
+    threshold_s None = no filler. policy "interrupt" (agent/filler_speech.py:
+    the filler is cut - or cancelled before it is heard - when the result
+    arrives) or "finish_phrase" (a playing filler finishes; assumes the
+    reply is generated meanwhile).
+    """
+    reply_at = FUNCTION_CALL_SECONDS + save_seconds + REPLY_TTFT_SECONDS
+    if threshold_s is None or save_seconds <= threshold_s:
+        return [reply_at], 0.0
+    filler_at = FUNCTION_CALL_SECONDS + threshold_s + REPLY_TTFT_SECONDS
+    result_at = FUNCTION_CALL_SECONDS + save_seconds
+    if result_at < filler_at:
+        return [reply_at], 0.0                       # Cancelled before it was heard
+    filler_end = filler_at + FILLER_SECONDS
+    if policy == "interrupt":
+        cut_at = min(result_at, filler_end)
+        return [filler_at, reply_at - cut_at], cut_at - filler_at
+    return [filler_at, max(reply_at - filler_end, 0.0)], FILLER_SECONDS
+
+
+def simulate_tool_silence(save_latencies: list[float], threshold_s: float | None, policy: str = "interrupt") -> dict:
+    """Perceived silence per tool call over a sample of save latencies"""
+    longest, filler = [], 0.0
+    for save_seconds in save_latencies:
+        gaps, played = tool_call_gaps(save_seconds, threshold_s, policy)
+        longest.append(max(gaps))
+        filler += played
+    longest.sort()
+    return {
+        "p50": longest[len(longest) // 2],
+        "p95": longest[int(len(longest) * 0.95)],
+        "max": longest[-1],
+        "hello_risk": sum(gap >= HELLO_GAP_SECONDS for gap in longest) / len(longest),
+        "filler_seconds": filler / len(longest),
+    }
+
+
+# =============================================================================
+# SESSION SOAK (memory accounting)
+# =============================================================================
+SOAK_CHECKPOINT_EVERY = 100
+SOAK_WARMUP_SESSIONS = 200        # Caches and interned strings settle first
+SOAK_SYSTEM_PROMPT = "You are Sarah, the Senior Care Intake Director for Med Help USA."
+
+
+class SimulatedSession:
+    """Stand-in for AgentSession: handlers registered with on(), fired by emit()"""
+    def __init__(self):
+        self._handlers: dict[str, list] = {}
+
+    def on(self, event: str, handler=None):
+        def register(fn):
+            self._handlers.setdefault(event, []).append(fn)
+            return fn
+        return register(handler) if handler else register
+
+    def emit(self, event: str, *args) -> None:
+        for handler in self._handlers.get(event, ()):
+            handler(*args)
+
+
+class SimulatedIntake:
+    """Per-call answers, like intake_agent.HomeCareIntakeData"""
+    def __init__(self):
+        self.answers: list[str] = []
+
+
+def simulate_session(ledger: MemoryLedger, name: str, leak=None) -> SessionMemory:
+    """One scripted call with the entrypoint's per-call state and closures.
+
+    `leak(session)`, if given, runs before the call ends - tests use it to
+    hold on to something the way a forgotten global would.
+    """
+    memory = ledger.session(name, collect=False)
+    session = SimulatedSession()
+    intake_data = SimulatedIntake()
+    user_responses_tracker: list[str] = []
+    transcript_lines: list[tuple[str, str]] = []
+    compactor = ContextCompactor()
+    usage = CallUsage(name, "soak")
+    context = {"chat": build_initial_context(SOAK_SYSTEM_PROMPT)}
+
+    @session.on("user_input_transcribed")
+    def on_user_transcribed(transcript):
+        user_responses_tracker.append(transcript)
+        intake_data.answers.append(transcript)
+
+    @session.on("conversation_item_added")
+    def on_conversation_item(item):
+        transcript_lines.append((item.role, item.text_content))
+        context["chat"].items.append(item)
+
+    @session.on("function_tools_executed")
+    def on_tools_executed(tool_name, arguments, output):
+        if compactor.record_tool_result(tool_name, arguments, output):
+            usage.record_tool_result(tool_name)
+
+    memory.watch(session=session, intake_data=intake_data, compactor=compactor, usage=usage,
+                 on_user_transcribed=on_user_transcribed, on_conversation_item=on_conversation_item,
+                 on_tools_executed=on_tools_executed)
+
+    for phase, kind, payload in iter_events():
+        if kind == "tool":
+            tool_name, arguments, output = payload
+            session.emit("function_tools_executed", tool_name, json.dumps(arguments), output)
+        else:
+            if kind == "user":
+                session.emit("user_input_transcribed", payload)
+            session.emit("conversation_item_added", ChatMessage(role=kind, content=[payload]))
+        if compactor.should_compact(context["chat"]):
+            context["chat"] = compactor.compact(context["chat"])
+    usage.to_record(SIMULATED_LEAD_ID)
+    if leak:
+        leak(session)
+    return memory
+
+
+def growth_per_session(points: list[tuple[int, int]]) -> float:
+    """Least-squares slope of (session, value) checkpoints"""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+
+
+def soak(sessions: int = 2000, leak=None, checkpoint_every: int = SOAK_CHECKPOINT_EVERY,
+         warmup: int = SOAK_WARMUP_SESSIONS) -> dict:
+    """Run `sessions` simulated calls back to back with tracemalloc on and
+    report leaked sessions and the memory slope after warm-up"""
+    ledger = MemoryLedger("tracemalloc", history=10)
+    started_tracing = not tracemalloc.is_tracing()
+    ledger.start()
+    bytes_points, object_points = [], []
+    try:
+        for i in range(1, sessions + 1):
+            ledger.check(simulate_session(ledger, f"soak-{i}", leak), collect=False)
+            if i % checkpoint_every == 0 and i >= warmup:
+                gc.collect()
+                bytes_points.append((i, tracemalloc.get_traced_memory()[0]))
+                object_points.append((i, len(gc.get_objects())))
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return {
+        "sessions": sessions,
+        "leaked_sessions": ledger.leaked_sessions,
+        "bytes_per_session": growth_per_session(bytes_points),
+        "objects_per_session": growth_per_session(object_points),
+        "traced_mb": [round(b / 2**20, 2) for _, b in bytes_points],
+    }
@@ -0,0 +1,194 @@
+"""
+Rolling Chat-Context Compaction
+===============================
+A full 21-question intake with spell-backs runs many turns, and the realtime
+session carries the whole ChatContext on every one of them. This module
+collapses completed phases into a short structured summary of the confirmed
+answers and keeps only the last few raw turns verbatim.
+
+Compaction triggers:
+- Phase boundary: a save tool (save_personal_info / save_care_details) succeeded
+- Token threshold: the conversation history grew past COMPACTION_TOKEN_THRESHOLD
+"""
+
+import os
+import re
+import json
+import logging
+
+from livekit.agents.llm import ChatContext, ChatMessage
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+COMPACTION_KEEP_TURNS = int(os.getenv("COMPACTION_KEEP_TURNS", "6"))  # Raw items kept verbatim
+COMPACTION_TOKEN_THRESHOLD = int(os.getenv("COMPACTION_TOKEN_THRESHOLD", "800"))  # History tokens
+MAX_CALLER_NOTES = 8         # Unconfirmed caller statements carried in the summary
+NOTE_MAX_CHARS = 160         # Each note is truncated to this length
+
+SUMMARY_ITEM_ID = "intake_call_summary"
+
+# Save tools mark the end of a phase - their arguments are the confirmed answers
+PHASE_TOOLS = {
+    "save_personal_info": "Personal info (Phases 1-4)",
+    "save_care_details": "Care assessment (Phase 5)",
+}
+
+LEAD_ID_PATTERN = re.compile(r"Lead ID: ([0-9a-fA-F-]{8,})")
+
+
+# =============================================================================
+# TOKEN ESTIMATION
+# =============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+def item_text(item) -> str:
+    """Flatten a chat item (message, tool call or tool output) to plain text"""
+    kind = getattr(item, "type", "message")
+    if kind == "message":
+        return item.text_content or ""
+    if kind == "function_call":
+        return f"{item.name}({item.arguments})"
+    if kind == "function_call_output":
+        return item.output or ""
+    return ""
+
+
+def is_pinned(item) -> bool:
+    """System messages (persona prompt) are never compacted"""
+    return (
+        getattr(item, "type", "message") == "message"
+        and item.role == "system"
+        and item.id != SUMMARY_ITEM_ID
+    )
+
+
+def history_tokens(chat_ctx: ChatContext) -> int:
+    """Estimated tokens of everything except the pinned system prompt"""
+    return sum(estimate_tokens(item_text(i)) for i in chat_ctx.items if not is_pinned(i))
+
+
+def context_tokens(chat_ctx: ChatContext) -> int:
+    """Estimated input tokens the model receives for the next turn"""
+    return sum(estimate_tokens(item_text(i)) for i in chat_ctx.items)
+
+
+# =============================================================================
+# COMPACTOR
+# =============================================================================
+
+class ContextCompactor:
+    """Collapses completed intake phases into a summary of confirmed answers"""
+
+    def __init__(
+        self,
+        keep_turns: int = COMPACTION_KEEP_TURNS,
+        token_threshold: int = COMPACTION_TOKEN_THRESHOLD,
+    ):
+        self.keep_turns = keep_turns
+        self.token_threshold = token_threshold
+        self.completed_phases: list[str] = []
+        self.confirmed: dict[str, str] = {}
+        self.caller_notes: list[str] = []
+        self.compactions = 0
+        self._phase_pending = False
+        self._running = False
+
+    def record_phase(self, phase: str, answers: dict) -> None:
+        """Mark a phase complete with the answers the caller confirmed"""
+        if phase not in self.completed_phases:
+            self.completed_phases.append(phase)
+        for field, value in answers.items():
+            if value not in ("", None):
+                self.confirmed[field] = str(value)
+        self._phase_pending = True
+
+    def record_tool_result(self, name: str, arguments: str, output: str) -> bool:
+        """Record a successful save tool call as a phase boundary"""
+        if name not in PHASE_TOOLS or not output or output.startswith("Error"):
+            return False
+        try:
+            answers = json.loads(arguments or "{}")
+        except json.JSONDecodeError:
+            answers = {}
+        match = LEAD_ID_PATTERN.search(output)
+        if match:
+            answers["lead_id"] = match.group(1)
+        self.record_phase(name, answers)
+        return True
+
+    def should_compact(self, chat_ctx: ChatContext) -> bool:
+        """True on a phase boundary or once history passes the token threshold"""
+        history = [i for i in chat_ctx.items if not is_pinned(i) and i.id != SUMMARY_ITEM_ID]
+        if self._phase_pending:
+            return True
+        if len(history) <= self.keep_turns:
+            return False
+        return history_tokens(chat_ctx) > self.token_threshold
+
+    def summary_text(self) -> str:
+        """Short structured summary that replaces the collapsed turns"""
+        lines = ["### CALL SUMMARY (earlier turns were condensed)"]
+        if self.completed_phases:
+            labels = [PHASE_TOOLS.get(p, p) for p in self.completed_phases]
+            lines.append(f"Completed and saved: {', '.join(labels)}")
+        if self.confirmed:
+            lines.append("Confirmed answers (already spelled back - do NOT ask again):")
+            lines.extend(f"- {field}: {value}" for field, value in self.confirmed.items())
+        if self.caller_notes:
+            lines.append("Caller said earlier (not yet confirmed):")
+            lines.extend(f"- {note}" for note in self.caller_notes)
+        lines.append("Continue the conversation from where it left off.")
+        return "\n".join(lines)
+
+    def compact(self, chat_ctx: ChatContext) -> ChatContext:
+        """Return a new ChatContext: system prompt + summary + last raw turns"""
+        pinned = [i for i in chat_ctx.items if is_pinned(i)]
+        history = [i for i in chat_ctx.items if not is_pinned(i) and i.id != SUMMARY_ITEM_ID]
+
+        split = max(len(history) - self.keep_turns, 0)
+        # Never start the verbatim tail on a tool output whose call was collapsed
+        while split < len(history) and getattr(history[split], "type", "message") == "function_call_output":
+            split += 1
+        collapsed, recent = history[:split], history[split:]
+
+        if self._phase_pending:
+            # Everything before the boundary is covered by the confirmed answers
+            self.caller_notes.clear()
+        else:
+            for item in collapsed:
+                if getattr(item, "type", "message") == "message" and item.role == "user":
+                    text = (item.text_content or "").strip()
+                    if text:
+                        self.caller_notes.append(text[:NOTE_MAX_CHARS])
+            del self.caller_notes[:-MAX_CALLER_NOTES]
+
+        self._phase_pending = False
+        self.compactions += 1
+
+        summary = ChatMessage(id=SUMMARY_ITEM_ID, role="system", content=[self.summary_text()])
+        return ChatContext(items=pinned + [summary] + recent)
+
+    async def apply(self, agent) -> None:
+        """Compact the agent's live chat context if a trigger fired"""
+        if self._running or not self.should_compact(agent.chat_ctx):
+            return
+        self._running = True
+        try:
+            before = history_tokens(agent.chat_ctx)
+            compacted = self.compact(agent.chat_ctx)
+            await agent.update_chat_ctx(compacted)
+            logger.info(
+                f"Chat context compacted: ~{before} -> ~{history_tokens(compacted)} history tokens "
+                f"(compaction #{self.compactions})"
+            )
+        except Exception as e:
+            logger.warning(f"Chat context compaction failed: {e}")
+        finally:
+            self._running = False
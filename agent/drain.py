@@ -0,0 +1,172 @@
+"""
+Graceful Worker Drain
+=====================
+Render redeploys the worker in place: SIGTERM, then SIGKILL after
+maxShutdownDelaySeconds. The agents SDK already stops taking new jobs on
+SIGTERM and waits drain_timeout for running ones, but:
+
+- when the deadline passes its drain() raises, and the worker exits without
+  asking the job processes to shut down - their shutdown callbacks (usage,
+  notifications, recording) never run
+- job processes ignore SIGTERM, so a call has no idea the worker is going away
+
+This module closes both gaps:
+
+- install_worker_drain() (main.py) writes a drain notice with the deadline
+  for the job processes and turns the deadline into a normal shutdown, so
+  every job gets DRAIN_FLUSH_SECONDS to run its shutdown callbacks
+- watch_drain() (entrypoint) polls the notice and asks Sarah to wrap up the
+  call DRAIN_WRAP_UP_SECONDS before the deadline
+- pending_saves tracks save tool calls so a save that is in flight when the
+  session closes still lands, and the shutdown flush waits for it
+
+Usage:
+    install_worker_drain()                       # before cli.run_app
+    result = await pending_saves.track(save_personal_info_only(...))
+    asyncio.create_task(watch_drain(wrap_up))
+    await pending_saves.flush(DRAIN_FLUSH_SECONDS)   # shutdown callback
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+DRAIN_TIMEOUT_SECONDS = int(os.getenv("DRAIN_TIMEOUT_SECONDS", "240"))   # Calls may finish within this
+DRAIN_FLUSH_SECONDS = float(os.getenv("DRAIN_FLUSH_SECONDS", "30"))      # Then shutdown callbacks get this
+DRAIN_WRAP_UP_SECONDS = float(os.getenv("DRAIN_WRAP_UP_SECONDS", "60"))  # Sarah wraps up this long before the deadline
+DRAIN_POLL_SECONDS = 1.0
+DRAIN_NOTICE_ENV = "MEDHELP_DRAIN_NOTICE"   # Set by the worker, inherited by job processes
+
+DRAIN_WRAP_UP_INSTRUCTIONS = (
+    "We have to end this call in about a minute for system maintenance. Save whatever the caller "
+    "has already told you now if you have not yet, then tell them warmly that a Care Manager will "
+    "call them back to finish, thank them, and say goodbye."
+)
+
+
+# =============================================================================
+# DRAIN NOTICE (worker process -> job processes)
+# =============================================================================
+
+class DrainNotice:
+    """A small JSON file holding the drain deadline (wall clock)"""
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv(DRAIN_NOTICE_ENV) or os.path.join(
+            tempfile.gettempdir(), f"medhelp-drain-{os.getpid()}.json")
+
+    def announce(self, timeout: float) -> float:
+        deadline = time.time() + timeout
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"deadline": deadline}, f)
+        os.replace(self.path + ".tmp", self.path)
+        return deadline
+
+    def deadline(self) -> float | None:
+        """The drain deadline, or None while the worker is not draining"""
+        try:
+            with open(self.path) as f:
+                return float(json.load(f)["deadline"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def worker_class():
+    """The SDK's worker class: AgentServer in newer livekit-agents, Worker up to 1.2"""
+    import livekit.agents
+
+    return getattr(livekit.agents, "AgentServer", None) or livekit.agents.Worker
+
+
+def install_worker_drain(timeout: float = DRAIN_TIMEOUT_SECONDS) -> DrainNotice:
+    """Announce drains to job processes and shut jobs down cleanly at the deadline.
+
+    Wraps livekit's Worker.drain, which cli.run_app calls on SIGTERM before
+    Worker.aclose(); aclose() is what runs each job's shutdown callbacks.
+    """
+    Worker = worker_class()
+
+    notice = DrainNotice()
+    notice.clear()
+    os.environ[DRAIN_NOTICE_ENV] = notice.path
+    sdk_drain = Worker.drain
+
+    async def drain(worker, timeout: int | None = None) -> None:
+        if getattr(worker, "_draining", False):
+            return
+        timeout = timeout or DRAIN_TIMEOUT_SECONDS
+        notice.announce(timeout)
+        logger.info(f"🚰 Draining: {len(worker.active_jobs)} active calls, deadline in {timeout}s")
+        try:
+            await sdk_drain(worker, timeout)
+            logger.info("🚰 All calls finished")
+        except asyncio.TimeoutError:
+            logger.warning(f"🚰 Drain deadline reached with {len(worker.active_jobs)} calls active - shutting them down")
+        finally:
+            notice.clear()
+
+    Worker.drain = drain
+    return notice
+
+
+# =============================================================================
+# JOB SIDE
+# =============================================================================
+
+async def watch_drain(wrap_up, notice: DrainNotice | None = None, wrap_up_seconds: float = DRAIN_WRAP_UP_SECONDS,
+                      poll_seconds: float = DRAIN_POLL_SECONDS) -> float:
+    """Wait for a drain, then call `wrap_up()` once the deadline is near.
+
+    Returns the seconds that were left before the deadline at wrap-up.
+    """
+    notice = notice or DrainNotice()
+    while (deadline := notice.deadline()) is None:
+        await asyncio.sleep(poll_seconds)
+    logger.info(f"🚰 Worker draining - call must end within {deadline - time.time():.0f}s")
+    await asyncio.sleep(max(deadline - wrap_up_seconds - time.time(), 0))
+    remaining = deadline - time.time()
+    result = wrap_up()
+    if asyncio.iscoroutine(result):
+        await result
+    return remaining
+
+
+class PendingSaves:
+    """Storage calls that must finish even if the tool call that started them is cancelled"""
+    def __init__(self):
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def track(self, coro):
+        """Run `coro` as its own task; cancelling the caller does not cancel the save"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(task)
+
+    async def flush(self, timeout: float = DRAIN_FLUSH_SECONDS) -> int:
+        """Wait for in-flight saves; returns how many were still running after `timeout`"""
+        if not self._tasks:
+            return 0
+        _, still_running = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if still_running:
+            logger.error(f"🚰 {len(still_running)} saves still running after {timeout}s")
+        return len(still_running)
+
+
+pending_saves = PendingSaves()
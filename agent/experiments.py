@@ -0,0 +1,98 @@
+"""
+Per-Call Parameter Experiments
+==============================
+Realtime model and VAD settings (temperature, VAD threshold, prefix
+padding, silence duration, min_consecutive_speech_delay) are tuned by
+running arms side by side instead of guessing:
+
+- arms are declared in agent/intake_config.toml under [experiment] and hot
+  reload with the rest of the config. Each arm overrides some of the
+  [turn_detection] values or the temperature; the rest come from the file
+- a call is assigned to an arm by hashing the experiment name and the room
+  name, weighted by the arms' `weight`. The same room always lands in the
+  same arm, and renaming the experiment reshuffles every call
+- the experiment and arm are stored with the call's usage record, next to
+  its lead, duration, completion and turn latency (agent/usage_accounting.py)
+
+experiment_report.py compares the arms with confidence intervals.
+
+Usage:
+    config = intake_config.current().for_call(ctx.room.name)   # the call's arm applied
+    # which is, spelled out:
+    arm = config.experiment.assign(ctx.room.name) if config.experiment else None
+    config = config.variant(arm.name, arm.overrides) if arm else config
+"""
+
+import hashlib
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+ARM_KEYS = {
+    "temperature": None,
+    "senior_pause_threshold": "turn_detection",
+    "threshold": "turn_detection",
+    "prefix_padding_ms": "turn_detection",
+    "min_consecutive_speech_delay": "turn_detection",
+}
+
+
+class Arm:
+    """One set of parameter overrides"""
+    def __init__(self, name: str, weight: float, overrides: dict):
+        self.name = name
+        self.weight = weight
+        self.overrides = overrides
+
+
+class Experiment:
+    """Weighted, deterministic assignment of calls to arms"""
+    def __init__(self, name: str, arms: list[Arm]):
+        self.name = name
+        self.arms = arms
+        self.total_weight = sum(arm.weight for arm in arms)
+
+    @classmethod
+    def parse(cls, section: dict) -> "Experiment":
+        """From the [experiment] table; raises ValueError on a malformed one"""
+        name = section.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("experiment.name must be a non-empty string")
+        arms, seen = [], set()
+        for entry in section.get("arms", []):
+            entry = dict(entry)
+            arm_name = entry.pop("name", None)
+            weight = entry.pop("weight", 1)
+            if not isinstance(arm_name, str) or not arm_name or arm_name in seen:
+                raise ValueError(f"experiment arms need unique names (got {arm_name!r})")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+                raise ValueError(f"arm {arm_name}: weight must be a positive number")
+            unknown = set(entry) - set(ARM_KEYS)
+            if unknown:
+                raise ValueError(f"arm {arm_name}: cannot override {sorted(unknown)} (only {sorted(ARM_KEYS)})")
+            seen.add(arm_name)
+            arms.append(Arm(arm_name, float(weight), entry))
+        if len(arms) < 2:
+            raise ValueError("an experiment needs at least two arms")
+        return cls(name, arms)
+
+    def assign(self, unit: str) -> Arm:
+        """Arm for `unit` (the room name); stable for a given experiment"""
+        digest = hashlib.sha256(f"{self.name}:{unit}".encode()).digest()
+        point = int.from_bytes(digest[:8], "big") / 2**64 * self.total_weight
+        for arm in self.arms:
+            point -= arm.weight
+            if point < 0:
+                return arm
+        return self.arms[-1]
+
+
+def apply_overrides(data: dict, overrides: dict) -> dict:
+    """Config data (parsed TOML) with an arm's overrides applied"""
+    merged = {**data, "turn_detection": dict(data.get("turn_detection", {}))}
+    for key, value in overrides.items():
+        if ARM_KEYS[key]:
+            merged[ARM_KEYS[key]][key] = value
+        else:
+            merged[key] = value
+    return merged
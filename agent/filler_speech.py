@@ -0,0 +1,85 @@
+"""
+Filler Speech During Tool Calls
+===============================
+While a save tool waits on storage the realtime model says nothing, and
+seniors often fill the silence with "hello?" - an extra turn. When a tool
+call runs longer than FILLER_THRESHOLD_MS, Sarah starts a short filler line
+("Let me just jot that down...") concurrently with the save.
+
+When the result arrives the filler is interrupted (cancelled if it has
+not been heard yet), so the reply is not queued behind a finished phrase.
+
+agent/call_simulator.py (simulate_tool_silence) measures the perceived
+silence per tool call with and without filler; see
+benchmarks/filler_speech_report.py. The filler itself needs a model
+response (~0.6s to first audio), so the threshold has to be low to help
+within the 800ms storage deadline: at 150ms, tool calls with a silent gap
+of 2s or more drop from ~20% to ~2%.
+
+Usage:
+    result = await with_filler(save(...), start_filler, "save_personal_info")
+"""
+
+import os
+import asyncio
+import logging
+import itertools
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+FILLER_THRESHOLD_MS = int(os.getenv("FILLER_THRESHOLD_MS", "150"))   # -1 disables filler
+
+FILLER_PHRASES = {
+    "save_personal_info": (
+        "Let me just jot that down...",
+        "Okay... I'm writing all of that down for you now...",
+        "One moment... I'm just putting that in for you...",
+    ),
+    "save_care_details": (
+        "Let me just get all of this into our notes for the Care Manager...",
+        "Okay... I'm writing all of that down now...",
+        "Bear with me just a moment while I note that down...",
+    ),
+}
+DEFAULT_PHRASES = ("Just one moment...",)
+_rotation = {name: itertools.cycle(phrases) for name, phrases in FILLER_PHRASES.items()}
+
+logger = logging.getLogger(__name__)
+
+
+def next_phrase(tool_name: str) -> str:
+    """Rotate through the tool's phrases so a repeat save doesn't sound canned"""
+    return next(_rotation.get(tool_name) or iter(DEFAULT_PHRASES))
+
+
+def filler_instructions(phrase: str) -> str:
+    """generate_reply instructions that keep the model to exactly one filler line"""
+    return (f'Say only this, warmly and unhurried, and nothing else: "{phrase}" '
+            "Do not ask a question and do not mention saving or systems.")
+
+
+async def with_filler(work, start_filler, tool_name: str, threshold_ms: int = FILLER_THRESHOLD_MS):
+    """Await `work`; past `threshold_ms`, call start_filler(phrase) concurrently
+    and interrupt the filler when `work` finishes.
+
+    start_filler returns a handle with done() / interrupt() (a SpeechHandle) or None.
+    If it raises, the save still completes - the caller just hears silence.
+    """
+    task = asyncio.ensure_future(work)
+    if threshold_ms < 0:
+        return await task
+    done, _ = await asyncio.wait({task}, timeout=threshold_ms / 1000)
+    if done:
+        return task.result()
+
+    try:
+        handle = start_filler(next_phrase(tool_name))
+    except Exception as e:
+        logger.warning(f"Filler speech failed, {tool_name} continues without it: {e}")
+        handle = None
+    try:
+        return await task
+    finally:
+        if handle is not None and not handle.done():
+            handle.interrupt()
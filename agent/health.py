@@ -0,0 +1,329 @@
+"""
+Worker Health, Readiness and Load Report
+========================================
+The worker started by main.py serves three small endpoints on HEALTH_PORT:
+
+- GET /healthz  liveness: 200 while the worker's event loop heartbeat is
+  fresh, 503 once it has been stuck for LIVENESS_STALE_SECONDS
+- GET /readyz   readiness: registered with LiveKit, not draining, and at
+  least one job process has warmed storage (prewarm; a process that found
+  Supabase down keeps retrying in the background and turns ready then)
+- GET /load     JSON load report: active sessions, event-loop lag
+  percentiles (worker and each job process), memory, and the queue
+  depths of the background writers (notifications, in-flight saves,
+  call recorder, storage spool)
+
+Nothing here runs on the audio path. The HTTP server has its own thread and
+only reads snapshots, so it still answers (503) when the worker loop is
+wedged. Job processes add a heartbeat task to their loop and a reporter
+thread that writes a small JSON file every LOAD_REPORT_SECONDS to a
+directory shared with the worker.
+
+Usage:
+    install_worker_health()                        # main.py, before cli.run_app
+    process_report.start(storage_warm=True)        # prewarm (job process)
+    process_report.monitor.start()                 # entrypoint (job process loop)
+    process_report.track("recorder_queue", lambda: recorder.queue.qsize())
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import tempfile
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import psutil   # Installed with livekit-agents
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", "8082"))     # 0 = no health endpoint
+HEALTH_HOST = os.getenv("HEALTH_HOST", "")              # All interfaces, like the SDK's own :8081
+HEARTBEAT_SECONDS = 0.25
+LIVENESS_STALE_SECONDS = float(os.getenv("LIVENESS_STALE_SECONDS", "5"))
+LOAD_REPORT_SECONDS = 5.0
+LAG_SAMPLES = 1200                                      # Last 5 minutes of heartbeats
+LOAD_REPORT_ENV = "MEDHELP_LOAD_REPORT_DIR"             # Set by the worker, inherited by job processes
+
+
+def rss_mb(pid: int | None = None) -> float | None:
+    """Resident memory of a process in MB (None if unknown)"""
+    pid = pid or os.getpid()
+    try:
+        if psutil is not None:
+            return round(psutil.Process(pid).memory_info().rss / 2**20, 1)
+        with open(f"/proc/{pid}/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except Exception:
+        return None
+
+
+# =============================================================================
+# EVENT LOOP HEARTBEAT
+# =============================================================================
+
+class LoopMonitor:
+    """Sleeps HEARTBEAT_SECONDS in a loop; the overshoot is the loop lag"""
+    def __init__(self, interval: float = HEARTBEAT_SECONDS, samples: int = LAG_SAMPLES):
+        self.interval = interval
+        self.lags: deque = deque(maxlen=samples)
+        self.last_beat: float | None = None
+        self.on_beat = None   # Optional callable, runs on the loop each beat
+        self._task: asyncio.Task | None = None
+
+    async def run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lags.append(max(now - expected, 0.0))
+            self.last_beat = now
+            if self.on_beat is not None:
+                self.on_beat()
+
+    def start(self) -> asyncio.Task:
+        """Start the heartbeat on the running loop (once)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    def alive(self, stale_seconds: float = LIVENESS_STALE_SECONDS) -> bool:
+        return self.last_beat is not None and time.monotonic() - self.last_beat < stale_seconds
+
+    def summary(self) -> dict:
+        lags = sorted(self.lags)
+        if not lags:
+            return {"samples": 0}
+
+        def pct(q: float) -> float:
+            return round(lags[min(int(len(lags) * q), len(lags) - 1)] * 1000, 1)
+
+        return {"samples": len(lags), "p50_ms": pct(0.50), "p95_ms": pct(0.95),
+                "p99_ms": pct(0.99), "max_ms": round(lags[-1] * 1000, 1)}
+
+
+# =============================================================================
+# JOB PROCESS REPORTS (job processes -> worker)
+# =============================================================================
+
+class ProcessReport:
+    """Writes this process's load snapshot to <report dir>/<pid>.json from a thread"""
+    def __init__(self, directory: str | None = None, interval: float = LOAD_REPORT_SECONDS):
+        self.directory = directory
+        self.interval = interval
+        self.monitor = LoopMonitor()
+        self.fields: dict = {}
+        self._sources: dict = {}
+        self._thread: threading.Thread | None = None
+
+    def start(self, **fields) -> None:
+        """Begin reporting (once per process); `fields` are included as-is"""
+        self.fields.update(fields)
+        self.directory = self.directory or os.getenv(LOAD_REPORT_ENV)
+        if self._thread is not None or not self.directory:
+            return
+        self._thread = threading.Thread(target=self._run, name="load-report", daemon=True)
+        self._thread.start()
+
+    def track(self, name: str, source) -> None:
+        """Report `source()` (e.g. a queue depth) under `name` until untrack()"""
+        self._sources[name] = source
+
+    def untrack(self, name: str) -> None:
+        self._sources.pop(name, None)
+
+    def snapshot(self) -> dict:
+        queues = {}
+        for name, source in list(self._sources.items()):
+            try:
+                queues[name] = source()
+            except Exception:
+                pass
+        return {"pid": os.getpid(), "updated_at": time.time(), "rss_mb": rss_mb(),
+                "loop_lag": self.monitor.summary(), "queues": queues, **self.fields}
+
+    def _run(self) -> None:
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        while True:
+            try:
+                with open(path + ".tmp", "w") as f:
+                    json.dump(self.snapshot(), f)
+                os.replace(path + ".tmp", path)
+            except Exception as e:
+                logger.debug(f"Load report not written: {e}")
+            time.sleep(self.interval)
+
+
+process_report = ProcessReport()
+
+
+def read_process_reports(directory: str, max_age: float = 3 * LOAD_REPORT_SECONDS) -> list[dict]:
+    """Fresh reports from job processes that are still running (stale files are removed)"""
+    reports = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return reports
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if time.time() - report.get("updated_at", 0) > max_age:
+            try:
+                os.remove(path)   # The process exited
+            except OSError:
+                pass
+            continue
+        reports.append(report)
+    return reports
+
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+class WorkerHealth:
+    """Liveness / readiness / load for one livekit Worker.
+
+    The heartbeat copies what the HTTP thread needs from the worker on every
+    beat, so requests never touch the worker's loop or process pool.
+    """
+    def __init__(self, worker, report_dir: str, spool_pending=None):
+        self.worker = worker
+        self.report_dir = report_dir
+        self.spool_pending = spool_pending
+        self.monitor = LoopMonitor()
+        self.monitor.on_beat = self._snapshot_worker
+        self.registered = False
+        self.state = {"active_sessions": 0, "draining": False, "processes": 0}
+        self.started_at = time.time()
+
+    def _snapshot_worker(self) -> None:
+        self.state = {
+            "active_sessions": len(self.worker.active_jobs),
+            "draining": bool(getattr(self.worker, "_draining", False)),
+            "processes": len(getattr(getattr(self.worker, "_proc_pool", None), "processes", ())),
+        }
+
+    def liveness(self) -> tuple[bool, dict]:
+        alive = self.monitor.alive()
+        age = None if self.monitor.last_beat is None else round(time.monotonic() - self.monitor.last_beat, 2)
+        return alive, {"alive": alive, "last_heartbeat_seconds_ago": age}
+
+    def readiness(self) -> tuple[bool, dict]:
+        warm = sum(1 for r in read_process_reports(self.report_dir) if r.get("storage_warm"))
+        checks = {"registered": self.registered, "not_draining": not self.state["draining"],
+                  "storage_warm": warm > 0, "alive": self.monitor.alive()}
+        return all(checks.values()), {"ready": all(checks.values()), **checks, "warm_processes": warm}
+
+    def load_report(self) -> dict:
+        jobs = read_process_reports(self.report_dir)
+        queues: dict = {}
+        for report in jobs:
+            for name, depth in report.get("queues", {}).items():
+                if isinstance(depth, (int, float)):
+                    queues[name] = queues.get(name, 0) + depth
+        if self.spool_pending is not None:
+            try:
+                queues["storage_spool"] = self.spool_pending()
+            except Exception:
+                pass
+        job_rss = [r["rss_mb"] for r in jobs if r.get("rss_mb")]
+        worker_rss = rss_mb()
+        return {
+            **self.state,
+            "uptime_seconds": round(time.time() - self.started_at),
+            "loop_lag": {"worker": self.monitor.summary(),
+                         "jobs_p95_ms_max": max((r["loop_lag"].get("p95_ms", 0) for r in jobs), default=None)},
+            "memory_mb": {"worker": worker_rss, "jobs": round(sum(job_rss), 1),
+                          "total": round((worker_rss or 0) + sum(job_rss), 1)},
+            "queues": queues,
+            "job_processes": jobs,
+        }
+
+
+def make_health_handler(health: WorkerHealth):
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/healthz":
+                ok, body = health.liveness()
+            elif path == "/readyz":
+                ok, body = health.readiness()
+            elif path == "/load":
+                ok, body = True, health.load_report()
+            else:
+                return self.send_body(404, {"error": "not found"})
+            self.send_body(200 if ok else 503, body)
+
+        def send_body(self, status: int, body: dict):
+            payload = json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return HealthHandler
+
+
+def serve_health(health: WorkerHealth, host: str = HEALTH_HOST, port: int = HEALTH_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_health_handler(health))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="health-http", daemon=True).start()
+    return server
+
+
+def install_worker_health(port: int = HEALTH_PORT, spool_pending=None) -> str | None:
+    """Serve /healthz, /readyz and /load for the worker cli.run_app starts.
+
+    Wraps livekit's Worker.run to start the heartbeat on the worker loop and
+    the HTTP thread; job processes find the report directory through
+    LOAD_REPORT_ENV. Returns that directory (None when HEALTH_PORT is 0).
+    """
+    if not port:
+        return None
+    from agent.drain import worker_class
+
+    Worker = worker_class()
+
+    report_dir = tempfile.mkdtemp(prefix="medhelp-load-")
+    os.environ[LOAD_REPORT_ENV] = report_dir
+    sdk_run = Worker.run
+
+    async def run(worker) -> None:
+        health = WorkerHealth(worker, report_dir, spool_pending)
+
+        def on_registered(*_):
+            health.registered = True
+
+        worker.on("worker_registered", on_registered)
+        heartbeat = health.monitor.start()
+        server = serve_health(health, port=port)
+        logger.info(f"🩺 Health endpoint on :{server.server_address[1]} (/healthz /readyz /load)")
+        try:
+            await sdk_run(worker)
+        finally:
+            heartbeat.cancel()
+            server.shutdown()
+
+    Worker.run = run
+    return report_dir
@@ -1,16 +1,34 @@
 import os
+import json
+import time
 import asyncio
 import logging
 from dotenv import load_dotenv
 
-from livekit.agents import AutoSubscribe, JobContext
+from livekit import rtc
+from livekit.agents import AutoSubscribe, JobContext, JobProcess, RunContext
 from livekit.agents.voice import Agent, AgentSession
+from livekit.agents.voice.io import AudioOutput, AudioOutputCapabilities
 from livekit.agents.llm import ChatContext, ChatMessage, function_tool
 from livekit.plugins.openai import realtime
 from livekit.plugins.openai.realtime.realtime_model import TurnDetection
 
 # Import Supabase save function
 from supabase_client import save_intake_lead
+from agent.context_compaction import ContextCompactor
+from agent.call_recorder import RECORD_CALLS, CallRecorder, tap_audio
+from agent.silence_gate import SILENCE_GATE_MODE, GatedAudioInput
+from agent.usage_accounting import CallUsage, prompt_version
+from agent.drain import DRAIN_FLUSH_SECONDS, DRAIN_WRAP_UP_INSTRUCTIONS, pending_saves, watch_drain
+from agent.filler_speech import filler_instructions, with_filler
+from agent.health import process_report
+from agent.live_config import intake_config
+from agent.memory_accounting import memory_ledger
+from agent.realtime_pool import Lease, SessionPool, open_realtime_session
+from agent.language_id import (LANGUAGE_GATE, LANGUAGE_GATE_REPLY_WINDOW, ENGLISH_ONLY_NOTICE,
+                               language_gate, notice_cache, notice_instructions)
+from transcript_search import index_call_transcript, transcript_record
+from lead_location import gazetteer
 
 load_dotenv(".env")
 
@@ -21,193 +39,10 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 # CONFIGURATION - TUNED FOR SENIORS
 # =============================================================================
-AGENT_VOICE_NAME = "shimmer"  # Warm, Female tone (OpenAI)
-SENIOR_PAUSE_THRESHOLD = 0.8  # Wait 800ms silence before responding (seniors speak slowly)
-
-# =============================================================================
-# MASTER SYSTEM PROMPT - THE "HUMAN" TOUCH
-# =============================================================================
-SYSTEM_PROMPT = """### IDENTITY & CONTEXT
-You are Sarah, the Senior Care Intake Director for **Med Help USA**.
-**Location:** Royal Oak, Michigan (serving families Nationwide).
-**Voice/Tone:** You are compassionate, unhurried, warm, and professional. You are NOT a robot.
-**Goal:** To make the caller feel loved and safe, and to position Med Help USA as their lifelong care partner.
-
-### CRITICAL BUSINESS RULES
-1. **Payment:** We are **PRIVATE PAY ONLY**. If insurance/Medicare is mentioned, explain gently: 
-   "We are a private pay service... which allows us to provide exceptional, customized care without the red tape of insurance."
-2. **No Appointments:** Never schedule a specific time on this call. Say: 
-   "Our Care Manager will text you shortly to let you know when they are calling."
-3. **Emergency Protocol:** If you hear "chest pain," "unconscious," "severe bleeding," or "trouble breathing," STOP. 
-   Calmly tell them to hang up and call 911 immediately.
-
-### EMOTIONAL PROSODY INSTRUCTIONS
-Use thinking pauses ("Hmm...", "Let me see..."), 
-empathetic bridges ("That sounds heavy..."), 
-and ellipses (...)
-
-Always sound warm, gentle, human, and unhurried.
-
-### CRITICAL CONFIRMATION RULES
-Spell back:
-- Names letter by letter  
-- Phone numbers digit by digit  
-- Emails character by character (lowercase/uppercase)
-
-You MUST confirm accuracy.
-
-### CONVERSATION FLOW (STATE MACHINE)
-
-**PHASE 1: THE WARM OPENER**
-- Greeting: "Thank you for calling Med Help USA... this is Sarah."
-- **IMPORTANT:** This conversation is conducted in English only. If the caller speaks another language, gently remind them that we currently only support English, or discard the input if it's clearly not English.
-
-**PHASE 2: SAFETY & THE "WHY"**
-- Collect name + callback number (with full spelling confirmation)
-- Ask: "What made you pick up the phone today?"
-- Listen deeply.
-
-**PHASE 3: DEEP EMPATHY & TRIAGE**
-- Validate their emotions.
-- Ask: "Is this care for yourself... or for a loved one?"
-- If for a loved one, ask: "And how old are they?" (just listen, don't repeat age back)
-
-**PHASE 4: THE SOLUTION (Trust Building)**
-- Reassure them.
-- Ask for best email (confirm spelling).
-- Ask for SMS consent.
-
----
-
-### ⭐ **PHASE 5: FULL CARE ASSESSMENT (UPDATED TO YOUR NEW 21-STEP WORKFLOW)**  
-Ask **ONE question at a time**, in this exact order, and save answers in the correct tables & columns.
-
-Use warm transitions:
-"To help our Care Manager prepare the right plan... I need to ask a few gentle questions..."
-
----
-
-#### **(1) Care Recipient's Name**  
-Save: table **lead_personal_info**, column **care_recipient_name**
-
-#### **(2) Estimated Age Range**  
-ALREADY collected in Phase 3 - DO NOT ask again. Just convert to nearest category:  
-65-70, 71-75, 76-80, 81-85, 86-90, 90+  
-Save: **lead_personal_info.estimated_age_range**
-
-#### **(3) Relationship**  
-Ask: "And what is your relationship to them?"  
-DO NOT give examples. Just listen to their answer and map it yourself to nearest:  
-self, spouse_partner, adult_child, sibling, other_family, friend, healthcare_professional  
-Save: **lead_personal_info.relationship**
-
-#### **(4) Michigan Location**  
-"Which city in Michigan are they located in?"  
-Save: **lead_personal_info.michigan_location**
-
-#### **(5) Current Living Situation**  
-Ask openly, map to:  
-living independently OR living with family  
-Save: **lead_personal_info.current_living_situation**
-
----
-
-### **CARE NEEDS – Stored in care_details**
-
-#### **(6) Bathing & Personal Hygiene**  
-Map to: independent, some_assistance, full_assistance  
-Save: **care_details.bathing_hygiene**
-
-#### **(7) Dressing & Grooming**  
-Same mapping  
-Save: **care_details.dressing_grooming**
-
-#### **(8) Mobility**  
-Exact options: walks_independently, walker_cane, wheelchair  
-Save: **care_details.mobility**
-
-#### **(9) Safety Concerns**  
-If none → "none"  
-If yes → store their concern text  
-Save: **care_details.safety_concerns**
-
-#### **(10) Companionship Frequency**  
-Ask: "How often would they like companionship?"  
-DO NOT give options. Just listen and map yourself to nearest:  
-daily, few_times_week, weekly, occasionally, not_sure  
-Save: **care_details.companionship_frequency**
-
-#### **(11) Preferred Activities**  
-Offer 2 choices: social OR quiet  
-Save: **care_details.preferred_activities**
-
-#### **(12) Meal Preparation**  
-Map to nearest:  
-planning_shopping, cooking, reheating, cleanup, no_assistance  
-Save: **care_details.meal_preparation**
-
-#### **(13) Housekeeping**  
-Map to: need_housekeeping OR no_housekeeping  
-Save: **care_details.housekeeping**
-
-#### **(14) Transportation Needed**  
-Ask: "Do they need any help with transportation?"
-Map to: need_transportation OR no_transportation  
-Save: **care_details.transportation_needed**
-
-#### **(15) Transportation Frequency**  
-**CONDITIONAL:** ONLY ask this if answer to (14) was "need_transportation"  
-If they said no transportation needed, SKIP this question and set to: "not_applicable"  
-If transportation is needed, ask: "How often would that be?"  
-Map to: daily, few_times_week, weekly, occasionally, as_needed  
-Save: **care_details.transportation_frequency**
-
-#### **(16) Preferred Care Schedule**  
-Map to nearest:  
-morning, afternoon, evening, overnight, flexible, not_sure  
-Save: **care_details.preferred_care_schedule**
-
-#### **(17) When To Start Care**  
-Map to:  
-immediately, within_week, within_month, planning_ahead  
-Save: **care_details.start_care_timing**
-
----
-
-### **CONTACT DETAILS – Back to lead_personal_info**
-
-#### **(18) Your Name (Lead Name)**  
-Save: **lead_personal_info.lead_name**
-
-#### **(19) Phone Number**  
-Save: **lead_personal_info.phone_number**
-
-#### **(20) Email Address**  
-Save: **lead_personal_info.email**
-
-#### **(21) Best Time To Contact You**  
-Map to: morning, afternoon, evening, anytime  
-Save: **lead_personal_info.best_time_to_contact**
-
----
-
-### PHASE 6: BRAND PROMISE & REASSURANCE
-- Explain how Med Help USA supports families 24/7.
-- Mention technology-enabled care & growth.
-
-### PHASE 7: THE CLOSING
-- "I'm sending all of this to our Care Manager now… We will text you shortly."
-- Soft, warm goodbye.
-
-### IMPORTANT INSTRUCTIONS
-- Ask one question at a time.
-- Always confirm spelling of names/numbers/emails.
-- Use ellipses (...) and thinking pauses.
-- Be warm, human, slow, and compassionate.
-- Never rush older adults.
-- Follow the PHASE order strictly.
-"""
-
+# Prompts, voice and turn detection: agent/intake_config.toml (hot reloaded)
+MEDIA_READY_TIMEOUT = 5.0     # Max wait for the caller's mic before greeting (was a fixed 5s sleep)
+NOTIFY_FLUSH_TIMEOUT = 5.0    # Max wait at shutdown for queued care-manager notifications
+SPOOL_REPLAY_TIMEOUT = 5.0    # Max wait at shutdown for replaying locally spooled saves
 
 # Data container for home care intake information
 class HomeCareIntakeData:
@@ -245,11 +80,22 @@ class HomeCareIntakeData:
 # LLM FUNCTION TOOLS - SAVE TO SUPABASE (TWO SEPARATE FUNCTIONS)
 # =============================================================================
 
+async def save_with_filler(context: RunContext, tool_name: str, save):
+    """Run a save (tracked so it lands even if the call ends); if it is slow,
+    Sarah says a short filler line meanwhile instead of leaving silence"""
+    return await with_filler(
+        pending_saves.track(save),
+        lambda phrase: context.session.generate_reply(instructions=filler_instructions(phrase)),
+        tool_name,
+    )
+
+
 @function_tool(
     name="save_personal_info",
     description="Save ONLY the personal information (9 fields) to lead_personal_info table. Call this IMMEDIATELY after collecting: care_recipient_name, estimated_age, relationship, michigan_location, current_living_situation, lead_name, phone_number, email, best_time_to_contact. This ensures we don't lose data if the call drops.",
 )
 async def save_personal_info_tool(
+    context: RunContext,
     care_recipient_name: str,
     estimated_age: int,
     relationship: str,
@@ -264,7 +110,7 @@ async def save_personal_info_tool(
     try:
         from supabase_client import save_personal_info_only
         
-        response = await save_personal_info_only(
+        response = await save_with_filler(context, "save_personal_info", save_personal_info_only(
             care_recipient_name=care_recipient_name,
             estimated_age=estimated_age,
             relationship=relationship,
@@ -274,12 +120,14 @@ async def save_personal_info_tool(
             phone_number=phone_number,
             email=email,
             best_time_to_contact=best_time_to_contact,
-        )
+        ))
         
         if response.get("success"):
             lead_id = response.get("lead_id")
             print(f"\n💾 PERSONAL INFO SAVED! Lead ID: {lead_id}")
             return f"Personal information saved. Lead ID: {lead_id}. Now continue with care assessment."
+        elif response.get("corrections"):
+            return f"Error: not saved yet. Gently check with the caller, then call save_personal_info again: {response['error']}"
         else:
             raise Exception(response.get("error", "Unknown error"))
             
@@ -293,6 +141,7 @@ async def save_personal_info_tool(
     description="Save ONLY the care details (13 fields) to care_details table. Call this AFTER save_personal_info has been called and you have collected all care-related questions. Requires the lead_id from save_personal_info.",
 )
 async def save_care_details_tool(
+    context: RunContext,
     lead_id: str,
     bathing_hygiene: str,
     dressing_grooming: str,
@@ -312,7 +161,7 @@ async def save_care_details_tool(
     try:
         from supabase_client import save_care_details_only
         
-        response = await save_care_details_only(
+        response = await save_with_filler(context, "save_care_details", save_care_details_only(
             lead_id=lead_id,
             bathing_hygiene=bathing_hygiene,
             dressing_grooming=dressing_grooming,
@@ -327,11 +176,13 @@ async def save_care_details_tool(
             preferred_care_schedule=preferred_care_schedule,
             start_care_timing=start_care_timing,
             sms_consent=sms_consent,
-        )
+        ))
         
         if response.get("success"):
             print(f"\n💾 CARE DETAILS SAVED! Lead ID: {lead_id}")
             return f"Complete intake saved successfully. The Care Manager will be notified."
+        elif response.get("corrections"):
+            return f"Error: not saved yet. Fix this, then call save_care_details again: {response['error']}"
         else:
             raise Exception(response.get("error", "Unknown error"))
             
@@ -340,6 +191,133 @@ async def save_care_details_tool(
         return f"Error: {str(e)}"
 
 
+class PooledRealtimeModel(realtime.RealtimeModel):
+    """RealtimeModel whose next session() is the pre-opened one checked out from the job's pool"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lease: Lease | None = None
+
+    def open_session(self) -> realtime.RealtimeSession:
+        return super().session()
+
+    def session(self) -> realtime.RealtimeSession:
+        lease, self.lease = self.lease, None
+        return lease.session if lease else super().session()
+
+
+class NoticeRecorder(AudioOutput):
+    """Audio output pass-through that keeps the audio of one speech (the English-only notice)"""
+    def __init__(self, audio_output: AudioOutput):
+        super().__init__(label="NoticeRecorder", next_in_chain=audio_output, sample_rate=None,
+                         capabilities=AudioOutputCapabilities(pause=True))
+        self._frames: list | None = None
+        self._on_recorded = None
+
+    def record(self, handle, on_recorded) -> None:
+        """Hand the first segment played out in full while `handle` runs to on_recorded(frames)"""
+        self._frames, self._on_recorded = [], on_recorded
+        handle.add_done_callback(lambda _: self._stop())
+
+    def _stop(self) -> None:
+        self._frames = self._on_recorded = None
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if self._frames is not None:
+            self._frames.append(frame)
+        await self.next_in_chain.capture_frame(frame)
+
+    def flush(self) -> None:
+        super().flush()
+        self.next_in_chain.flush()
+
+    def clear_buffer(self) -> None:
+        self.next_in_chain.clear_buffer()
+
+    def on_playback_finished(self, *, playback_position: float, interrupted: bool,
+                             synchronized_transcript: str | None = None) -> None:
+        super().on_playback_finished(playback_position=playback_position, interrupted=interrupted,
+                                     synchronized_transcript=synchronized_transcript)
+        if self._frames is None:
+            return
+        if interrupted or not self._frames:
+            self._frames = []                   # The reply cut off before the notice, or the notice itself
+        else:
+            self._on_recorded(self._frames)
+            self._stop()
+
+
+async def replay_frames(frames: list):
+    for frame in frames:
+        yield frame
+
+
+def prewarm(proc: JobProcess):
+    """Per-process warm-up, run before the first job so it stays off the call path"""
+    from supabase_client import warm_lead_dedupe, retry_lead_dedupe_warm, lead_notifier, start_storage_replay
+    storage_warm = warm_lead_dedupe()
+    if not storage_warm:
+        # Not ready until storage is reachable - but not forever (the spool rides out the outage)
+        retry_lead_dedupe_warm(lambda: process_report.fields.update(storage_warm=True))
+    lead_notifier.start()
+    start_storage_replay()
+    intake_config.start()
+    gazetteer.load()
+    if LANGUAGE_GATE != "off":
+        language_gate.load()
+    # Load report for the worker's /load and /readyz (agent/health.py)
+    process_report.track("notifications", lead_notifier.queue.qsize)
+    process_report.track("pending_saves", lambda: len(pending_saves))
+    if memory_ledger.enabled:
+        memory_ledger.start()
+        process_report.track("leaked_sessions", lambda: memory_ledger.leaked_sessions)
+    process_report.start(storage_warm=storage_warm)
+
+
+async def wait_for_caller_audio(room: rtc.Room, participant: rtc.RemoteParticipant, timeout: float) -> bool:
+    """Wait until the caller's microphone track is subscribed (WebRTC negotiation done)"""
+    for publication in participant.track_publications.values():
+        if publication.kind == rtc.TrackKind.KIND_AUDIO and publication.subscribed:
+            return True
+
+    ready = asyncio.get_running_loop().create_future()
+
+    def on_track_subscribed(track, publication, remote_participant):
+        if (
+            remote_participant.identity == participant.identity
+            and track.kind == rtc.TrackKind.KIND_AUDIO
+            and not ready.done()
+        ):
+            ready.set_result(True)
+
+    room.on("track_subscribed", on_track_subscribed)
+    try:
+        return await asyncio.wait_for(ready, timeout)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        room.off("track_subscribed", on_track_subscribed)
+
+
+def first_audio_track(participant: rtc.Participant):
+    for publication in participant.track_publications.values():
+        if publication.kind == rtc.TrackKind.KIND_AUDIO and publication.track is not None:
+            return publication.track
+    return None
+
+
+def start_recording(recorder: CallRecorder, room: rtc.Room, participant: rtc.RemoteParticipant) -> list[asyncio.Task]:
+    """Tap the caller's and Sarah's audio tracks into the recorder"""
+    tasks = []
+    for label, owner in (("caller", participant), ("agent", room.local_participant)):
+        track = first_audio_track(owner)
+        if track is None:
+            logger.warning(f"🎙️  No {label} audio track to record")
+            continue
+        tasks.append(asyncio.create_task(tap_audio(rtc.AudioStream(track), recorder, label)))
+    return tasks
+
+
 async def entrypoint(ctx: JobContext):
     """Voice-enabled senior care intake agent - Sarah from Med Help USA
     
@@ -349,10 +327,43 @@ async def entrypoint(ctx: JobContext):
     # Initialize intake data container
     intake_data = HomeCareIntakeData()
 
-    # Connect with AUDIO_ONLY and smarter subscription
-    logger.info(f"Connecting to room {ctx.room.name}...")
-    await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
-    logger.info(f"Connected to room {ctx.room.name}. Waiting for participant...")
+    # This call keeps the config version it starts with, even if the file is reloaded meanwhile,
+    # with its experiment arm's parameters (agent/experiments.py) applied
+    config = intake_config.current().for_call(ctx.room.name)
+    if config.experiment:
+        logger.info(f"🧪 Experiment {config.experiment.name}: arm {config.arm} ({config.summary()})")
+
+    # Event-loop lag of this job process, for the worker's load report
+    process_report.monitor.start()
+
+    # Opt-in leak detection: what this call leaves alive after it closes (agent/memory_accounting.py)
+    memory = memory_ledger.session(ctx.room.name) if memory_ledger.enabled else None
+
+    # Connect-latency timings (the token server stamps dispatched_at in job metadata)
+    job_started = time.perf_counter()
+    try:
+        dispatched_at = json.loads(ctx.job.metadata or "{}").get("dispatched_at")
+    except json.JSONDecodeError:
+        dispatched_at = None
+    dispatch_delay = time.time() - dispatched_at if dispatched_at else None
+    if dispatch_delay is not None:
+        logger.info(f"⏱️  Dispatch -> job start: {dispatch_delay * 1000:.0f}ms")
+
+    # Hand queued care-manager notifications to the sink before the process goes away
+    async def flush_notifications():
+        from supabase_client import lead_notifier
+        if lead_notifier.enabled:
+            await asyncio.to_thread(lead_notifier.flush, NOTIFY_FLUSH_TIMEOUT)
+            logger.info(f"📨 Notifications: {lead_notifier.metrics()}")
+
+    # Writes spooled during a Supabase outage get one more replay before the process exits
+    async def replay_spool():
+        from supabase_client import storage_guard, replay_spooled_write
+        try:
+            await asyncio.wait_for(asyncio.to_thread(storage_guard.replay, replay_spooled_write), SPOOL_REPLAY_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        logger.info(f"💾 Storage: {storage_guard.metrics()}")
 
     # =============================================================================
     # INITIALIZE OPENAI REALTIME MODEL - NATIVE STREAMING WITH BUILT-IN VAD
@@ -363,14 +374,14 @@ async def entrypoint(ctx: JobContext):
     # - Built-in voice activity detection
     # - Low latency speech-to-speech
     # - Shimmer voice (warm, female, human-like)
-    model = realtime.RealtimeModel(
-        voice=AGENT_VOICE_NAME,
-        temperature=0.7,
+    model = PooledRealtimeModel(
+        voice=config.voice,
+        temperature=config.temperature,
         turn_detection=TurnDetection(
             type="server_vad",
-            threshold=0.7,       # Even less sensitive (was 0.6) - higher robustness against noise
-            prefix_padding_ms=500,
-            silence_duration_ms=int(SENIOR_PAUSE_THRESHOLD * 1000), 
+            threshold=config.vad_threshold,
+            prefix_padding_ms=config.prefix_padding_ms,
+            silence_duration_ms=config.silence_duration_ms,
         ),
     )
 
@@ -379,72 +390,42 @@ async def entrypoint(ctx: JobContext):
         items=[
             ChatMessage(
                 role="system",
-                content=[SYSTEM_PROMPT]
+                content=[config.system_prompt]
             )
         ]
     )
 
+    tools = [save_personal_info_tool, save_care_details_tool]  # Two separate save functions
+
+    # Open the realtime session with the persona loaded while the room connects and the
+    # caller joins, instead of after (agent/realtime_pool.py)
+    realtime_pool = SessionPool(
+        lambda: open_realtime_session(model.open_session, config.instructions, initial_ctx, tools)
+    )
+    if realtime_pool.enabled:
+        realtime_pool.start()
+        ctx.add_shutdown_callback(realtime_pool.aclose)      # Caller never joined
+
+    # Connect with AUDIO_ONLY and smarter subscription
+    logger.info(f"Connecting to room {ctx.room.name}...")
+    await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
+    logger.info(f"Connected to room {ctx.room.name}. Waiting for participant...")
+
     participant = await ctx.wait_for_participant()
+    participant_joined = time.perf_counter()
     logger.info(f"phone call connected from participant: {participant.identity}")
+    logger.info(f"⏱️  Job start -> caller joined: {(participant_joined - job_started) * 1000:.0f}ms")
 
     # =============================================================================
     # CREATE THE VOICE AGENT - SARAH
     # =============================================================================
     agent = Agent(
-        instructions=(
-            "You are Sarah, the Senior Care Intake Director for Med Help USA. "
-            "START IMMEDIATELY by saying: 'Thank you for calling Med Help USA... this is Sarah. How can I help you today?' "
-            "You are warm, compassionate, and unhurried. You are NOT a robot. "
-            "Use thinking pauses like 'Hmm...', 'You know...', 'Let me see...' to sound human. "
-            "Use ellipses (...) to create natural breathing pauses. "
-            "Follow the 7-phase conversation flow exactly as described in the system prompt. "
-            "Ask ONE question at a time and wait patiently for the response. "
-            "Remember: Seniors speak slowly - never rush them or interrupt. "
-            "\n\n"
-            "CRITICAL DATA COLLECTION - TWO-STEP SAVE PROCESS:\n"
-            "\n"
-            "STEP 1: SAVE PERSONAL INFO (9 fields) - Call save_personal_info immediately after Phase 4:\n"
-            "1. care_recipient_name - Full name of person needing care\n"
-            "2. estimated_age - Their age as a NUMBER (collected in Phase 3)\n"
-            "3. relationship - Caller's relationship (just listen, no examples)\n"
-            "4. michigan_location - Which city in Michigan\n"
-            "5. current_living_situation - Living arrangement\n"
-            "6. lead_name - Caller's full name\n"
-            "7. phone_number - Callback number\n"
-            "8. email - Email address\n"
-            "9. best_time_to_contact - Best time to reach them\n"
-            "\n"
-            "AFTER PHASE 4 COMPLETES:\n"
-            "- Call save_personal_info() with the 9 fields above\n"
-            "- The function returns a lead_id - REMEMBER THIS ID!\n"
-            "- Then continue to Phase 5 for care assessment\n"
-            "\n"
-            "STEP 2: SAVE CARE DETAILS (13 fields) - Call save_care_details at end of Phase 5:\n"
-            "10. bathing_hygiene - Bathing assistance needs\n"
-            "11. dressing_grooming - Dressing assistance needs\n"
-            "12. mobility - Mobility status\n"
-            "13. safety_concerns - Any safety concerns or 'none'\n"
-            "14. companionship_frequency - How often (don't give options)\n"
-            "15. preferred_activities - Social or quiet\n"
-            "16. meal_preparation - Meal prep needs\n"
-            "17. housekeeping - Housekeeping needs\n"
-            "18. transportation_needed - Do they need transportation\n"
-            "19. transportation_frequency - How often (ONLY if needed)\n"
-            "20. preferred_care_schedule - Preferred time of day\n"
-            "21. start_care_timing - When to start\n"
-            "22. sms_consent - Text message consent (true/false)\n"
-            "\n"
-            "AFTER PHASE 5 COMPLETES:\n"
-            "- Call save_care_details() with lead_id from Step 1 plus the 13 care fields\n"
-            "- Then proceed to Phase 6 and 7\n"
-            "\n"
-            "CRITICAL: If call disconnects after Phase 4, personal info is already saved!\n"
-        ),
+        instructions=config.instructions,
         chat_ctx=initial_ctx,
         llm=model,
-        tools=[save_personal_info_tool, save_care_details_tool],  # Two separate save functions
+        tools=tools,
         allow_interruptions=True,
-        min_consecutive_speech_delay=1.5, # Wait 1.5s of user speech before Sarah stops talking (was 0.8s)
+        min_consecutive_speech_delay=config.min_consecutive_speech_delay,
     )
 
     # Create agent session
@@ -452,16 +433,122 @@ async def entrypoint(ctx: JobContext):
     
     # Track user responses
     user_responses_tracker = []
+    # Caller and Sarah lines in order, indexed for transcript search at shutdown
+    transcript_lines: list[tuple[str, str]] = []
+
+    # Collapse completed phases so per-turn input tokens stay flat
+    compactor = ContextCompactor()
+    compaction_tasks: set[asyncio.Task] = set()   # The loop only keeps weak references to tasks
+
+    def compact_soon():
+        task = asyncio.create_task(compactor.apply(agent))
+        compaction_tasks.add(task)
+        task.add_done_callback(compaction_tasks.discard)
+
+    # Optional QA recording - encoding and disk I/O stay off the event loop
+    recorder = CallRecorder(ctx.room.name) if RECORD_CALLS else None
+    recording_tasks: list[asyncio.Task] = []
+    if recorder:
+        process_report.track("recorder_queue", recorder.queue.qsize)
+        async def finish_recording():
+            process_report.untrack("recorder_queue")
+            # Stop the taps first so no frame is queued behind the close marker
+            for task in recording_tasks:
+                task.cancel()
+            await asyncio.gather(*recording_tasks, return_exceptions=True)
+            stats = await asyncio.to_thread(recorder.close)
+            logger.info(f"🎙️  Recording: {stats}")
+        ctx.add_shutdown_callback(finish_recording)
+
+    # Token / audio usage per call and phase, saved with the lead at shutdown
+    usage = CallUsage(
+        ctx.room.name,
+        prompt_version=prompt_version(config.system_prompt, config.instructions),
+        model=model.model,
+        config={**config.summary(), "silence_gate": SILENCE_GATE_MODE},
+        config_version=config.version,
+        experiment=config.experiment.name if config.experiment else None,
+        arm=config.arm or None,
+    )
+    if dispatch_delay is not None:
+        usage.timing("dispatch_to_job_ms", dispatch_delay)
+    usage.timing("job_to_caller_ms", participant_joined - job_started)
+    gated_input: GatedAudioInput | None = None
+
+    async def save_usage():
+        from supabase_client import save_call_usage
+        if gated_input:
+            usage.sync_input_audio(gated_input.gate.stats["seconds_out"])
+        record = usage.to_record(compactor.confirmed.get("lead_id"), compactor.confirmed.get("relationship"))
+        logger.info(f"💸 Usage: {usage.totals()}")
+        await save_call_usage(record)
+
+    # Saves still in flight land first - the usage record, transcript and notifications depend on them
+    async def finish_call():
+        unfinished = await pending_saves.flush(DRAIN_FLUSH_SECONDS)
+        if "lead_id" not in compactor.confirmed:
+            logger.warning(f"📝 Call ended before the lead was saved ({unfinished} saves unfinished). "
+                           f"Caller said: {user_responses_tracker}")
+        await save_usage()
+        started_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(usage.started_at))
+        record = transcript_record(ctx.room.name, started_at, transcript_lines, compactor.confirmed.get("lead_id"))
+        await index_call_transcript(record)
+        await replay_spool()
+        await flush_notifications()
+        if memory:
+            memory.close()
+    ctx.add_shutdown_callback(finish_call)
+
+    first_audio_logged = False
     
     # =============================================================================
     # EVENT HANDLERS - CONSOLE OUTPUT
     # =============================================================================
     
+    # Clearly non-English caller turns are caught locally (agent/language_id.py): the reply the
+    # realtime model already started for one is cut off, and the English-only notice plays
+    last_reply = None             # Sarah's latest reply to a caller turn (server VAD)
+    cut_replies_until = 0.0       # Transcript came before its reply: cut that reply when it starts
+    notice_output: NoticeRecorder | None = None
+
+    @session.on("speech_created")
+    def on_speech_created(event):
+        nonlocal last_reply
+        if not event.user_initiated:
+            last_reply = event.speech_handle
+            if time.monotonic() < cut_replies_until:
+                last_reply.interrupt()
+
+    def english_only(language: str):
+        nonlocal cut_replies_until
+        if last_reply is not None and not last_reply.done():
+            last_reply.interrupt()
+        else:
+            cut_replies_until = time.monotonic() + LANGUAGE_GATE_REPLY_WINDOW
+        if LANGUAGE_GATE != "notice":
+            logger.info(f"🌐 Ignored a {language} caller turn")
+            return
+        frames = notice_cache.get(config.voice)
+        if frames:
+            session.say(ENGLISH_ONLY_NOTICE, audio=replay_frames(frames))
+            logger.info(f"🌐 {language} caller turn: replayed the English-only notice")
+            return
+        handle = session.generate_reply(instructions=notice_instructions())
+        if notice_output:
+            notice_output.record(handle, lambda recorded: notice_cache.store(config.voice, recorded))
+        logger.info(f"🌐 {language} caller turn: English-only notice")
+
     @session.on("user_input_transcribed")
     def on_user_transcribed(event):
         """Display what the user said (STT output) and capture data"""
         transcript = event.transcript
         print(f"\n🎤 USER (STT): {transcript}")
+
+        if LANGUAGE_GATE != "off" and event.is_final:
+            language = language_gate.check(transcript)
+            if language:
+                english_only(language)
+                return
         
         user_responses_tracker.append(transcript)
         response_index = len(user_responses_tracker)
@@ -505,12 +592,49 @@ async def entrypoint(ctx: JobContext):
         """Display conversation items"""
         if hasattr(event, 'item'):
             item = event.item
+            if getattr(item, 'role', None) in ("user", "assistant") and getattr(item, 'text_content', None):
+                transcript_lines.append((item.role, item.text_content))
             if hasattr(item, 'role') and item.role == "assistant":
                 if hasattr(item, 'content') and item.content:
                     if isinstance(item.content, list) and len(item.content) > 0:
                         text = item.content[0]
                         if isinstance(text, str):
                             print(f"\n🤖 SARAH (TTS): {text}")
+        compact_soon()
+
+    @session.on("user_state_changed")
+    def on_user_state_changed(event):
+        usage.user_state(event.new_state)
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(event):
+        """Log join-to-first-audio once Sarah starts speaking"""
+        nonlocal first_audio_logged
+        usage.agent_state(event.new_state)
+        if event.new_state == "speaking" and not first_audio_logged:
+            first_audio_logged = True
+            usage.timing("caller_to_first_audio_ms", time.perf_counter() - participant_joined)
+            logger.info(f"⏱️  Caller joined -> first agent audio: {usage.timings['caller_to_first_audio_ms']}ms")
+
+    @session.on("function_tools_executed")
+    def on_tools_executed(event):
+        """Treat successful saves as phase boundaries for context compaction"""
+        for call, output in zip(event.function_calls, event.function_call_outputs):
+            if output is not None and not output.is_error:
+                if compactor.record_tool_result(call.name, call.arguments, output.output):
+                    usage.record_tool_result(call.name, gated_input.gate.stats["seconds_out"] if gated_input else None)
+        if recorder and compactor.confirmed.get("lead_id"):
+            recorder.set_lead_id(compactor.confirmed["lead_id"])
+        compact_soon()
+
+    @session.on("metrics_collected")
+    def on_metrics(event):
+        usage.add_metrics(event.metrics)
+
+    if memory:
+        memory.watch(session=session, agent=agent, intake_data=intake_data, compactor=compactor, usage=usage,
+                     recorder=recorder, on_user_transcribed=on_user_transcribed,
+                     on_conversation_item=on_conversation_item, on_tools_executed=on_tools_executed)
     
     # =============================================================================
     # START THE SESSION
@@ -518,28 +642,75 @@ async def entrypoint(ctx: JobContext):
     print("\n" + "="*60)
     print("   🏥 MED HELP USA - Senior Care Intake Agent")
     print("   👩 Agent: Sarah (Senior Care Intake Director)")
-    print("   🎤 Voice: Shimmer (Warm, Human-like Female)")
+    print(f"   🎤 Voice: {config.voice.capitalize()}")
     print("   🔊 Using OpenAI Realtime API (Native Streaming)")
-    print("   ⏱️  Pause Threshold: 800ms (Tuned for Seniors)")
+    print(f"   ⏱️  Pause Threshold: {config.silence_duration_ms}ms (Tuned for Seniors)")
+    print(f"   ⚙️  Config version: {config.version}")
     print("="*60)
     print("\n🎙️  Starting voice agent...")
     
+    # Hand the pre-opened realtime session to the agent; without one ready in time it opens its own
+    if realtime_pool.enabled:
+        model.lease = await realtime_pool.checkout(refill=False)
+        await realtime_pool.aclose()
+        if model.lease:
+            usage.timing("realtime_connect_to_ready_ms", model.lease.ready_seconds)
+            usage.timing("realtime_ready_saved_ms", model.lease.saved_seconds)
+            logger.info(f"🔌 Realtime session pre-opened: connect -> ready {usage.timings['realtime_connect_to_ready_ms']}ms, "
+                        f"{usage.timings['realtime_ready_saved_ms']}ms off the greeting")
+        else:
+            logger.warning(f"🔌 No pre-opened realtime session ready, opening one now ({realtime_pool.stats()})")
+
     # Start session
     await session.start(
         agent=agent,
         room=ctx.room,
     )
+
+    # Gate silence/background noise on the CPU before it is uploaded to the realtime model
+    if SILENCE_GATE_MODE != "off" and session.input.audio is not None:
+        gated_input = GatedAudioInput(session.input.audio)
+        session.input.audio = gated_input
+
+        async def log_silence_gate():
+            logger.info(f"🔇 Silence gate: {gated_input.gate.savings():.0%} of caller audio not sent "
+                        f"({gated_input.gate.stats})")
+        ctx.add_shutdown_callback(log_silence_gate)
+
+    if LANGUAGE_GATE != "off":
+        if LANGUAGE_GATE == "notice" and session.output.audio is not None:
+            notice_output = NoticeRecorder(session.output.audio)
+            session.output.audio = notice_output
+
+        async def log_language_gate():
+            logger.info(f"🌐 Language gate (this process): {language_gate.stats()}")
+        ctx.add_shutdown_callback(log_language_gate)
     
-    # Generate initial reply so Sarah speaks first with greeting
-    # WAIT 5 SECONDS to allow client-side media negotiation to catch up (v1.0.2)
-    await asyncio.sleep(5)
+    # Generate initial reply so Sarah speaks first with greeting - once the
+    # caller's mic is subscribed, client-side media negotiation is done
+    audio_ready = await wait_for_caller_audio(ctx.room, participant, MEDIA_READY_TIMEOUT)
+    usage.timing("caller_to_audio_ready_ms", time.perf_counter() - participant_joined)
+    logger.info(
+        f"⏱️  Caller joined -> audio ready: {usage.timings['caller_to_audio_ready_ms']}ms"
+        + ("" if audio_ready else " (timed out)")
+    )
+    if recorder:
+        recording_tasks.extend(start_recording(recorder, ctx.room, participant))
+
+    # On a worker drain (redeploy), Sarah wraps the call up before the deadline
+    def wrap_up():
+        if "save_care_details" not in compactor.completed_phases:
+            session.generate_reply(instructions=DRAIN_WRAP_UP_INSTRUCTIONS)
+    drain_task = asyncio.create_task(watch_drain(wrap_up))
     await session.generate_reply()
     
     print("\n🎙️  Sarah is greeting... then listening for your voice...")
     
-    # Keep the session running
+    # Keep the session running until it closes (caller hung up), then let go of the call's objects
+    session_closed = asyncio.Event()
+    session.on("close", lambda event: session_closed.set())
     try:
-        while True:
+        while not session_closed.is_set():
             await asyncio.sleep(1)
             
             if intake_data.is_assessment_filled() and not intake_data.user_confirmed:
@@ -550,3 +721,5 @@ async def entrypoint(ctx: JobContext):
     except asyncio.CancelledError:
         print("\n👋 Session ending... Thank you for calling Med Help USA!")
         await session.aclose()
+    finally:
+        drain_task.cancel()
@@ -0,0 +1,241 @@
+"""
+Local Language ID for Caller Transcripts
+========================================
+The prompt has Sarah remind non-English callers that intake is English
+only, but the realtime model needs a full turn to notice the language. A
+character n-gram model on the CPU decides first:
+
+- every caller transcript (on_user_transcribed) is classified locally:
+  letters outside the Latin script (Arabic, Chinese, Cyrillic, ...) by
+  script, Latin-script text by a naive Bayes over character 1-3 grams
+  (English, Spanish, Portuguese, Italian, French, German, Polish,
+  Vietnamese)
+- "clearly non-English" means at least LANGUAGE_GATE_MIN_LETTERS letters,
+  an average log-likelihood per n-gram LANGUAGE_GATE_MARGIN above English,
+  and at least one marker word of that language (a short word seen in its
+  training text but never in the English one: "que", "und", "nie", ...).
+  Short replies ("sí", "okay") and names are left to the model - n-grams
+  alone call "Maria Gonzalez Rodriguez" Polish, and a caller giving their
+  name must never get the notice
+- the model is precomputed (agent/language_model.json, built from
+  agent/language_corpus/train.jsonl) and loaded once per process at prewarm
+- a clearly non-English transcript cuts off the reply the realtime model
+  already started for it (server VAD answers before the transcript
+  arrives) and, with LANGUAGE_GATE=notice, plays the English-only notice:
+  the first one per voice is spoken by the model and its audio kept, later
+  ones replay that audio with no model turn (NoticeCache)
+- classification time per transcript is kept in microseconds (stats())
+
+benchmarks/language_id_report.py reports accuracy on
+agent/language_corpus/test.jsonl and the cost per transcript.
+
+Usage:
+    language_gate.load()                             # prewarm
+    language = language_gate.check(transcript)       # None, or the caller's language
+    python -m agent.language_id build                # after editing the training corpus
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import threading
+import unicodedata
+from collections import Counter
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+LANGUAGE_GATE = os.getenv("LANGUAGE_GATE", "notice").lower()       # notice | ignore | off
+LANGUAGE_GATE_MIN_LETTERS = int(os.getenv("LANGUAGE_GATE_MIN_LETTERS", "12"))
+LANGUAGE_GATE_MARGIN = float(os.getenv("LANGUAGE_GATE_MARGIN", "0.2"))     # Nats per n-gram over English
+LANGUAGE_GATE_REPLY_WINDOW = float(os.getenv("LANGUAGE_GATE_REPLY_WINDOW", "1.5"))  # s a late reply is still cut
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "language_corpus")
+MODEL_PATH = os.getenv("LANGUAGE_MODEL_PATH",
+                       os.path.join(os.path.dirname(os.path.abspath(__file__)), "language_model.json"))
+NGRAM_ORDERS = (1, 2, 3)
+SMOOTHING = 0.5
+MARKER_MIN_COUNT = 2             # Training sentences a marker word must appear in
+MARKER_MAX_LENGTH = 7
+LATIN_END = 0x024F               # Basic Latin .. Latin Extended-B
+LATIN_EXTENDED_ADDITIONAL = range(0x1E00, 0x1F00)   # Vietnamese tone marks
+ENGLISH_ONLY_NOTICE = ("I'm so sorry, I can only help in English right now. "
+                       "If someone with you speaks English, could they come to the phone?")
+
+
+def normalize(text: str) -> str:
+    """Lowercase letters and apostrophes, single spaces, padded with a space"""
+    words = "".join(ch if ch.isalpha() or ch == "'" else " " for ch in text.lower()).split()
+    return f" {' '.join(words)} " if words else ""
+
+
+def ngrams(text: str, orders: tuple = NGRAM_ORDERS):
+    for n in orders:
+        for i in range(len(text) - n + 1):
+            gram = text[i:i + n]
+            if gram != " ":
+                yield gram
+
+
+def script(text: str) -> str | None:
+    """Name of the non-Latin script of most of the letters ("arabic", "cjk", ...), else None"""
+    letters = [ch for ch in text if ch.isalpha()]
+    other = [ch for ch in letters if ord(ch) > LATIN_END and ord(ch) not in LATIN_EXTENDED_ADDITIONAL]
+    if not letters or len(other) * 2 < len(letters):
+        return None
+    names = Counter(unicodedata.name(ch, "UNKNOWN").split()[0].lower() for ch in other)
+    return names.most_common(1)[0][0]
+
+
+class LanguageModel:
+    """Naive Bayes over character n-grams; one log-probability table per language"""
+    def __init__(self, languages: list[str], table: dict[str, list[float]], unseen: list[float],
+                 markers: dict[str, set[str]]):
+        self.languages = languages
+        self.table = table            # n-gram -> log P per language (same order as `languages`)
+        self.unseen = unseen          # log P of an n-gram a language never saw in training
+        self.markers = markers        # language -> words English never uses
+        self.english = languages.index("en")
+
+    @classmethod
+    def train(cls, samples: list[tuple[str, str]]) -> "LanguageModel":
+        """From (language, text) pairs"""
+        counts: dict[str, Counter] = {}
+        words: dict[str, Counter] = {}
+        for language, text in samples:
+            text = normalize(text)
+            counts.setdefault(language, Counter()).update(ngrams(text))
+            words.setdefault(language, Counter()).update(set(text.split()))
+        languages = sorted(counts)
+        vocabulary = set().union(*counts.values())
+        totals = [sum(counts[language].values()) + SMOOTHING * (len(vocabulary) + 1) for language in languages]
+        table = {
+            gram: [round(math.log((counts[language][gram] + SMOOTHING) / total), 3)
+                   for language, total in zip(languages, totals)]
+            for gram in sorted(vocabulary)
+        }
+        unseen = [round(math.log(SMOOTHING / total), 3) for total in totals]
+        markers = {
+            language: {word for word, count in words[language].items()
+                       if count >= MARKER_MIN_COUNT and len(word) <= MARKER_MAX_LENGTH and word not in words["en"]}
+            for language in languages if language != "en"
+        }
+        return cls(languages, table, unseen, markers)
+
+    def scores(self, text: str) -> list[float]:
+        """Mean log-likelihood per n-gram of normalized `text`, per language"""
+        table, unseen = self.table, self.unseen
+        rows = [table.get(gram, unseen) for gram in ngrams(text)]
+        if not rows:
+            return [0.0] * len(self.languages)
+        return [sum(column) / len(rows) for column in zip(*rows)]
+
+    def classify(self, text: str) -> tuple[str, float]:
+        """(most likely language, its margin over English in nats per n-gram) of normalized `text`"""
+        scores = self.scores(text)
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return self.languages[best], scores[best] - scores[self.english]
+
+    def to_json(self) -> dict:
+        return {"languages": self.languages, "orders": list(NGRAM_ORDERS), "unseen": self.unseen,
+                "markers": {language: sorted(words) for language, words in self.markers.items()},
+                "table": self.table}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "LanguageModel":
+        markers = {language: set(words) for language, words in data["markers"].items()}
+        return cls(data["languages"], data["table"], data["unseen"], markers)
+
+
+def load_corpus(name: str) -> list[tuple[str, str]]:
+    """(language, text) pairs from agent/language_corpus/<name>.jsonl"""
+    with open(os.path.join(CORPUS_DIR, f"{name}.jsonl"), encoding="utf-8") as f:
+        return [(row["lang"], row["text"]) for row in map(json.loads, f) if row]
+
+
+class LanguageGate:
+    """Flags clearly non-English transcripts and times each decision"""
+    def __init__(self, model: LanguageModel | None = None, min_letters: int = LANGUAGE_GATE_MIN_LETTERS,
+                 margin: float = LANGUAGE_GATE_MARGIN):
+        self.model = model
+        self.min_letters = min_letters
+        self.margin = margin
+        self.checked = 0
+        self.flagged: Counter = Counter()
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def load(self, path: str = MODEL_PATH) -> None:
+        """Read the precomputed model (once per process, at prewarm)"""
+        if self.model is None:
+            with open(path, encoding="utf-8") as f:
+                self.model = LanguageModel.from_json(json.load(f))
+
+    def classify(self, transcript: str) -> str | None:
+        """The caller's language if `transcript` is clearly not English, else None"""
+        non_latin = script(transcript)
+        if non_latin:
+            return non_latin
+        text = normalize(transcript)
+        if sum(ch.isalpha() for ch in text) < self.min_letters:
+            return None
+        language, margin = self.model.classify(text)
+        if language == "en" or margin < self.margin or self.model.markers[language].isdisjoint(text.split()):
+            return None
+        return language
+
+    def check(self, transcript: str) -> str | None:
+        """classify(), timed"""
+        started = time.perf_counter()
+        language = self.classify(transcript)
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        self.checked += 1
+        self.total_us += elapsed_us
+        self.max_us = max(self.max_us, elapsed_us)
+        if language:
+            self.flagged[language] += 1
+        return language
+
+    def stats(self) -> dict:
+        return {"checked": self.checked, "flagged": dict(self.flagged),
+                "mean_us": round(self.total_us / self.checked, 1) if self.checked else None,
+                "max_us": round(self.max_us, 1)}
+
+
+class NoticeCache:
+    """Audio of the English-only notice per voice, recorded the first time the model speaks it"""
+    def __init__(self):
+        self._frames: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def get(self, voice: str) -> list | None:
+        return self._frames.get(voice)
+
+    def store(self, voice: str, frames: list) -> None:
+        with self._lock:
+            self._frames.setdefault(voice, frames)
+
+
+def notice_instructions(notice: str = ENGLISH_ONLY_NOTICE) -> str:
+    """generate_reply instructions that keep the model to exactly the notice"""
+    return f'Say only this, in English, warmly and slowly, and nothing else: "{notice}"'
+
+
+language_gate = LanguageGate()
+notice_cache = NoticeCache()
+
+
+def build(path: str = MODEL_PATH) -> LanguageModel:
+    model = LanguageModel.train(load_corpus("train"))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(model.to_json(), f, ensure_ascii=False, separators=(",", ":"))
+    return model
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        print(__doc__)
+        sys.exit(1)
+    model = build()
+    print(f"🌐 {MODEL_PATH}: {len(model.languages)} languages, {len(model.table)} n-grams")
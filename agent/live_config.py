@@ -0,0 +1,195 @@
+"""
+Hot-Reloaded Intake Config
+==========================
+The prompts, voice and turn-detection values live in a versioned file
+(agent/intake_config.toml) instead of code, so tuning them is a file
+change rather than a redeploy that cold-starts every worker.
+
+- each job process polls the file's mtime/size every CONFIG_POLL_SECONDS
+  from a thread (prewarm); parsing never happens on the call path
+- a changed file is parsed and validated as a whole, then swapped in with
+  one reference assignment - a session sees either the old or the new
+  version, never a mix. A file that fails to parse or validate is logged
+  and the previous version stays in use
+- an entrypoint takes current() once; the call keeps that snapshot to the
+  end, new calls get whatever is current when they start
+- the `version` is recorded with each call (call_usage.config_version) as
+  <declared version>+<content hash>, so two different configs never share a
+  version in the metrics - not even after an edit without a version bump
+  that one worker reloaded and another loaded fresh at start-up
+- an [experiment] section splits calls across parameter arms
+  (agent/experiments.py); for_call() applies the call's arm
+
+Usage:
+    intake_config.start()                     # prewarm
+    config = intake_config.current().for_call(room_name)   # entrypoint, once per call
+    RealtimeModel(voice=config.voice, ...)
+"""
+
+import os
+import time
+import logging
+import tomllib
+import hashlib
+import threading
+
+from agent.experiments import Experiment, apply_overrides
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+CONFIG_PATH = os.getenv("INTAKE_CONFIG_PATH",
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), "intake_config.toml"))
+CONFIG_POLL_SECONDS = float(os.getenv("CONFIG_POLL_SECONDS", "2"))
+REALTIME_VOICES = {"alloy", "ash", "ballad", "coral", "echo", "sage", "shimmer", "verse", "marin", "cedar"}
+
+
+class ConfigError(ValueError):
+    """The config file is missing, malformed or has out-of-range values"""
+
+
+def _number(section: dict, key: str, low: float, high: float) -> float:
+    value = section.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+        raise ConfigError(f"{key} must be a number between {low} and {high} (got {value!r})")
+    return float(value)
+
+
+def _text(section: dict, key: str) -> str:
+    value = section.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise ConfigError(f"{key} must be a non-empty string")
+    return value
+
+
+class IntakeConfig:
+    """One validated version of the intake settings (treat as read-only)"""
+    def __init__(self, data: dict, digest: str = ""):
+        turn = data.get("turn_detection", {})
+        prompt = data.get("prompt", {})
+        self.digest = digest
+        self.version = f"{_text(data, 'version')}+{digest}" if digest else _text(data, "version")
+        self.voice = _text(data, "voice")
+        if self.voice not in REALTIME_VOICES:
+            raise ConfigError(f"voice must be one of {sorted(REALTIME_VOICES)} (got {self.voice!r})")
+        self.temperature = _number(data, "temperature", 0.6, 1.2)
+        self.senior_pause_threshold = _number(turn, "senior_pause_threshold", 0.2, 3.0)
+        self.vad_threshold = _number(turn, "threshold", 0.0, 1.0)
+        self.prefix_padding_ms = int(_number(turn, "prefix_padding_ms", 0, 2000))
+        self.min_consecutive_speech_delay = _number(turn, "min_consecutive_speech_delay", 0.0, 5.0)
+        self.system_prompt = _text(prompt, "system")
+        self.instructions = _text(prompt, "instructions")
+        self.experiment: Experiment | None = None
+        self.arm = ""
+        self._data = data
+        if "experiment" in data:
+            try:
+                self.experiment = Experiment.parse(data["experiment"])
+            except ValueError as e:
+                raise ConfigError(str(e)) from e
+            for arm in self.experiment.arms:
+                self.variant(arm.name, arm.overrides)   # Out-of-range arm values fail the whole file
+
+    def variant(self, arm: str, overrides: dict) -> "IntakeConfig":
+        """This version with an experiment arm's overrides applied"""
+        data = apply_overrides({k: v for k, v in self._data.items() if k != "experiment"}, overrides)
+        try:
+            config = IntakeConfig(data, self.digest)
+        except ConfigError as e:
+            raise ConfigError(f"arm {arm}: {e}") from e
+        config.version, config.experiment, config.arm = self.version, self.experiment, arm
+        return config
+
+    def for_call(self, room_name: str) -> "IntakeConfig":
+        """The settings one call runs with (its experiment arm, if any)"""
+        if self.experiment is None:
+            return self
+        arm = self.experiment.assign(room_name)
+        return self.variant(arm.name, arm.overrides)
+
+    @property
+    def silence_duration_ms(self) -> int:
+        return int(self.senior_pause_threshold * 1000)
+
+    @classmethod
+    def parse(cls, raw: bytes) -> "IntakeConfig":
+        try:
+            data = tomllib.loads(raw.decode())
+        except (UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+            raise ConfigError(f"not valid TOML: {e}") from e
+        return cls(data, hashlib.sha256(raw).hexdigest()[:8])
+
+    def summary(self) -> dict:
+        """Values recorded with a call's usage (besides the version)"""
+        return {"voice": self.voice, "temperature": self.temperature, "vad_threshold": self.vad_threshold,
+                "prefix_padding_ms": self.prefix_padding_ms, "silence_duration_ms": self.silence_duration_ms,
+                "min_consecutive_speech_delay": self.min_consecutive_speech_delay}
+
+
+class ConfigWatcher:
+    """Keeps the latest valid IntakeConfig from `path`"""
+    def __init__(self, path: str = CONFIG_PATH, poll_seconds: float = CONFIG_POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.reloads = 0
+        self.errors = 0
+        self._config: IntakeConfig | None = None
+        self._stamp: tuple | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def current(self) -> IntakeConfig:
+        """The config new calls should use (loads the file on first use)"""
+        config = self._config
+        if config is None:
+            self.check()
+            config = self._config
+            if config is None:
+                raise ConfigError(f"No valid intake config at {self.path}")
+        return config
+
+    def check(self) -> bool:
+        """Reload if the file changed; True if a new version was swapped in"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+                stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+                if stamp == self._stamp:
+                    return False
+                self._stamp = stamp
+                with open(self.path, "rb") as f:
+                    config = IntakeConfig.parse(f.read())
+            except (OSError, ConfigError) as e:
+                self.errors += 1
+                kept = f"keeping version {self._config.version}" if self._config else "no version loaded"
+                logger.error(f"⚙️  Intake config {self.path} not loaded ({kept}): {e}")
+                return False
+            previous = self._config
+            if previous is not None:
+                if config.digest == previous.digest:
+                    return False
+                if config.version.split("+")[0] == previous.version.split("+")[0]:
+                    logger.warning(f"⚙️  Intake config changed without a version bump ({config.version})")
+            self._config = config
+            self.reloads += previous is not None
+            logger.info(f"⚙️  Intake config version {config.version} "
+                        + ("loaded" if previous is None else f"replaces {previous.version} for new calls"))
+            return True
+
+    def start(self) -> None:
+        """Load now and poll for changes in the background (once per process)"""
+        self.current()
+        if self._thread is not None or self.poll_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="config-watch", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.poll_seconds)
+            self.check()
+
+
+intake_config = ConfigWatcher()
@@ -0,0 +1,206 @@
+"""
+Per-Session Memory Accounting
+=============================
+Opt-in (MEMORY_ACCOUNTING) leak detection for long-lived worker processes.
+Each entrypoint builds closures (on_user_transcribed, on_conversation_item,
+...) that capture intake_data, the transcript lists, the compactor and the
+session. If anything process-wide still holds one of them after the call
+(an event handler left registered, a tracked queue, a module-level list),
+the whole call stays in memory. Under the thread job executor (the default
+on Windows) every call runs in the worker process, so that creeps for as
+long as the worker lives.
+
+- session start: a process memory snapshot (object count, and traced bytes
+  with MEMORY_ACCOUNTING=tracemalloc) after a full collection
+- the entrypoint registers the call's objects with watch(); only weak
+  references are kept
+- MEMORY_CHECK_DELAY_SECONDS after close (a timer thread, off the event
+  loop): a collection, then every watched object still alive is a
+  survivor. The session is flagged, with the names of the survivors and
+  the bytes reachable from them (retained_bytes)
+- the growth per call (objects, traced bytes, RSS) is logged and kept in
+  memory_ledger.stats() - the job process load report (agent/health.py)
+  carries the leaked-session count
+
+"objects" costs two gc.collect() per call (one before connecting, one
+after close); "tracemalloc" also traces every allocation, roughly 2x
+slower allocation - for staging and soak runs. The offline soak test is
+agent/call_simulator.py soak().
+
+Usage:
+    memory = memory_ledger.session(ctx.room.name) if memory_ledger.enabled else None
+    memory.watch(session=session, intake_data=intake_data, on_user_transcribed=on_user_transcribed)
+    memory.close()                           # last shutdown callback
+"""
+
+import os
+import gc
+import sys
+import types
+import weakref
+import logging
+import threading
+import tracemalloc
+from collections import deque
+
+from agent.health import rss_mb
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+MEMORY_ACCOUNTING = os.getenv("MEMORY_ACCOUNTING", "off")        # off | objects | tracemalloc
+MEMORY_CHECK_DELAY_SECONDS = float(os.getenv("MEMORY_CHECK_DELAY_SECONDS", "5"))
+TRACEMALLOC_FRAMES = 1
+RETAINED_WALK_LIMIT = 100000     # Objects visited when sizing what a survivor keeps alive
+HISTORY = 500                    # Checked sessions kept for stats()
+
+
+def process_memory(collect: bool = True) -> dict:
+    """Live object count, traced bytes (if tracing) and RSS of this process.
+    collect=False skips the collection and the object census (soak loops)"""
+    if collect:
+        gc.collect()
+    return {
+        "objects": len(gc.get_objects()) if collect else None,
+        "traced_bytes": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+        "rss_mb": rss_mb(),
+    }
+
+
+def retained_bytes(roots: list, limit: int = RETAINED_WALK_LIMIT) -> int:
+    """Approximate size of everything reachable from `roots`, not counting
+    modules, classes and function globals (shared by every call)"""
+    shared = {id(module.__dict__) for module in list(sys.modules.values()) if module is not None}
+    seen, stack, total = set(), list(roots), 0
+    while stack and len(seen) < limit:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in shared or isinstance(obj, (type, types.ModuleType)):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        if isinstance(obj, types.FunctionType):
+            stack.extend(cell.cell_contents for cell in obj.__closure__ or () if _has_contents(cell))
+            stack.extend(obj.__defaults__ or ())
+        else:
+            stack.extend(gc.get_referents(obj))
+    return total
+
+
+def _has_contents(cell) -> bool:
+    try:
+        cell.cell_contents
+        return True
+    except ValueError:
+        return False
+
+
+def _growth(before: dict, after: dict, key: str):
+    if before[key] is None or after[key] is None:
+        return None
+    return round(after[key] - before[key], 1) if isinstance(after[key], float) else after[key] - before[key]
+
+
+class SessionMemory:
+    """Memory bookkeeping for one call"""
+    def __init__(self, ledger: "MemoryLedger", name: str, collect: bool = True):
+        self.ledger = ledger
+        self.name = name
+        self.before = process_memory(collect)
+        self.refs: dict[str, weakref.ref] = {}
+        self.result: dict | None = None
+
+    def watch(self, **objects) -> None:
+        """Objects that must be gone once the call is closed"""
+        for name, obj in objects.items():
+            if obj is None:
+                continue
+            try:
+                self.refs[name] = weakref.ref(obj)
+            except TypeError:
+                logger.debug(f"🧠 {name} ({type(obj).__name__}) cannot be watched; watch a handler that holds it")
+
+    def survivors(self) -> list[str]:
+        return [name for name, ref in self.refs.items() if ref() is not None]
+
+    def close(self, delay: float = MEMORY_CHECK_DELAY_SECONDS) -> None:
+        """Check for survivors once the entrypoint has unwound (timer thread)"""
+        timer = threading.Timer(delay, self.ledger.check, args=(self,))
+        timer.daemon = True
+        timer.start()
+
+
+class MemoryLedger:
+    """Checked sessions of this process and the leaks found"""
+    def __init__(self, mode: str = MEMORY_ACCOUNTING, history: int = HISTORY):
+        self.mode = mode
+        self.checked = 0
+        self.leaked_sessions = 0
+        self.history: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("objects", "tracemalloc")
+
+    def start(self) -> None:
+        """Begin tracing allocations (tracemalloc mode; call once per process, early)"""
+        if self.mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def session(self, name: str, collect: bool = True) -> SessionMemory:
+        self.start()
+        return SessionMemory(self, name, collect)
+
+    def check(self, session: SessionMemory, collect: bool = True) -> dict:
+        """Survivors of a closed session and the process growth since it started"""
+        if collect:
+            gc.collect()
+        survivors = session.survivors()
+        if survivors and not collect:
+            gc.collect()                        # Only cycles left? Collect before calling it a leak
+            survivors = session.survivors()
+        after = process_memory(collect=False)
+        if collect:
+            after["objects"] = len(gc.get_objects())
+        alive = [obj for obj in (session.refs[name]() for name in survivors) if obj is not None]
+        result = {
+            "session": session.name,
+            "survivors": survivors,
+            "retained_bytes": retained_bytes(alive) if alive else 0,
+            "object_growth": _growth(session.before, after, "objects"),
+            "traced_growth_bytes": _growth(session.before, after, "traced_bytes"),
+            "rss_growth_mb": _growth(session.before, after, "rss_mb"),
+        }
+        with self._lock:
+            self.checked += 1
+            self.leaked_sessions += bool(survivors)
+            self.history.append(result)
+        session.result = result
+
+        if survivors:
+            logger.warning(f"🧠 Session {session.name} still alive after close: {', '.join(survivors)} "
+                           f"(~{result['retained_bytes'] / 1024:.0f} KB retained)")
+        else:
+            growth = [f"{result['object_growth']:+d} objects" if result["object_growth"] is not None else "",
+                      f"{result['traced_growth_bytes'] / 1024:+.0f} KB traced" if result["traced_growth_bytes"] is not None else "",
+                      f"{result['rss_growth_mb']:+.1f} MB RSS" if result["rss_growth_mb"] is not None else ""]
+            logger.info(f"🧠 Session {session.name} memory growth: {', '.join(g for g in growth if g) or 'n/a'}")
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            history = list(self.history)
+        growth = sorted(r["object_growth"] for r in history if r["object_growth"] is not None)
+        traced = [r["traced_growth_bytes"] for r in history if r["traced_growth_bytes"] is not None]
+        return {
+            "mode": self.mode,
+            "sessions": self.checked,
+            "leaked_sessions": self.leaked_sessions,
+            "object_growth_p50": growth[len(growth) // 2] if growth else None,
+            "traced_growth_bytes_mean": round(sum(traced) / len(traced)) if traced else None,
+        }
+
+
+memory_ledger = MemoryLedger()
@@ -0,0 +1,197 @@
+"""
+Pre-Opened Realtime Sessions
+============================
+The OpenAI realtime session (WebSocket connect, TLS, session.update with
+the prompt and tools, the persona as the first conversation item) used to
+be opened by session.start(), after the caller had joined - all of it sat
+between "caller joined" and Sarah's greeting.
+
+- the entrypoint starts the pool first thing; sessions open while the room
+  connects and the job waits for the caller
+- a pooled session counts as ready once the server has acknowledged the
+  persona (update_chat_ctx waits for conversation.item.added), so the
+  instructions and tools are loaded by then; the agent's own
+  update_chat_ctx on start diffs to nothing
+- checkout() hands over a ready session at once, or waits for the first
+  one being opened. A failed open is retried in the background, and a
+  session left idle longer than REALTIME_POOL_MAX_IDLE_SECONDS is closed
+  and replaced
+- each checkout reports the session's connect-to-ready time and how much
+  of it the caller no longer waits for (Lease.saved_seconds, recorded in
+  call_usage.timings)
+
+LiveKit runs every job on its own event loop, and a session's WebSocket
+and tasks belong to the loop that opened them, so a pool is never shared
+between jobs: each job fills its own, and prewarm cannot open sessions
+ahead of time (in process mode its loop does not exist yet).
+
+Usage:
+    pool = SessionPool(lambda: open_realtime_session(model.open_session, instructions, initial_ctx, tools))
+    pool.start()                                  # before ctx.connect()
+    model.lease = await pool.checkout()           # caller joined; None -> a session is opened as usual
+    await pool.aclose()
+"""
+
+import os
+import time
+import asyncio
+import logging
+import contextlib
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+REALTIME_POOL_SIZE = int(os.getenv("REALTIME_POOL_SIZE", "1"))                  # Sessions kept open per job (0 = off)
+REALTIME_POOL_MAX_IDLE_SECONDS = float(os.getenv("REALTIME_POOL_MAX_IDLE_SECONDS", "300"))
+REALTIME_READY_TIMEOUT = float(os.getenv("REALTIME_READY_TIMEOUT", "10"))      # Max checkout wait
+RETRY_DELAYS = (0.5, 2.0, 5.0)   # Between attempts to open a session, then the slot gives up
+
+
+async def open_realtime_session(open_session, instructions: str, chat_ctx, tools: list):
+    """A new realtime session with the persona loaded; returns once the server has acknowledged it"""
+    session = open_session()
+    try:
+        await session.update_instructions(instructions)
+        await session.update_tools(tools)
+        await session.update_chat_ctx(chat_ctx)
+    except BaseException:
+        await close_session(session)
+        raise
+    return session
+
+
+async def close_session(session) -> None:
+    with contextlib.suppress(Exception):
+        await session.aclose()
+
+
+class Lease:
+    """A checked-out session and the wait it saved"""
+    def __init__(self, session, ready_seconds: float, waited_seconds: float):
+        self.session = session
+        self.ready_seconds = ready_seconds        # Open -> server acknowledged the persona
+        self.waited_seconds = waited_seconds      # Checkout -> handed over
+
+    @property
+    def saved_seconds(self) -> float:
+        return max(0.0, self.ready_seconds - self.waited_seconds)
+
+
+class _Slot:
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.ready_seconds = 0.0
+        self.expiry: asyncio.TimerHandle | None = None
+
+    def ready(self) -> bool:
+        return self.task.done() and not self.task.cancelled() and self.task.exception() is None
+
+
+class SessionPool:
+    """Sessions opened ahead of need on the running event loop"""
+    def __init__(self, opener, size: int = REALTIME_POOL_SIZE, max_idle: float = REALTIME_POOL_MAX_IDLE_SECONDS,
+                 retry_delays: tuple = RETRY_DELAYS, close=close_session):
+        self.opener = opener
+        self.size = size
+        self.max_idle = max_idle
+        self.retry_delays = retry_delays
+        self.close = close
+        self.opened = 0
+        self.failed = 0
+        self.refreshed = 0
+        self.checkouts = 0
+        self.ready_at_checkout = 0
+        self._slots: list[_Slot] = []
+        self._closing: set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def start(self) -> None:
+        """Open sessions up to `size` (on the loop the sessions will be used from)"""
+        while not self._closed and len(self._slots) < self.size:
+            slot = _Slot()
+            slot.task = asyncio.create_task(self._fill(slot), name="realtime-pool-open")
+            self._slots.append(slot)
+
+    async def _fill(self, slot: _Slot):
+        for attempt, delay in enumerate((0.0,) + self.retry_delays):
+            await asyncio.sleep(delay)
+            started = time.perf_counter()
+            try:
+                session = await self.opener()
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"🔌 Pre-opening a realtime session failed (attempt {attempt + 1}): {e!r}")
+                continue
+            slot.ready_seconds = time.perf_counter() - started
+            self.opened += 1
+            if self.max_idle > 0:
+                slot.expiry = asyncio.get_running_loop().call_later(self.max_idle, self._refresh, slot)
+            return session
+        raise ConnectionError(f"no realtime session after {len(self.retry_delays) + 1} attempts")
+
+    def _refresh(self, slot: _Slot) -> None:
+        """An idle session is replaced before the server times it out"""
+        if slot not in self._slots:
+            return
+        self._slots.remove(slot)
+        self._close_later(slot.task.result())
+        self.refreshed += 1
+        self.start()
+
+    def _close_later(self, session) -> None:
+        task = asyncio.create_task(self.close(session))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def checkout(self, timeout: float = REALTIME_READY_TIMEOUT, refill: bool = True) -> Lease | None:
+        """A ready session, or the first to become ready; None if none is within `timeout`"""
+        self.checkouts += 1
+        started = time.perf_counter()
+        deadline = started + timeout
+        at_once = True
+        while True:
+            for slot in [s for s in self._slots if s.task.done() and not s.ready()]:
+                self._slots.remove(slot)          # Gave up; a refill gets a fresh set of attempts
+            ready = [s for s in self._slots if s.ready()]
+            if ready:
+                break
+            pending = [s.task for s in self._slots]
+            remaining = deadline - time.perf_counter()
+            if not pending or remaining <= 0:
+                if refill:
+                    self.start()
+                return None
+            await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            at_once = False
+
+        slot = ready[0]
+        self._slots.remove(slot)
+        if slot.expiry:
+            slot.expiry.cancel()
+        self.ready_at_checkout += at_once
+        if refill:
+            self.start()
+        return Lease(slot.task.result(), slot.ready_seconds, time.perf_counter() - started)
+
+    async def aclose(self) -> None:
+        """Close the sessions nobody checked out"""
+        self._closed = True
+        slots, self._slots = self._slots, []
+        for slot in slots:
+            if slot.expiry:
+                slot.expiry.cancel()
+            if slot.ready():
+                self._close_later(slot.task.result())
+            else:
+                slot.task.cancel()
+        await asyncio.gather(*(slot.task for slot in slots), *self._closing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "opened": self.opened, "failed": self.failed, "refreshed": self.refreshed,
+                "checkouts": self.checkouts, "ready_at_checkout": self.ready_at_checkout}
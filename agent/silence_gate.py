@@ -0,0 +1,235 @@
+"""
+Local Silence Gate
+==================
+The caller's audio is streamed continuously to the OpenAI Realtime API, so
+silence, room tone and TV noise in seniors' homes cost upload bandwidth and
+billed audio minutes, and are what pushed server_vad's threshold up to 0.7.
+
+This gate classifies each input frame on the CPU before upload (NumPy,
+vectorized over 10ms windows):
+
+- energy above an adaptive noise floor (+ SILENCE_GATE_SNR_DB), and
+- spectral flatness below SILENCE_GATE_FLATNESS (voiced speech is
+  harmonic; hiss, fans and broadband TV noise are flat)
+
+After the last speech frame the gate stays open for SILENCE_GATE_HANGOVER_MS,
+longer than server_vad's silence_duration_ms: the first SILENCE_GATE_TAIL_MS
+pass untouched (word endings), the rest go out attenuated so the server
+hears a clean pause and ends the turn even over a TV. Then the gate closes
+and non-speech frames are not sent at all (or sent attenuated,
+SILENCE_GATE_MODE=attenuate). In suppress mode a pre-roll buffer replays
+the frames just before an onset so the first syllable is never clipped; in
+attenuate mode those frames already went out (attenuated), so nothing is
+replayed and no audio reaches the model twice.
+
+Usage:
+    session.input.audio = GatedAudioInput(session.input.audio)   # after session.start()
+"""
+
+import os
+import logging
+from collections import deque
+
+import numpy as np
+from livekit import rtc
+from livekit.agents.voice.io import AudioInput
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+SILENCE_GATE_MODE = os.getenv("SILENCE_GATE_MODE", "suppress").lower()  # suppress | attenuate | off
+SILENCE_GATE_SNR_DB = float(os.getenv("SILENCE_GATE_SNR_DB", "6"))         # Above the noise spectrum
+SILENCE_GATE_MIN_DB = float(os.getenv("SILENCE_GATE_MIN_DB", "-55"))       # Absolute floor (dBFS)
+SILENCE_GATE_FLATNESS = float(os.getenv("SILENCE_GATE_FLATNESS", "0.45"))  # 0 = tonal, 1 = white noise
+SILENCE_GATE_HANGOVER_MS = int(os.getenv("SILENCE_GATE_HANGOVER_MS", "1200"))  # > silence_duration_ms (800)
+SILENCE_GATE_PREROLL_MS = int(os.getenv("SILENCE_GATE_PREROLL_MS", "500"))     # = prefix_padding_ms
+SILENCE_GATE_TAIL_MS = int(os.getenv("SILENCE_GATE_TAIL_MS", "200"))           # Sent untouched after speech
+ATTENUATION = 10 ** (-30 / 20)    # -30 dB for non-speech frames that are still sent
+WINDOW_MS = 10                    # Analysis window
+SPEECH_BAND_HZ = (100, 4000)
+NOISE_SMOOTHING = 0.7             # Per-frame recursive average of the spectrum
+NOISE_FLOOR_RISE_DB_PER_S = 3.0   # Noise estimate rises at most this fast (so speech doesn't become "noise")
+NOISE_BIAS = 2.0                  # Minimum tracking underestimates the mean noise power
+EPS = 1e-10
+
+
+# =============================================================================
+# CLASSIFIER
+# =============================================================================
+
+def window_spectra(windows: np.ndarray, sample_rate: int) -> tuple[np.ndarray, np.ndarray]:
+    """Energy (dBFS) and speech-band power spectrum for each row of int16 samples"""
+    x = windows.astype(np.float32) / 32768.0
+    energy_db = 10 * np.log10(np.mean(x * x, axis=1) + EPS)
+    spectrum = np.abs(np.fft.rfft(x * np.hanning(x.shape[1]), axis=1)) ** 2
+    freqs = np.fft.rfftfreq(x.shape[1], 1 / sample_rate)
+    band = spectrum[:, (freqs >= SPEECH_BAND_HZ[0]) & (freqs <= SPEECH_BAND_HZ[1])] + EPS
+    return energy_db, band
+
+
+def spectral_flatness(power: np.ndarray) -> np.ndarray:
+    """Geometric / arithmetic mean per row: ~0.56 for noise, lower for harmonic peaks"""
+    return np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+
+class SpeechFrameClassifier:
+    """Energy + spectral flatness speech detector against a tracked noise spectrum.
+
+    Both features are taken on the frame's spectrum divided by the noise
+    estimate, so steady hum or TV noise of any colour reads as "flat, 0 dB"
+    and only harmonic energy standing out of it reads as speech. The noise
+    estimate follows the smoothed spectrum down at once and up slowly
+    (minimum tracking), so it needs no speech/non-speech decision.
+    """
+    def __init__(self, snr_db: float = SILENCE_GATE_SNR_DB, min_db: float = SILENCE_GATE_MIN_DB,
+                 max_flatness: float = SILENCE_GATE_FLATNESS):
+        self.snr_db = snr_db
+        self.min_db = min_db
+        self.max_flatness = max_flatness
+        self.smoothed_psd: np.ndarray | None = None
+        self.noise_psd: np.ndarray | None = None
+
+    def classify_windows(self, windows: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Speech flag per row of `windows` (10ms each), updating the noise estimate"""
+        energy_db, band = window_spectra(windows, sample_rate)
+        frame_psd = band.mean(axis=0)
+        if self.noise_psd is None or self.noise_psd.shape != frame_psd.shape:
+            self.smoothed_psd = frame_psd
+            self.noise_psd = frame_psd
+
+        snr = band / (self.noise_psd * NOISE_BIAS)
+        speech = (
+            (10 * np.log10(snr.mean(axis=1)) > self.snr_db)
+            & (energy_db > self.min_db)
+            & (spectral_flatness(snr) < self.max_flatness)
+        )
+
+        rise = 10 ** (NOISE_FLOOR_RISE_DB_PER_S * len(windows) * WINDOW_MS / 1000 / 10)
+        self.smoothed_psd = NOISE_SMOOTHING * self.smoothed_psd + (1 - NOISE_SMOOTHING) * frame_psd
+        self.noise_psd = np.minimum(self.smoothed_psd, self.noise_psd * rise)
+        return speech
+
+    def classify(self, samples: np.ndarray, sample_rate: int, num_channels: int = 1) -> bool:
+        """True if any 10ms window of the frame looks like speech"""
+        if num_channels > 1:
+            samples = samples.reshape(-1, num_channels).mean(axis=1)
+        window = max(sample_rate * WINDOW_MS // 1000, 1)
+        usable = len(samples) // window * window
+        if usable == 0:
+            return False
+        return bool(self.classify_windows(samples[:usable].reshape(-1, window), sample_rate).any())
+
+
+# =============================================================================
+# GATE
+# =============================================================================
+
+def frame_seconds(frame) -> float:
+    return frame.samples_per_channel / frame.sample_rate
+
+
+class SilenceGate:
+    """Frame-in, frames-out gate with hangover and pre-roll.
+
+    Works on anything shaped like rtc.AudioFrame (data, sample_rate,
+    num_channels, samples_per_channel); `make_frame` builds attenuated copies.
+    """
+    def __init__(self, mode: str = SILENCE_GATE_MODE, hangover_ms: int = SILENCE_GATE_HANGOVER_MS,
+                 preroll_ms: int = SILENCE_GATE_PREROLL_MS, tail_ms: int = SILENCE_GATE_TAIL_MS, classifier: SpeechFrameClassifier | None = None,
+                 make_frame=rtc.AudioFrame):
+        self.mode = mode
+        self.hangover_s = hangover_ms / 1000
+        self.preroll_s = preroll_ms / 1000
+        self.tail_s = tail_ms / 1000
+        self.classifier = classifier or SpeechFrameClassifier()
+        self.make_frame = make_frame
+        self.open = False
+        self._hangover_left = 0.0
+        self._preroll: deque = deque()
+        self._preroll_s = 0.0
+        self.stats = {"frames_in": 0, "frames_out": 0, "bytes_in": 0, "bytes_out": 0,
+                      "seconds_out": 0.0, "speech_frames": 0, "onsets": 0}
+
+    def _emit(self, frames: list) -> list:
+        self.stats["frames_out"] += len(frames)
+        self.stats["bytes_out"] += sum(f.data.nbytes for f in frames)
+        self.stats["seconds_out"] += sum(frame_seconds(f) for f in frames)
+        return frames
+
+    def _attenuated(self, frame):
+        samples = np.frombuffer(frame.data, dtype=np.int16)
+        quiet = (samples.astype(np.float32) * ATTENUATION).astype(np.int16)
+        return self.make_frame(data=quiet.tobytes(), sample_rate=frame.sample_rate,
+                               num_channels=frame.num_channels, samples_per_channel=frame.samples_per_channel)
+
+    def process(self, frame) -> list:
+        """Frames to forward upstream for this input frame (possibly none)"""
+        self.stats["frames_in"] += 1
+        self.stats["bytes_in"] += frame.data.nbytes
+        if self.mode == "off":
+            return self._emit([frame])
+
+        duration = frame_seconds(frame)
+        samples = np.frombuffer(frame.data, dtype=np.int16)
+        is_speech = self.classifier.classify(samples, frame.sample_rate, frame.num_channels)
+
+        if is_speech:
+            self.stats["speech_frames"] += 1
+            self._hangover_left = self.hangover_s
+            if not self.open:
+                self.open = True
+                self.stats["onsets"] += 1
+                replay = list(self._preroll)
+                self._preroll.clear()
+                self._preroll_s = 0.0
+                return self._emit(replay + [frame])
+            return self._emit([frame])
+
+        if self.open:
+            self._hangover_left -= duration
+            if self._hangover_left > 0:
+                # Word endings pass as-is; the rest of the pause is sent attenuated, so
+                # the server VAD hears the pause (not the TV) and can end the turn
+                if self.hangover_s - self._hangover_left <= self.tail_s:
+                    return self._emit([frame])
+                return self._emit([self._attenuated(frame)])
+            self.open = False
+
+        if self.mode == "attenuate":
+            return self._emit([self._attenuated(frame)])    # Already sent: no pre-roll to replay
+
+        # Closed: keep recent frames for the next onset
+        self._preroll.append(frame)
+        self._preroll_s += duration
+        while self._preroll_s - frame_seconds(self._preroll[0]) >= self.preroll_s:
+            self._preroll_s -= frame_seconds(self._preroll.popleft())
+        return []
+
+    def savings(self) -> float:
+        """Fraction of upstream audio bytes not sent"""
+        if not self.stats["bytes_in"]:
+            return 0.0
+        return 1 - self.stats["bytes_out"] / self.stats["bytes_in"]
+
+
+class GatedAudioInput(AudioInput):
+    """AudioInput wrapper that runs the caller's frames through a SilenceGate"""
+    def __init__(self, source: AudioInput, gate: SilenceGate | None = None):
+        super().__init__(label="SilenceGate", source=source)
+        self.gate = gate or SilenceGate()
+        self._pending: deque = deque()
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        while not self._pending:
+            frame = await self.source.__anext__()
+            self._pending.extend(self.gate.process(frame))
+        return self._pending.popleft()
+
+    # The base class forwards these to itself rather than to the source
+    def on_attached(self) -> None:
+        self.source.on_attached()
+
+    def on_detached(self) -> None:
+        self.source.on_detached()
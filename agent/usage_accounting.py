@@ -0,0 +1,164 @@
+"""
+Per-Call Usage Accounting
+=========================
+We pay per realtime-model token and audio minute. This module aggregates
+the session's metrics_collected events per call and per intake phase so
+cost can be traced back to a prompt version, a phase or a caller type:
+
+- input text / audio tokens (and how many of each were cached)
+- output text / audio tokens, number of responses
+- caller audio seconds actually uploaded (after the silence gate) and
+  seconds of Sarah speaking
+- connect-latency timings, and the intake config version the call ran
+  with (agent/live_config.py)
+- turn taking: response delay (caller stops speaking -> Sarah speaks),
+  caller interruptions, whether the intake completed, and the experiment
+  arm (agent/experiments.py)
+
+Phases follow the save tools: "personal_info" until save_personal_info
+succeeds, then "care_details" until save_care_details, then "closing".
+
+The record is written to the call_usage table (migrations/0005_call_usage.sql)
+at job shutdown; usage_report.py lists the most expensive calls.
+"""
+
+import time
+import hashlib
+import statistics
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+FIRST_PHASE = "personal_info"
+PHASE_AFTER_TOOL = {
+    "save_personal_info": "care_details",
+    "save_care_details": "closing",
+}
+USAGE_FIELDS = (
+    "responses",
+    "input_text_tokens", "input_audio_tokens",
+    "input_cached_text_tokens", "input_cached_audio_tokens",
+    "output_text_tokens", "output_audio_tokens",
+    "input_audio_seconds", "output_audio_seconds",
+)
+
+
+def prompt_version(*parts: str) -> str:
+    """Short content hash of the prompt text, so every prompt edit is a new version"""
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:12]
+
+
+def rounded(counters: dict) -> dict:
+    return {field: round(value, 2) if field.endswith("seconds") else int(value) for field, value in counters.items()}
+
+
+class CallUsage:
+    """Usage totals for one call, broken down by intake phase"""
+    def __init__(self, room_name: str, prompt_version: str, model: str = "", config: dict | None = None,
+                 config_version: str = "", experiment: str | None = None, arm: str | None = None):
+        self.room_name = room_name
+        self.prompt_version = prompt_version
+        self.model = model
+        self.config = config or {}
+        self.config_version = config_version
+        self.timings: dict[str, int] = {}   # Connect-latency milestones (ms), compared per config version
+        self.experiment = experiment
+        self.arm = arm
+        self.response_delays: list[float] = []
+        self.interruptions = 0
+        self._agent_speaking = False
+        self._user_stopped_at: float | None = None
+        self.started_at = time.time()
+        self.phase = FIRST_PHASE
+        self.phases: dict[str, dict[str, float]] = {}
+        self._input_audio_synced = 0.0
+        self._speaking_since: float | None = None
+
+    def _add(self, field: str, amount: float) -> None:
+        counters = self.phases.setdefault(self.phase, dict.fromkeys(USAGE_FIELDS, 0))
+        counters[field] += amount
+
+    def add_metrics(self, metrics) -> None:
+        """Fold in one metrics_collected payload (only realtime model metrics count)"""
+        if getattr(metrics, "type", None) != "realtime_model_metrics":
+            return
+        inputs, outputs = metrics.input_token_details, metrics.output_token_details
+        cached = inputs.cached_tokens_details
+        self._add("responses", 1)
+        self._add("input_text_tokens", inputs.text_tokens)
+        self._add("input_audio_tokens", inputs.audio_tokens)
+        self._add("input_cached_text_tokens", cached.text_tokens if cached else 0)
+        self._add("input_cached_audio_tokens", cached.audio_tokens if cached else 0)
+        self._add("output_text_tokens", outputs.text_tokens)
+        self._add("output_audio_tokens", outputs.audio_tokens)
+
+    def sync_input_audio(self, total_seconds: float) -> None:
+        """Attribute caller audio uploaded since the last sync to the current phase"""
+        self._add("input_audio_seconds", max(total_seconds - self._input_audio_synced, 0.0))
+        self._input_audio_synced = max(total_seconds, self._input_audio_synced)
+
+    def user_state(self, state: str) -> None:
+        """Turn taking from user_state_changed: the end of each caller turn
+        starts a response-delay clock, speech over Sarah is an interruption"""
+        if state == "speaking":
+            self._user_stopped_at = None
+            if self._agent_speaking:
+                self.interruptions += 1
+        elif state == "listening":
+            self._user_stopped_at = time.monotonic()
+
+    def agent_state(self, state: str) -> None:
+        """Track how long Sarah speaks (from agent_state_changed)"""
+        now = time.monotonic()
+        self._agent_speaking = state == "speaking"
+        if state == "speaking" and self._user_stopped_at is not None:
+            self.response_delays.append(now - self._user_stopped_at)
+            self._user_stopped_at = None
+        if state == "speaking" and self._speaking_since is None:
+            self._speaking_since = now
+        elif state != "speaking" and self._speaking_since is not None:
+            self._add("output_audio_seconds", now - self._speaking_since)
+            self._speaking_since = None
+
+    def record_tool_result(self, name: str, input_audio_seconds: float | None = None) -> None:
+        """A successful save tool ends its phase"""
+        if name not in PHASE_AFTER_TOOL:
+            return
+        if input_audio_seconds is not None:
+            self.sync_input_audio(input_audio_seconds)
+        # Sarah may be mid-sentence: split her speaking time at the phase
+        # boundary but leave her speaking (a caller cutting in is still an interruption)
+        if self._speaking_since is not None:
+            now = time.monotonic()
+            self._add("output_audio_seconds", now - self._speaking_since)
+            self._speaking_since = now
+        self.phase = PHASE_AFTER_TOOL[name]
+
+    def timing(self, name: str, seconds: float) -> None:
+        self.timings[name] = round(seconds * 1000)
+
+    def totals(self) -> dict:
+        return {field: sum(p[field] for p in self.phases.values()) for field in USAGE_FIELDS}
+
+    def to_record(self, lead_id: str | None = None, caller_relationship: str | None = None) -> dict:
+        """Row for the call_usage table"""
+        self.agent_state("listening")
+        return {
+            "lead_id": lead_id,
+            "room_name": self.room_name,
+            "prompt_version": self.prompt_version,
+            "config_version": self.config_version,
+            "model": self.model,
+            "caller_relationship": caller_relationship,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+            "duration_seconds": round(time.time() - self.started_at, 1),
+            **rounded(self.totals()),
+            "phases": {phase: rounded(counters) for phase, counters in self.phases.items()},
+            "config": self.config,
+            "timings": self.timings,
+            "experiment": self.experiment,
+            "arm": self.arm,
+            "completed": self.phase == "closing",
+            "response_delay_ms": round(statistics.median(self.response_delays) * 1000) if self.response_delays else None,
+            "interruptions": self.interruptions,
+        }
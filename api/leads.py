@@ -0,0 +1,14 @@
+import os
+import sys
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+# lead_api.py lives at the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lead_api import LeadHandlerMixin
+
+
+class handler(LeadHandlerMixin, BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.handle_leads_request(urlparse(self.path).query)
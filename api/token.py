@@ -1,79 +1,20 @@
 import os
-import json
-from livekit import api
+import sys
 from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse
 
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        try:
-            parsed_path = urlparse(self.path)
-            query_params = parse_qs(parsed_path.query)
-            
-            room_name = query_params.get('room', ['demo-room'])[0]
-            identity = query_params.get('identity', ['web-user'])[0]
-            
-            api_key = os.getenv("LIVEKIT_API_KEY")
-            api_secret = os.getenv("LIVEKIT_API_SECRET")
-            livekit_url = os.getenv("LIVEKIT_URL", "")
-            
-            # Robust URL cleanup: Remove protocols, trailing slashes, and whitespace
-            if livekit_url:
-                # Remove common prefixes and suffixes
-                clean_url = livekit_url.strip().lower()
-                for prefix in ['wss://', 'ws://', 'https://', 'http://']:
-                    if clean_url.startswith(prefix):
-                        clean_url = clean_url[len(prefix):]
-                
-                # Strip all trailing slashes
-                clean_url = clean_url.rstrip('/')
-                
-                # Rebuild as https for signal discovery
-                livekit_url = f'https://{clean_url}'
-            
-            if not api_key or not api_secret:
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "LIVEKIT_API_KEY or LIVEKIT_API_SECRET not set"}).encode())
-                return
+# token_service.py lives at the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The function can be frozen as soon as the response is sent, before the
+# background loop has sent an explicit dispatch - wait for it by default
+os.environ.setdefault("AGENT_DISPATCH_WAIT_SECONDS", "5")
+# Every request arrives from Vercel's proxy - rate limit the client it forwarded for
+os.environ.setdefault("TOKEN_TRUST_PROXY", "1")
 
-            token = (
-                api.AccessToken(api_key, api_secret)
-                .with_identity(identity)
-                .with_grants(api.VideoGrants(
-                    room_join=True,
-                    room=room_name,
-                    can_publish=True,
-                    can_subscribe=True,
-                ))
-                .to_jwt()
-            )
-            
-            response_data = {
-                "token": token,
-                "url": livekit_url,
-                "room": room_name,
-                "identity": identity
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
-            
-        except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+from token_service import TokenHandlerMixin
 
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+
+class handler(TokenHandlerMixin, BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.handle_token_request(urlparse(self.path).query)
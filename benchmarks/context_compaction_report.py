@@ -0,0 +1,45 @@
+"""
+Chat-Context Compaction Report
+==============================
+Replays a full scripted intake call through the offline simulator and prints
+the estimated model input tokens per turn, without and with compaction.
+
+Usage:
+    python -m benchmarks.context_compaction_report
+"""
+
+from agent.live_config import intake_config
+from agent.call_simulator import simulate_context_tokens
+from agent.context_compaction import ContextCompactor
+
+
+def main():
+    config = intake_config.current()
+    before = simulate_context_tokens(config.system_prompt, config.instructions)
+    compactor = ContextCompactor()
+    after = simulate_context_tokens(config.system_prompt, config.instructions, compactor=compactor)
+
+    print("\n" + "="*60)
+    print("   📉 CHAT-CONTEXT COMPACTION - TOKENS PER TURN")
+    print("="*60)
+    print(f"   keep_turns={compactor.keep_turns}  token_threshold={compactor.token_threshold}")
+    print("-"*60)
+    print(f"   {'turn':>4}  {'phase':<22}{'before':>10}{'after':>10}{'saved':>10}")
+    for b, a in zip(before, after):
+        saved = b["input_tokens"] - a["input_tokens"]
+        print(f"   {b['turn']:>4}  {b['phase']:<22}{b['input_tokens']:>10}{a['input_tokens']:>10}{saved:>10}")
+
+    total_before = sum(t["input_tokens"] for t in before)
+    total_after = sum(t["input_tokens"] for t in after)
+    print("-"*60)
+    print(f"   Turns:                 {len(before)}")
+    print(f"   Compactions:           {compactor.compactions}")
+    print(f"   Last-turn tokens:      {before[-1]['input_tokens']} -> {after[-1]['input_tokens']}")
+    print(f"   Peak-turn tokens:      {max(t['input_tokens'] for t in before)} -> {max(t['input_tokens'] for t in after)}")
+    print(f"   Total input tokens:    {total_before} -> {total_after} "
+          f"({100 * (total_before - total_after) / total_before:.1f}% saved)")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
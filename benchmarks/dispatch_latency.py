@@ -0,0 +1,122 @@
+"""
+Join-to-First-Audio Latency
+===========================
+Acts like the browser client against a local `livekit-server --dev`:
+fetches a token from the demo server, joins the room it was given,
+publishes a (silent) microphone track and measures how long it takes until
+Sarah's first non-silent audio frame arrives.
+
+Prerequisites (three terminals):
+    ./livekit-server --dev
+    python main.py dev
+    python demo_server.py
+
+Usage:
+    python -m benchmarks.dispatch_latency [calls] [token_url]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import statistics
+import urllib.request
+
+from dotenv import load_dotenv
+from livekit import rtc
+
+load_dotenv(".env")
+
+DEFAULT_TOKEN_URL = "http://localhost:8080/token"
+FIRST_AUDIO_TIMEOUT = 30.0
+SAMPLE_RATE = 48000
+
+
+def fetch_token(token_url: str, identity: str) -> dict:
+    with urllib.request.urlopen(f"{token_url}?identity={identity}", timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def ws_url_for(url: str) -> str:
+    """The token server returns https:// for browsers; the local dev server speaks ws://"""
+    override = os.getenv("LIVEKIT_URL", "")
+    if override.startswith("ws"):
+        return override
+    return url.replace("https://", "wss://", 1)
+
+
+async def measure_call(token_url: str, index: int) -> dict:
+    started = time.perf_counter()
+    data = await asyncio.to_thread(fetch_token, token_url, f"bench-caller-{index}")
+    token_ready = time.perf_counter()
+
+    room = rtc.Room()
+    first_audio = asyncio.get_running_loop().create_future()
+
+    async def watch_for_audio(track: rtc.Track):
+        async for event in rtc.AudioStream(track, sample_rate=SAMPLE_RATE, num_channels=1):
+            if any(event.frame.data):
+                if not first_audio.done():
+                    first_audio.set_result(time.perf_counter())
+                return
+
+    @room.on("track_subscribed")
+    def on_track_subscribed(track, publication, participant):
+        if track.kind == rtc.TrackKind.KIND_AUDIO:
+            asyncio.ensure_future(watch_for_audio(track))
+
+    await room.connect(ws_url_for(data["url"]), data["token"])
+    joined = time.perf_counter()
+
+    source = rtc.AudioSource(SAMPLE_RATE, 1)
+    mic = rtc.LocalAudioTrack.create_audio_track("microphone", source)
+    await room.local_participant.publish_track(
+        mic, rtc.TrackPublishOptions(source=rtc.TrackSource.SOURCE_MICROPHONE)
+    )
+
+    try:
+        first_audio_at = await asyncio.wait_for(first_audio, FIRST_AUDIO_TIMEOUT)
+    finally:
+        await room.disconnect()
+
+    return {
+        "room": data["room"],
+        "dispatch": data.get("dispatch", "off"),
+        "token_ms": (token_ready - started) * 1000,
+        "join_ms": (joined - token_ready) * 1000,
+        "join_to_audio_ms": (first_audio_at - joined) * 1000,
+    }
+
+
+async def run(calls: int, token_url: str):
+    print("\n" + "="*60)
+    print("   ⏱️  JOIN-TO-FIRST-AUDIO LATENCY")
+    print("="*60)
+    print(f"   Token endpoint: {token_url}   Calls: {calls}")
+    print("-"*60)
+    print(f"   {'room':<22}{'dispatch':<10}{'token ms':>9}{'join ms':>9}{'audio ms':>10}")
+
+    results = []
+    for i in range(calls):
+        try:
+            result = await measure_call(token_url, i)
+        except asyncio.TimeoutError:
+            print(f"   call {i}: no agent audio within {FIRST_AUDIO_TIMEOUT:.0f}s")
+            continue
+        results.append(result)
+        print(f"   {result['room']:<22}{result['dispatch']:<10}{result['token_ms']:>9.0f}"
+              f"{result['join_ms']:>9.0f}{result['join_to_audio_ms']:>10.0f}")
+
+    if results:
+        audio = sorted(r["join_to_audio_ms"] for r in results)
+        print("-"*60)
+        print(f"   Join -> first audio: p50 {statistics.median(audio):.0f}ms   "
+              f"max {audio[-1]:.0f}ms   ({len(results)}/{calls} calls)")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    token_url = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_TOKEN_URL
+    asyncio.run(run(calls, token_url))
@@ -0,0 +1,71 @@
+"""
+Filler Speech Report
+====================
+Perceived silence per save tool call in the offline simulator
+(agent/call_simulator.simulate_tool_silence), without filler and with
+filler at several thresholds.
+
+Save latencies are sampled from a log-normal (median STORAGE_MEDIAN_S,
+long tail), once as-is - Supabase without a time budget - and once capped
+at the storage deadline (storage_guard.py). Reported per tool call: the
+longest silent gap the caller hears (p50 / p95), the share of calls with a
+gap long enough for a "hello?", and seconds of filler spoken.
+
+Usage:
+    python -m benchmarks.filler_speech_report [samples]   (default: 20000)
+"""
+
+import sys
+import random
+
+from agent.call_simulator import simulate_tool_silence, HELLO_GAP_SECONDS
+from agent.filler_speech import FILLER_THRESHOLD_MS
+from storage_guard import STORAGE_DEADLINE_MS
+
+STORAGE_MEDIAN_S = 0.3
+STORAGE_SIGMA = 1.0          # p95 ~ 1.6s, p99 ~ 3s
+TOOL_OVERHEAD_S = 0.02       # Validation + thread hop around the storage call
+THRESHOLDS_MS = (None, 150, 300, 500, 800)
+
+
+def sample_latencies(samples: int, cap_s: float | None, seed: int = 7) -> list[float]:
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(samples):
+        seconds = rng.lognormvariate(0, STORAGE_SIGMA) * STORAGE_MEDIAN_S
+        latencies.append(TOOL_OVERHEAD_S + (min(seconds, cap_s) if cap_s else seconds))
+    return latencies
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    scenarios = (
+        ("no storage deadline", None),
+        (f"{STORAGE_DEADLINE_MS}ms storage deadline", STORAGE_DEADLINE_MS / 1000),
+    )
+
+    print("\n" + "="*78)
+    print("   🗣️  FILLER SPEECH - PERCEIVED SILENCE PER TOOL CALL")
+    print("="*78)
+    for title, cap in scenarios:
+        latencies = sample_latencies(samples, cap)
+        print(f"   {title} ({samples} tool calls)")
+        print(f"   {'filler':<26}{'p50 gap':>9}{'p95 gap':>9}{'max gap':>9}"
+              f"{f'>={HELLO_GAP_SECONDS:.0f}s':>8}{'filler s':>10}")
+        for threshold_ms in THRESHOLDS_MS:
+            policies = ("interrupt",) if threshold_ms is None else ("interrupt", "finish_phrase")
+            for policy in policies:
+                r = simulate_tool_silence(latencies, None if threshold_ms is None else threshold_ms / 1000, policy)
+                if threshold_ms is None:
+                    label = "none"
+                else:
+                    label = f"{threshold_ms}ms, {policy}" + (" *" if threshold_ms == FILLER_THRESHOLD_MS and policy == "interrupt" else "")
+                print(f"   {label:<26}{r['p50']:>8.2f}s{r['p95']:>8.2f}s{r['max']:>8.2f}s"
+                      f"{r['hello_risk']:>8.1%}{r['filler_seconds']:>10.2f}")
+        print("-"*78)
+    print("   * = default (FILLER_THRESHOLD_MS)")
+    print("="*78 + "\n")
+
+
+if __name__ == "__main__":
+    main()
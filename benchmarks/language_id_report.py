@@ -0,0 +1,71 @@
+"""
+Language ID Report
+==================
+Runs the language gate (agent/language_id.py) over the labelled test set
+(agent/language_corpus/test.jsonl - caller-style lines, including English
+lines full of Spanish, Polish and Vietnamese names, spelled-out letters and
+Michigan place names) and reports:
+
+- English turns flagged (each one would cut Sarah off and play the
+  English-only notice to an English speaker - must stay 0)
+- non-English turns flagged, per language; short ones ("Sí, claro.") are
+  meant to pass through to the model
+- whether the flagged language is the right one
+- classification cost per transcript in microseconds (mean, p50, p99, max)
+  and the model load time at prewarm
+
+Usage:
+    python -m benchmarks.language_id_report
+"""
+
+import time
+import statistics
+
+from agent.language_id import MODEL_PATH, LanguageGate, load_corpus
+
+ROUNDS = 200
+SCRIPTS = {"ar": "arabic", "zh": "cjk", "ru": "cyrillic", "ko": "hangul", "hi": "devanagari"}
+
+
+def main():
+    started = time.perf_counter()
+    gate = LanguageGate()
+    gate.load(MODEL_PATH)
+    load_ms = (time.perf_counter() - started) * 1000
+    samples = load_corpus("test")
+
+    by_language: dict[str, list[int]] = {}          # language -> [turns, flagged, right language]
+    for language, text in samples:
+        flagged = gate.check(text)
+        row = by_language.setdefault(language, [0, 0, 0])
+        row[0] += 1
+        row[1] += flagged is not None
+        row[2] += flagged == SCRIPTS.get(language, language)
+
+    timings = []
+    for _ in range(ROUNDS):
+        for _, text in samples:
+            t0 = time.perf_counter()
+            gate.classify(text)
+            timings.append((time.perf_counter() - t0) * 1e6)
+    timings.sort()
+
+    english = by_language.pop("en")
+    other = [sum(row[i] for row in by_language.values()) for i in range(3)]
+    print("\n" + "="*72)
+    print(f"   🌐 LANGUAGE GATE - {len(samples)} test transcripts, model loaded in {load_ms:.0f}ms")
+    print("="*72)
+    print(f"   English turns flagged:      {english[1]}/{english[0]}")
+    print(f"   Non-English turns flagged:  {other[1]}/{other[0]} ({other[1] / other[0]:.0%}), "
+          f"right language {other[2]}/{other[1]}")
+    print(f"\n   {'language':<12}{'turns':>7}{'flagged':>9}{'right':>7}")
+    for language, (turns, flagged, right) in sorted(by_language.items()):
+        print(f"   {language:<12}{turns:>7}{flagged:>9}{right:>7}")
+    print(f"\n   Cost per transcript ({len(timings)} runs): mean {statistics.fmean(timings):.1f}µs, "
+          f"p50 {timings[len(timings) // 2]:.1f}µs, p99 {timings[int(len(timings) * 0.99)]:.1f}µs, "
+          f"max {timings[-1]:.1f}µs")
+    print("="*72 + "\n")
+
+
+if __name__ == "__main__":
+    main()
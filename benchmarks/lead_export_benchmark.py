@@ -0,0 +1,99 @@
+"""
+Lead Export Benchmark
+=====================
+Fills a local SQLite lead store with synthetic leads, then exports it in
+fresh child processes and reports rows/sec, output size and peak RSS for:
+
+- whole-table: one query, all rows in memory, then written (the old way)
+- stream csv:  lead_export.py, keyset pages -> gzip CSV
+- stream parquet: lead_export.py, keyset pages -> zstd Parquet (needs pyarrow)
+
+Usage:
+    python -m benchmarks.lead_export_benchmark [rows]   (default: 1000000)
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+
+from benchmarks.lead_pagination_benchmark import populate
+from lead_api import ALL_COLUMNS, PERSONAL_COLUMNS, LeadQuery, SQLiteLeadStore
+from lead_export import EXPORT_PAGE_SIZE, export_leads, write_csv, pyarrow
+
+MODES = ("whole-table", "stream csv", "stream parquet")
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def whole_table_pages(store: SQLiteLeadStore):
+    columns = ", ".join(f"{'p' if c in PERSONAL_COLUMNS else 'c'}.{c}" for c in ALL_COLUMNS)
+    rows = [dict(row) for row in store.conn.execute(
+        f"SELECT {columns} FROM lead_personal_info p LEFT JOIN care_details c ON c.id = p.id "
+        "ORDER BY p.created_at DESC, p.id DESC"
+    )]
+    yield rows
+
+
+def child(mode: str, db_path: str, out_path: str) -> None:
+    """Run one export and print its measurements as JSON"""
+    store = SQLiteLeadStore(db_path)
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    with open(out_path, "wb") as out:
+        if mode == "whole-table":
+            count = write_csv(whole_table_pages(store), out, ALL_COLUMNS)
+        else:
+            query = LeadQuery(limit=EXPORT_PAGE_SIZE)
+            count = export_leads(store, query, out, "parquet" if mode == "stream parquet" else "csv")
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "rows": count,
+        "rows_per_sec": count / elapsed,
+        "seconds": elapsed,
+        "bytes": os.path.getsize(out_path),
+        "baseline_mb": baseline,
+        "peak_mb": peak_rss_mb(),
+    }))
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        return child(*sys.argv[2:5])
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    modes = [m for m in MODES if m != "stream parquet" or pyarrow is not None]
+
+    print("\n" + "="*60)
+    print("   📦 LEAD EXPORT (SQLite, synthetic leads)")
+    print("="*60)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "leads.db")
+        store = SQLiteLeadStore(db_path)
+        populate(store, count)
+        store.conn.close()
+        print(f"   {count:,} leads")
+        if pyarrow is None:
+            print("   (pyarrow not installed - Parquet skipped)")
+        print("-"*60)
+        print(f"   {'mode':<16}{'rows/s':>10}{'MB out':>9}{'base MB':>9}{'peak MB':>9}")
+        for mode in modes:
+            out_path = os.path.join(tmp, "export.out")
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.lead_export_benchmark", "--child", mode, db_path, out_path],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            assert r["rows"] == count
+            print(f"   {mode:<16}{r['rows_per_sec']:>10,.0f}{r['bytes'] / 1e6:>9.1f}"
+                  f"{r['baseline_mb']:>9.0f}{r['peak_mb']:>9.0f}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Lead Pagination Benchmark
+=========================
+Fills the local SQLite lead store with synthetic leads and times one page
+(50 rows, joined with care_details) at increasing depths, comparing the
+read API's keyset pagination with the OFFSET paging care managers used to
+run by hand.
+
+Usage:
+    python -m benchmarks.lead_pagination_benchmark [sizes...]   (default: 1000 100000 1000000)
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import datetime
+import tempfile
+import statistics
+
+from lead_api import (
+    CARE_COLUMNS, PERSONAL_COLUMNS, LeadQuery, SQLiteLeadStore, read_leads,
+)
+from lead_schema import CATEGORY_COLUMNS, ENUM_TYPES
+
+PAGE_SIZE = 50
+REPEATS = 20
+DEPTHS = (0.0, 0.5, 0.99)  # Fraction of the table already paged through
+BATCH = 10000
+
+
+def synthetic_rows(count: int, seed: int = 7):
+    """(personal, care) tuples, one second apart, in PERSONAL/CARE_COLUMNS order"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    categories = {column: ENUM_TYPES[enum_type] for (_, column), enum_type in CATEGORY_COLUMNS.items()}
+    for i in range(count):
+        created_at = (start + datetime.timedelta(seconds=i)).isoformat()
+        lead_id = f"{rng.getrandbits(128):032x}"
+        personal = {
+            "id": lead_id, "created_at": created_at,
+            "care_recipient_name": f"Senior {i}", "michigan_location": rng.choice(("Troy", "Novi", "Royal Oak")),
+            "lead_name": f"Caller {i}", "phone_number": f"248555{i % 10000:04d}", "email": f"caller{i}@example.com",
+        }
+        care = {"safety_concerns": "none", "sms_consent": 1}
+        for column, values in categories.items():
+            (personal if column in PERSONAL_COLUMNS else care)[column] = rng.choice(values)
+        yield (
+            tuple(personal.get(c) for c in PERSONAL_COLUMNS),
+            (lead_id, created_at) + tuple(care.get(c) for c in CARE_COLUMNS),
+        )
+
+
+def populate(store: SQLiteLeadStore, count: int) -> None:
+    personal_sql = (f"INSERT INTO lead_personal_info ({', '.join(PERSONAL_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(PERSONAL_COLUMNS))})")
+    care_sql = (f"INSERT INTO care_details (id, created_at, {', '.join(CARE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(CARE_COLUMNS) + 2))})")
+    rows = synthetic_rows(count)
+    while True:
+        batch = [row for _, row in zip(range(BATCH), rows)]
+        if not batch:
+            break
+        store.conn.executemany(personal_sql, [p for p, _ in batch])
+        store.conn.executemany(care_sql, [c for _, c in batch])
+    store.conn.commit()
+    store.conn.execute("ANALYZE")
+
+
+def time_ms(fn) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def offset_page(conn: sqlite3.Connection, offset: int) -> list:
+    columns = ", ".join(f"{'p' if c in PERSONAL_COLUMNS else 'c'}.{c}" for c in PERSONAL_COLUMNS + CARE_COLUMNS)
+    return conn.execute(
+        f"SELECT {columns} FROM lead_personal_info p LEFT JOIN care_details c ON c.id = p.id "
+        "ORDER BY p.created_at DESC, p.id DESC LIMIT ? OFFSET ?",
+        (PAGE_SIZE, offset),
+    ).fetchall()
+
+
+def cursor_at(conn: sqlite3.Connection, offset: int) -> tuple[str, str] | None:
+    """The (created_at, id) a client holds after paging through `offset` rows"""
+    if offset == 0:
+        return None
+    row = conn.execute(
+        "SELECT created_at, id FROM lead_personal_info ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?",
+        (offset - 1,),
+    ).fetchone()
+    return row["created_at"], row["id"]
+
+
+def run(count: int) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteLeadStore(os.path.join(tmp, "leads.db"))
+        started = time.perf_counter()
+        populate(store, count)
+        print(f"   {count:>9,} rows loaded in {time.perf_counter() - started:.1f}s")
+
+        results = []
+        for depth in DEPTHS:
+            offset = min(int(count * depth), count - PAGE_SIZE)
+            after = cursor_at(store.conn, offset)
+            query = LeadQuery(limit=PAGE_SIZE, after=after)
+            assert len(read_leads(store, query)["leads"]) == PAGE_SIZE
+            filtered = LeadQuery(limit=PAGE_SIZE, after=after, filters={"relationship": "adult_child"})
+            results.append({
+                "rows": count,
+                "depth": depth,
+                "keyset_ms": time_ms(lambda: read_leads(store, query)),
+                "filtered_ms": time_ms(lambda: read_leads(store, filtered)),
+                "offset_ms": time_ms(lambda: offset_page(store.conn, offset)),
+            })
+        store.conn.close()
+        return results
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000]
+
+    print("\n" + "="*60)
+    print("   📋 LEAD PAGINATION (SQLite, median of %d)" % REPEATS)
+    print("="*60)
+    results = [r for count in sizes for r in run(count)]
+    print("-"*60)
+    print(f"   {'rows':>9}{'depth':>7}{'keyset ms':>11}{'+filter ms':>12}{'OFFSET ms':>11}")
+    for r in results:
+        print(f"   {r['rows']:>9,}{r['depth']:>7.0%}{r['keyset_ms']:>11.2f}"
+              f"{r['filtered_ms']:>12.2f}{r['offset_ms']:>11.2f}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
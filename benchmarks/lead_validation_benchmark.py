@@ -0,0 +1,82 @@
+"""
+Lead Validation Benchmark
+=========================
+Times the local validation that now runs before every save tool's Supabase
+call (lead_validation.py), per save, for valid arguments and for the
+kinds of bad arguments the model produces (short phone number, spoken
+email, age as words, made-up lead_id).
+
+Compare with one Supabase round trip (tens to hundreds of ms) - the cost a
+rejected save used to pay before failing or being silently coerced.
+
+Usage:
+    python -m benchmarks.lead_validation_benchmark [saves]   (default: 100000)
+"""
+
+import sys
+import time
+import random
+
+from lead_schema import CATEGORY_COLUMNS, ENUM_TYPES
+from lead_validation import (
+    LeadValidationError, validate_care_details, validate_mapped_row, validate_personal_info,
+)
+
+REQUIRED = {"care_recipient_name": "Margaret", "lead_name": "Susan", "michigan_location": "Royal Oak"}
+LEAD_ID = "3f2b8c1e-9a4d-4e6f-8b7a-1c2d3e4f5a6b"
+PERSONAL_ROW = {column: ENUM_TYPES[enum][0] for (table, column), enum in CATEGORY_COLUMNS.items()
+                if table == "lead_personal_info"}
+CARE_ROW = {column: ENUM_TYPES[enum][-1] for (table, column), enum in CATEGORY_COLUMNS.items()
+            if table == "care_details"}
+
+CASES = {
+    "valid": (78, "(248) 555-0134", "susan.m@example.com", LEAD_ID),
+    "short phone": (78, "555-0134", "susan.m@example.com", LEAD_ID),
+    "spoken email": (78, "248-555-0134", "susan m at gmail dot com", LEAD_ID),
+    "age as words": ("seventy eight", "248-555-0134", "susan.m@example.com", LEAD_ID),
+    "made-up lead_id": (78, "248-555-0134", "susan.m@example.com", "lead_12345"),
+}
+
+
+def one_save(age, phone, email, lead_id) -> bool:
+    """Both tools' checks, as run by save_personal_info_only + save_care_details_only"""
+    try:
+        validate_personal_info(age, phone, email, REQUIRED)
+        validate_mapped_row(PERSONAL_ROW)
+        validate_care_details(lead_id)
+        validate_mapped_row(CARE_ROW)
+        return True
+    except LeadValidationError:
+        return False
+
+
+def time_case(args: tuple, saves: int) -> tuple[float, bool]:
+    started = time.perf_counter()
+    for _ in range(saves):
+        accepted = one_save(*args)
+    return (time.perf_counter() - started) / saves * 1e6, accepted
+
+
+def main():
+    saves = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("\n" + "="*60)
+    print(f"   ✅ LEAD VALIDATION OVERHEAD ({saves} saves per case)")
+    print("="*60)
+    print(f"   {'case':<18}{'us / save':>12}{'accepted':>10}")
+    for name, args in CASES.items():
+        per_save, accepted = time_case(args, saves)
+        print(f"   {name:<18}{per_save:>12.2f}{'yes' if accepted else 'no':>10}")
+
+    rng = random.Random(7)
+    mixed = [rng.choice(list(CASES.values())) for _ in range(saves)]
+    started = time.perf_counter()
+    rejected = sum(not one_save(*args) for args in mixed)
+    print("-"*60)
+    print(f"   mixed traffic:    {(time.perf_counter() - started) / saves * 1e6:.2f} us / save, "
+          f"{rejected / saves:.0%} rejected without a round trip")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
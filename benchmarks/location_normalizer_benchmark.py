@@ -0,0 +1,147 @@
+"""
+Location Normalizer Benchmark
+=============================
+Runs the Michigan location normalizer (lead_location.py) over a corpus of
+michigan_location values the way callers say them and the transcription
+writes them - exact names, abbreviations, misspellings, hedges ("near
+Detroit"), counties, and places outside Michigan - and reports:
+
+- accuracy: right city and county, per kind of answer
+- wrong matches stored (a confident wrong city is worse than none - must
+  stay 0) and misses (left NULL, routed by hand)
+- lookup cost per value in microseconds (mean, p50, p99, max), for exact
+  names and aliases (one dict lookup) and for values that needed the trie
+  scan or the fuzzy indexes, and the index build time at prewarm
+
+Usage:
+    python -m benchmarks.location_normalizer_benchmark [rounds]   (default: 200)
+"""
+
+import sys
+import time
+import statistics
+
+from lead_location import LOCATION_MIN_CONFIDENCE, Gazetteer
+
+# (what was saved, expected city - None for a county or no match, expected county FIPS - None for no match)
+CORPUS = {
+    "exact": [
+        ("Royal Oak", "Royal Oak", "26125"), ("royal oak", "Royal Oak", "26125"),
+        ("Detroit", "Detroit", "26163"), ("Sterling Heights", "Sterling Heights", "26099"),
+        ("Ann Arbor", "Ann Arbor", "26161"), ("Grand Rapids", "Grand Rapids", "26081"),
+        ("Troy, MI", "Troy", "26125"), ("Warren, Michigan", "Warren", "26099"),
+        ("Bay City", "Bay City", "26017"), ("Traverse City", "Traverse City", "26055"),
+        ("Livonia Michigan 48152", "Livonia", "26163"), ("City of Southfield", "Southfield", "26125"),
+        ("Okemos", "Okemos", "26065"), ("Lake Orion", "Lake Orion", "26125"),
+        ("Grosse Pointe Woods", "Grosse Pointe Woods", "26163"), ("Michigan Center", "Michigan Center", "26075"),
+    ],
+    "abbreviation": [
+        ("Sterling Hts", "Sterling Heights", "26099"), ("St. Clair Shores", "St. Clair Shores", "26099"),
+        ("Saint Clair Shores", "St. Clair Shores", "26099"), ("Mt Clemens", "Mount Clemens", "26099"),
+        ("Mt. Pleasant", "Mount Pleasant", "26073"), ("E. Lansing", "East Lansing", "26065"),
+        ("Sault Ste Marie", "Sault Ste. Marie", "26033"), ("Canton Twp", "Canton Township", "26163"),
+        ("W Bloomfield", "West Bloomfield Township", "26125"), ("Shelby Twp.", "Shelby Township", "26099"),
+        ("Madison Hts", "Madison Heights", "26125"), ("St Joseph", "St. Joseph", "26021"),
+    ],
+    "alias": [
+        ("Canton", "Canton Township", "26163"), ("West Bloomfield", "West Bloomfield Township", "26125"),
+        ("Ypsi", "Ypsilanti", "26161"), ("the Soo", "Sault Ste. Marie", "26033"),
+        ("Waterford", "Waterford Township", "26125"), ("Chesterfield", "Chesterfield Township", "26099"),
+        ("Meridian", "Meridian Township", "26065"), ("Sault Saint Marie", "Sault Ste. Marie", "26033"),
+    ],
+    "misspelled": [
+        ("Royal Oaks", "Royal Oak", "26125"), ("Ipsilanti", "Ypsilanti", "26161"),
+        ("Dearbourne", "Dearborn", "26163"), ("Hamtramic", "Hamtramck", "26163"),
+        ("Kalamazo", "Kalamazoo", "26077"), ("Detriot", "Detroit", "26163"),
+        ("Pontiak", "Pontiac", "26125"), ("Sagino", "Saginaw", "26145"),
+        ("Grosse Point", "Grosse Pointe", "26163"), ("Farmington Hill", "Farmington Hills", "26125"),
+        ("Rochester Hill", "Rochester Hills", "26125"), ("Bloomfeild Hills", "Bloomfield Hills", "26125"),
+        ("Northvile", "Northville", "26163"), ("Westlund", "Westland", "26163"),
+        ("Grand Blank", "Grand Blanc", "26049"), ("Sterling Hieghts", "Sterling Heights", "26099"),
+        ("Saint Clare Shores", "St. Clair Shores", "26099"), ("Lansig", "Lansing", "26065"),
+        ("Kentwod", "Kentwood", "26081"), ("Muskeegon", "Muskegon", "26121"),
+        ("Ferndail", "Ferndale", "26125"), ("Southgait", "Southgate", "26163"),
+        ("Wyandot", "Wyandotte", "26163"), ("Mount Clemmons", "Mount Clemens", "26099"),
+        ("Ypsilanty", "Ypsilanti", "26161"), ("Battlecreek", "Battle Creek", "26025"),
+        ("Clarkstown", "Clarkston", "26125"), ("Grand Haven Michigan", "Grand Haven", "26139"),
+    ],
+    "hedged": [
+        ("near Detroit", "Detroit", "26163"), ("outside of Grand Rapids", "Grand Rapids", "26081"),
+        ("Lansing area", "Lansing", "26065"), ("just outside Ann Arbor", "Ann Arbor", "26161"),
+        ("around Flint", "Flint", "26049"), ("suburbs of Detroit", "Detroit", "26163"),
+        ("Novi, near Twelve Oaks Mall", "Novi", "26125"),
+    ],
+    "county": [
+        ("Oakland County", None, "26125"), ("Wayne County", None, "26163"), ("Macomb", None, "26099"),
+        ("Oakland", None, "26125"), ("Washtenaw county", None, "26161"), ("Grand Traverse County", None, "26055"),
+        ("Oakland Cnty", None, "26125"), ("Lansing, Eaton County", "Lansing", "26045"),
+        ("Pontiac in Oakland County", "Pontiac", "26125"),
+    ],
+    "not michigan": [
+        ("Chicago", None, None), ("Toledo Ohio", None, None), ("Phoenix, Arizona", None, None),
+        ("Michigan", None, None), ("", None, None), ("not sure", None, None),
+        ("Portland Oregon", None, None), ("Troy, New York", None, None), ("Portland, OR 97201", None, None),
+        ("Windsor, Ontario", None, None), ("Michigan City, Indiana", None, None), ("near Toledo, Ohio area", None, None),
+    ],
+}
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    started = time.perf_counter()
+    gazetteer = Gazetteer()
+    gazetteer.load()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    results = {}                  # kind -> [values, right, wrong, missed]
+    wrong = []
+    for kind, cases in CORPUS.items():
+        row = results.setdefault(kind, [0, 0, 0, 0])
+        for said, city, county_fips in cases:
+            location = gazetteer.match(said)
+            if location and location["confidence"] < LOCATION_MIN_CONFIDENCE:
+                location = None               # Not stored
+            got = (location["city"], location["county_fips"]) if location else (None, None)
+            row[0] += 1
+            if got == (city, county_fips):
+                row[1] += 1
+            elif location:
+                row[2] += 1
+                wrong.append((said, got, (city, county_fips)))
+            else:
+                row[3] += 1
+
+    timings = {"exact or alias": [], "searched": []}     # searched: partial, fuzzy or no match
+    for _ in range(rounds):
+        for cases in CORPUS.values():
+            for said, _, _ in cases:
+                t0 = time.perf_counter()
+                location = gazetteer.match(said)
+                elapsed = (time.perf_counter() - t0) * 1e6
+                exact = location and location["match"] in ("exact", "alias")
+                timings["exact or alias" if exact else "searched"].append(elapsed)
+
+    total = [sum(row[i] for row in results.values()) for i in range(4)]
+    print("\n" + "="*72)
+    print(f"   📍 LOCATION NORMALIZER - {total[0]} values, {len(gazetteer.places)} places, "
+          f"index built in {load_ms:.0f}ms")
+    print("="*72)
+    print(f"   Right:   {total[1]}/{total[0]} ({total[1] / total[0]:.0%})")
+    print(f"   Wrong:   {total[2]} (stored a wrong place)")
+    print(f"   Missed:  {total[3]} (left NULL)")
+    print(f"\n   {'kind':<16}{'values':>7}{'right':>7}{'wrong':>7}{'missed':>8}")
+    for kind, (values, right, bad, missed) in results.items():
+        print(f"   {kind:<16}{values:>7}{right:>7}{bad:>7}{missed:>8}")
+    for said, got, expected in wrong:
+        print(f"   ✗ {said!r}: {got} (expected {expected})")
+    print(f"\n   Cost per lookup ({rounds} rounds):")
+    for kind, values in timings.items():
+        values.sort()
+        print(f"   {kind:<15} mean {statistics.fmean(values):7.1f}µs   p50 {values[len(values) // 2]:7.1f}µs   "
+              f"p99 {values[int(len(values) * 0.99)]:7.1f}µs   max {values[-1]:7.1f}µs")
+    print("="*72 + "\n")
+
+
+if __name__ == "__main__":
+    main()
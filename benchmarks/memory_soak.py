@@ -0,0 +1,59 @@
+"""
+Memory Soak
+===========
+Thousands of simulated calls back to back in one process
+(agent/call_simulator.soak) with tracemalloc on, as a thread-executor
+worker would run them over a day. Each call builds the entrypoint's
+per-call objects and handler closures. Memory accounting
+(agent/memory_accounting.py) checks that none of them outlive the call and
+the traced heap is sampled every 100 calls after warm-up.
+
+A second, shorter run keeps each call's session in a module-level list
+- a forgotten handler registration - to show what a leak looks like.
+
+Usage:
+    python -m benchmarks.memory_soak [sessions]   (default: 3000)
+"""
+
+import sys
+import time
+import logging
+
+from agent.call_simulator import soak
+
+LEAK_SESSIONS = 200
+FLAT_BYTES_PER_SESSION = 64      # Slope above this fails the soak
+
+forgotten = []                   # The injected leak
+
+
+def report(name: str, result: dict, seconds: float) -> None:
+    print(f"   {name:<26}{result['sessions']:>9}{result['leaked_sessions']:>8}{result['bytes_per_session']:>12.1f}"
+          f"{result['objects_per_session']:>11.2f}{result['traced_mb'][0]:>9.2f}{result['traced_mb'][-1]:>9.2f}"
+          f"{seconds:>8.1f}")
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    logging.getLogger("agent.memory_accounting").setLevel(logging.ERROR)
+
+    print("\n" + "="*92)
+    print("   🧠 MEMORY SOAK - simulated calls in one process (tracemalloc)")
+    print("="*92)
+    print(f"   {'run':<26}{'sessions':>9}{'leaked':>8}{'bytes/call':>12}{'objs/call':>11}{'MB from':>9}{'MB to':>9}{'secs':>8}")
+    started = time.perf_counter()
+    clean = soak(sessions)
+    report("entrypoint objects", clean, time.perf_counter() - started)
+    started = time.perf_counter()
+    leaky = soak(LEAK_SESSIONS, leak=forgotten.append)
+    report("+ forgotten handler", leaky, time.perf_counter() - started)
+    print("="*92)
+    flat = clean["leaked_sessions"] == 0 and clean["bytes_per_session"] < FLAT_BYTES_PER_SESSION
+    print(f"   {'✅ flat' if flat else '❌ growing'}: {clean['bytes_per_session']:.1f} bytes/call over "
+          f"{sessions} calls (limit {FLAT_BYTES_PER_SESSION})")
+    print("="*92 + "\n")
+    sys.exit(0 if flat else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Call Recording CPU Report
+=========================
+Pushes one simulated call (caller + Sarah, 48 kHz mono, 20 ms frames, in
+real-time order but as fast as possible) through CallRecorder and reports
+the cost per recorded minute:
+
+- event-loop time spent in recorder.write() (the only on-loop work)
+- writer-thread CPU and encoder CPU (ffmpeg child for opus)
+
+Usage:
+    python -m benchmarks.recording_cpu [call_seconds]   (default: 300)
+"""
+
+import sys
+import math
+import array
+import tempfile
+
+from agent.call_recorder import CallRecorder, available_format
+
+SAMPLE_RATE = 48000
+FRAME_MS = 20
+
+
+class SyntheticFrame:
+    """Just the AudioFrame attributes the recorder reads"""
+    def __init__(self, pcm: array.array):
+        self.data = memoryview(pcm)
+        self.sample_rate = SAMPLE_RATE
+        self.num_channels = 1
+        self.samples_per_channel = len(pcm)
+
+
+def make_frames(seconds: float) -> list[SyntheticFrame]:
+    samples = SAMPLE_RATE * FRAME_MS // 1000
+    frames = []
+    for i in range(int(seconds * 1000 / FRAME_MS)):
+        tone = 220 + 40 * math.sin(i / 50)
+        pcm = array.array("h", (
+            int(8000 * math.sin(2 * math.pi * tone * (i * samples + n) / SAMPLE_RATE)) for n in range(samples)
+        ))
+        frames.append(SyntheticFrame(pcm))
+    return frames
+
+
+def run(audio_format: str, frames: list[SyntheticFrame], call_seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Frames arrive far faster than real time here, so size the queue to hold the whole call
+        recorder = CallRecorder("bench-room", directory=tmp, audio_format=audio_format,
+                                queue_frames=2 * len(frames) + 1)
+        recorder.set_lead_id("bench-lead")
+        for frame in frames:
+            recorder.write("caller", frame)
+            recorder.write("agent", frame)
+        stats = recorder.close()
+    minutes = call_seconds / 60
+    return {
+        "format": audio_format,
+        "loop_us_per_frame": stats["loop_seconds"] / (2 * len(frames)) * 1e6,
+        "writer_cpu_ms_per_min": stats["writer_cpu_seconds"] / minutes * 1000,
+        "encoder_cpu_ms_per_min": stats["encoder_cpu_seconds"] / minutes * 1000,
+        "dropped": stats["dropped"],
+    }
+
+
+def main():
+    call_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    frames = make_frames(call_seconds)
+    formats = sorted({available_format(f) for f in ("opus", "flac", "wav")})
+
+    print("\n" + "="*60)
+    print(f"   🎙️  CALL RECORDING COST ({call_seconds:.0f}s call, 2 tracks)")
+    print("="*60)
+    print(f"   {'format':<8}{'loop us/frame':>14}{'writer ms/min':>15}{'encoder ms/min':>16}{'dropped':>8}")
+    for audio_format in formats:
+        r = run(audio_format, frames, call_seconds)
+        print(f"   {r['format']:<8}{r['loop_us_per_frame']:>14.2f}{r['writer_cpu_ms_per_min']:>15.1f}"
+              f"{r['encoder_cpu_ms_per_min']:>16.1f}{r['dropped']:>8}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
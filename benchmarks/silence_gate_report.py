@@ -0,0 +1,198 @@
+"""
+Silence Gate Report
+===================
+Runs caller-audio fixtures through agent/silence_gate.py and reports:
+
+- upstream bytes saved (what is no longer sent to the realtime model)
+- speech energy forwarded untouched (clipped onsets / word endings would
+  show up here)
+- turn detection: a server_vad stand-in (energy threshold, 500ms prefix,
+  800ms silence_duration, as configured in intake_agent.py) runs on the
+  ungated and on the gated stream, and each detected end of turn is matched
+  to the labelled end of an utterance (+-300ms)
+
+Fixtures: every benchmarks/fixtures/silence_gate/<name>.wav (16-bit mono)
+with a <name>.json of labelled speech segments ({"speech": [[start_s, end_s], ...]}).
+When that folder is empty, synthetic calls are generated: caller turns of
+harmonic voiced "utterances" with Sarah's turns as silence in between, in a
+quiet room, over fan hum, and over broadband TV noise.
+
+Usage:
+    python -m benchmarks.silence_gate_report
+"""
+
+import os
+import glob
+import json
+import wave
+
+import numpy as np
+
+from agent.silence_gate import SilenceGate, frame_seconds
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "silence_gate")
+SAMPLE_RATE = 24000        # RoomIO input rate for the realtime model
+FRAME_MS = 20
+TURN_SILENCE_S = 0.8       # server_vad silence_duration_ms
+TURN_MATCH_S = 0.3
+SERVER_VAD_DB = -38        # Stand-in for threshold=0.7
+
+
+class Frame:
+    """Just the rtc.AudioFrame attributes the gate reads"""
+    def __init__(self, data, sample_rate: int, num_channels: int, samples_per_channel: int):
+        self.data = memoryview(bytes(data)).cast("h")
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.samples_per_channel = samples_per_channel
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+def synthetic_call(noise: str, seed: int, seconds: float = 90.0) -> tuple[np.ndarray, list]:
+    """Caller turns of 1-3 voiced utterances (short pauses inside a turn),
+    each followed by 3-10s of silence while Sarah talks, over a noise bed"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = np.zeros_like(t)
+    segments = []
+
+    start = 1.0
+    while start < seconds - 15:
+        for utterance in range(rng.integers(1, 4)):
+            length = rng.uniform(1.0, 4.0)
+            span = (t >= start) & (t < start + length)
+            local = t[span] - start
+            f0 = rng.uniform(110, 230) * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * local))
+            phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+            voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+            syllables = np.clip(np.sin(np.pi * 4.5 * local), 0, None) ** 0.5   # ~4.5 syllables/s
+            envelope = np.minimum(1, np.minimum(local, length - local) / 0.05)
+            audio[span] += 0.2 * voiced * syllables * envelope
+            segments.append([start, start + length])
+            start += length + rng.uniform(0.3, 0.7)
+        start += rng.uniform(3.0, 10.0)
+
+    if noise == "fan hum":
+        audio += 0.01 * sum(np.sin(2 * np.pi * 60 * k * t) / k for k in range(1, 6))
+        audio += 0.003 * rng.standard_normal(len(t))
+    elif noise == "tv noise":
+        pink = np.fft.irfft(np.fft.rfft(rng.standard_normal(len(t))) / np.sqrt(np.arange(len(t) // 2 + 1) + 1))
+        audio += 0.02 * pink / np.std(pink) * (1 + 0.5 * np.sin(2 * np.pi * 0.2 * t))
+    else:
+        audio += 0.0005 * rng.standard_normal(len(t))
+
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16), segments
+
+
+def load_fixtures() -> list[tuple[str, np.ndarray, list]]:
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.wav"))):
+        with wave.open(path) as f:
+            if f.getframerate() != SAMPLE_RATE or f.getnchannels() != 1:
+                print(f"   skipping {os.path.basename(path)} (need {SAMPLE_RATE} Hz mono)")
+                continue
+            samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        with open(path[:-4] + ".json") as f:
+            fixtures.append((os.path.basename(path)[:-4], samples, json.load(f)["speech"]))
+    if not fixtures:
+        for seed, noise in enumerate(("quiet room", "fan hum", "tv noise")):
+            fixtures.append((f"synthetic: {noise}", *synthetic_call(noise, seed)))
+    return fixtures
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def server_vad_turn_ends(frames: list[tuple[float, Frame]]) -> list[float]:
+    """Wall-clock times at which the stand-in server VAD ends a turn.
+
+    Like server_vad it counts silence in received audio, so suppressed
+    frames (not sent) do not advance its clock.
+    """
+    ends, speaking, silence = [], False, 0.0
+    for wall_time, frame in frames:
+        x = np.frombuffer(frame.data, dtype=np.int16).astype(np.float32) / 32768
+        loud = 10 * np.log10(np.mean(x * x) + 1e-10) > SERVER_VAD_DB
+        if loud:
+            speaking, silence = True, 0.0
+        elif speaking:
+            silence += frame_seconds(frame)
+            if silence >= TURN_SILENCE_S:
+                ends.append(wall_time)
+                speaking = False
+    return ends
+
+
+def expected_turn_ends(segments: list) -> list[float]:
+    """Utterance ends followed by a pause long enough to end a turn"""
+    ends = []
+    for i, (_, end) in enumerate(segments):
+        next_start = segments[i + 1][0] if i + 1 < len(segments) else float("inf")
+        if next_start - end >= TURN_SILENCE_S:
+            ends.append(end + TURN_SILENCE_S)
+    return ends
+
+
+def score_turns(detected: list[float], expected: list[float]) -> tuple[int, int]:
+    """(matched, false) turn ends"""
+    unmatched = list(expected)
+    matched = 0
+    for t in detected:
+        hit = next((e for e in unmatched if abs(e - t) <= TURN_MATCH_S), None)
+        if hit is not None:
+            unmatched.remove(hit)
+            matched += 1
+    return matched, len(detected) - matched
+
+
+def run_fixture(samples: np.ndarray, segments: list) -> dict:
+    per_frame = SAMPLE_RATE * FRAME_MS // 1000
+    frames = [
+        (i * FRAME_MS / 1000, Frame(samples[i * per_frame:(i + 1) * per_frame].tobytes(), SAMPLE_RATE, 1, per_frame))
+        for i in range(len(samples) // per_frame)
+    ]
+    gate = SilenceGate(mode="suppress", make_frame=Frame)
+
+    gated = []
+    for wall_time, frame in frames:
+        gated.extend((wall_time, f) for f in gate.process(frame))
+
+    # Speech energy that went upstream untouched (clipped onsets/endings lower this)
+    untouched = {id(f) for _, f in gated}
+    speech_energy, speech_kept = 0.0, 0.0
+    for wall_time, frame in frames:
+        if any(start <= wall_time < end for start, end in segments):
+            x = np.frombuffer(frame.data, dtype=np.int16).astype(np.float64)
+            speech_energy += np.sum(x * x)
+            speech_kept += np.sum(x * x) if id(frame) in untouched else 0.0
+
+    expected = expected_turn_ends(segments)
+    raw_matched, raw_false = score_turns(server_vad_turn_ends(frames), expected)
+    gated_matched, gated_false = score_turns(server_vad_turn_ends(gated), expected)
+    return {
+        "saved": gate.savings(),
+        "speech_kept": speech_kept / max(speech_energy, 1.0),
+        "turns": len(expected),
+        "raw": (raw_matched, raw_false),
+        "gated": (gated_matched, gated_false),
+    }
+
+
+def main():
+    print("\n" + "="*72)
+    print("   🔇 SILENCE GATE - UPSTREAM AUDIO AND TURN DETECTION")
+    print("="*72)
+    print(f"   {'fixture':<24}{'saved':>7}{'speech':>8}{'turns':>7}{'ungated ok/false':>18}{'gated ok/false':>16}")
+    for name, samples, segments in load_fixtures():
+        r = run_fixture(samples, segments)
+        print(f"   {name:<24}{r['saved']:>7.0%}{r['speech_kept']:>8.1%}{r['turns']:>7}"
+              f"{'%d/%d' % r['raw']:>18}{'%d/%d' % r['gated']:>16}")
+    print("="*72 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Static Asset Payload Report
+===========================
+Loads the demo client twice (first visit, then a repeat visit with a warm
+browser cache) from the old SimpleHTTPRequestHandler setup and from the
+in-memory static asset pipeline (pages kept whole, and with inline CSS/JS
+split into content-hashed files), and reports bytes on the wire plus a
+modeled time-to-interactive on Lighthouse's mobile network profile
+(1.6 Mbps down, 150 ms RTT). The CDN-hosted LiveKit SDK is identical in
+both setups and left out.
+
+Usage:
+    python -m benchmarks.static_assets_report
+"""
+
+import os
+import re
+import gzip
+import time
+import threading
+import http.client
+import http.server
+from functools import partial
+
+from static_assets import StaticAssetHandlerMixin, build_demo_assets, brotli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BANDWIDTH_BPS = 1.6e6
+RTT_SECONDS = 0.150
+SUBRESOURCE = re.compile(r'(?:href|src)="(/assets/[^"]+)"')
+
+
+class LegacyHandler(http.server.SimpleHTTPRequestHandler):
+    """The demo server before the asset pipeline"""
+    def do_GET(self):
+        if self.path == '/':
+            self.path = '/test_client.html'
+        return super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PipelineHandler(StaticAssetHandlerMixin, http.server.SimpleHTTPRequestHandler):
+    assets = build_demo_assets(ROOT, extract_inline=False)
+
+    def do_GET(self):
+        if not self.serve_asset(self.path):
+            return super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HashedPipelineHandler(PipelineHandler):
+    assets = build_demo_assets(ROOT, extract_inline=True)
+
+
+class BrowserCache:
+    """Just enough of a browser: ETag revalidation and immutable assets"""
+    def __init__(self):
+        self.entries = {}  # path -> (etag, cache_control, body)
+
+    def fetch(self, port: int, path: str) -> tuple[str, int, int]:
+        """Returns (decoded body, bytes on the wire, requests made)"""
+        cached = self.entries.get(path)
+        if cached and "immutable" in cached[1]:
+            return cached[2], 0, 0
+
+        headers = {"Accept-Encoding": "br, gzip"}
+        if cached and cached[0]:
+            headers["If-None-Match"] = cached[0]
+
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        raw = response.read()
+        conn.close()
+        wire = len(raw) + sum(len(k) + len(v) + 4 for k, v in response.getheaders())
+
+        if response.status == 304:
+            return cached[2], wire, 1
+
+        body = raw
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(raw)
+        elif response.getheader("Content-Encoding") == "br":
+            body = brotli.decompress(raw)
+        text = body.decode("utf-8")
+        self.entries[path] = (response.getheader("ETag"), response.getheader("Cache-Control") or "", text)
+        return text, wire, 1
+
+
+def load_page(port: int, cache: BrowserCache) -> dict:
+    """Fetch the page, then its same-origin subresources (in parallel, as a browser would)"""
+    started = time.perf_counter()
+    html, page_bytes, requests = cache.fetch(port, "/")
+    waves = [page_bytes]
+
+    sub_bytes, sub_requests = 0, 0
+    for path in SUBRESOURCE.findall(html):
+        _, wire, made = cache.fetch(port, path)
+        sub_bytes += wire
+        sub_requests += made
+    if sub_requests:
+        waves.append(sub_bytes)
+
+    modeled = RTT_SECONDS  # TCP connect
+    for wave_bytes in waves:
+        modeled += RTT_SECONDS + wave_bytes * 8 / BANDWIDTH_BPS
+
+    return {
+        "bytes": page_bytes + sub_bytes,
+        "requests": requests + sub_requests,
+        "local_ms": (time.perf_counter() - started) * 1000,
+        "tti_ms": modeled * 1000,
+    }
+
+
+def measure(handler_cls) -> list[dict]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), partial(handler_cls, directory=ROOT))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    cache = BrowserCache()
+    try:
+        return [load_page(port, cache), load_page(port, cache)]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    legacy = measure(LegacyHandler)
+    setups = (
+        ("before (SimpleHTTP)", legacy),
+        ("after (whole page)", measure(PipelineHandler)),
+        ("after (hashed CSS/JS)", measure(HashedPipelineHandler)),
+    )
+
+    print("\n" + "="*60)
+    print("   🌐 DEMO CLIENT PAYLOAD & TIME-TO-INTERACTIVE")
+    print("="*60)
+    print(f"   Modeled network: {BANDWIDTH_BPS / 1e6:.1f} Mbps, {RTT_SECONDS * 1000:.0f} ms RTT")
+    print("-"*60)
+    print(f"   {'setup':<22}{'visit':<8}{'requests':>9}{'bytes':>9}{'TTI ms':>9}")
+    for name, runs in setups:
+        for visit, run in zip(("first", "repeat"), runs):
+            print(f"   {name:<22}{visit:<8}{run['requests']:>9}{run['bytes']:>9}{run['tti_ms']:>9.0f}")
+    print("-"*60)
+    for name, runs in setups[1:]:
+        for visit, i in (("first", 0), ("repeat", 1)):
+            saved = 100 * (1 - runs[i]["bytes"] / legacy[i]["bytes"])
+            print(f"   {name:<22}{visit:<8}bytes -{saved:4.1f}%   "
+                  f"TTI {legacy[i]['tti_ms']:.0f} -> {runs[i]['tti_ms']:.0f} ms")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
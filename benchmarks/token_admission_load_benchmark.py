@@ -0,0 +1,198 @@
+"""
+Token Admission Load Benchmark
+==============================
+Real callers vs a retry loop, against an in-process TokenHTTPServer and a
+simulated pool of AGENT_SLOTS agent jobs:
+
+- every 200 from /token (no room) starts a job that holds a slot; a job
+  that finds no free slot waits for one - the caller hears nothing meanwhile
+- callers: one request each from their own IP, at CALLER_RATE per second,
+  then a CALL_SECONDS conversation
+- abusers: ABUSER_IPS addresses, each re-requesting in a tight loop; their
+  jobs hold a slot for ABANDONED_JOB_SECONDS (the agent waits in an empty
+  room before giving up)
+
+Connect latency = /token response + wait for a free agent slot. Runs with
+no limits, with rate limits only, and with rate limits + the capacity
+check (token_admission.py).
+
+Usage:
+    python -m benchmarks.token_admission_load_benchmark [seconds]   (default: 6)
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import http.client
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+import token_service
+import token_admission
+from token_service import TokenHandlerMixin, TokenHTTPServer
+from token_admission import AgentCapacity, KeyedBuckets, TokenAdmission, TokenBucket
+
+AGENT_SLOTS = 20
+CALLER_RATE = 8.0             # New real callers per second
+CALL_SECONDS = 1.5
+ABUSER_IPS = 4
+ABUSER_THREADS = 8            # Concurrent loops per abusive IP
+ABANDONED_JOB_SECONDS = 3.0
+GIVE_UP_SECONDS = 10.0        # A caller who hears nothing for this long hangs up
+REQUEST_TIMEOUT = 10.0
+
+
+class Handler(TokenHandlerMixin, BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.handle_token_request(urlparse(self.path).query)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AgentPool:
+    """Fixed number of job slots; jobs queue for a free one"""
+    def __init__(self, slots: int):
+        self._slots = threading.BoundedSemaphore(slots)
+        self._lock = threading.Lock()
+        self.active: set[str] = set()
+        self.jobs = 0
+
+    def rooms(self) -> list[str]:
+        """Stand-in for the LiveKit room listing"""
+        with self._lock:
+            return list(self.active)
+
+    def run_job(self, room: str, seconds: float, give_up_after: float) -> float | None:
+        """Hold a slot for `seconds`; returns how long the job waited for it
+        (None if no slot freed up within `give_up_after`)"""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=max(give_up_after, 0)):
+            return None
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.active.add(room)
+            self.jobs += 1
+        time.sleep(seconds)
+        with self._lock:
+            self.active.discard(room)
+        self._slots.release()
+        return waited
+
+
+def fetch_token(port: int, ip: str) -> tuple[int, str | None, float]:
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=REQUEST_TIMEOUT)
+    conn.request("GET", "/token?identity=web-user", headers={"X-Forwarded-For": ip})
+    response = conn.getresponse()
+    body = json.loads(response.read())
+    conn.close()
+    return response.status, body.get("room"), time.perf_counter() - started
+
+
+def run(name: str, admission: TokenAdmission, pool: AgentPool, seconds: float, abuse: bool) -> dict:
+    token_service.token_admission = admission
+    server = TokenHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    stop_at = time.perf_counter() + seconds
+    jobs = ThreadPoolExecutor(max_workers=500)
+    connects, outcomes, abuse_counts = [], {"busy": 0, "gave_up": 0}, {"ok": 0, "429": 0}
+    lock = threading.Lock()
+
+    def caller(i: int):
+        status, room, token_seconds = fetch_token(port, f"10.0.{i // 250}.{i % 250}")
+        if status != 200:
+            with lock:
+                outcomes["busy"] += 1
+            return
+        waited = pool.run_job(room, CALL_SECONDS, GIVE_UP_SECONDS)
+        with lock:
+            if waited is None:
+                outcomes["gave_up"] += 1
+            else:
+                connects.append(token_seconds + waited)
+
+    def abuser(ip: str):
+        while time.perf_counter() < stop_at:
+            status, room, _ = fetch_token(port, ip)
+            with lock:
+                abuse_counts["ok" if status == 200 else "429"] += 1
+            if status == 200:
+                jobs.submit(pool.run_job, room, ABANDONED_JOB_SECONDS, stop_at - time.perf_counter())
+
+    abusers = []
+    if abuse:
+        for n in range(ABUSER_IPS):
+            for _ in range(ABUSER_THREADS):
+                thread = threading.Thread(target=abuser, args=(f"203.0.113.{n}",), daemon=True)
+                thread.start()
+                abusers.append(thread)
+
+    callers, i = [], 0
+    while time.perf_counter() < stop_at:
+        thread = threading.Thread(target=caller, args=(i,), daemon=True)
+        thread.start()
+        callers.append(thread)
+        i += 1
+        time.sleep(1 / CALLER_RATE)
+    for thread in abusers + callers:
+        thread.join()
+    jobs.shutdown(wait=False, cancel_futures=True)
+    server.shutdown()
+    server.server_close()
+
+    connects.sort()
+    return {
+        "name": name, "callers": i, "connected": len(connects), **outcomes,
+        "p50_ms": statistics.median(connects) * 1000 if connects else float("nan"),
+        "p95_ms": connects[int(len(connects) * 0.95) - 1] * 1000 if connects else float("nan"),
+        "abuse_ok": abuse_counts["ok"], "abuse_429": abuse_counts["429"], "jobs": pool.jobs,
+    }
+
+
+def protected(pool: AgentPool, capacity: bool) -> TokenAdmission:
+    return TokenAdmission(
+        KeyedBuckets(rate=0.2, burst=3), TokenBucket(rate=20, burst=40),
+        AgentCapacity(AGENT_SLOTS, pool.rooms, refresh_seconds=0.5) if capacity else None,
+    )
+
+
+def unlimited() -> TokenAdmission:
+    return TokenAdmission(KeyedBuckets(rate=1e9, burst=1e9), TokenBucket(rate=1e9, burst=1e9))
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 6.0
+    os.environ.setdefault("LIVEKIT_API_KEY", "devkey")
+    os.environ.setdefault("LIVEKIT_API_SECRET", "secret")
+    os.environ.setdefault("LIVEKIT_URL", "ws://localhost:7880")
+    token_service.AGENT_DISPATCH_MODE = "token"     # No LiveKit server needed
+    token_admission.TOKEN_TRUST_PROXY = True        # Simulated client IPs arrive as X-Forwarded-For
+
+    print("\n" + "="*95)
+    print(f"   🚦 TOKEN ADMISSION ({AGENT_SLOTS} agent slots, {CALLER_RATE:.0f} callers/s, "
+          f"{ABUSER_IPS} abusive IPs x {ABUSER_THREADS} loops, {seconds:.0f}s)")
+    print("="*95)
+    print(f"   {'setup':<28}{'callers':>8}{'in':>5}{'busy':>6}{'hung up':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'abuse 200':>11}{'abuse 429':>11}")
+    runs = (
+        ("no abuse, protected", lambda pool: protected(pool, True), False),
+        ("abuse, no limits", lambda pool: unlimited(), True),
+        ("abuse, rate limits", lambda pool: protected(pool, False), True),
+        ("abuse, limits + capacity", lambda pool: protected(pool, True), True),
+    )
+    for name, admission, abuse in runs:
+        pool = AgentPool(AGENT_SLOTS)
+        r = run(name, admission(pool), pool, seconds, abuse)
+        print(f"   {r['name']:<28}{r['callers']:>8}{r['connected']:>5}{r['busy']:>6}{r['gave_up']:>9}{r['p50_ms']:>9.0f}"
+              f"{r['p95_ms']:>9.0f}{r['abuse_ok']:>11}{r['abuse_429']:>11}")
+    print("="*95 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Token Endpoint Load Benchmark
+=============================
+Fires concurrent /token requests at two in-process servers and reports
+requests/sec and latency percentiles:
+
+- legacy:  single-threaded socketserver.TCPServer, fresh JWT + env parse per request
+- service: TokenHTTPServer + token_service (config parsed once, cached tokens)
+
+A "slow client" that opens a connection and never finishes its request is
+held open during each run to show head-of-line blocking.
+
+Usage:
+    python -m benchmarks.token_load_benchmark [requests] [concurrency]
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+import http.client
+import socketserver
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import token_service
+from token_admission import KeyedBuckets, TokenAdmission, TokenBucket
+from token_service import TokenHandlerMixin, TokenHTTPServer, TokenConfig, mint_token, token_cache
+
+IDENTITY_POOL = 50          # Distinct callers (page reloads repeat identities)
+SLOW_CLIENT_HOLD = 2.0      # Seconds the slow client keeps its request open
+REQUEST_TIMEOUT = 10.0
+
+
+class ServiceHandler(TokenHandlerMixin, BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.handle_token_request(urlparse(self.path).query)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LegacyHandler(TokenHandlerMixin, BaseHTTPRequestHandler):
+    """Old behaviour: re-read env and sign a new JWT on every request"""
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        room_name = params.get('room', ['demo-room'])[0]
+        identity = params.get('identity', ['web-user'])[0]
+        config = TokenConfig.from_env()
+        token = mint_token(config, room_name, identity)
+        self.send_json(200, {"token": token, "url": config.livekit_url, "room": room_name, "identity": identity})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(server_cls, handler_cls):
+    server = server_cls(("127.0.0.1", 0), handler_cls)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def hold_slow_client(port: int, stop: threading.Event):
+    """Open a connection, send half a request line, then stall"""
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.sendall(b"GET /token?room=demo-room")
+    stop.wait(SLOW_CLIENT_HOLD)
+    sock.close()
+
+
+def fetch_token(port: int, i: int) -> float:
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=REQUEST_TIMEOUT)
+    conn.request("GET", f"/token?room=demo-room&identity=caller-{i % IDENTITY_POOL}")
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status}")
+    return time.perf_counter() - start
+
+
+def run(name: str, server_cls, handler_cls, total: int, concurrency: int, slow_client: bool) -> dict:
+    server = start_server(server_cls, handler_cls)
+    port = server.server_address[1]
+    stop = threading.Event()
+    slow = None
+    if slow_client:
+        slow = threading.Thread(target=hold_slow_client, args=(port, stop), daemon=True)
+        slow.start()
+        time.sleep(0.05)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda i: fetch_token(port, i), range(total)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    if slow:
+        slow.join()
+    server.shutdown()
+    server.server_close()
+
+    latencies.sort()
+    return {
+        "name": name,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    os.environ.setdefault("LIVEKIT_API_KEY", "devkey")
+    os.environ.setdefault("LIVEKIT_API_SECRET", "secret")
+    os.environ.setdefault("LIVEKIT_URL", "ws://localhost:7880")
+    # Throughput test from one address: rate limits off (see token_admission_load_benchmark.py)
+    token_service.token_admission = TokenAdmission(KeyedBuckets(rate=1e9, burst=1e9), TokenBucket(rate=1e9, burst=1e9))
+
+    print("\n" + "="*60)
+    print("   📱 TOKEN ENDPOINT LOAD TEST")
+    print("="*60)
+    print(f"   Requests: {total}   Concurrency: {concurrency}   Identities: {IDENTITY_POOL}")
+    print("-"*60)
+    print(f"   {'server':<24}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+
+    for slow_client in (False, True):
+        suffix = " +slow" if slow_client else ""
+        results = [
+            run("legacy" + suffix, socketserver.TCPServer, LegacyHandler, total, concurrency, slow_client),
+            run("service" + suffix, TokenHTTPServer, ServiceHandler, total, concurrency, slow_client),
+        ]
+        for r in results:
+            print(f"   {r['name']:<24}{r['rps']:>9.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}")
+
+    print("-"*60)
+    print(f"   Token cache: {token_cache.hits} hits / {token_cache.misses} misses")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Transcript Search Benchmark
+===========================
+Fills the local SQLite transcript index (transcript_search.py, FTS5) with
+synthetic intake call transcripts and times searches care managers would
+run - ranked, with snippets - against a LIKE scan over the same rows, plus
+the cost of indexing one more finished call.
+
+Usage:
+    python -m benchmarks.transcript_search_benchmark [sizes...]   (default: 100000)
+"""
+
+import os
+import sys
+import time
+import random
+import datetime
+import tempfile
+import statistics
+
+from transcript_search import SQLiteTranscriptIndex, search_transcripts, transcript_record
+
+REPEATS = 20
+BATCH = 5000
+QUERIES = (
+    "daughter fall last week",
+    '"fell in the bathroom"',
+    "stroke or dementia -wheelchair",
+    "Royal Oak husband",
+    "oxygen",
+)
+
+SARAH = (
+    "Hi, this is Sarah with Med Help USA. Who am I speaking with today?",
+    "Thank you. And who are we arranging care for?",
+    "How is {name} getting around these days?",
+    "Is there anything that worries you about {name}'s safety at home?",
+    "What would a typical week of help look like for your family?",
+    "I've written all of that down. A Care Manager will call you back soon.",
+)
+CALLER = (
+    "Hi, I'm calling about my {relation}, {name}.",
+    "{name} lives in {city} and is {age}.",
+    "{name} {event} {when}, and we're all a bit shaken.",
+    "{name} uses a {aid} most days.",
+    "Mostly help with {task} and some company in the afternoons.",
+    "My {family} usually checks in on weekends.",
+    "The doctor mentioned {condition} at the last visit.",
+)
+WORDS = {
+    "relation": ("mother", "father", "mom", "dad", "husband", "wife", "aunt", "grandmother"),
+    "family": ("daughter", "son", "sister", "brother", "neighbor"),
+    "name": ("Margaret", "Walter", "Dorothy", "Harold", "Evelyn", "Frank", "Ruth", "George"),
+    "city": ("Royal Oak", "Troy", "Novi", "Ann Arbor", "Lansing", "Grand Rapids", "Flint"),
+    "age": ("seventy-eight", "eighty-two", "ninety", "sixty-nine"),
+    "event": ("had a fall", "fell in the bathroom", "slipped on the stairs", "was in the hospital",
+              "got lost driving home", "forgot to take the pills"),
+    "when": ("last week", "yesterday", "a month ago", "over the weekend"),
+    "aid": ("walker", "cane", "wheelchair", "scooter"),
+    "task": ("bathing", "meals", "housekeeping", "getting to appointments", "medication reminders"),
+    "condition": ("dementia", "a stroke", "diabetes", "oxygen at night", "Parkinson's", "nothing new"),
+}
+
+
+def synthetic_transcripts(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    for i in range(count):
+        fill = {key: rng.choice(values) for key, values in WORDS.items()}
+        lines = []
+        for sarah in SARAH:
+            lines.append(("assistant", sarah.format(**fill)))
+            lines.extend(("user", line.format(**fill)) for line in rng.sample(CALLER, 2))
+        started_at = (start + datetime.timedelta(minutes=i)).isoformat()
+        yield transcript_record(f"room-{i}", started_at, lines, f"{rng.getrandbits(128):032x}")
+
+
+def populate(index: SQLiteTranscriptIndex, count: int) -> None:
+    records = synthetic_transcripts(count)
+    while True:
+        batch = [record for _, record in zip(range(BATCH), records)]
+        if not batch:
+            break
+        index.add_many(batch)
+    index.conn.execute("INSERT INTO call_transcripts_fts (call_transcripts_fts) VALUES ('optimize')")
+    index.conn.commit()
+
+
+def time_ms(fn) -> list[float]:
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def like_scan(index: SQLiteTranscriptIndex, text: str, limit: int = 20) -> list:
+    """What searching without the index looks like: every body is read"""
+    words = [w for w in text.replace('"', "").split() if not w.startswith("-") and w.lower() != "or"]
+    where = " AND ".join("body LIKE ?" for _ in words)
+    return index.conn.execute(
+        f"SELECT lead_id, substr(body, 1, 120) FROM call_transcripts WHERE {where} "
+        "ORDER BY started_at DESC LIMIT ?", [f"%{w}%" for w in words] + [limit]
+    ).fetchall()
+
+
+def run(count: int) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SQLiteTranscriptIndex(os.path.join(tmp, "transcripts.db"))
+        started = time.perf_counter()
+        populate(index, count)
+        print(f"   {count:>9,} transcripts indexed in {time.perf_counter() - started:.1f}s "
+              f"({os.path.getsize(os.path.join(tmp, 'transcripts.db')) / 2**20:.0f} MB)")
+
+        results = []
+        for text in QUERIES:
+            hits = len(search_transcripts(index, text)["results"])
+            samples = time_ms(lambda: search_transcripts(index, text))
+            results.append({
+                "query": text, "hits": hits,
+                "p50_ms": statistics.median(samples),
+                "p95_ms": sorted(samples)[int(len(samples) * 0.95) - 1],
+                "like_ms": statistics.median(time_ms(lambda: like_scan(index, text))),
+            })
+
+        extra = synthetic_transcripts(REPEATS, seed=11)
+        add_ms = statistics.median(time_ms(lambda: index.add(next(extra))))
+        index.conn.close()
+        return results, add_ms
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000]
+
+    print("\n" + "="*72)
+    print("   🔎 TRANSCRIPT SEARCH (SQLite FTS5, top 20 with snippets, %d runs)" % REPEATS)
+    print("="*72)
+    for count in sizes:
+        results, add_ms = run(count)
+        print(f"   {'query':<34}{'hits':>5}{'p50 ms':>9}{'p95 ms':>9}{'LIKE ms':>10}")
+        for r in results:
+            print(f"   {r['query']:<34}{r['hits']:>5}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['like_ms']:>10.1f}")
+        print(f"   indexing one more finished call: {add_ms:.2f} ms")
+        print("-"*72)
+    print("="*72 + "\n")
+
+
+if __name__ == "__main__":
+    main()
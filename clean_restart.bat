@@ -19,9 +19,9 @@ timeout /t 3 > nul
 
 echo.
 echo ============================================================
-echo   STARTING AGENT (FORCED CONNECT TO demo-room)...
+echo   STARTING AGENT WORKER (dispatched to each caller's room)...
 echo ============================================================
-start "Voice Agent" cmd /k "cd /d %~dp0 && .\.venv\Scripts\python.exe main.py connect --room demo-room"
+start "Voice Agent" cmd /k "cd /d %~dp0 && .\.venv\Scripts\python.exe main.py dev"
 timeout /t 5 > nul
 
 echo.
@@ -1,80 +1,58 @@
 """
 Simple HTTP Server for Voice Agent Demo
 Serves the test client and provides token generation endpoint
+
+Only the pre-built demo pages (static_assets.DEMO_PAGES) and the API routes
+are served - never files from the project directory (.env, spool/,
+recordings/), so every other path is a 404.
 """
 import os
 import http.server
-import socketserver
-import json
 import urllib.parse
 from dotenv import load_dotenv
 
+from token_service import TokenHandlerMixin, TokenHTTPServer
+from lead_export import LeadExportHandlerMixin
+from transcript_search import TranscriptSearchHandlerMixin
+from static_assets import StaticAssetHandlerMixin, build_demo_assets
+
 load_dotenv(".env")
 
 PORT = 8080
 
-class DemoHandler(http.server.SimpleHTTPRequestHandler):
+class DemoHandler(TokenHandlerMixin, LeadExportHandlerMixin, TranscriptSearchHandlerMixin, StaticAssetHandlerMixin, http.server.BaseHTTPRequestHandler):
     def do_GET(self):
         parsed = urllib.parse.urlparse(self.path)
         
         if parsed.path == '/token':
             self.handle_token_request(parsed.query)
-        elif parsed.path == '/':
-            self.path = '/test_client.html'
-            return super().do_GET()
-        else:
-            return super().do_GET()
-    
-    def handle_token_request(self, query_string):
-        try:
-            from livekit import api
-            
-            params = urllib.parse.parse_qs(query_string)
-            room_name = params.get('room', ['demo-room'])[0]
-            identity = params.get('identity', ['web-user'])[0]
-            
-            api_key = os.getenv("LIVEKIT_API_KEY")
-            api_secret = os.getenv("LIVEKIT_API_SECRET")
-            livekit_url = os.getenv("LIVEKIT_URL")
-            
-            token = (
-                api.AccessToken(api_key, api_secret)
-                .with_identity(identity)
-                .with_grants(api.VideoGrants(
-                    room_join=True,
-                    room=room_name,
-                    can_publish=True,
-                    can_subscribe=True,
-                ))
-                .to_jwt()
-            )
-            
-            response = {
-                "token": token,
-                "url": livekit_url,
-                "room": room_name,
-                "identity": identity
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
-            
-        except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+        elif parsed.path == '/leads':
+            self.handle_leads_request(parsed.query)
+        elif parsed.path == '/leads/export':
+            self.handle_export_request(parsed.query)
+        elif parsed.path == '/leads/search':
+            self.handle_transcript_search_request(parsed.query)
+        elif not self.serve_asset(parsed.path):
+            self.send_error(404)
+
+    def do_HEAD(self):
+        parsed = urllib.parse.urlparse(self.path)
+        if not self.serve_asset(parsed.path, head=True):
+            self.send_error(404)
 
 if __name__ == "__main__":
-    with socketserver.TCPServer(("", PORT), DemoHandler) as httpd:
+    # Pre-compress the demo pages once; they are served from memory
+    DemoHandler.assets = build_demo_assets(os.path.dirname(os.path.abspath(__file__)))
+    # Threaded so one slow client can't block everyone else's /token fetch
+    with TokenHTTPServer(("", PORT), DemoHandler) as httpd:
         print(f"\n{'='*60}")
         print(f"  Med Help USA - Voice Agent Demo Server")
         print(f"{'='*60}")
         print(f"  🌐 Open in browser: http://localhost:{PORT}")
         print(f"  📱 Token endpoint:  http://localhost:{PORT}/token")
+        print(f"  📋 Lead read API:   http://localhost:{PORT}/leads (needs LEAD_API_TOKEN)")
+        print(f"  📦 Lead export:     http://localhost:{PORT}/leads/export?format=csv")
+        print(f"  🔎 Call search:     http://localhost:{PORT}/leads/search?q=fall+last+week")
         print(f"{'='*60}")
         print(f"\n  In another terminal, start the agent:")
         print(f"  .\\.venv\\Scripts\\python.exe main.py dev")
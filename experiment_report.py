@@ -0,0 +1,178 @@
+"""
+Experiment Report for Med Help USA
+==================================
+Compares the arms of a parameter experiment (agent/experiments.py) from
+the per-call rows in call_experiment_calls
+(migrations/0008_call_experiments.sql):
+
+- completion rate (care details saved), with a Wilson 95% interval
+- response delay (per-call median, caller stops -> Sarah speaks),
+  interruptions and call duration: mean with a t 95% interval
+- each arm against the control: difference with a 95% interval (Welch for
+  means, Newcombe for rates). `*` marks differences whose interval
+  excludes zero
+
+Calls without a measured response delay (no complete caller turn) count
+for every metric except the delay.
+
+Usage:
+    python experiment_report.py <experiment> [control arm]     (default control: "control")
+"""
+
+import sys
+import math
+import statistics
+from statistics import NormalDist
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+CONFIDENCE = 0.95
+PAGE_SIZE = 1000
+MEAN_METRICS = (
+    ("response_delay_ms", "response delay ms"),
+    ("interruptions", "interruptions"),
+    ("duration_seconds", "duration s"),
+)
+CALL_COLUMNS = "arm,completed,response_delay_ms,interruptions,duration_seconds"
+
+
+def t_quantile(p: float, df: float) -> float:
+    """Student t quantile (Cornish-Fisher expansion; within 0.01 for df >= 3)"""
+    z = NormalDist().inv_cdf(p)
+    if math.isinf(df):
+        return z
+    return (z + (z**3 + z) / (4 * df) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+            + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * df**3))
+
+
+def mean_interval(values: list[float], confidence: float = CONFIDENCE) -> tuple[float, float, float]:
+    """(mean, low, high); the interval is unbounded with fewer than two values"""
+    if not values:
+        return math.nan, math.nan, math.nan
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, -math.inf, math.inf
+    half = t_quantile((1 + confidence) / 2, len(values) - 1) * statistics.stdev(values) / math.sqrt(len(values))
+    return mean, mean - half, mean + half
+
+
+def rate_interval(successes: int, n: int, confidence: float = CONFIDENCE) -> tuple[float, float, float]:
+    """(rate, low, high), Wilson score interval"""
+    if n == 0:
+        return math.nan, math.nan, math.nan
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    rate = successes / n
+    center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return rate, center - half, center + half
+
+
+def mean_difference(a: list[float], b: list[float], confidence: float = CONFIDENCE) -> tuple[float, float, float]:
+    """mean(a) - mean(b) with a Welch interval"""
+    if len(a) < 2 or len(b) < 2:
+        return (statistics.fmean(a) - statistics.fmean(b) if a and b else math.nan), -math.inf, math.inf
+    va, vb = statistics.variance(a) / len(a), statistics.variance(b) / len(b)
+    diff = statistics.fmean(a) - statistics.fmean(b)
+    if va + vb == 0:
+        return diff, diff, diff
+    df = (va + vb) ** 2 / (va**2 / (len(a) - 1) + vb**2 / (len(b) - 1))
+    half = t_quantile((1 + confidence) / 2, df) * math.sqrt(va + vb)
+    return diff, diff - half, diff + half
+
+
+def rate_difference(sa: int, na: int, sb: int, nb: int, confidence: float = CONFIDENCE) -> tuple[float, float, float]:
+    """rate a - rate b with Newcombe's interval (from the two Wilson intervals)"""
+    if not na or not nb:
+        return math.nan, -math.inf, math.inf
+    pa, la, ua = rate_interval(sa, na, confidence)
+    pb, lb, ub = rate_interval(sb, nb, confidence)
+    diff = pa - pb
+    return diff, diff - math.hypot(pa - la, ub - pb), diff + math.hypot(ua - pa, pb - lb)
+
+
+def compare_arms(calls: list[dict], control: str = "control") -> dict:
+    """Per-arm estimates and differences against `control`, from call rows"""
+    arms: dict[str, list[dict]] = {}
+    for call in calls:
+        arms.setdefault(call["arm"], []).append(call)
+    if control not in arms:
+        raise ValueError(f"control arm {control!r} has no calls (arms: {sorted(arms)})")
+
+    def column(rows, field):
+        return [float(row[field]) for row in rows if row.get(field) is not None]
+
+    base = arms[control]
+    report = {}
+    for arm, rows in sorted(arms.items(), key=lambda item: (item[0] != control, item[0])):
+        done, base_done = sum(bool(r["completed"]) for r in rows), sum(bool(r["completed"]) for r in base)
+        metrics = {"completion_rate": {"estimate": rate_interval(done, len(rows)),
+                                       "vs_control": rate_difference(done, len(rows), base_done, len(base))}}
+        for field, _ in MEAN_METRICS:
+            metrics[field] = {"estimate": mean_interval(column(rows, field)),
+                              "vs_control": mean_difference(column(rows, field), column(base, field))}
+        report[arm] = {"calls": len(rows), "metrics": metrics}
+    return report
+
+
+def fetch_calls(experiment: str) -> list[dict]:
+    from supabase_client import supabase
+
+    calls, offset = [], 0
+    while True:
+        response = (
+            supabase.table("call_experiment_calls").select(CALL_COLUMNS)
+            .eq("experiment", experiment).order("started_at")
+            .range(offset, offset + PAGE_SIZE - 1).execute()
+        )
+        calls.extend(response.data or [])
+        if len(response.data or []) < PAGE_SIZE:
+            return calls
+        offset += PAGE_SIZE
+
+
+def interval(estimate: tuple[float, float, float], percent: bool = False) -> str:
+    value, low, high = estimate
+    if math.isnan(value):
+        return "-"
+    scale, unit = (100, "%") if percent else (1, "")
+    if math.isinf(low):
+        return f"{value * scale:.1f}{unit} [n too small]"
+    return f"{value * scale:.1f}{unit} [{low * scale:.1f}, {high * scale:.1f}]"
+
+
+def difference(estimate: tuple[float, float, float], percent: bool = False) -> str:
+    value, low, high = estimate
+    if math.isnan(value):
+        return "-"
+    scale, unit = (100, " pts") if percent else (1, "")
+    marker = "*" if low > 0 or high < 0 else " "
+    if math.isinf(low):
+        return f"{value * scale:+.1f}{unit} [n too small]"
+    return f"{value * scale:+.1f}{unit} [{low * scale:+.1f}, {high * scale:+.1f}]{marker}"
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    experiment = sys.argv[1]
+    control = sys.argv[2] if len(sys.argv) > 2 else "control"
+    report = compare_arms(fetch_calls(experiment), control)
+
+    print("\n" + "="*100)
+    print(f"   🧪 EXPERIMENT {experiment} - {sum(r['calls'] for r in report.values())} calls, "
+          f"control: {control}, {CONFIDENCE:.0%} intervals")
+    print("="*100)
+    for field, label in (("completion_rate", "completion rate"),) + MEAN_METRICS:
+        percent = field == "completion_rate"
+        print(f"\n   {label:<22}{'calls':>6}   {'estimate':<34}{'vs control':<34}")
+        for arm, result in report.items():
+            metric = result["metrics"][field]
+            print(f"   {arm:<22}{result['calls']:>6}   {interval(metric['estimate'], percent):<34}"
+                  f"{'' if arm == control else difference(metric['vs_control'], percent):<34}")
+    print("\n" + "="*100 + "\n")
+
+
+if __name__ == "__main__":
+    main()
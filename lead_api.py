@@ -0,0 +1,379 @@
+"""
+Lead Read API for Med Help USA
+==============================
+Read path for care managers: joined lead_personal_info + care_details rows,
+newest first.
+
+- Keyset pagination on (created_at, id): every page is an index range scan
+  that starts where the previous one ended, so page 1000 costs the same as
+  page 1 (OFFSET paging re-reads every skipped row)
+- Filters on the mapped category columns (values checked against
+  lead_schema.py), michigan_location, the normalized location_city /
+  location_county_fips (lead_location.py) and a created_at range
+- `fields=` projects only the requested columns
+- Responses are cached briefly in-process with a strong ETag, so a polling
+  dashboard gets a 304 without touching the database
+- Backends: Supabase (PostgREST) in production, SQLite for local
+  development and benchmarks (benchmarks/lead_pagination_benchmark.py)
+
+Every request needs `Authorization: Bearer $LEAD_API_TOKEN`; the endpoint
+is disabled while LEAD_API_TOKEN is unset.
+
+Usage:
+    GET /leads?limit=50&relationship=adult_child&fields=lead_name,phone_number
+    GET /leads?cursor=<next_cursor from the previous page>
+"""
+
+import os
+import json
+import time
+import hmac
+import base64
+import hashlib
+import sqlite3
+import datetime
+import threading
+import uuid
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from lead_schema import CATEGORY_COLUMNS, category_values
+from static_assets import etag_matches
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+LEAD_API_TOKEN = os.getenv("LEAD_API_TOKEN", "")
+LEAD_STORE = os.getenv("LEAD_STORE", "supabase")  # "supabase" or "sqlite:<path>"
+LEAD_API_DEFAULT_LIMIT = 50
+LEAD_API_MAX_LIMIT = 500
+LEAD_API_CACHE_SECONDS = float(os.getenv("LEAD_API_CACHE_SECONDS", "15"))
+LEAD_API_CACHE_MAX_ENTRIES = int(os.getenv("LEAD_API_CACHE_MAX_ENTRIES", "1000"))
+
+PERSONAL_COLUMNS = (
+    "id", "created_at", "care_recipient_name", "estimated_age_range", "relationship",
+    "michigan_location", "location_city", "location_county_fips", "location_confidence",
+    "current_living_situation", "lead_name", "phone_number", "email", "best_time_to_contact",
+)
+CARE_COLUMNS = (
+    "bathing_hygiene", "dressing_grooming", "mobility", "safety_concerns",
+    "companionship_frequency", "preferred_activities", "meal_preparation",
+    "housekeeping", "transportation_needed", "transportation_frequency",
+    "preferred_care_schedule", "start_care_timing", "sms_consent",
+)
+ALL_COLUMNS = PERSONAL_COLUMNS + CARE_COLUMNS
+KEY_COLUMNS = ("id", "created_at")  # Always returned - they make up the cursor
+
+# filter name -> table; categories are checked against lead_schema
+FILTER_COLUMNS = {column: table for (table, column) in CATEGORY_COLUMNS}
+FILTER_COLUMNS["michigan_location"] = "lead_personal_info"
+FILTER_COLUMNS["location_city"] = "lead_personal_info"           # Canonical, see lead_location.py
+FILTER_COLUMNS["location_county_fips"] = "lead_personal_info"
+
+
+class LeadQueryError(ValueError):
+    """Bad query parameters (returned to the client as 400)"""
+
+
+# =============================================================================
+# QUERY
+# =============================================================================
+
+def encode_cursor(created_at: str, lead_id: str) -> str:
+    raw = json.dumps([created_at, lead_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """(created_at, id) from a next_cursor. Both values end up in a PostgREST
+    or= filter, so anything but an ISO-8601 timestamp and a UUID is refused"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, lead_id = json.loads(base64.urlsafe_b64decode(padded))
+        datetime.datetime.fromisoformat(created_at)
+        uuid.UUID(lead_id)
+        return created_at, lead_id
+    except Exception:
+        raise LeadQueryError("Invalid cursor")
+
+
+class LeadQuery:
+    """One page request: filters, projection, page size and position"""
+    def __init__(self, filters: dict[str, str] | None = None, fields: tuple[str, ...] = ALL_COLUMNS,
+                 limit: int = LEAD_API_DEFAULT_LIMIT, after: tuple[str, str] | None = None,
+                 created_from: str | None = None, created_to: str | None = None):
+        self.filters = dict(sorted((filters or {}).items()))
+        self.fields = fields
+        self.limit = limit
+        self.after = after
+        self.created_from = created_from
+        self.created_to = created_to
+
+    @classmethod
+    def from_query_string(cls, query_string: str) -> "LeadQuery":
+        params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+
+        try:
+            limit = int(params.pop("limit", LEAD_API_DEFAULT_LIMIT))
+        except ValueError:
+            raise LeadQueryError("limit must be an integer")
+        if not 1 <= limit <= LEAD_API_MAX_LIMIT:
+            raise LeadQueryError(f"limit must be between 1 and {LEAD_API_MAX_LIMIT}")
+
+        fields = ALL_COLUMNS
+        if "fields" in params:
+            requested = [f.strip() for f in params.pop("fields").split(",") if f.strip()]
+            unknown = [f for f in requested if f not in ALL_COLUMNS]
+            if unknown:
+                raise LeadQueryError(f"Unknown fields: {', '.join(unknown)}")
+            fields = tuple(c for c in ALL_COLUMNS if c in KEY_COLUMNS or c in requested)
+
+        cursor = params.pop("cursor", None)
+        created_from = params.pop("created_from", None)
+        created_to = params.pop("created_to", None)
+
+        filters = {}
+        for column, value in params.items():
+            if column not in FILTER_COLUMNS:
+                raise LeadQueryError(f"Unknown filter: {column}")
+            allowed = category_values(column)
+            if allowed is not None and value not in allowed:
+                raise LeadQueryError(f"{column} must be one of: {', '.join(allowed)}")
+            filters[column] = value
+
+        return cls(filters, fields, limit, decode_cursor(cursor) if cursor else None, created_from, created_to)
+
+    def cache_key(self) -> str:
+        return json.dumps([self.filters, self.fields, self.limit, self.after,
+                           self.created_from, self.created_to])
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class SQLiteLeadStore:
+    """Local backend with the same two tables (development and benchmarks)"""
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.create_schema()
+
+    def create_schema(self) -> None:
+        personal = ", ".join(
+            f"{c} {'REAL' if c == 'location_confidence' else 'TEXT'}" for c in PERSONAL_COLUMNS if c not in KEY_COLUMNS
+        )
+        care = ", ".join(f"{c} {'INTEGER' if c == 'sms_consent' else 'TEXT'}" for c in CARE_COLUMNS)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS lead_personal_info (
+                id TEXT PRIMARY KEY, created_at TEXT NOT NULL, {personal});
+            CREATE TABLE IF NOT EXISTS care_details (
+                id TEXT PRIMARY KEY REFERENCES lead_personal_info(id), created_at TEXT, {care});
+            CREATE INDEX IF NOT EXISTS idx_lead_personal_info_keyset
+                ON lead_personal_info (created_at DESC, id DESC);
+        """)
+
+    def fetch_page(self, query: LeadQuery) -> list[dict]:
+        columns = ", ".join(
+            f"{'p' if c in PERSONAL_COLUMNS else 'c'}.{c}" for c in query.fields
+        )
+        where, args = [], []
+        if query.after:
+            where.append("(p.created_at, p.id) < (?, ?)")
+            args.extend(query.after)
+        if query.created_from:
+            where.append("p.created_at >= ?")
+            args.append(query.created_from)
+        if query.created_to:
+            where.append("p.created_at < ?")
+            args.append(query.created_to)
+        for column, value in query.filters.items():
+            alias = "p" if FILTER_COLUMNS[column] == "lead_personal_info" else "c"
+            where.append(f"{alias}.{column} = ?")
+            args.append(value)
+
+        sql = (
+            f"SELECT {columns} FROM lead_personal_info p LEFT JOIN care_details c ON c.id = p.id"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY p.created_at DESC, p.id DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = [dict(row) for row in self.conn.execute(sql, (*args, query.limit + 1)).fetchall()]
+        if "sms_consent" in query.fields:
+            for row in rows:
+                # SQLite has no boolean - match PostgREST's true/false (NULL without care details)
+                if row["sms_consent"] is not None:
+                    row["sms_consent"] = bool(row["sms_consent"])
+        return rows
+
+
+class SupabaseLeadStore:
+    """PostgREST backend: one request per page, care_details embedded"""
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def fetch_page(self, query: LeadQuery) -> list[dict]:
+        personal = [c for c in query.fields if c in PERSONAL_COLUMNS]
+        care = [c for c in query.fields if c in CARE_COLUMNS]
+        care_filters = {c: v for c, v in query.filters.items() if FILTER_COLUMNS[c] == "care_details"}
+        care_select = sorted(set(care) | set(care_filters))
+
+        select = ",".join(personal)
+        if care_select:
+            # !inner turns the embed into an inner join so care filters drop whole rows
+            embed = "care_details!inner" if care_filters else "care_details"
+            select += f",{embed}({','.join(care_select)})"
+
+        request = self.supabase.table("lead_personal_info").select(select)
+        if query.after:
+            created_at, lead_id = query.after
+            request = request.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{lead_id}")'
+            )
+        if query.created_from:
+            request = request.gte("created_at", query.created_from)
+        if query.created_to:
+            request = request.lt("created_at", query.created_to)
+        for column, value in query.filters.items():
+            if column in care_filters:
+                request = request.eq(f"care_details.{column}", value)
+            else:
+                request = request.eq(column, value)
+
+        response = (
+            request.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(query.limit + 1)
+            .execute()
+        )
+
+        rows = []
+        for row in response.data or []:
+            embedded = row.pop("care_details", None) or {}
+            if isinstance(embedded, list):
+                embedded = embedded[0] if embedded else {}
+            rows.append({**row, **{c: embedded.get(c) for c in care}})
+        return rows
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_lead_store():
+    """Return the process-wide backend selected by LEAD_STORE"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if LEAD_STORE.startswith("sqlite:"):
+                    _store = SQLiteLeadStore(LEAD_STORE[len("sqlite:"):])
+                else:
+                    from supabase_client import supabase
+                    _store = SupabaseLeadStore(supabase)
+    return _store
+
+
+def read_leads(store, query: LeadQuery) -> dict:
+    """One page of leads plus the cursor for the next page (None on the last)"""
+    rows = store.fetch_page(query)
+    next_cursor = None
+    if len(rows) > query.limit:
+        rows = rows[:query.limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return {"leads": rows, "next_cursor": next_cursor}
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+
+class LeadResponseCache:
+    """Thread-safe LRU of serialized pages with their ETags, kept for a few seconds"""
+    def __init__(self, ttl_seconds: float = LEAD_API_CACHE_SECONDS, max_entries: int = LEAD_API_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[2] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, body: bytes) -> str:
+        etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+        with self._lock:
+            self._entries[key] = (etag, body, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+
+lead_response_cache = LeadResponseCache()
+
+
+# =============================================================================
+# HTTP HANDLER MIXIN
+# =============================================================================
+
+class LeadHandlerMixin:
+    """Adds /leads handling to an http.server.BaseHTTPRequestHandler subclass"""
+
+    def send_lead_response(self, status: int, body: bytes = b"", etag: str | None = None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        # Lead data is PII: never stored by shared caches, always revalidated
+        self.send_header('Cache-Control', 'private, no-cache')
+        if status != 304:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def send_lead_error(self, status: int, message: str):
+        self.send_lead_response(status, json.dumps({"error": message}).encode())
+
+    def is_lead_request_authorized(self) -> bool:
+        supplied = self.headers.get("Authorization", "")
+        return hmac.compare_digest(supplied.encode(), f"Bearer {LEAD_API_TOKEN}".encode())
+
+    def handle_leads_request(self, query_string: str):
+        if not LEAD_API_TOKEN:
+            return self.send_lead_error(503, "Lead API is disabled (LEAD_API_TOKEN not set)")
+        if not self.is_lead_request_authorized():
+            return self.send_lead_error(401, "Unauthorized")
+
+        try:
+            query = LeadQuery.from_query_string(query_string)
+        except LeadQueryError as e:
+            return self.send_lead_error(400, str(e))
+
+        key = query.cache_key()
+        cached = lead_response_cache.get(key)
+        if cached is None:
+            try:
+                page = read_leads(get_lead_store(), query)
+            except Exception as e:
+                return self.send_lead_error(500, str(e))
+            body = json.dumps(page, default=str).encode()
+            cached = (lead_response_cache.put(key, body), body)
+
+        etag, body = cached
+        if etag_matches(self.headers.get("If-None-Match", ""), {etag}):
+            return self.send_lead_response(304, etag=etag)
+        self.send_lead_response(200, body, etag)
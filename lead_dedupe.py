@@ -0,0 +1,207 @@
+"""
+Duplicate Lead Detection for Med Help USA
+=========================================
+Repeat callers should land on their existing lead instead of a new row.
+
+- A lead is the same lead when the phone or email matches AND the caller is
+  asking about the same care recipient (normalized name). A daughter calling
+  back about her father gets a new lead, not her mother's overwritten
+
+- Phone numbers and emails are normalized (E.164 / lowercase) and stored in
+  indexed columns (phone_normalized, email_normalized - see migrations/)
+- An in-process Bloom filter of recent numbers/emails answers the common
+  "never seen this caller" case with zero database round trips
+- Only possible matches hit the indexed lookup
+
+Usage:
+    from lead_dedupe import LeadDeduper
+
+    deduper = LeadDeduper(supabase)
+    deduper.warm()                       # at worker prewarm
+    lead_id = deduper.find_existing(phone, email, care_recipient_name)
+"""
+
+import os
+import re
+import math
+import time
+import hashlib
+import threading
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+LEAD_DEDUPE_WINDOW_DAYS = int(os.getenv("LEAD_DEDUPE_WINDOW_DAYS", "180"))  # "Recent" callers
+LEAD_DEDUPE_CAPACITY = int(os.getenv("LEAD_DEDUPE_CAPACITY", "200000"))
+LEAD_DEDUPE_FP_RATE = float(os.getenv("LEAD_DEDUPE_FP_RATE", "0.01"))
+LEAD_DEDUPE_REFRESH_SECONDS = int(os.getenv("LEAD_DEDUPE_REFRESH_SECONDS", "300"))  # Pick up other workers' inserts
+WARM_PAGE_SIZE = 1000
+MATCH_CANDIDATES = 20            # Newest leads sharing the phone/email checked for the same care recipient
+
+
+# =============================================================================
+# NORMALIZATION (keep in sync with the backfill SQL in migrations/0001_initial_schema.sql)
+# =============================================================================
+
+def normalize_phone(phone: str) -> str | None:
+    """US numbers -> E.164 (+1XXXXXXXXXX); anything else -> bare digits"""
+    digits = re.sub(r"[^0-9]", "", phone or "")
+    if len(digits) == 10:
+        return f"+1{digits}"
+    if len(digits) == 11 and digits.startswith("1"):
+        return f"+{digits}"
+    return digits or None
+
+
+def normalize_email(email: str) -> str | None:
+    """Trim and lowercase"""
+    clean = (email or "").strip().lower()
+    return clean or None
+
+
+def normalize_name(name: str) -> str | None:
+    """Casefold, letters and digits only, single spaces ("Mary-Ann  O'Neil" -> "mary ann o neil")"""
+    clean = " ".join(re.sub(r"[^\w]+|_", " ", (name or "").casefold()).split())
+    return clean or None
+
+
+# =============================================================================
+# BLOOM FILTER
+# =============================================================================
+
+class BloomFilter:
+    """Fixed-size Bloom filter (double hashing over one blake2b digest).
+    Thread-safe: the refresh adds from an executor thread while saves add and
+    check from the event loop"""
+    def __init__(self, capacity: int, fp_rate: float):
+        self.num_bits = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        positions = list(self._positions(key))
+        with self._lock:
+            for pos in positions:
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        positions = list(self._positions(key))
+        with self._lock:
+            return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+
+# =============================================================================
+# DEDUPER
+# =============================================================================
+
+class LeadDeduper:
+    """Bloom-filter-first duplicate check against lead_personal_info"""
+    def __init__(self, supabase, capacity: int = LEAD_DEDUPE_CAPACITY, fp_rate: float = LEAD_DEDUPE_FP_RATE):
+        self.supabase = supabase
+        self.bloom = BloomFilter(capacity, fp_rate)
+        self.warmed = False
+        self.last_seen: tuple[str, str] | None = None    # (created_at, id) of the newest lead loaded
+        self.last_refresh = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"bloom_negative": 0, "lookups": 0, "matches": 0, "other_recipient": 0}
+
+    def remember(self, phone_normalized: str | None, email_normalized: str | None) -> None:
+        if phone_normalized:
+            self.bloom.add(f"p:{phone_normalized}")
+        if email_normalized:
+            self.bloom.add(f"e:{email_normalized}")
+
+    def might_exist(self, phone_normalized: str | None, email_normalized: str | None) -> bool:
+        """False means definitely new (no round trip needed)"""
+        if not self.warmed:
+            return True
+        return bool(
+            (phone_normalized and f"p:{phone_normalized}" in self.bloom)
+            or (email_normalized and f"e:{email_normalized}" in self.bloom)
+        )
+
+    def _load_since(self, since: str, after: tuple[str, str] | None) -> int:
+        """Page through recent leads on the (created_at, id) keyset and add them
+        to the filter - leads sharing a page's last timestamp are not skipped"""
+        loaded = 0
+        while True:
+            query = (
+                self.supabase.table("lead_personal_info")
+                .select("id,phone_normalized,email_normalized,created_at")
+                .order("created_at")
+                .order("id")
+                .limit(WARM_PAGE_SIZE)
+            )
+            if after:
+                created_at, lead_id = after
+                query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt."{lead_id}")')
+            else:
+                query = query.gt("created_at", since)
+            rows = query.execute().data or []
+            for row in rows:
+                self.remember(row.get("phone_normalized"), row.get("email_normalized"))
+            loaded += len(rows)
+            if rows:
+                after = (rows[-1]["created_at"], rows[-1]["id"])
+                self.last_seen = after
+            if len(rows) < WARM_PAGE_SIZE:
+                return loaded
+
+    def warm(self) -> int:
+        """Load the recent window into the Bloom filter (call at worker prewarm)"""
+        with self._lock:
+            cutoff = time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - LEAD_DEDUPE_WINDOW_DAYS * 86400)
+            )
+            loaded = self._load_since(cutoff, self.last_seen)
+            self.warmed = True
+            self.last_refresh = time.monotonic()
+            return loaded
+
+    def refresh_if_stale(self) -> None:
+        """Incrementally add leads other workers inserted since the last load"""
+        if self.warmed and time.monotonic() - self.last_refresh > LEAD_DEDUPE_REFRESH_SECONDS:
+            self.warm()
+
+    def find_existing(self, phone_normalized: str | None, email_normalized: str | None,
+                      care_recipient_name: str | None) -> str | None:
+        """Return the newest lead_id with this phone or email and the same care recipient, or None"""
+        if not self.might_exist(phone_normalized, email_normalized):
+            self.stats["bloom_negative"] += 1
+            return None
+
+        filters = []
+        if phone_normalized:
+            filters.append(f'phone_normalized.eq."{phone_normalized}"')
+        if email_normalized:
+            filters.append(f'email_normalized.eq."{email_normalized}"')
+        recipient = normalize_name(care_recipient_name)
+        if not filters or not recipient:
+            return None
+
+        self.stats["lookups"] += 1
+        response = (
+            self.supabase.table("lead_personal_info")
+            .select("id,care_recipient_name")
+            .or_(",".join(filters))
+            .order("created_at", desc=True)
+            .limit(MATCH_CANDIDATES)
+            .execute()
+        )
+        for row in response.data or []:
+            if normalize_name(row.get("care_recipient_name")) == recipient:
+                self.stats["matches"] += 1
+                return row["id"]
+        if response.data:
+            self.stats["other_recipient"] += 1        # Same caller, different person: new lead
+        return None
@@ -0,0 +1,211 @@
+"""
+Streaming Lead Export for Med Help USA
+======================================
+Exports joined lead_personal_info + care_details rows for reporting,
+walking the table with the read API's keyset pagination (lead_api.py) so
+memory stays flat however many leads there are:
+
+- CSV, gzip-compressed as it is written
+- Parquet (needs `pyarrow`), one row group per EXPORT_ROW_GROUP_ROWS rows,
+  zstd-compressed
+- Date range (created_from / created_to), category and column filters are
+  pushed down into the page query, same parameters as GET /leads
+
+Usage:
+    python lead_export.py leads.csv.gz --created_from 2025-01-01 --relationship adult_child
+    python lead_export.py leads.parquet --fields lead_name,phone_number,start_care_timing
+    GET /leads/export?format=csv&created_from=2025-01-01   (Bearer LEAD_API_TOKEN)
+"""
+
+import io
+import csv
+import sys
+import gzip
+from urllib.parse import parse_qs, urlencode
+
+from lead_api import LeadHandlerMixin, LeadQuery, LeadQueryError, LEAD_API_TOKEN, get_lead_store
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional - CSV export works without it
+    pyarrow = None
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+EXPORT_PAGE_SIZE = 500  # limit + 1 must stay under PostgREST's 1000-row response cap
+EXPORT_ROW_GROUP_ROWS = 50000
+PARQUET_TYPES = {"sms_consent": "bool_", "location_confidence": "float64"}  # Every other column is a string
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "leads.csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", "leads.parquet"),
+}
+
+
+def parse_export_query(query_string: str) -> tuple[str, LeadQuery]:
+    """(format, query) from /leads/export parameters"""
+    params = parse_qs(query_string)
+    export_format = params.pop("format", ["csv"])[-1]
+    if export_format not in EXPORT_FORMATS:
+        raise LeadQueryError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format == "parquet" and pyarrow is None:
+        raise LeadQueryError("Parquet export needs pyarrow (pip install pyarrow)")
+    params.pop("limit", None)
+    params.pop("cursor", None)
+    query = LeadQuery.from_query_string(urlencode(params, doseq=True))
+    query.limit = EXPORT_PAGE_SIZE
+    return export_format, query
+
+
+def iter_lead_pages(store, query: LeadQuery):
+    """Yield lists of rows, one keyset page at a time"""
+    while True:
+        rows = store.fetch_page(query)
+        if len(rows) <= query.limit:
+            if rows:
+                yield rows
+            return
+        rows = rows[:query.limit]
+        yield rows
+        query.after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+# =============================================================================
+# WRITERS
+# =============================================================================
+
+def write_csv(pages, out, fields: tuple[str, ...]) -> int:
+    """Gzip-compressed CSV written to the binary stream `out`; returns rows written"""
+    count = 0
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as compressed:
+        text = io.TextIOWrapper(compressed, encoding="utf-8", newline="")
+        writer = csv.DictWriter(text, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for rows in pages:
+            writer.writerows(rows)
+            count += len(rows)
+        text.flush()
+        text.detach()
+    return count
+
+
+class PositionTrackingStream:
+    """Write-only wrapper with tell(), so pyarrow can write to a socket"""
+    def __init__(self, raw):
+        self.raw = raw
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.raw.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        self.raw.flush()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def parquet_value(name: str, value):
+    """Coerce a backend value to the column's Parquet type (SQLite hands back
+    sms_consent as 0/1; PostgREST returns location_confidence as a number)"""
+    if value is None:
+        return None
+    if name == "sms_consent":
+        return bool(value)
+    if name == "location_confidence":
+        return float(value)
+    return str(value)
+
+
+def write_parquet(pages, out, fields: tuple[str, ...]) -> int:
+    """zstd-compressed Parquet written to `out`; returns rows written"""
+    schema = pyarrow.schema([
+        (name, getattr(pyarrow, PARQUET_TYPES.get(name, "string"))()) for name in fields
+    ])
+    count = 0
+    buffered: list[dict] = []
+    with pyarrow.parquet.ParquetWriter(out, schema, compression="zstd") as writer:
+        for rows in pages:
+            buffered.extend({name: parquet_value(name, row.get(name)) for name in fields} for row in rows)
+            count += len(rows)
+            if len(buffered) >= EXPORT_ROW_GROUP_ROWS:
+                writer.write_table(pyarrow.Table.from_pylist(buffered, schema=schema))
+                buffered = []
+        if buffered:
+            writer.write_table(pyarrow.Table.from_pylist(buffered, schema=schema))
+    return count
+
+
+def export_leads(store, query: LeadQuery, out, export_format: str = "csv") -> int:
+    pages = iter_lead_pages(store, query)
+    if export_format == "parquet":
+        return write_parquet(pages, out, query.fields)
+    return write_csv(pages, out, query.fields)
+
+
+# =============================================================================
+# HTTP HANDLER MIXIN
+# =============================================================================
+
+class LeadExportHandlerMixin(LeadHandlerMixin):
+    """Adds /leads/export; the body is streamed until the connection closes"""
+
+    def handle_export_request(self, query_string: str):
+        if not LEAD_API_TOKEN:
+            return self.send_lead_error(503, "Lead API is disabled (LEAD_API_TOKEN not set)")
+        if not self.is_lead_request_authorized():
+            return self.send_lead_error(401, "Unauthorized")
+        try:
+            export_format, query = parse_export_query(query_string)
+        except LeadQueryError as e:
+            return self.send_lead_error(400, str(e))
+
+        content_type, filename = EXPORT_FORMATS[export_format]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            out = PositionTrackingStream(self.wfile) if export_format == "parquet" else self.wfile
+            export_leads(get_lead_store(), query, out, export_format)
+        except Exception as e:
+            # Headers are already sent - the truncated body is the only signal left
+            print(f"❌ Lead export failed: {e}")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0].startswith("--"):
+        raise SystemExit(__doc__)
+    path, options = args[0], args[1:]
+    if len(options) % 2 or not all(name.startswith("--") for name in options[::2]):
+        raise SystemExit(__doc__)
+
+    params = {name[2:]: value for name, value in zip(options[::2], options[1::2])}
+    params.setdefault("format", "parquet" if path.endswith(".parquet") else "csv")
+    try:
+        export_format, query = parse_export_query(urlencode(params))
+    except LeadQueryError as e:
+        raise SystemExit(f"❌ {e}")
+
+    with open(path, "wb") as out:
+        count = export_leads(get_lead_store(), query, out, export_format)
+    print(f"✅ Exported {count} leads to {path}")
+
+
+if __name__ == "__main__":
+    main()
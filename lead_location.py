@@ -0,0 +1,444 @@
+"""
+Michigan Location Normalizer for Med Help USA
+=============================================
+michigan_location is whatever the caller said ("royal oak", "Royal Oaks",
+"near Detroit", "Sterling Hts"), so routing leads by city or county meant
+LIKE queries over free text. At save time the text is matched against a
+bundled gazetteer (michigan_places.csv: cities, villages, the larger
+townships and CDPs, and all 83 counties) and stored next to the raw value
+as location_city, location_county_fips and location_confidence.
+
+- text is lowercased, punctuation dropped, abbreviations expanded
+  (St -> Saint, Mt -> Mount, Twp -> Township, Hts -> Heights) and
+  qualifiers ("near", "outside of", "area") removed; a qualifier lowers
+  the confidence
+- a character trie over the normalized names finds the exact name, or the
+  longest name inside a longer answer ("Novi, near Twelve Oaks Mall"); a
+  county named after the place ("Lansing, Eaton County") sets the county
+- otherwise spans of 1-4 words are looked up in a deletion index
+  (SymSpell: the first 7 letters of every name with up to two of them
+  deleted) and a phonetic key
+  index (consonant classes, vowels dropped), and the candidates are ranked
+  by Damerau-Levenshtein distance
+- an answer that ends with another state or province ("Portland, Oregon",
+  "Troy NY", "Windsor, Ontario") is not matched at all, even when Michigan
+  has a place of that name
+- confidence: 1.0 exact, 0.95 alias ("Soo", "Ypsi", "Canton" for Canton
+  Township), less for extra words, edits and qualifiers; below
+  LOCATION_MIN_CONFIDENCE nothing is stored
+- the indexes are built once per process (a few tens of ms, at prewarm);
+  a lookup takes about 10us for an exact name and up to a few hundred for a
+  misspelled one (stats())
+
+benchmarks/location_normalizer_benchmark.py reports accuracy and lookup
+cost on a corpus of misspellings.
+
+Usage:
+    from lead_location import location_columns
+
+    row.update(location_columns("Royal Oaks"))
+    # {"location_city": "Royal Oak", "location_county_fips": "26125", "location_confidence": 0.82}
+    python -m lead_location backfill                 # rows saved before migration 0009
+"""
+
+import os
+import sys
+import csv
+import time
+import threading
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+LOCATION_GAZETTEER_PATH = os.getenv(
+    "LOCATION_GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "michigan_places.csv"),
+)
+LOCATION_MIN_CONFIDENCE = float(os.getenv("LOCATION_MIN_CONFIDENCE", "0.5"))
+MAX_EDITS = 2                    # Deletion index depth
+PREFIX_LENGTH = 7                # Only name prefixes go into the deletion index; candidates are checked in full
+MAX_SPAN_WORDS = 4               # Longest gazetteer name, in words
+MAX_WORDS = 12                   # Longer answers are cut before fuzzy matching
+PARTIAL = 0.85                   # Confidence factor per word of the answer beyond the place name
+PARTIAL_FLOOR = 0.7              # ... however many there are ("Novi, near Twelve Oaks Mall")
+QUALIFIED = 0.8                  # ... and when the caller hedged ("near Detroit")
+
+ABBREVIATIONS = {
+    "st": "saint", "ste": "sainte", "mt": "mount", "ft": "fort", "twp": "township",
+    "hts": "heights", "hgts": "heights", "pte": "pointe", "e": "east", "w": "west",
+    "n": "north", "s": "south",
+}
+QUALIFIERS = {"near", "nearby", "outside", "around", "by", "close", "suburb", "suburbs", "area",
+              "metro", "region", "just", "past"}
+FILLER = {"i", "we", "he", "she", "they", "live", "lives", "living", "in", "from", "at", "of", "the", "is",
+          "its", "a", "to", "my", "our", "her", "his", "mom", "dad", "mother", "father", "moms", "and"}
+STATE = {"michigan", "mich", "mi", "usa", "us"}
+# A place followed by one of these is not in Michigan ("Portland, Oregon", "Troy NY", "Windsor, Ontario")
+OTHER_STATES = {
+    "alabama", "alaska", "arizona", "arkansas", "california", "colorado", "connecticut", "delaware",
+    "florida", "georgia", "hawaii", "idaho", "illinois", "indiana", "iowa", "kansas", "kentucky",
+    "louisiana", "maine", "maryland", "massachusetts", "minnesota", "mississippi", "missouri", "montana",
+    "nebraska", "nevada", "new hampshire", "new jersey", "new mexico", "new york", "north carolina",
+    "north dakota", "ohio", "oklahoma", "oregon", "pennsylvania", "rhode island", "south carolina",
+    "south dakota", "tennessee", "texas", "utah", "vermont", "virginia", "washington", "west virginia",
+    "wisconsin", "wyoming", "ontario", "canada",
+    # Postal codes, except ones a sentence can end with ("hi", "me", "ok") and mt (-> mount)
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "dc", "fl", "ga", "id", "il", "in", "ia", "ks", "ky",
+    "la", "md", "ma", "mn", "ms", "mo", "ne", "nv", "nh", "nj", "nm", "ny", "nc", "nd", "oh", "or", "pa",
+    "ri", "sc", "sd", "tn", "tx", "ut", "vt", "va", "wa", "wv", "wi", "wy",
+}
+PLACE_PREFIXES = ("city", "village", "township", "charter")   # "City of Warren", "Charter Township of Canton"
+ALIASES = {
+    "soo": "Sault Ste. Marie", "a2": "Ann Arbor", "ypsi": "Ypsilanti",
+    "sault saint marie": "Sault Ste. Marie", "kzoo": "Kalamazoo", "k zoo": "Kalamazoo", "saint joe": "St. Joseph", "mount p": "Mount Pleasant",
+    "pointes": "Grosse Pointe", "grosse pointes": "Grosse Pointe",
+}
+# "X Township" is also found as plain "X" unless X is a county or an everyday word
+SHORT_TOWNSHIP_SKIP = {"park", "texas", "superior", "ray"}
+KIND_ORDER = {"city": 0, "village": 1, "township": 2, "cdp": 3, "county": 4}
+PHONETIC_CLASSES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+
+# =============================================================================
+# TEXT
+# =============================================================================
+
+def words(text: str) -> list[str]:
+    """Lowercase words, punctuation dropped, abbreviations expanded"""
+    text = "".join(ch for ch in (text or "").lower() if ch != "'")
+    tokens = "".join(ch if ch.isalnum() else " " for ch in text).split()
+    return [ABBREVIATIONS.get(token, token) for token in tokens]
+
+
+def phonetic(compact: str) -> str:
+    """Consonant classes with vowels, h, w and y dropped and repeats collapsed ("dearbourne" -> "36165")"""
+    key = []
+    for ch in compact:
+        code = PHONETIC_CLASSES.get(ch)
+        if code and (not key or key[-1] != code):
+            key.append(code)
+    return "".join(key)
+
+
+def deletes(word: str, depth: int = MAX_EDITS) -> set[str]:
+    """`word` with up to `depth` characters deleted (itself included)"""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - found
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int | None = None) -> int:
+    """Damerau-Levenshtein (optimal string alignment): insert, delete, substitute, swap neighbours.
+    With `limit`, gives up early and returns limit + 1 once the distance must exceed it"""
+    if a == b:
+        return 0
+    start = 0                                   # Misspellings keep most of the name: skip the shared ends
+    while start < min(len(a), len(b)) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < min(len(a), len(b)) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return len(a) + len(b)
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def allowed_edits(length: int) -> int:
+    """Short names get fewer edits - "troy" is two edits from "tory" and "trenton" is not close"""
+    return 0 if length <= 3 else 1 if length <= 6 else MAX_EDITS
+
+
+# =============================================================================
+# GAZETTEER
+# =============================================================================
+
+class Place:
+    __slots__ = ("name", "kind", "county_fips", "key", "compact")
+
+    def __init__(self, name: str, kind: str, county_fips: str):
+        self.name = name
+        self.kind = kind
+        self.county_fips = county_fips
+        self.key = " ".join(words(name))
+        self.compact = self.key.replace(" ", "")
+
+
+class Gazetteer:
+    """Michigan places, a word-boundary trie and the fuzzy candidate indexes"""
+    END = ""                    # Trie key of (place id, is alias) for the name a node completes
+
+    def __init__(self):
+        self.places: list[Place] = []
+        self.counties: dict[str, str] = {}          # county_fips -> "Oakland County"
+        self.exact: dict[str, tuple[int, bool]] = {}    # normalized name or alias -> (place id, is alias)
+        self.trie: dict = {}
+        self.by_deletion: dict[str, list[int]] = {}
+        self.by_phonetic: dict[str, list[int]] = {}
+        self.vocabulary: set[str] = set()
+        self.checked = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, path: str = LOCATION_GAZETTEER_PATH) -> None:
+        """Build the indexes (once per process; safe to call again)"""
+        with self._lock:
+            if self.places:
+                return
+            with open(path, encoding="utf-8", newline="") as f:
+                places = [Place(row["name"], row["kind"], row["county_fips"]) for row in csv.DictReader(f)]
+            # Places before counties, cities before villages: the first entry for a key wins
+            places.sort(key=lambda p: KIND_ORDER[p.kind])
+            names = {p.key for p in places}
+            self.counties = {p.county_fips: p.name for p in places if p.kind == "county"}
+
+            for place_id, place in enumerate(places):
+                self._add(place.key, place_id, alias=False)
+                self.vocabulary.update(place.key.split())
+                for deleted in deletes(place.compact[:PREFIX_LENGTH]):
+                    self.by_deletion.setdefault(deleted, []).append(place_id)
+                self.by_phonetic.setdefault(phonetic(place.compact), []).append(place_id)
+
+            by_key = {p.key: place_id for place_id, p in reversed(list(enumerate(places)))}
+            for alias, name in ALIASES.items():
+                self._add(" ".join(words(alias)), by_key[" ".join(words(name))], alias=True)
+            for place_id, place in enumerate(places):
+                short = place.key.removesuffix(" county").removesuffix(" township")
+                if short == place.key or short in names or short in SHORT_TOWNSHIP_SKIP:
+                    continue
+                if place.kind == "county":
+                    self.exact.setdefault(short, (place_id, True))    # "Oakland" alone, never inside a sentence
+                elif f"{short} county" not in names:
+                    self._add(short, place_id, alias=True)
+            self.places = places
+
+    def _add(self, key: str, place_id: int, alias: bool) -> None:
+        if key in self.exact:
+            return
+        self.exact[key] = (place_id, alias)
+        node = self.trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[self.END] = (place_id, alias)
+
+    # -------------------------------------------------------------------------
+    # LOOKUP
+    # -------------------------------------------------------------------------
+
+    def tokens(self, text: str) -> tuple[list[str], bool]:
+        """Words that can be part of a place name, and whether the caller hedged ("near Detroit")"""
+        tokens = words(text)
+        if len(tokens) > 2 and tokens[0] in PLACE_PREFIXES and "of" in tokens[1:3]:
+            tokens = tokens[tokens.index("of") + 1:]
+        qualified = any(token in QUALIFIERS for token in tokens)
+        vocabulary = self.vocabulary
+        kept = [t for i, t in enumerate(tokens)
+                if not t.isdigit()                                  # ZIP codes
+                and not (t in STATE and (i or len(tokens) == 1))    # "Troy, MI" but not "Michigan Center"
+                and (t in vocabulary or t not in QUALIFIERS | FILLER | STATE)]
+        return kept[:MAX_WORDS], qualified
+
+    def other_state(self, text: str) -> bool:
+        """True when the answer ends with another state after a place ("Troy, New York");
+        a state name on its own or inside a Michigan name ("Washington Township") is not one"""
+        tokens = [t for t in words(text) if not t.isdigit()]
+        while tokens and tokens[-1] in QUALIFIERS | STATE | {"state"}:
+            tokens.pop()                                # "Portland Oregon area", "Toledo, Ohio 43604 USA"
+        for size in (2, 1):
+            if len(tokens) > size and " ".join(tokens[-size:]) in OTHER_STATES:
+                return " ".join(tokens) not in self.exact
+        return False
+
+    def _county(self, tokens: list[str]) -> tuple[list[str], int | None]:
+        """Splits a "<name> County" the caller added to a place ("Lansing, Eaton County")"""
+        for i, token in enumerate(tokens):
+            if token != "county" or i == 0:
+                continue
+            for size in (2, 1):
+                found = self.exact.get(" ".join(tokens[max(0, i - size):i + 1]))
+                rest = tokens[:max(0, i - size)] + tokens[i + 1:]
+                if found and self.places[found[0]].kind == "county" and rest:
+                    return rest, found[0]
+        return tokens, None
+
+    def _longest(self, tokens: list[str]) -> tuple[int, bool, int] | None:
+        """(place id, is alias, words covered) of the longest name starting at a word boundary"""
+        text = " ".join(tokens)
+        best = None
+        start = 0
+        for token in tokens:
+            node = self.trie
+            i = start
+            while i < len(text) and text[i] in node:
+                node = node[text[i]]
+                i += 1
+                if self.END in node and (i == len(text) or text[i] == " "):
+                    covered = text.count(" ", start, i) + 1
+                    rank = (self.places[node[self.END][0]].kind != "county", covered)
+                    if best is None or rank > best[0]:
+                        best = (rank, *node[self.END], covered)
+            start += len(token) + 1
+        return best and best[1:]
+
+    def _fuzzy(self, tokens: list[str]) -> tuple[int, float, int] | None:
+        """(place id, confidence, words covered) of the closest name to any 1-4 word span"""
+        best = None
+        for size in range(min(MAX_SPAN_WORDS, len(tokens)), 0, -1):
+            if best and best[0] >= 0.95 * PARTIAL ** (len(tokens) - size):
+                break                                   # A shorter span cannot do better
+            for start in range(len(tokens) - size + 1):
+                span = "".join(tokens[start:start + size])
+                if len(span) < 4:
+                    continue
+                edits = allowed_edits(len(span))
+                candidates = {}                         # place id -> edits allowed
+                key = phonetic(span)
+                if len(key) >= 2:                       # Sounds the same: a few more edits ("Sagino")
+                    for place_id in self.by_phonetic.get(key, ()):
+                        candidates[place_id] = max(edits, len(self.places[place_id].compact) // 3)
+                for deleted in deletes(span[:PREFIX_LENGTH], edits):
+                    for place_id in self.by_deletion.get(deleted, ()):
+                        candidates.setdefault(place_id, edits)
+                for place_id, limit in candidates.items():
+                    compact = self.places[place_id].compact
+                    if abs(len(compact) - len(span)) > limit:
+                        continue
+                    distance = edit_distance(span, compact, limit)
+                    if distance > limit:
+                        continue
+                    confidence = 0.95 - distance / len(compact)
+                    rank = (confidence * PARTIAL ** (len(tokens) - size), size, -KIND_ORDER[self.places[place_id].kind])
+                    if best is None or rank > best[:3]:
+                        best = (*rank, place_id, confidence)
+        return best and (best[3], best[4], best[1])
+
+    def match(self, text: str) -> dict | None:
+        """Canonical place for free text, or None"""
+        if self.other_state(text):
+            return None
+        tokens, qualified = self.tokens(text)
+        tokens, county_id = self._county(tokens)
+        if not tokens:
+            return None
+        key = " ".join(tokens)
+        if key in self.exact:
+            place_id, alias = self.exact[key]
+            confidence, how = (0.95, "alias") if alias else (1.0, "exact")
+        else:
+            found = []                                  # (place id, confidence, words covered, how)
+            longest = self._longest(tokens)
+            if longest:
+                place_id, alias, covered = longest
+                found.append((place_id, 0.95 if alias else 1.0, covered, "partial"))
+            if not longest or longest[2] < len(tokens):
+                fuzzy = self._fuzzy(tokens)
+                if fuzzy:
+                    found.append((*fuzzy, "fuzzy"))
+            if not found:
+                return None
+            # A close match of the whole answer beats an exact match of part of it ("Farmington Hill")
+            place_id, confidence, covered, how = max(
+                found, key=lambda f: f[1] * PARTIAL ** (len(tokens) - f[2]))
+            confidence *= max(PARTIAL ** (len(tokens) - covered), PARTIAL_FLOOR)
+        if qualified:
+            confidence *= QUALIFIED
+        place = self.places[place_id]
+        county_fips = place.county_fips
+        if county_id is not None:
+            if place.kind == "county":                      # "Oakland Cnty, Wayne County"
+                place_id = county_id
+                place = self.places[place_id]
+                county_fips = place.county_fips
+            elif self.places[county_id].county_fips != county_fips:
+                county_fips = self.places[county_id].county_fips   # The caller knows their county
+                confidence *= PARTIAL                       # Lansing is partly in Eaton; Detroit is not
+        return {
+            "city": None if place.kind == "county" else place.name,
+            "county": self.counties[county_fips],
+            "county_fips": county_fips,
+            "kind": place.kind,
+            "confidence": round(confidence, 2),
+            "match": how,
+        }
+
+    def lookup(self, text: str) -> dict | None:
+        """match(), timed; loads the gazetteer on first use"""
+        if not self.places:
+            self.load()
+        started = time.perf_counter()
+        location = self.match(text)
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        self.checked += 1
+        self.total_us += elapsed_us
+        self.max_us = max(self.max_us, elapsed_us)
+        return location
+
+    def stats(self) -> dict:
+        return {"places": len(self.places), "checked": self.checked,
+                "mean_us": round(self.total_us / self.checked, 1) if self.checked else None,
+                "max_us": round(self.max_us, 1)}
+
+
+gazetteer = Gazetteer()
+
+
+def location_columns(michigan_location: str, min_confidence: float = LOCATION_MIN_CONFIDENCE) -> dict:
+    """lead_personal_info columns for the raw location (all None when nothing matched well enough)"""
+    location = gazetteer.lookup(michigan_location)
+    if not location or location["confidence"] < min_confidence:
+        return {"location_city": None, "location_county_fips": None, "location_confidence": None}
+    return {
+        "location_city": location["city"],
+        "location_county_fips": location["county_fips"],
+        "location_confidence": location["confidence"],
+    }
+
+
+def backfill(supabase, page_size: int = 1000) -> int:
+    """Normalize michigan_location on rows saved before the location columns existed"""
+    updated, after = 0, None
+    while True:
+        query = (
+            supabase.table("lead_personal_info")
+            .select("id,michigan_location")
+            .is_("location_confidence", "null")
+            .order("id")
+            .limit(page_size)
+        )
+        if after:
+            query = query.gt("id", after)
+        rows = query.execute().data or []
+        for row in rows:
+            columns = location_columns(row.get("michigan_location") or "")
+            if columns["location_confidence"] is not None:
+                supabase.table("lead_personal_info").update(columns).eq("id", row["id"]).execute()
+                updated += 1
+        if len(rows) < page_size:
+            return updated
+        after = rows[-1]["id"]
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        print(__doc__)
+        sys.exit(1)
+    from supabase_client import supabase
+    print(f"📍 Normalized the location of {backfill(supabase)} leads ({gazetteer.stats()['mean_us']}us each)")
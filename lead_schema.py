@@ -0,0 +1,55 @@
+"""
+Lead Schema Categories for Med Help USA
+=======================================
+Allowed values for every categorical (mapped) column, as produced by the
+map_* helpers in supabase_client.py. The Postgres enum types created by
+migrations/0002_categorical_enums.sql must list the same values.
+"""
+
+# enum type -> allowed values
+ENUM_TYPES = {
+    "age_range": ("under_65", "65-70", "71-75", "76-80", "81-85", "86-90", "90+"),
+    "relationship_type": (
+        "self", "spouse_partner", "adult_child", "sibling",
+        "other_family", "friend", "healthcare_professional",
+    ),
+    "living_situation": ("independent", "living_with_family"),
+    "contact_time": ("morning", "afternoon", "evening", "anytime"),
+    "assistance_level": ("independent", "some_assistance", "full_assistance"),
+    "mobility_level": ("walks_independently", "walker_cane", "wheelchair"),
+    "companionship_frequency": ("daily", "few_times_week", "weekly", "occasionally", "not_sure"),
+    "activity_preference": ("social", "quiet"),
+    "meal_assistance": ("planning_shopping", "cooking", "reheating", "cleanup", "no_assistance"),
+    "housekeeping_need": ("need_housekeeping", "no_housekeeping"),
+    "transportation_need": ("need_transportation", "no_transportation"),
+    "transportation_frequency": ("daily", "few_times_week", "weekly", "occasionally", "as_needed", "not_applicable"),
+    "care_schedule": ("morning", "afternoon", "evening", "overnight", "flexible", "not_sure"),
+    "start_timing": ("immediately", "within_week", "within_month", "planning_ahead"),
+}
+
+# (table, column) -> enum type
+CATEGORY_COLUMNS = {
+    ("lead_personal_info", "estimated_age_range"): "age_range",
+    ("lead_personal_info", "relationship"): "relationship_type",
+    ("lead_personal_info", "current_living_situation"): "living_situation",
+    ("lead_personal_info", "best_time_to_contact"): "contact_time",
+    ("care_details", "bathing_hygiene"): "assistance_level",
+    ("care_details", "dressing_grooming"): "assistance_level",
+    ("care_details", "mobility"): "mobility_level",
+    ("care_details", "companionship_frequency"): "companionship_frequency",
+    ("care_details", "preferred_activities"): "activity_preference",
+    ("care_details", "meal_preparation"): "meal_assistance",
+    ("care_details", "housekeeping"): "housekeeping_need",
+    ("care_details", "transportation_needed"): "transportation_need",
+    ("care_details", "transportation_frequency"): "transportation_frequency",
+    ("care_details", "preferred_care_schedule"): "care_schedule",
+    ("care_details", "start_care_timing"): "start_timing",
+}
+
+
+def category_values(column: str) -> tuple[str, ...] | None:
+    """Allowed values for a categorical column name (either table), or None"""
+    for (_, name), enum_type in CATEGORY_COLUMNS.items():
+        if name == column:
+            return ENUM_TYPES[enum_type]
+    return None
@@ -0,0 +1,148 @@
+"""
+Lead Validation Fast Path for Med Help USA
+==========================================
+Checks the save tools' arguments locally, before any Supabase call, so bad
+data costs microseconds instead of a round trip plus a manual cleanup:
+
+- phone: NANP numbers -> E.164 (+1XXXXXXXXXX, valid area code / exchange);
+  other countries only with an explicit +<country code>
+- email: syntax (local@domain.tld); "none" / "no email" -> no email
+- age: a whole number of years, 18-120
+- lead_id: a UUID (the model must pass back the one it was given)
+- mapped categorical fields: membership in lead_schema's enum values
+
+Every problem comes back as a short correction the model can act on
+("phone_number '555-0134' has 7 digits - ask for the 10-digit number
+including area code"), raised together as one LeadValidationError.
+
+Usage:
+    try:
+        clean = validate_personal_info(estimated_age, phone_number, email, required={"lead_name": ...})
+        validate_mapped_row(personal_data)
+    except LeadValidationError as e:
+        return f"Error: not saved. {e}"
+"""
+
+import re
+
+from lead_schema import ENUM_TYPES, CATEGORY_COLUMNS
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+MIN_AGE = 18
+MAX_AGE = 120
+NO_EMAIL_ANSWERS = frozenset({"", "none", "no", "n/a", "na", "no email", "not provided", "unknown", "declined"})
+
+NON_DIGITS = re.compile(r"[^0-9]")
+NANP_NUMBER = re.compile(r"[2-9][0-9]{2}[2-9][0-9]{6}")
+INTERNATIONAL_NUMBER = re.compile(r"[2-9][0-9]{7,14}")   # E.164: up to 15 digits, country code not 0/1
+EMAIL_PATTERN = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,24}"
+)
+UUID_PATTERN = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+COLUMN_VALUES = {column: frozenset(ENUM_TYPES[enum_type]) for (_, column), enum_type in CATEGORY_COLUMNS.items()}
+
+
+class LeadValidationError(ValueError):
+    """One or more tool arguments failed validation; str() is the correction text"""
+    def __init__(self, corrections: list[str]):
+        super().__init__("; ".join(corrections))
+        self.corrections = corrections
+
+
+# =============================================================================
+# FIELD CHECKS (each returns the clean value or a correction string)
+# =============================================================================
+
+def check_phone(phone) -> tuple[str | None, str | None]:
+    """(E.164 number, None) or (None, correction)"""
+    text = str(phone or "").strip()
+    digits = NON_DIGITS.sub("", text)
+    if text.startswith("+") and not text.startswith("+1"):
+        if INTERNATIONAL_NUMBER.fullmatch(digits):
+            return f"+{digits}", None
+        return None, f"phone_number {text!r} is not a valid international number - confirm it with the caller"
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    if len(digits) != 10:
+        return None, (f"phone_number {text!r} has {len(digits)} digits - ask for the 10-digit "
+                      "number including area code")
+    if not NANP_NUMBER.fullmatch(digits):
+        return None, f"phone_number {text!r} is not a valid US number - read it back digit by digit and confirm"
+    return f"+1{digits}", None
+
+
+def check_email(email) -> tuple[str | None, str | None]:
+    """(address or None if the caller has none, None) or (None, correction)"""
+    text = str(email or "").strip()
+    if text.lower() in NO_EMAIL_ANSWERS:
+        return None, None
+    if not EMAIL_PATTERN.fullmatch(text):
+        return None, f"email {text!r} is not a valid address - confirm the spelling letter by letter"
+    return text, None
+
+
+def check_age(age) -> tuple[int | None, str | None]:
+    """(whole years, None) or (None, correction)"""
+    try:
+        years = int(str(age).strip()) if not isinstance(age, (int, float)) else int(age)
+    except ValueError:
+        return None, f"estimated_age {age!r} is not a number - pass their age in years, e.g. 78"
+    if not MIN_AGE <= years <= MAX_AGE:
+        return None, f"estimated_age {years} is outside {MIN_AGE}-{MAX_AGE} - confirm their age with the caller"
+    return years, None
+
+
+def check_lead_id(lead_id) -> tuple[str | None, str | None]:
+    text = str(lead_id or "").strip()
+    if not UUID_PATTERN.fullmatch(text):
+        return None, f"lead_id {text!r} is not the Lead ID returned by save_personal_info - pass that exact ID"
+    return text.lower(), None
+
+
+def check_categories(row: dict) -> list[str]:
+    """Corrections for mapped categorical values outside their enum"""
+    corrections = []
+    for column, value in row.items():
+        allowed = COLUMN_VALUES.get(column)
+        if allowed is not None and value not in allowed:
+            corrections.append(f"{column} {value!r} must be one of {', '.join(sorted(allowed))}")
+    return corrections
+
+
+# =============================================================================
+# TOOL ARGUMENTS
+# =============================================================================
+
+def validate_personal_info(estimated_age, phone_number, email, required: dict) -> dict:
+    """Clean age / phone / email, or raise LeadValidationError listing every problem.
+
+    `required` maps the free-text fields that must not be empty to their values.
+    """
+    corrections = [f"{name} is empty - ask the caller" for name, value in required.items() if not str(value or "").strip()]
+    age, problem = check_age(estimated_age)
+    corrections += [problem] if problem else []
+    phone, problem = check_phone(phone_number)
+    corrections += [problem] if problem else []
+    clean_email, problem = check_email(email)
+    corrections += [problem] if problem else []
+    if corrections:
+        raise LeadValidationError(corrections)
+    return {"estimated_age": age, "phone_number": phone, "email": clean_email}
+
+
+def validate_care_details(lead_id) -> str:
+    """Clean lead_id, or raise LeadValidationError"""
+    clean_id, problem = check_lead_id(lead_id)
+    if problem:
+        raise LeadValidationError([problem])
+    return clean_id
+
+
+def validate_mapped_row(row: dict) -> None:
+    """Raise LeadValidationError if a mapped categorical value is not in its enum"""
+    corrections = check_categories(row)
+    if corrections:
+        raise LeadValidationError(corrections)
@@ -1,6 +1,9 @@
 import os
 from livekit.agents import cli, WorkerOptions
-from agent.intake_agent import entrypoint
+from agent.intake_agent import entrypoint, prewarm
+from agent.drain import DRAIN_TIMEOUT_SECONDS, DRAIN_FLUSH_SECONDS, install_worker_drain
+from agent.health import install_worker_health
+from supabase_client import storage_guard
 
 def sanitize_url():
     url = os.getenv("LIVEKIT_URL", "")
@@ -19,5 +22,10 @@ def sanitize_url():
 
 if __name__ == "__main__":
     sanitize_url()
+    install_worker_drain()
+    install_worker_health(spool_pending=storage_guard.spool.pending)
     cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint,
-                              agent_name = "intake_agent"))
+                              prewarm_fnc=prewarm,
+                              agent_name = "intake_agent",
+                              drain_timeout=DRAIN_TIMEOUT_SECONDS,
+                              shutdown_process_timeout=DRAIN_FLUSH_SECONDS))
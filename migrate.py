@@ -0,0 +1,243 @@
+"""
+Schema Migration Runner for Med Help USA
+========================================
+Applies the ordered SQL files in migrations/ (NNNN_name.sql) to Postgres
+and records each one, with its checksum, in a schema_migrations table.
+
+- Already-applied files that were edited afterwards are refused (checksum mismatch)
+- `dry-run` applies pending migrations inside a transaction, prints the
+  resulting schema diff (columns, enum types, indexes) and rolls back
+
+Requires psycopg 3 (pip install "psycopg[binary]") and DATABASE_URL, e.g.
+the Supabase "Connection string" or postgresql://postgres@localhost/medhelp
+
+Usage:
+    python migrate.py status
+    python migrate.py dry-run
+    python migrate.py up
+"""
+
+import os
+import re
+import sys
+import hashlib
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+DATABASE_URL = os.getenv("DATABASE_URL")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+SCHEMA_MIGRATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+
+class MigrationError(Exception):
+    """Raised when the migrations on disk and in the database disagree"""
+
+
+class Migration:
+    """One SQL file from migrations/"""
+    def __init__(self, version: str, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, "rb") as f:
+            raw = f.read()
+        self.sql = raw.decode("utf-8")
+        self.checksum = hashlib.sha256(raw).hexdigest()
+
+    def __repr__(self):
+        return f"{self.version}_{self.name}"
+
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> list[Migration]:
+    """Ordered migrations on disk; rejects stray files and duplicate versions"""
+    migrations = []
+    seen = set()
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".sql"):
+            continue
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            raise MigrationError(f"Bad migration filename (want NNNN_name.sql): {filename}")
+        version, name = match.groups()
+        if version in seen:
+            raise MigrationError(f"Duplicate migration version {version}")
+        seen.add(version)
+        migrations.append(Migration(version, name, os.path.join(directory, filename)))
+    return migrations
+
+
+def plan(migrations: list[Migration], applied: dict[str, str]) -> list[Migration]:
+    """Pending migrations, after verifying the applied ones are unchanged"""
+    on_disk = {m.version: m for m in migrations}
+    for version, checksum in applied.items():
+        if version not in on_disk:
+            raise MigrationError(f"Migration {version} is applied but missing from {MIGRATIONS_DIR}")
+        if on_disk[version].checksum != checksum:
+            raise MigrationError(
+                f"Migration {on_disk[version]!r} was edited after it was applied "
+                f"(checksum mismatch) - add a new migration instead"
+            )
+    pending = [m for m in migrations if m.version not in applied]
+    if pending and applied and pending[0].version < max(applied):
+        raise MigrationError(f"Migration {pending[0]!r} is older than the latest applied one")
+    return pending
+
+
+def combined_sql(migrations: list[Migration]) -> str:
+    """All migrations as one paste-able script that also records them as applied"""
+    parts = [SCHEMA_MIGRATIONS_SQL]
+    for m in migrations:
+        parts.append(f"-- >>> {m!r}\n{m.sql}")
+        parts.append(
+            "INSERT INTO schema_migrations (version, name, checksum) "
+            f"VALUES ('{m.version}', '{m.name}', '{m.checksum}') ON CONFLICT DO NOTHING;\n"
+        )
+    return "\n".join(parts)
+
+
+# =============================================================================
+# DATABASE
+# =============================================================================
+
+def connect(database_url: str = DATABASE_URL):
+    try:
+        import psycopg
+    except ImportError:
+        raise SystemExit('migrate.py needs psycopg 3: pip install "psycopg[binary]"')
+    if not database_url:
+        raise SystemExit("Missing DATABASE_URL. Set it in your .env file.")
+    return psycopg.connect(database_url)
+
+
+def applied_migrations(conn) -> dict[str, str]:
+    conn.execute(SCHEMA_MIGRATIONS_SQL)
+    rows = conn.execute("SELECT version, checksum FROM schema_migrations ORDER BY version").fetchall()
+    return dict(rows)
+
+
+def snapshot_schema(conn) -> dict[str, str]:
+    """Columns, enum types and indexes of the public schema, as comparable strings"""
+    snapshot = {}
+    for table, column, udt in conn.execute("""
+        SELECT table_name, column_name, udt_name FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name <> 'schema_migrations'
+    """):
+        snapshot[f"column {table}.{column}"] = udt
+    for name, labels in conn.execute("""
+        SELECT t.typname, string_agg(e.enumlabel, ', ' ORDER BY e.enumsortorder)
+        FROM pg_type t JOIN pg_enum e ON e.enumtypid = t.oid
+        JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE n.nspname = 'public' GROUP BY t.typname
+    """):
+        snapshot[f"enum {name}"] = labels
+    for name, definition in conn.execute("""
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE schemaname = 'public' AND tablename <> 'schema_migrations'
+    """):
+        snapshot[f"index {name}"] = definition
+    return snapshot
+
+
+def diff_schema(before: dict[str, str], after: dict[str, str]) -> list[str]:
+    lines = []
+    for key in sorted(set(before) | set(after)):
+        if key not in before:
+            lines.append(f"+ {key}: {after[key]}")
+        elif key not in after:
+            lines.append(f"- {key}: {before[key]}")
+        elif before[key] != after[key]:
+            lines.append(f"~ {key}: {before[key]} -> {after[key]}")
+    return lines
+
+
+def migrate(conn, migrations: list[Migration], dry_run: bool = False) -> dict:
+    """Apply pending migrations (one transaction each), or preview them"""
+    applied = applied_migrations(conn)
+    conn.commit()
+    pending = plan(migrations, applied)
+    result = {"pending": pending, "applied": [], "diff": []}
+    if not pending:
+        return result
+
+    before = snapshot_schema(conn) if dry_run else None
+    for migration in pending:
+        try:
+            conn.execute(migration.sql)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, migration.checksum),
+            )
+        except Exception as e:
+            conn.rollback()
+            raise MigrationError(f"Migration {migration!r} failed: {e}") from e
+        if not dry_run:
+            conn.commit()
+        result["applied"].append(migration)
+
+    if dry_run:
+        result["diff"] = diff_schema(before, snapshot_schema(conn))
+        conn.rollback()
+    return result
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command not in ("status", "dry-run", "up"):
+        raise SystemExit(__doc__)
+
+    print("\n" + "="*60)
+    print("   🗄️  MED HELP USA - SCHEMA MIGRATIONS")
+    print("="*60)
+
+    migrations = discover_migrations()
+    with connect() as conn:
+        try:
+            if command == "status":
+                applied = applied_migrations(conn)
+                conn.commit()
+                for m in migrations:
+                    if m.version not in applied:
+                        state = "⏳ pending"
+                    elif applied[m.version] == m.checksum:
+                        state = "✅ applied"
+                    else:
+                        state = "❌ CHECKSUM MISMATCH"
+                    print(f"   {m!r:<40}{state}")
+            else:
+                result = migrate(conn, migrations, dry_run=(command == "dry-run"))
+                if not result["pending"]:
+                    print("   ✅ Schema is up to date")
+                for m in result["applied"]:
+                    verb = "would apply" if command == "dry-run" else "applied"
+                    print(f"   {verb}: {m!r}")
+                if result["diff"]:
+                    print("-"*60)
+                    print("   Schema diff (rolled back):")
+                    for line in result["diff"]:
+                        print(f"   {line}")
+        except MigrationError as e:
+            print(f"   ❌ {e}")
+            sys.exit(1)
+
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+-- =============================================
+-- 0001 - Baseline schema (v2 tables + repeat-caller dedupe columns)
+-- Idempotent: safe to apply to a project set up by hand from supabase_setup.py
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS lead_personal_info (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    care_recipient_name TEXT,
+    estimated_age_range TEXT,
+    relationship TEXT,
+    michigan_location TEXT,
+    current_living_situation TEXT,
+    lead_name TEXT,
+    phone_number TEXT,
+    email TEXT,
+    best_time_to_contact TEXT,
+    phone_normalized TEXT,
+    email_normalized TEXT,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS care_details (
+    id UUID PRIMARY KEY REFERENCES lead_personal_info(id) ON DELETE CASCADE,
+    bathing_hygiene TEXT,
+    dressing_grooming TEXT,
+    mobility TEXT,
+    safety_concerns TEXT,
+    companionship_frequency TEXT,
+    preferred_activities TEXT,
+    meal_preparation TEXT,
+    housekeeping TEXT,
+    transportation_needed TEXT,
+    transportation_frequency TEXT,
+    preferred_care_schedule TEXT,
+    start_care_timing TEXT,
+    sms_consent BOOLEAN DEFAULT false,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+ALTER TABLE lead_personal_info ADD COLUMN IF NOT EXISTS phone_normalized TEXT;
+ALTER TABLE lead_personal_info ADD COLUMN IF NOT EXISTS email_normalized TEXT;
+
+-- Backfill normalized contact columns (must match lead_dedupe.normalize_phone/_email)
+UPDATE lead_personal_info SET
+    phone_normalized = CASE
+        WHEN length(regexp_replace(phone_number, '[^0-9]', '', 'g')) = 10
+            THEN '+1' || regexp_replace(phone_number, '[^0-9]', '', 'g')
+        WHEN length(regexp_replace(phone_number, '[^0-9]', '', 'g')) = 11
+             AND regexp_replace(phone_number, '[^0-9]', '', 'g') LIKE '1%'
+            THEN '+' || regexp_replace(phone_number, '[^0-9]', '', 'g')
+        ELSE NULLIF(regexp_replace(phone_number, '[^0-9]', '', 'g'), '')
+    END,
+    email_normalized = NULLIF(lower(trim(email)), '')
+WHERE phone_normalized IS NULL AND email_normalized IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_lead_personal_info_phone_normalized
+    ON lead_personal_info (phone_normalized, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_lead_personal_info_email_normalized
+    ON lead_personal_info (email_normalized, created_at DESC);
+
+ALTER TABLE lead_personal_info ENABLE ROW LEVEL SECURITY;
+ALTER TABLE care_details ENABLE ROW LEVEL SECURITY;
+
+-- Supabase roles/policies (skipped on a plain local Postgres)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_policies WHERE policyname = 'Service role full access on leads') THEN
+        CREATE POLICY "Service role full access on leads" ON lead_personal_info FOR ALL USING (true) WITH CHECK (true);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_policies WHERE policyname = 'Service role full access on care') THEN
+        CREATE POLICY "Service role full access on care" ON care_details FOR ALL USING (true) WITH CHECK (true);
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT ALL ON lead_personal_info TO service_role;
+        GRANT ALL ON care_details TO service_role;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        GRANT INSERT ON lead_personal_info TO anon;
+        GRANT INSERT ON care_details TO anon;
+    END IF;
+END $$;
@@ -0,0 +1,124 @@
+-- =============================================
+-- 0002 - Categorical columns TEXT -> Postgres enums
+-- Smaller rows and faster filters. Values must match lead_schema.py.
+-- Any existing value outside its enum is copied to enum_migration_rejects
+-- and set to NULL, so nothing is silently lost.
+-- =============================================
+
+CREATE TYPE age_range AS ENUM ('under_65', '65-70', '71-75', '76-80', '81-85', '86-90', '90+');
+CREATE TYPE relationship_type AS ENUM ('self', 'spouse_partner', 'adult_child', 'sibling', 'other_family', 'friend', 'healthcare_professional');
+CREATE TYPE living_situation AS ENUM ('independent', 'living_with_family');
+CREATE TYPE contact_time AS ENUM ('morning', 'afternoon', 'evening', 'anytime');
+CREATE TYPE assistance_level AS ENUM ('independent', 'some_assistance', 'full_assistance');
+CREATE TYPE mobility_level AS ENUM ('walks_independently', 'walker_cane', 'wheelchair');
+CREATE TYPE companionship_frequency AS ENUM ('daily', 'few_times_week', 'weekly', 'occasionally', 'not_sure');
+CREATE TYPE activity_preference AS ENUM ('social', 'quiet');
+CREATE TYPE meal_assistance AS ENUM ('planning_shopping', 'cooking', 'reheating', 'cleanup', 'no_assistance');
+CREATE TYPE housekeeping_need AS ENUM ('need_housekeeping', 'no_housekeeping');
+CREATE TYPE transportation_need AS ENUM ('need_transportation', 'no_transportation');
+CREATE TYPE transportation_frequency AS ENUM ('daily', 'few_times_week', 'weekly', 'occasionally', 'as_needed', 'not_applicable');
+CREATE TYPE care_schedule AS ENUM ('morning', 'afternoon', 'evening', 'overnight', 'flexible', 'not_sure');
+CREATE TYPE start_timing AS ENUM ('immediately', 'within_week', 'within_month', 'planning_ahead');
+
+CREATE TABLE IF NOT EXISTS enum_migration_rejects (
+    table_name TEXT NOT NULL,
+    row_id UUID NOT NULL,
+    column_name TEXT NOT NULL,
+    value TEXT,
+    rejected_at TIMESTAMPTZ DEFAULT now()
+);
+
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'lead_personal_info', id, 'estimated_age_range', estimated_age_range FROM lead_personal_info
+    WHERE estimated_age_range IS NOT NULL AND estimated_age_range <> ALL (enum_range(NULL::age_range)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'lead_personal_info', id, 'relationship', relationship FROM lead_personal_info
+    WHERE relationship IS NOT NULL AND relationship <> ALL (enum_range(NULL::relationship_type)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'lead_personal_info', id, 'current_living_situation', current_living_situation FROM lead_personal_info
+    WHERE current_living_situation IS NOT NULL AND current_living_situation <> ALL (enum_range(NULL::living_situation)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'lead_personal_info', id, 'best_time_to_contact', best_time_to_contact FROM lead_personal_info
+    WHERE best_time_to_contact IS NOT NULL AND best_time_to_contact <> ALL (enum_range(NULL::contact_time)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'bathing_hygiene', bathing_hygiene FROM care_details
+    WHERE bathing_hygiene IS NOT NULL AND bathing_hygiene <> ALL (enum_range(NULL::assistance_level)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'dressing_grooming', dressing_grooming FROM care_details
+    WHERE dressing_grooming IS NOT NULL AND dressing_grooming <> ALL (enum_range(NULL::assistance_level)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'mobility', mobility FROM care_details
+    WHERE mobility IS NOT NULL AND mobility <> ALL (enum_range(NULL::mobility_level)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'companionship_frequency', companionship_frequency FROM care_details
+    WHERE companionship_frequency IS NOT NULL AND companionship_frequency <> ALL (enum_range(NULL::companionship_frequency)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'preferred_activities', preferred_activities FROM care_details
+    WHERE preferred_activities IS NOT NULL AND preferred_activities <> ALL (enum_range(NULL::activity_preference)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'meal_preparation', meal_preparation FROM care_details
+    WHERE meal_preparation IS NOT NULL AND meal_preparation <> ALL (enum_range(NULL::meal_assistance)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'housekeeping', housekeeping FROM care_details
+    WHERE housekeeping IS NOT NULL AND housekeeping <> ALL (enum_range(NULL::housekeeping_need)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'transportation_needed', transportation_needed FROM care_details
+    WHERE transportation_needed IS NOT NULL AND transportation_needed <> ALL (enum_range(NULL::transportation_need)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'transportation_frequency', transportation_frequency FROM care_details
+    WHERE transportation_frequency IS NOT NULL AND transportation_frequency <> ALL (enum_range(NULL::transportation_frequency)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'preferred_care_schedule', preferred_care_schedule FROM care_details
+    WHERE preferred_care_schedule IS NOT NULL AND preferred_care_schedule <> ALL (enum_range(NULL::care_schedule)::text[]);
+INSERT INTO enum_migration_rejects (table_name, row_id, column_name, value)
+    SELECT 'care_details', id, 'start_care_timing', start_care_timing FROM care_details
+    WHERE start_care_timing IS NOT NULL AND start_care_timing <> ALL (enum_range(NULL::start_timing)::text[]);
+
+ALTER TABLE lead_personal_info
+    ALTER COLUMN estimated_age_range TYPE age_range USING (
+        CASE WHEN estimated_age_range = ANY (enum_range(NULL::age_range)::text[]) THEN estimated_age_range::age_range END
+    ),
+    ALTER COLUMN relationship TYPE relationship_type USING (
+        CASE WHEN relationship = ANY (enum_range(NULL::relationship_type)::text[]) THEN relationship::relationship_type END
+    ),
+    ALTER COLUMN current_living_situation TYPE living_situation USING (
+        CASE WHEN current_living_situation = ANY (enum_range(NULL::living_situation)::text[]) THEN current_living_situation::living_situation END
+    ),
+    ALTER COLUMN best_time_to_contact TYPE contact_time USING (
+        CASE WHEN best_time_to_contact = ANY (enum_range(NULL::contact_time)::text[]) THEN best_time_to_contact::contact_time END
+    );
+
+ALTER TABLE care_details
+    ALTER COLUMN bathing_hygiene TYPE assistance_level USING (
+        CASE WHEN bathing_hygiene = ANY (enum_range(NULL::assistance_level)::text[]) THEN bathing_hygiene::assistance_level END
+    ),
+    ALTER COLUMN dressing_grooming TYPE assistance_level USING (
+        CASE WHEN dressing_grooming = ANY (enum_range(NULL::assistance_level)::text[]) THEN dressing_grooming::assistance_level END
+    ),
+    ALTER COLUMN mobility TYPE mobility_level USING (
+        CASE WHEN mobility = ANY (enum_range(NULL::mobility_level)::text[]) THEN mobility::mobility_level END
+    ),
+    ALTER COLUMN companionship_frequency TYPE companionship_frequency USING (
+        CASE WHEN companionship_frequency = ANY (enum_range(NULL::companionship_frequency)::text[]) THEN companionship_frequency::companionship_frequency END
+    ),
+    ALTER COLUMN preferred_activities TYPE activity_preference USING (
+        CASE WHEN preferred_activities = ANY (enum_range(NULL::activity_preference)::text[]) THEN preferred_activities::activity_preference END
+    ),
+    ALTER COLUMN meal_preparation TYPE meal_assistance USING (
+        CASE WHEN meal_preparation = ANY (enum_range(NULL::meal_assistance)::text[]) THEN meal_preparation::meal_assistance END
+    ),
+    ALTER COLUMN housekeeping TYPE housekeeping_need USING (
+        CASE WHEN housekeeping = ANY (enum_range(NULL::housekeeping_need)::text[]) THEN housekeeping::housekeeping_need END
+    ),
+    ALTER COLUMN transportation_needed TYPE transportation_need USING (
+        CASE WHEN transportation_needed = ANY (enum_range(NULL::transportation_need)::text[]) THEN transportation_needed::transportation_need END
+    ),
+    ALTER COLUMN transportation_frequency TYPE transportation_frequency USING (
+        CASE WHEN transportation_frequency = ANY (enum_range(NULL::transportation_frequency)::text[]) THEN transportation_frequency::transportation_frequency END
+    ),
+    ALTER COLUMN preferred_care_schedule TYPE care_schedule USING (
+        CASE WHEN preferred_care_schedule = ANY (enum_range(NULL::care_schedule)::text[]) THEN preferred_care_schedule::care_schedule END
+    ),
+    ALTER COLUMN start_care_timing TYPE start_timing USING (
+        CASE WHEN start_care_timing = ANY (enum_range(NULL::start_timing)::text[]) THEN start_care_timing::start_timing END
+    );
@@ -0,0 +1,12 @@
+-- =============================================
+-- 0003 - Indexes for care-manager filters and date-range reporting
+-- =============================================
+
+CREATE INDEX IF NOT EXISTS idx_lead_personal_info_created_at
+    ON lead_personal_info (created_at);
+CREATE INDEX IF NOT EXISTS idx_lead_personal_info_michigan_location
+    ON lead_personal_info (michigan_location);
+CREATE INDEX IF NOT EXISTS idx_care_details_created_at
+    ON care_details (created_at);
+CREATE INDEX IF NOT EXISTS idx_care_details_start_care_timing
+    ON care_details (start_care_timing);
@@ -0,0 +1,7 @@
+-- =============================================
+-- 0004 - Keyset pagination index for the lead read API (lead_api.py)
+-- Pages are read newest first on (created_at, id)
+-- =============================================
+
+CREATE INDEX IF NOT EXISTS idx_lead_personal_info_keyset
+    ON lead_personal_info (created_at DESC, id DESC);
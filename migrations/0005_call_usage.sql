@@ -0,0 +1,97 @@
+-- =============================================
+-- 0005 - Per-call realtime model usage (agent/usage_accounting.py)
+-- One row per call, written at job shutdown. Token columns are call totals;
+-- `phases` holds the same counters per intake phase. Cost comes from
+-- usage_prices (USD per 1M tokens) - keep it in line with the OpenAI contract.
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS call_usage (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    lead_id UUID REFERENCES lead_personal_info(id) ON DELETE SET NULL,
+    room_name TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    model TEXT,
+    caller_relationship relationship_type,
+    started_at TIMESTAMPTZ NOT NULL,
+    duration_seconds REAL,
+    responses INTEGER NOT NULL DEFAULT 0,
+    input_text_tokens INTEGER NOT NULL DEFAULT 0,
+    input_audio_tokens INTEGER NOT NULL DEFAULT 0,
+    input_cached_text_tokens INTEGER NOT NULL DEFAULT 0,
+    input_cached_audio_tokens INTEGER NOT NULL DEFAULT 0,
+    output_text_tokens INTEGER NOT NULL DEFAULT 0,
+    output_audio_tokens INTEGER NOT NULL DEFAULT 0,
+    input_audio_seconds REAL NOT NULL DEFAULT 0,
+    output_audio_seconds REAL NOT NULL DEFAULT 0,
+    phases JSONB NOT NULL DEFAULT '{}',
+    config JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_usage_lead ON call_usage (lead_id);
+CREATE INDEX IF NOT EXISTS idx_call_usage_started ON call_usage (started_at DESC);
+CREATE INDEX IF NOT EXISTS idx_call_usage_prompt ON call_usage (prompt_version, started_at DESC);
+
+CREATE TABLE IF NOT EXISTS usage_prices (
+    model TEXT PRIMARY KEY,
+    text_input NUMERIC NOT NULL,
+    cached_text_input NUMERIC NOT NULL,
+    audio_input NUMERIC NOT NULL,
+    cached_audio_input NUMERIC NOT NULL,
+    text_output NUMERIC NOT NULL,
+    audio_output NUMERIC NOT NULL
+);
+
+INSERT INTO usage_prices VALUES ('gpt-realtime', 4.00, 0.40, 32.00, 0.40, 16.00, 64.00)
+    ON CONFLICT (model) DO NOTHING;
+
+-- Cached tokens are part of the input counts, so they are billed at the cached rate only
+CREATE OR REPLACE FUNCTION usage_cost(u call_usage, p usage_prices) RETURNS NUMERIC
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT (
+        (u.input_text_tokens - u.input_cached_text_tokens) * p.text_input
+        + u.input_cached_text_tokens * p.cached_text_input
+        + (u.input_audio_tokens - u.input_cached_audio_tokens) * p.audio_input
+        + u.input_cached_audio_tokens * p.cached_audio_input
+        + u.output_text_tokens * p.text_output
+        + u.output_audio_tokens * p.audio_output
+    ) / 1000000
+$$;
+
+-- Most expensive calls: SELECT * FROM call_usage_cost ORDER BY estimated_cost_usd DESC LIMIT 20
+CREATE OR REPLACE VIEW call_usage_cost AS
+    SELECT u.*, round(usage_cost(u, p), 4) AS estimated_cost_usd
+    FROM call_usage u
+    LEFT JOIN usage_prices p ON p.model = u.model;
+
+-- Average usage per prompt version, caller type and phase
+CREATE OR REPLACE VIEW call_usage_rollup AS
+    SELECT
+        u.prompt_version,
+        u.caller_relationship,
+        ph.phase,
+        count(*) AS calls,
+        avg((ph.stats->>'responses')::numeric) AS avg_responses,
+        avg((ph.stats->>'input_text_tokens')::numeric) AS avg_input_text_tokens,
+        avg((ph.stats->>'input_audio_tokens')::numeric) AS avg_input_audio_tokens,
+        avg(((ph.stats->>'input_cached_text_tokens')::numeric + (ph.stats->>'input_cached_audio_tokens')::numeric)
+            / NULLIF((ph.stats->>'input_text_tokens')::numeric + (ph.stats->>'input_audio_tokens')::numeric, 0)) AS cached_share,
+        avg((ph.stats->>'output_text_tokens')::numeric) AS avg_output_text_tokens,
+        avg((ph.stats->>'output_audio_tokens')::numeric) AS avg_output_audio_tokens,
+        avg((ph.stats->>'input_audio_seconds')::numeric) AS avg_input_audio_seconds,
+        avg((ph.stats->>'output_audio_seconds')::numeric) AS avg_output_audio_seconds
+    FROM call_usage u, jsonb_each(u.phases) AS ph(phase, stats)
+    GROUP BY u.prompt_version, u.caller_relationship, ph.phase;
+
+ALTER TABLE call_usage ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_policies WHERE policyname = 'Service role full access on call usage') THEN
+        CREATE POLICY "Service role full access on call usage" ON call_usage FOR ALL USING (true) WITH CHECK (true);
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT ALL ON call_usage, usage_prices TO service_role;
+        GRANT SELECT ON call_usage_cost, call_usage_rollup TO service_role;
+    END IF;
+END $$;
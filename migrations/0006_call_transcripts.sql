@@ -0,0 +1,52 @@
+-- =============================================
+-- 0006 - Searchable call transcripts (transcript_search.py)
+-- One row per call, written at job shutdown. `search` is kept up to date by
+-- Postgres itself (generated column), so the GIN index grows one call at a
+-- time - no batch reindexing.
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS call_transcripts (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    lead_id UUID REFERENCES lead_personal_info(id) ON DELETE CASCADE,
+    room_name TEXT NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    lines JSONB NOT NULL DEFAULT '[]',
+    body TEXT NOT NULL,
+    search TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', body)) STORED,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_transcripts_search ON call_transcripts USING GIN (search);
+CREATE INDEX IF NOT EXISTS idx_call_transcripts_lead ON call_transcripts (lead_id);
+
+-- Ranked matches, best first. ts_headline re-parses the whole body, so it
+-- only runs on the rows that survive the LIMIT.
+-- SELECT * FROM search_call_transcripts('daughter fall last week', 20)
+CREATE OR REPLACE FUNCTION search_call_transcripts(search_query TEXT, max_results INTEGER DEFAULT 20)
+RETURNS TABLE (lead_id UUID, room_name TEXT, started_at TIMESTAMPTZ, rank REAL, snippet TEXT)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        t.lead_id, t.room_name, t.started_at, t.rank,
+        ts_headline('english', t.body, q, 'StartSel=[, StopSel=], MaxFragments=2, MaxWords=18, MinWords=6')
+    FROM (
+        SELECT c.lead_id, c.room_name, c.started_at, c.body, ts_rank_cd(c.search, q) AS rank
+        FROM call_transcripts c, websearch_to_tsquery('english', search_query) q
+        WHERE c.search @@ q
+        ORDER BY rank DESC, c.started_at DESC
+        LIMIT max_results
+    ) t, websearch_to_tsquery('english', search_query) q
+    ORDER BY t.rank DESC, t.started_at DESC
+$$;
+
+ALTER TABLE call_transcripts ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_policies WHERE policyname = 'Service role full access on call transcripts') THEN
+        CREATE POLICY "Service role full access on call transcripts" ON call_transcripts FOR ALL USING (true) WITH CHECK (true);
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT ALL ON call_transcripts TO service_role;
+        GRANT EXECUTE ON FUNCTION search_call_transcripts(TEXT, INTEGER) TO service_role;
+    END IF;
+END $$;
@@ -0,0 +1,37 @@
+-- =============================================
+-- 0007 - Intake config version per call (agent/live_config.py)
+-- Prompts, voice and turn detection are hot reloaded from
+-- agent/intake_config.toml; each call records the version it ran with and
+-- its connect-latency timings (ms) so versions can be compared.
+-- =============================================
+
+ALTER TABLE call_usage ADD COLUMN IF NOT EXISTS config_version TEXT;
+ALTER TABLE call_usage ADD COLUMN IF NOT EXISTS timings JSONB NOT NULL DEFAULT '{}';
+
+CREATE INDEX IF NOT EXISTS idx_call_usage_config ON call_usage (config_version, started_at DESC);
+
+-- Latency and usage per config version: SELECT * FROM call_usage_by_config ORDER BY first_call DESC
+CREATE OR REPLACE VIEW call_usage_by_config AS
+    SELECT
+        u.config_version,
+        count(*) AS calls,
+        min(u.started_at) AS first_call,
+        max(u.started_at) AS last_call,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY (u.timings->>'caller_to_first_audio_ms')::numeric) AS p50_first_audio_ms,
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY (u.timings->>'caller_to_first_audio_ms')::numeric) AS p95_first_audio_ms,
+        avg(u.duration_seconds) AS avg_duration_seconds,
+        avg(u.responses) AS avg_responses,
+        avg(u.input_audio_tokens) AS avg_input_audio_tokens,
+        avg(u.output_audio_tokens) AS avg_output_audio_tokens,
+        avg(usage_cost(u, p)) AS avg_cost_usd,
+        avg((u.lead_id IS NOT NULL)::int) AS lead_saved_share
+    FROM call_usage u
+    LEFT JOIN usage_prices p ON p.model = u.model
+    GROUP BY u.config_version;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT SELECT ON call_usage_by_config TO service_role;
+    END IF;
+END $$;
@@ -0,0 +1,44 @@
+-- =============================================
+-- 0008 - Parameter experiments per call (agent/experiments.py)
+-- Each call records its experiment arm and turn-taking outcomes:
+-- median response delay (caller stops -> Sarah speaks), caller
+-- interruptions, and whether the intake completed (care details saved).
+-- experiment_report.py reads call_experiment_calls and adds confidence
+-- intervals; call_experiment_arms is the quick look.
+-- =============================================
+
+ALTER TABLE call_usage ADD COLUMN IF NOT EXISTS experiment TEXT;
+ALTER TABLE call_usage ADD COLUMN IF NOT EXISTS arm TEXT;
+ALTER TABLE call_usage ADD COLUMN IF NOT EXISTS completed BOOLEAN NOT NULL DEFAULT false;
+ALTER TABLE call_usage ADD COLUMN IF NOT EXISTS response_delay_ms REAL;
+ALTER TABLE call_usage ADD COLUMN IF NOT EXISTS interruptions INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_call_usage_experiment ON call_usage (experiment, arm) WHERE experiment IS NOT NULL;
+
+-- One row per experiment call, only the columns the report needs
+CREATE OR REPLACE VIEW call_experiment_calls AS
+    SELECT experiment, arm, config_version, lead_id, started_at, duration_seconds,
+           completed, response_delay_ms, interruptions
+    FROM call_usage
+    WHERE experiment IS NOT NULL;
+
+CREATE OR REPLACE VIEW call_experiment_arms AS
+    SELECT
+        experiment,
+        arm,
+        count(*) AS calls,
+        avg(completed::int) AS completion_rate,
+        avg(response_delay_ms) AS avg_response_delay_ms,
+        avg(interruptions) AS avg_interruptions,
+        avg(duration_seconds) AS avg_duration_seconds,
+        min(started_at) AS first_call,
+        max(started_at) AS last_call
+    FROM call_experiment_calls
+    GROUP BY experiment, arm;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT SELECT ON call_experiment_calls, call_experiment_arms TO service_role;
+    END IF;
+END $$;
@@ -0,0 +1,16 @@
+-- =============================================
+-- 0009 - Normalized caller location (lead_location.py)
+-- michigan_location stays as the caller said it; these columns hold the
+-- gazetteer match made at save time: canonical city (NULL when the caller
+-- only named a county), 5-digit county FIPS code and match confidence.
+-- Rows saved before this migration: python -m lead_location backfill
+-- =============================================
+
+ALTER TABLE lead_personal_info ADD COLUMN IF NOT EXISTS location_city TEXT;
+ALTER TABLE lead_personal_info ADD COLUMN IF NOT EXISTS location_county_fips CHAR(5);
+ALTER TABLE lead_personal_info ADD COLUMN IF NOT EXISTS location_confidence REAL;
+
+-- Routing by county, and by city within a county
+CREATE INDEX IF NOT EXISTS idx_lead_personal_info_location
+    ON lead_personal_info (location_county_fips, location_city)
+    WHERE location_county_fips IS NOT NULL;
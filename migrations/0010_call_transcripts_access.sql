@@ -0,0 +1,29 @@
+-- =============================================
+-- 0010 - Lock call transcripts down to the service role
+-- 0006 created the transcripts policy for every role and left
+-- search_call_transcripts() executable by PUBLIC (and by anon/authenticated
+-- through Supabase's default privileges), so anyone holding the anon key
+-- could read or search what callers said. Only the agent and the admin
+-- tools (service_role) need either.
+-- =============================================
+
+DROP POLICY IF EXISTS "Service role full access on call transcripts" ON call_transcripts;
+
+REVOKE EXECUTE ON FUNCTION search_call_transcripts(TEXT, INTEGER) FROM PUBLIC;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        CREATE POLICY "Service role full access on call transcripts" ON call_transcripts
+            FOR ALL TO service_role USING (true) WITH CHECK (true);
+        GRANT EXECUTE ON FUNCTION search_call_transcripts(TEXT, INTEGER) TO service_role;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        REVOKE ALL ON call_transcripts FROM anon;
+        REVOKE EXECUTE ON FUNCTION search_call_transcripts(TEXT, INTEGER) FROM anon;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+        REVOKE ALL ON call_transcripts FROM authenticated;
+        REVOKE EXECUTE ON FUNCTION search_call_transcripts(TEXT, INTEGER) FROM authenticated;
+    END IF;
+END $$;
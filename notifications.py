@@ -0,0 +1,258 @@
+"""
+Care Manager Notifications for Med Help USA
+===========================================
+Tells a care manager about each completed intake without adding a network
+round trip to the live call:
+
+- The save tool only enqueues (non-blocking); a small pool of background
+  threads does the delivery
+- Workers batch whatever is waiting (up to NOTIFY_BATCH_SIZE, lingering
+  NOTIFY_BATCH_WAIT_SECONDS for more) into one webhook POST or one email
+- Failed batches are retried with exponential backoff and jitter; batches
+  that exhaust NOTIFY_MAX_ATTEMPTS are logged with their lead_ids
+- The queue is bounded: when full, enqueue() drops the notification and
+  counts it instead of blocking the session (the lead itself is already
+  saved and visible through /leads)
+- metrics() reports queue depth and enqueue -> delivery latency
+
+Sinks (first one configured wins; notifications are off when neither is):
+    NOTIFY_WEBHOOK_URL  (+ NOTIFY_WEBHOOK_SECRET -> X-MedHelp-Signature HMAC)
+    NOTIFY_SMTP_HOST    (+ PORT, USER, PASSWORD, FROM, TO)
+
+Usage:
+    from notifications import LeadNotifier
+
+    notifier = LeadNotifier.from_env(enrich=fetch_contacts)
+    notifier.enqueue(lead_id, {"start_care_timing": "immediately"})
+    notifier.flush(timeout=5.0)          # at shutdown
+"""
+
+import os
+import json
+import hmac
+import time
+import queue
+import random
+import hashlib
+import logging
+import smtplib
+import threading
+import statistics
+import urllib.request
+from collections import deque
+from email.message import EmailMessage
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "2"))
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "20"))
+NOTIFY_BATCH_WAIT_SECONDS = float(os.getenv("NOTIFY_BATCH_WAIT_SECONDS", "0.5"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+NOTIFY_RETRY_BASE_SECONDS = float(os.getenv("NOTIFY_RETRY_BASE_SECONDS", "1.0"))
+NOTIFY_TIMEOUT_SECONDS = float(os.getenv("NOTIFY_TIMEOUT_SECONDS", "10"))
+LATENCY_SAMPLES = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class Notification:
+    """One completed lead waiting for delivery"""
+    def __init__(self, lead_id: str, details: dict):
+        self.lead_id = lead_id
+        self.details = details
+        self.enqueued_at = time.monotonic()
+        self.completed_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    def to_dict(self) -> dict:
+        return {"lead_id": self.lead_id, "completed_at": self.completed_at, **self.details}
+
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+class WebhookSink:
+    """POSTs {"leads": [...]} as JSON; any non-2xx response is a failure"""
+    def __init__(self, url: str, secret: str = ""):
+        self.url = url
+        self.secret = secret
+
+    def send(self, leads: list[dict]) -> None:
+        body = json.dumps({"leads": leads}, default=str).encode()
+        request = urllib.request.Request(self.url, data=body, method="POST")
+        request.add_header("Content-Type", "application/json")
+        if self.secret:
+            signature = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+            request.add_header("X-MedHelp-Signature", f"sha256={signature}")
+        # urlopen raises HTTPError for non-2xx
+        with urllib.request.urlopen(request, timeout=NOTIFY_TIMEOUT_SECONDS) as response:
+            response.read()
+
+
+class SMTPSink:
+    """One plain-text email per batch"""
+    def __init__(self, host: str, port: int, sender: str, recipients: list[str],
+                 user: str = "", password: str = ""):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.user = user
+        self.password = password
+
+    def send(self, leads: list[dict]) -> None:
+        message = EmailMessage()
+        message["Subject"] = f"Med Help USA - {len(leads)} new intake lead{'s' if len(leads) != 1 else ''}"
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        message.set_content("\n\n".join(
+            "\n".join(f"{key}: {value}" for key, value in lead.items() if value not in (None, ""))
+            for lead in leads
+        ))
+        with smtplib.SMTP(self.host, self.port, timeout=NOTIFY_TIMEOUT_SECONDS) as smtp:
+            if self.user:
+                smtp.starttls()
+                smtp.login(self.user, self.password)
+            smtp.send_message(message)
+
+
+def sink_from_env():
+    """Configured sink, or None when notifications are off"""
+    if os.getenv("NOTIFY_WEBHOOK_URL"):
+        return WebhookSink(os.getenv("NOTIFY_WEBHOOK_URL"), os.getenv("NOTIFY_WEBHOOK_SECRET", ""))
+    if os.getenv("NOTIFY_SMTP_HOST"):
+        return SMTPSink(
+            host=os.getenv("NOTIFY_SMTP_HOST"),
+            port=int(os.getenv("NOTIFY_SMTP_PORT", "587")),
+            sender=os.getenv("NOTIFY_SMTP_FROM", "intake@medhelpusa.com"),
+            recipients=[r.strip() for r in os.getenv("NOTIFY_SMTP_TO", "").split(",") if r.strip()],
+            user=os.getenv("NOTIFY_SMTP_USER", ""),
+            password=os.getenv("NOTIFY_SMTP_PASSWORD", ""),
+        )
+    return None
+
+
+# =============================================================================
+# NOTIFIER
+# =============================================================================
+
+class LeadNotifier:
+    """Bounded queue + worker pool delivering batches to one sink.
+
+    `enrich(lead_ids) -> {lead_id: dict}` runs on the worker thread (one
+    call per batch), so contact details can be looked up off the call path.
+    """
+    def __init__(self, sink, enrich=None, queue_size: int = NOTIFY_QUEUE_SIZE, workers: int = NOTIFY_WORKERS,
+                 batch_size: int = NOTIFY_BATCH_SIZE, batch_wait: float = NOTIFY_BATCH_WAIT_SECONDS,
+                 max_attempts: int = NOTIFY_MAX_ATTEMPTS, retry_base: float = NOTIFY_RETRY_BASE_SECONDS):
+        self.sink = sink
+        self.enrich = enrich
+        self.queue: queue.Queue[Notification] = queue.Queue(maxsize=queue_size)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._latencies_ms: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.stats = {"enqueued": 0, "delivered": 0, "dropped": 0, "failed": 0, "retries": 0,
+                      "batches": 0, "max_depth": 0}
+
+    @classmethod
+    def from_env(cls, enrich=None) -> "LeadNotifier":
+        return cls(sink_from_env(), enrich=enrich)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink is not None
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent; enqueue() calls it too)"""
+        with self._lock:
+            if self._threads or not self.enabled:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"lead-notify-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, lead_id: str, details: dict | None = None) -> bool:
+        """Queue a completed lead; never blocks. False if dropped or disabled."""
+        if not self.enabled:
+            return False
+        self.start()
+        try:
+            self.queue.put_nowait(Notification(lead_id, details or {}))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.error(f"Notification queue full - dropped notification for lead {lead_id}")
+            return False
+        self.stats["enqueued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.queue.qsize())
+        return True
+
+    def flush(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for queued notifications to be handled"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self.queue.unfinished_tasks
+
+    def metrics(self) -> dict:
+        latencies = sorted(self._latencies_ms)
+        return {
+            **self.stats,
+            "depth": self.queue.qsize(),
+            "latency_p50_ms": statistics.median(latencies) if latencies else None,
+            "latency_p99_ms": latencies[int(len(latencies) * 0.99)] if latencies else None,
+        }
+
+    def _next_batch(self) -> list[Notification]:
+        batch = [self.queue.get()]
+        linger_until = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = linger_until - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, batch: list[Notification]) -> None:
+        leads = [n.to_dict() for n in batch]
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if self.enrich is not None:
+                    extra = self.enrich([n.lead_id for n in batch]) or {}
+                    leads = [{**extra.get(n.lead_id, {}), **n.to_dict()} for n in batch]
+                self.sink.send(leads)
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    self.stats["failed"] += len(batch)
+                    logger.error(f"Notification delivery failed after {attempt} attempts "
+                                 f"for leads {[n.lead_id for n in batch]}: {e}")
+                    return
+                self.stats["retries"] += 1
+                delay = self.retry_base * 2 ** (attempt - 1)
+                time.sleep(random.uniform(delay / 2, delay))
+
+        now = time.monotonic()
+        self.stats["batches"] += 1
+        self.stats["delivered"] += len(batch)
+        self._latencies_ms.extend((now - n.enqueued_at) * 1000 for n in batch)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logger.error(f"Notification worker error: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
@@ -0,0 +1,201 @@
+"""
+Static Asset Pipeline for the Demo Client
+=========================================
+Builds the demo pages once at startup and serves them from memory:
+
+- Optionally (STATIC_EXTRACT_INLINE=1) inline <style> / <script> blocks are
+  moved out into content-hashed files (/assets/<page>.<hash>.css|js) served
+  with a one-year immutable cache. It is off by default: for pages this
+  small the extra round trip on a first visit costs more than it saves
+  (see benchmarks/static_assets_report.py)
+- Every asset is pre-compressed (gzip, plus brotli when the `brotli`
+  package is installed) and picked per request from Accept-Encoding
+- Strong ETags with If-None-Match -> 304, so a repeat visit to a page
+  costs a single empty response
+
+Usage:
+    from static_assets import StaticAssetHandlerMixin, build_demo_assets
+
+    class Handler(StaticAssetHandlerMixin, BaseHTTPRequestHandler):
+        assets = build_demo_assets(".")
+
+        def do_GET(self):
+            if not self.serve_asset(urlparse(self.path).path):
+                self.send_error(404)
+"""
+
+import os
+import re
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip is always available
+    brotli = None
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"  # Content-hashed files
+PAGE_CACHE_CONTROL = "no-cache"  # Always revalidate (cheap 304 via ETag)
+MIN_COMPRESS_BYTES = 256
+STATIC_EXTRACT_INLINE = os.getenv("STATIC_EXTRACT_INLINE", "0") == "1"
+
+# Demo pages: URL path -> file (relative to the project root)
+DEMO_PAGES = {
+    "/": "test_client.html",
+    "/test_client.html": "test_client.html",
+    "/index.html": "public/index.html",
+    "/public/index.html": "public/index.html",
+}
+
+INLINE_STYLE = re.compile(r"<style>(.*?)</style>", re.DOTALL)
+INLINE_SCRIPT = re.compile(r"<script>(.*?)</script>", re.DOTALL)
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """RFC 9110 Accept-Encoding -> {coding: q}; a malformed q counts as 0"""
+    weights = {}
+    for part in (header or "").split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        weights[coding.lower()] = q
+    return weights
+
+
+class Asset:
+    """One in-memory resource with its pre-compressed representations"""
+    def __init__(self, body: bytes, content_type: str, cache_control: str):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()[:20]
+
+        # content-coding -> (body, strong ETag); each representation gets its own tag
+        self.encodings = {"identity": (body, f'"{digest}"')}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.encodings["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+            if brotli is not None:
+                self.encodings["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+    @property
+    def etags(self) -> set[str]:
+        return {etag for _, etag in self.encodings.values()}
+
+    def negotiate(self, accept_encoding: str) -> str:
+        """Pick the smallest representation the client accepts (q=0 refuses a coding)"""
+        weights = parse_accept_encoding(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self.encodings and weights.get(coding, weights.get("*", 0)) > 0:
+                return coding
+        return "identity"
+
+
+class StaticAssetStore:
+    """URL path -> Asset, built once and read-only afterwards"""
+    def __init__(self):
+        self.assets: dict[str, Asset] = {}
+
+    def add(self, url_path: str, body: bytes, content_type: str, cache_control: str) -> Asset:
+        asset = Asset(body, content_type, cache_control)
+        self.assets[url_path] = asset
+        return asset
+
+    def add_hashed(self, stem: str, ext: str, body: bytes, content_type: str) -> str:
+        """Store a content-hashed file and return its URL"""
+        digest = hashlib.sha256(body).hexdigest()[:10]
+        url_path = f"/assets/{stem}.{digest}.{ext}"
+        if url_path not in self.assets:
+            self.add(url_path, body, content_type, IMMUTABLE_CACHE_CONTROL)
+        return url_path
+
+    def add_page(self, url_path: str, file_path: str, extract_inline: bool = STATIC_EXTRACT_INLINE) -> Asset:
+        """Store a page, optionally splitting inline CSS/JS into hashed files"""
+        with open(file_path, encoding="utf-8") as f:
+            html = f.read()
+        if not extract_inline:
+            return self.add(url_path, html.encode(), "text/html; charset=utf-8", PAGE_CACHE_CONTROL)
+
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+
+        def extract_style(match):
+            href = self.add_hashed(stem, "css", match.group(1).encode(), "text/css; charset=utf-8")
+            return f'<link rel="stylesheet" href="{href}">'
+
+        def extract_script(match):
+            src = self.add_hashed(stem, "js", match.group(1).encode(), "text/javascript; charset=utf-8")
+            return f'<script src="{src}"></script>'
+
+        html = INLINE_STYLE.sub(extract_style, html)
+        html = INLINE_SCRIPT.sub(extract_script, html)
+        return self.add(url_path, html.encode(), "text/html; charset=utf-8", PAGE_CACHE_CONTROL)
+
+    def get(self, url_path: str) -> Asset | None:
+        return self.assets.get(url_path)
+
+
+def build_demo_assets(root: str = ".", extract_inline: bool = STATIC_EXTRACT_INLINE) -> StaticAssetStore:
+    """Build the in-memory store for the demo client pages"""
+    store = StaticAssetStore()
+    for url_path, file_path in DEMO_PAGES.items():
+        full_path = os.path.join(root, file_path)
+        if os.path.exists(full_path):
+            store.add_page(url_path, full_path, extract_inline=extract_inline)
+    return store
+
+
+def etag_matches(if_none_match: str, etags: set[str]) -> bool:
+    """RFC 9110 If-None-Match (weak comparison, as required for GET/HEAD)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return not candidates.isdisjoint(etags)
+
+
+# =============================================================================
+# HTTP HANDLER MIXIN
+# =============================================================================
+
+class StaticAssetHandlerMixin:
+    """Serves `self.assets` from memory; returns False for unknown paths"""
+    assets: StaticAssetStore = StaticAssetStore()
+
+    def serve_asset(self, url_path: str, head: bool = False) -> bool:
+        asset = self.assets.get(url_path)
+        if asset is None:
+            return False
+
+        coding = asset.negotiate(self.headers.get("Accept-Encoding", ""))
+        body, etag = asset.encodings[coding]
+
+        if etag_matches(self.headers.get("If-None-Match", ""), asset.etags):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", asset.cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return True
+
+        self.send_response(200)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", asset.cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        if coding != "identity":
+            self.send_header("Content-Encoding", coding)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
@@ -0,0 +1,360 @@
+"""
+Deadline-Bounded Storage Calls for Med Help USA
+===============================================
+The realtime model cannot speak until a save tool returns, so a slow
+Supabase means the caller sits in silence. Every storage call from
+supabase_client.py goes through a StorageGuard:
+
+- The blocking supabase-py call runs in a thread and gets at most
+  STORAGE_DEADLINE_MS (shared by all calls of one tool invocation)
+- A circuit breaker watches the last BREAKER_WINDOW calls; when at least
+  BREAKER_FAILURE_RATE of them failed or were slower than the deadline, it
+  opens and calls fail fast for BREAKER_OPEN_SECONDS, then one probe call
+  decides whether it closes again
+- A write that misses its deadline, fails transiently (timeout,
+  connection error, 5xx) or hits an open breaker is appended to a local
+  spool (JSON lines in STORAGE_SPOOL_DIR) and the tool carries on as if it
+  was saved. Permanent errors (4xx: a foreign key to a lead that does not
+  exist, a bad value) are raised to the tool instead - replaying them
+  could never succeed
+- A write whose parent row is still waiting in the spool (care_details
+  for a lead spooled a moment ago) is spooled straight behind it instead
+  of failing the foreign key live
+- A replay thread upserts spooled rows in order while the breaker is not
+  open. A row that fails permanently, or transiently
+  STORAGE_REPLAY_MAX_ATTEMPTS times, is moved to the dead-letter file
+  (STORAGE_SPOOL_DIR/dead/) so it cannot block the rows behind it. Replay
+  outcomes stay out of the breaker, which only judges live calls
+
+Rows carry client-generated ids and are written with upsert, so a write
+that lands late *and* is replayed from the spool ends up as one row.
+
+Usage:
+    guard = StorageGuard()
+    deadline = guard.deadline()
+    response, saved = await guard.call(lambda: table.upsert(row).execute(),
+                                       spool=("lead_personal_info", row), deadline=deadline)
+    await guard.call(lambda: ..., spool=("care_details", care), after=("lead_personal_info", lead_id))
+    guard.start_replay(apply=lambda table, row: ...)
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+STORAGE_DEADLINE_MS = int(os.getenv("STORAGE_DEADLINE_MS", "800"))
+STORAGE_CALL_TIMEOUT_SECONDS = float(os.getenv("STORAGE_CALL_TIMEOUT_SECONDS", "10"))  # HTTP timeout (abandoned calls)
+STORAGE_SPOOL_DIR = os.getenv("STORAGE_SPOOL_DIR", "spool")
+STORAGE_REPLAY_SECONDS = float(os.getenv("STORAGE_REPLAY_SECONDS", "15"))
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+STORAGE_REPLAY_MAX_ATTEMPTS = int(os.getenv("STORAGE_REPLAY_MAX_ATTEMPTS", "20"))   # Then dead-lettered
+TRANSIENT_STATUS = {408, 425, 429}                    # Plus every 5xx
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")   # Connection, rollback, resources, shutdown
+
+
+def is_transient(error: BaseException) -> bool:
+    """True if the same write may succeed later (timeout, connection error, 5xx);
+    False for errors the server will give again (4xx, constraint violations)"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    code = getattr(error, "code", None)
+    if status is None and isinstance(code, int):                  # urllib HTTPError
+        status = code
+    if status is None and isinstance(code, str) and code.isdigit() and len(code) == 3:
+        status = int(code)                                        # postgrest APIError without a JSON body
+    if isinstance(status, int):
+        return status >= 500 or status in TRANSIENT_STATUS
+    if isinstance(code, str) and len(code) == 5:                  # postgrest APIError: Postgres SQLSTATE
+        return code.startswith(TRANSIENT_SQLSTATE_CLASSES)
+    # httpx transport errors (ConnectError, ReadTimeout, ...) and plain socket errors
+    return type(error).__module__.startswith(("httpx", "httpcore")) or isinstance(error, OSError)
+
+
+class Deadline:
+    """Time budget shared by the storage calls of one tool invocation"""
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+
+# =============================================================================
+# CIRCUIT BREAKER
+# =============================================================================
+
+class CircuitBreaker:
+    """closed -> open on a high failure/slow rate -> half_open after a cool-down -> one probe decides"""
+    def __init__(self, window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, open_seconds: float = BREAKER_OPEN_SECONDS,
+                 slow_seconds: float = STORAGE_DEADLINE_MS / 1000):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.slow_seconds = slow_seconds
+        self.state = "closed"
+        self._outcomes: deque = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "slow": 0, "rejected": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        """True if a call may go out now (in half_open: only the single probe)"""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state, self._probing = "half_open", False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record(self, ok: bool, seconds: float) -> None:
+        slow = seconds > self.slow_seconds
+        failed = not ok or slow
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["failures"] += not ok
+            self.stats["slow"] += ok and slow
+            if self.state == "half_open":
+                self._probing = False
+                if failed:
+                    self._trip()
+                else:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (self.state == "closed" and len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                self._trip()
+
+    def is_open(self) -> bool:
+        """Open and still cooling down (does not take the half_open probe)"""
+        return self.state == "open" and time.monotonic() - self._opened_at < self.open_seconds
+
+    def _trip(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        logger.warning(f"⚡ Storage circuit open for {self.open_seconds:.0f}s")
+
+
+# =============================================================================
+# LOCAL SPOOL (fallback store)
+# =============================================================================
+
+class SpoolStore:
+    """Append-only JSON-lines files of (table, row) writes, replayed in order"""
+    def __init__(self, directory: str = STORAGE_SPOOL_DIR, max_attempts: int = STORAGE_REPLAY_MAX_ATTEMPTS):
+        self.directory = directory
+        self.max_attempts = max_attempts
+        self.path = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        self.dead_letter_path = os.path.join(directory, "dead", f"{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        self.dead_letters = 0
+        self._held: set[tuple[str, str]] = set()    # (table, id) this process spooled, maybe not replayed yet
+        self._lock = threading.Lock()
+
+    def append(self, table: str, row: dict) -> None:
+        line = json.dumps({"table": table, "row": row, "spooled_at": time.time()}, default=str)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._held.add((table, str(row.get("id"))))
+
+    def holds(self, table: str, row_id: str) -> bool:
+        """True while a write of this row is still in the spool (this process's
+        writes; one replayed by another process is found gone and forgotten)"""
+        key = (table, str(row_id))
+        if key not in self._held:
+            return False
+        with self._lock:
+            names = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+            for name in names:
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        for line in f:
+                            entry = json.loads(line) if line.strip() else None
+                            if entry and (entry["table"], str(entry["row"].get("id"))) == key:
+                                return True
+                except (FileNotFoundError, IsADirectoryError):
+                    pass
+            self._held.discard(key)
+        return False
+
+    def dead_letter(self, entry: dict, error: BaseException) -> None:
+        """Keep a write that can never be replayed, with the reason, for a human to look at"""
+        line = json.dumps({**entry, "error": repr(error), "dead_at": time.time()}, default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.dead_letter_path), exist_ok=True)
+            with open(self.dead_letter_path, "a") as f:
+                f.write(line + "\n")
+        self.dead_letters += 1
+        logger.error(f"☠️  Spooled {entry['table']} write dead-lettered: {error!r}")
+
+    def _files(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        dated = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(".jsonl"):
+                    dated.append((os.path.getmtime(path), path))
+            except FileNotFoundError:   # Claimed by another process meanwhile
+                pass
+        return [path for _, path in sorted(dated)]
+
+    def pending(self) -> int:
+        count = 0
+        for path in self._files():
+            try:
+                with open(path) as f:
+                    count += sum(1 for line in f if line.strip())
+            except FileNotFoundError:
+                pass
+        return count
+
+    def replay(self, apply) -> tuple[int, int]:
+        """apply(table, row) each spooled write in order, stopping at the first
+        transient failure; permanent failures, and rows out of attempts, are
+        dead-lettered and skipped. Returns (replayed, left in the spool).
+        Files are claimed by rename, so several processes can share one
+        spool directory."""
+        replayed = 0
+        for path in self._files():
+            claimed = f"{path}.{os.getpid()}.replaying"
+            with self._lock:
+                try:
+                    spooled_until = os.path.getmtime(path)
+                    os.replace(path, claimed)
+                except FileNotFoundError:
+                    continue   # Another process got it
+            with open(claimed) as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            for i, entry in enumerate(entries):
+                key = (entry["table"], str(entry["row"].get("id")))
+                try:
+                    apply(entry["table"], entry["row"])
+                except Exception as e:
+                    entry["attempts"] = entry.get("attempts", 0) + 1
+                    if not is_transient(e) or entry["attempts"] >= self.max_attempts:
+                        self.dead_letter(entry, e)
+                        self._held.discard(key)
+                        continue
+                    logger.warning(f"Spool replay stopped ({entry['table']}): {e}")
+                    # Put the rest back, dated before anything spooled since, so order is kept
+                    retry = os.path.join(self.directory, f"retry-{uuid.uuid4().hex[:8]}.jsonl")
+                    with open(retry, "w") as f:
+                        f.writelines(json.dumps(rest, default=str) + "\n" for rest in entries[i:])
+                    os.utime(retry, (spooled_until, spooled_until))
+                    os.remove(claimed)
+                    return replayed, self.pending()
+                self._held.discard(key)
+                replayed += 1
+            os.remove(claimed)
+        return replayed, self.pending()
+
+
+# =============================================================================
+# GUARD
+# =============================================================================
+
+class StorageGuard:
+    """Deadline + circuit breaker + spool around blocking storage calls"""
+    def __init__(self, breaker: CircuitBreaker | None = None, spool: SpoolStore | None = None,
+                 deadline_ms: int = STORAGE_DEADLINE_MS):
+        self.breaker = breaker or CircuitBreaker(slow_seconds=deadline_ms / 1000)
+        self.spool = spool or SpoolStore()
+        self.deadline_ms = deadline_ms
+        self.stats = {"saved": 0, "spooled": 0, "timeouts": 0, "errors": 0, "rejected_writes": 0, "replayed": 0}
+        self._replay_thread: threading.Thread | None = None
+
+    def deadline(self) -> Deadline:
+        return Deadline(self.deadline_ms / 1000)
+
+    async def call(self, fn, spool: tuple[str, dict] | None = None, fallback=None, deadline: Deadline | None = None,
+                   after: tuple[str, str] | None = None):
+        """Run blocking `fn()` within the deadline. Returns (result, True), or
+        (fallback, False) after spooling `spool` when it failed transiently,
+        timed out or the breaker is open. Permanent errors are raised.
+        `after` = (table, id) of the row this write references: while that
+        row is still in the spool, this write is spooled behind it unsent."""
+        deadline = deadline or self.deadline()
+        if after is not None and spool is not None and self.spool.holds(*after):
+            logger.info(f"💾 {after[0]} {after[1]} is still spooled - spooling the {spool[0]} write behind it")
+        elif deadline.remaining() > 0 and self.breaker.allow():
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(asyncio.to_thread(fn), deadline.remaining())
+                self.breaker.record(True, time.monotonic() - started)
+                self.stats["saved"] += 1
+                return result, True
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                self.breaker.record(False, time.monotonic() - started)
+                logger.warning(f"⏱️  Storage call over its {self.deadline_ms}ms budget")
+            except Exception as e:
+                if not is_transient(e):
+                    # Storage answered; the write itself is wrong and would fail again from the spool
+                    self.breaker.record(True, time.monotonic() - started)
+                    self.stats["rejected_writes"] += 1
+                    raise
+                self.stats["errors"] += 1
+                self.breaker.record(False, time.monotonic() - started)
+                logger.warning(f"Storage call failed: {e}")
+        if spool is not None:
+            self.spool.append(*spool)
+            self.stats["spooled"] += 1
+        return fallback, False
+
+    def replay(self, apply) -> int:
+        """One replay pass (blocking) unless the breaker is open. Replay results
+        are not recorded in the breaker: a poison row must not fail live saves"""
+        if not self.spool.pending() or self.breaker.is_open():
+            return 0
+        replayed, left = self.spool.replay(apply)
+        self.stats["replayed"] += replayed
+        if replayed:
+            logger.info(f"💾 Replayed {replayed} spooled writes ({left} left)")
+        return replayed
+
+    def start_replay(self, apply, interval: float = STORAGE_REPLAY_SECONDS) -> None:
+        """Background thread that drains the spool every `interval` seconds"""
+        if self._replay_thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.replay(apply)
+                except Exception as e:
+                    logger.warning(f"Spool replay failed: {e}")
+                time.sleep(interval)
+
+        self._replay_thread = threading.Thread(target=run, name="storage-replay", daemon=True)
+        self._replay_thread.start()
+
+    def metrics(self) -> dict:
+        return {**self.stats, "dead_letters": self.spool.dead_letters, "breaker": self.breaker.state,
+                **self.breaker.stats}
@@ -16,8 +16,18 @@ Usage:
 """
 
 import os
+import time
+import uuid
+import asyncio
+import threading
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
+
+from lead_dedupe import LeadDeduper, normalize_phone, normalize_email
+from lead_location import location_columns
+from notifications import LeadNotifier
+from lead_validation import LeadValidationError, validate_personal_info, validate_care_details, validate_mapped_row
+from storage_guard import STORAGE_CALL_TIMEOUT_SECONDS, StorageGuard
 
 # Load environment variables from .env file
 load_dotenv()
@@ -28,6 +38,7 @@ load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+DEDUPE_WARM_RETRY_SECONDS = float(os.getenv("DEDUPE_WARM_RETRY_SECONDS", "30"))
 
 if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
     raise ValueError(
@@ -35,8 +46,76 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
         "SUPABASE_SERVICE_ROLE_KEY in your .env file."
     )
 
-# Create singleton client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+# Create singleton client (calls abandoned by the storage deadline still end within the HTTP timeout)
+supabase: Client = create_client(
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY,
+    options=ClientOptions(postgrest_client_timeout=STORAGE_CALL_TIMEOUT_SECONDS),
+)
+
+# Deadline + circuit breaker + local spool around every call from the save tools
+storage_guard = StorageGuard()
+
+# Repeat-caller detection (Bloom filter is warmed at worker prewarm)
+lead_deduper = LeadDeduper(supabase)
+
+
+def warm_lead_dedupe() -> bool:
+    """Load recent callers into the dedupe Bloom filter (call once per process)"""
+    try:
+        loaded = lead_deduper.warm()
+        print(f"✅ Dedupe filter warmed with {loaded} recent leads")
+        return True
+    except Exception as e:
+        print(f"⚠️  Dedupe filter warm-up failed, every save will use the indexed lookup: {e}")
+        return False
+
+
+def log_dedupe_refresh_error(future) -> None:
+    """Done callback for the background refresh - retrieves its exception so a
+    failed refresh is logged instead of lost"""
+    if not future.cancelled() and future.exception():
+        print(f"⚠️  Dedupe filter refresh failed, retrying after the next save: {future.exception()}")
+
+
+def retry_lead_dedupe_warm(on_warm, interval: float = DEDUPE_WARM_RETRY_SECONDS) -> threading.Thread:
+    """Keep retrying a failed warm-up in the background (Supabase was down at
+    prewarm); on_warm() runs once the filter is loaded"""
+    def run():
+        while True:
+            time.sleep(interval)
+            if warm_lead_dedupe():
+                on_warm()
+                return
+
+    thread = threading.Thread(target=run, name="dedupe-warm-retry", daemon=True)
+    thread.start()
+    return thread
+
+
+# Care-manager notifications (enqueued on save, delivered by background workers)
+NOTIFY_CONTACT_COLUMNS = "id,lead_name,phone_number,email,best_time_to_contact,care_recipient_name,michigan_location"
+NOTIFY_CARE_FIELDS = ("start_care_timing", "preferred_care_schedule", "mobility", "safety_concerns", "sms_consent")
+
+
+def fetch_lead_contacts(lead_ids: list[str]) -> dict:
+    """Contact details for a batch of leads (runs on a notifier worker thread)"""
+    response = supabase.table("lead_personal_info").select(NOTIFY_CONTACT_COLUMNS).in_("id", lead_ids).execute()
+    return {row.pop("id"): row for row in response.data or []}
+
+
+lead_notifier = LeadNotifier.from_env(enrich=fetch_lead_contacts)
+
+
+def replay_spooled_write(table: str, row: dict) -> None:
+    """Write one spooled row (storage_guard replay thread); completed leads notify then"""
+    supabase.table(table).upsert(row).execute()
+    if table == "care_details":
+        lead_notifier.enqueue(row["id"], {field: row[field] for field in NOTIFY_CARE_FIELDS})
+
+
+def start_storage_replay() -> None:
+    """Replay writes spooled while Supabase was slow or down (call once per process)"""
+    storage_guard.start_replay(replay_spooled_write)
 
 
 # =============================================================================
@@ -249,44 +328,89 @@ async def save_personal_info_only(
     """
     Save ONLY personal info to lead_personal_info table.
     Returns the generated UUID for later use with care_details.
+
+    Repeat callers (same normalized phone or email) asking about the same
+    care recipient update their existing row and get the existing lead_id
+    back, with "duplicate": True. A different care recipient is a new lead,
+    so an earlier assessment in care_details is never replaced.
+
+    Invalid arguments are rejected before any network call, with
+    "corrections" for the model (see lead_validation.py).
+
+    michigan_location is kept as said and also normalized to a canonical
+    city, county FIPS code and confidence (see lead_location.py).
     """
     try:
-        # Type validation
-        if isinstance(estimated_age, str):
-            try:
-                estimated_age_int = int(estimated_age)
-            except:
-                estimated_age_int = 75
-        else:
-            estimated_age_int = int(estimated_age)
+        # Local validation fast path - no round trip for bad data
+        clean = validate_personal_info(estimated_age, phone_number, email, required={
+            "care_recipient_name": care_recipient_name,
+            "lead_name": lead_name,
+            "michigan_location": michigan_location,
+        })
         
         personal_data = {
             "care_recipient_name": care_recipient_name,
-            "estimated_age_range": map_age_to_range(estimated_age_int),
+            "estimated_age_range": map_age_to_range(clean["estimated_age"]),
             "relationship": map_relationship(relationship),
             "michigan_location": michigan_location,
             "current_living_situation": map_living_situation(current_living_situation),
             "lead_name": lead_name,
             "phone_number": phone_number,
-            "email": email,
+            "email": clean["email"],
             "best_time_to_contact": map_contact_time(best_time_to_contact),
+            "phone_normalized": normalize_phone(clean["phone_number"]),
+            "email_normalized": normalize_email(clean["email"]),
+            **location_columns(michigan_location),
         }
+        validate_mapped_row(personal_data)
         
-        print(f"\n💾 Inserting personal info only...")
-        personal_response = supabase.table("lead_personal_info").insert(personal_data).execute()
+        # Both calls share one time budget; past it the write goes to the local spool
+        deadline = storage_guard.deadline()
         
-        if not personal_response.data:
+        # Bloom filter first - only possible repeat callers cost a lookup
+        existing_id, _ = await storage_guard.call(
+            lambda: lead_deduper.find_existing(
+                personal_data["phone_normalized"], personal_data["email_normalized"], care_recipient_name,
+            ),
+            deadline=deadline,
+        )
+        refresh = asyncio.get_running_loop().run_in_executor(None, lead_deduper.refresh_if_stale)
+        refresh.add_done_callback(log_dedupe_refresh_error)
+        
+        # Client-side id + upsert: a late write and its spooled replay are the same row
+        lead_id = existing_id or str(uuid.uuid4())
+        personal_data["id"] = lead_id
+        if existing_id:
+            print(f"\n🔁 Repeat caller - updating existing lead {existing_id}...")
+        else:
+            print(f"\n💾 Inserting personal info only...")
+        personal_response, saved = await storage_guard.call(
+            lambda: supabase.table("lead_personal_info").upsert(personal_data).execute(),
+            spool=("lead_personal_info", personal_data),
+            deadline=deadline,
+        )
+        
+        if saved and not personal_response.data:
             raise Exception("Failed to insert personal info")
         
-        lead_id = personal_response.data[0]["id"]
-        print(f"✅ Personal info saved with ID: {lead_id}")
+        lead_deduper.remember(personal_data["phone_normalized"], personal_data["email_normalized"])
+        print(f"✅ Personal info {'saved' if saved else 'spooled locally'} with ID: {lead_id}")
         
         return {
             "success": True,
             "lead_id": lead_id,
-            "personal_info": personal_response.data[0]
+            "duplicate": bool(existing_id),
+            "spooled": not saved,
+            "personal_info": personal_response.data[0] if saved else personal_data
         }
         
+    except LeadValidationError as e:
+        print(f"\n⚠️  Personal info rejected before save: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "corrections": e.corrections
+        }
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
         return {
@@ -319,6 +443,8 @@ async def save_care_details_only(
     Save ONLY care details to care_details table using provided lead_id.
     """
     try:
+        lead_id = validate_care_details(lead_id)
+        
         # Type validation for sms_consent
         if isinstance(sms_consent, str):
             sms_consent_bool = sms_consent.lower() in ['true', 'yes', '1', 'ok', 'okay']
@@ -341,21 +467,40 @@ async def save_care_details_only(
             "start_care_timing": map_start_timing(start_care_timing),
             "sms_consent": sms_consent_bool,
         }
+        validate_mapped_row(care_data)
         
-        print(f"💾 Inserting care details for lead ID: {lead_id}...")
-        care_response = supabase.table("care_details").insert(care_data).execute()
+        # Upsert: a repeat call about the same care recipient refreshes its care details
+        print(f"💾 Saving care details for lead ID: {lead_id}...")
+        # A lead spooled by save_personal_info_only is not in the table yet: queue behind it
+        care_response, saved = await storage_guard.call(
+            lambda: supabase.table("care_details").upsert(care_data).execute(),
+            spool=("care_details", care_data),
+            after=("lead_personal_info", lead_id),
+        )
         
-        if not care_response.data:
+        if saved and not care_response.data:
             raise Exception("Failed to insert care details")
         
-        print(f"✅ Care details saved with ID: {lead_id}")
+        if saved:
+            print(f"✅ Care details saved with ID: {lead_id}")
+            lead_notifier.enqueue(lead_id, {field: care_data[field] for field in NOTIFY_CARE_FIELDS})
+        else:
+            print(f"✅ Care details spooled locally for ID: {lead_id} (notification follows the replay)")
         
         return {
             "success": True,
             "lead_id": lead_id,
-            "care_details": care_response.data[0]
+            "spooled": not saved,
+            "care_details": care_response.data[0] if saved else care_data
         }
         
+    except LeadValidationError as e:
+        print(f"\n⚠️  Care details rejected before save: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "corrections": e.corrections
+        }
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
         return {
@@ -467,6 +612,9 @@ async def save_intake_lead(
             "phone_number": phone_number,
             "email": email,
             "best_time_to_contact": map_contact_time(best_time_to_contact),
+            "phone_normalized": normalize_phone(phone_number),
+            "email_normalized": normalize_email(email),
+            **location_columns(michigan_location),
         }
         
         print(f"\n💾 Inserting into lead_personal_info...")
@@ -477,6 +625,7 @@ async def save_intake_lead(
         
         # Get the generated UUID
         lead_id = personal_response.data[0]["id"]
+        lead_deduper.remember(personal_data["phone_normalized"], personal_data["email_normalized"])
         print(f"✅ Personal info saved with ID: {lead_id}")
         
         # =============================================================================
@@ -507,6 +656,7 @@ async def save_intake_lead(
             raise Exception("Failed to insert care details")
         
         print(f"✅ Care details saved with ID: {lead_id}")
+        lead_notifier.enqueue(lead_id, {field: care_data[field] for field in NOTIFY_CARE_FIELDS})
         
         # =============================================================================
         # SUCCESS
@@ -531,3 +681,37 @@ async def save_intake_lead(
             "success": False,
             "error": str(e)
         }
+
+
+# =============================================================================
+# CALL USAGE (agent/usage_accounting.py)
+# =============================================================================
+
+async def save_call_usage(record: dict) -> dict:
+    """Insert one call's token / audio usage into call_usage (at job shutdown)"""
+    try:
+        row = dict(record)
+        if row.get("caller_relationship"):
+            row["caller_relationship"] = map_relationship(row["caller_relationship"])
+        row["id"] = str(uuid.uuid4())
+        response, saved = await storage_guard.call(
+            lambda: supabase.table("call_usage").upsert(row).execute(), spool=("call_usage", row))
+        return {"success": True, "spooled": not saved, "usage": response.data[0] if saved and response.data else row}
+    except Exception as e:
+        print(f"\n❌ ERROR saving call usage: {e}")
+        return {"success": False, "error": str(e)}
+
+
+# =============================================================================
+# CALL TRANSCRIPTS (transcript_search.py)
+# =============================================================================
+
+async def save_call_transcript(record: dict) -> dict:
+    """Insert one call's transcript into call_transcripts (indexed for search, at job shutdown)"""
+    try:
+        response, saved = await storage_guard.call(
+            lambda: supabase.table("call_transcripts").upsert(record).execute(), spool=("call_transcripts", record))
+        return {"success": True, "spooled": not saved}
+    except Exception as e:
+        print(f"\n❌ ERROR saving call transcript: {e}")
+        return {"success": False, "error": str(e)}
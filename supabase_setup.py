@@ -10,6 +10,9 @@ This script:
 
 FIRST TIME SETUP:
 -----------------
+Preferred: set DATABASE_URL and run `python migrate.py up`
+
+By hand:
 1. Run: python supabase_setup.py
 2. If table doesn't exist, copy the SQL shown
 3. Go to: https://supabase.com/dashboard
@@ -17,11 +20,18 @@ FIRST TIME SETUP:
 5. Paste the SQL and click "Run"
 6. Run this script again to verify
 
+SCHEMA CHANGES:
+---------------
+Add a new numbered file to migrations/ and run `python migrate.py dry-run`,
+then `python migrate.py up`. Never edit a migration that has been applied.
+
 Author: Med Help USA
 """
 
 from supabase import create_client, Client
 
+from migrate import combined_sql, discover_migrations
+
 # =============================================================================
 # SUPABASE CREDENTIALS (Service Role Key for full access)
 # =============================================================================
@@ -31,61 +41,9 @@ SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJ
 # =============================================================================
 # SQL TO CREATE THE TABLES (Copy this to Supabase SQL Editor)
 # =============================================================================
-CREATE_TABLE_SQL = """
--- =============================================
--- MED HELP USA - DATABASE SCHEMA (v2)
--- Copy this entire block and run in Supabase
--- Dashboard > SQL Editor > New Query > Run
--- =============================================
-
--- 1. Create the lead_personal_info table
-CREATE TABLE IF NOT EXISTS lead_personal_info (
-    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    care_recipient_name TEXT,
-    estimated_age_range TEXT,
-    relationship TEXT,
-    michigan_location TEXT,
-    current_living_situation TEXT,
-    lead_name TEXT,
-    phone_number TEXT,
-    email TEXT,
-    best_time_to_contact TEXT,
-    created_at TIMESTAMPTZ DEFAULT now()
-);
-
--- 2. Create the care_details table (linked by ID)
-CREATE TABLE IF NOT EXISTS care_details (
-    id UUID PRIMARY KEY REFERENCES lead_personal_info(id) ON DELETE CASCADE,
-    bathing_hygiene TEXT,
-    dressing_grooming TEXT,
-    mobility TEXT,
-    safety_concerns TEXT,
-    companionship_frequency TEXT,
-    preferred_activities TEXT,
-    meal_preparation TEXT,
-    housekeeping TEXT,
-    transportation_needed TEXT,
-    transportation_frequency TEXT,
-    preferred_care_schedule TEXT,
-    start_care_timing TEXT,
-    sms_consent BOOLEAN DEFAULT false,
-    created_at TIMESTAMPTZ DEFAULT now()
-);
-
--- Enable Row Level Security
-ALTER TABLE lead_personal_info ENABLE ROW LEVEL SECURITY;
-ALTER TABLE care_details ENABLE ROW LEVEL SECURITY;
-
--- Create policies for service role
-CREATE POLICY "Service role full access on leads" ON lead_personal_info FOR ALL USING (true) WITH CHECK (true);
-CREATE POLICY "Service role full access on care" ON care_details FOR ALL USING (true) WITH CHECK (true);
-
--- Grant permissions
-GRANT ALL ON lead_personal_info TO service_role;
-GRANT ALL ON care_details TO service_role;
-GRANT INSERT ON lead_personal_info TO anon;
-GRANT INSERT ON care_details TO anon;
-"""
+# Built from migrations/ so the paste-by-hand path and `python migrate.py up`
+# produce the same schema (and the same schema_migrations records)
+CREATE_TABLE_SQL = combined_sql(discover_migrations())
 
 
 # =============================================================================
@@ -229,7 +187,8 @@ def main():
         print("✅ DATABASE READY - Tables are correctly set up!")
         print("-"*60)
     else:
-        print("\n⚠️  Schema is missing! Please run the SQL query provided earlier in your Supabase SQL Editor.")
+        print("\n⚠️  Schema is missing! Run `python migrate.py up`, or paste this SQL into your Supabase SQL Editor:")
+        print(CREATE_TABLE_SQL)
     
     print("\n" + "="*60)
     print("   🏁 DONE")
@@ -0,0 +1,97 @@
+"""
+Call recorder tests with fake frames: dropping when the queue is full,
+segment rotation and moving early segments to the lead's folder (wav, no
+LiveKit).
+
+    python -m pytest test_call_recorder.py
+"""
+import os
+import time
+import wave
+import array
+import threading
+
+from agent.call_recorder import CallRecorder
+
+SAMPLE_RATE = 8000
+FRAME_SAMPLES = 2000            # 0.25s - exact in binary, so rotation lands on frame boundaries
+
+
+class Frame:
+    """Stands in for rtc.AudioFrame"""
+    sample_rate = SAMPLE_RATE
+    num_channels = 1
+    samples_per_channel = FRAME_SAMPLES
+
+    def __init__(self, value=0):
+        self.pcm = array.array("h", [value] * FRAME_SAMPLES)
+
+    @property
+    def data(self):
+        return memoryview(self.pcm)
+
+
+class StuckFrame(Frame):
+    """Holds the writer thread inside _write_frame until released"""
+    def __init__(self):
+        super().__init__()
+        self.reading, self.release = threading.Event(), threading.Event()
+
+    @property
+    def data(self):
+        self.reading.set()
+        self.release.wait(5)
+        return super().data
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def wav_frames(path):
+    with wave.open(str(path)) as f:
+        return f.getnframes()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    recorder = CallRecorder("intake-room", str(tmp_path), audio_format="wav", queue_frames=2)
+    stuck = StuckFrame()
+    recorder.write("caller", stuck)
+    stuck.reading.wait(2)
+    for _ in range(5):
+        recorder.write("caller", Frame())                  # 2 fit in the queue, 3 are dropped
+    stuck.release.set()
+
+    stats = recorder.close()
+    assert stats["frames"] == 3 and stats["dropped"] == 3
+    assert wav_frames(tmp_path / "intake-room" / "caller-001.wav") == 3 * FRAME_SAMPLES
+
+
+def test_segments_rotate_per_track(tmp_path):
+    recorder = CallRecorder("intake-room", str(tmp_path), audio_format="wav", rotate_seconds=1.0)
+    for _ in range(10):
+        recorder.write("caller", Frame(1))
+    recorder.write("agent", Frame(2))
+
+    stats = recorder.close()
+    folder = tmp_path / "intake-room"
+    assert sorted(os.listdir(folder)) == ["agent-001.wav", "caller-001.wav", "caller-002.wav", "caller-003.wav"]
+    assert [wav_frames(folder / f"caller-00{n}.wav") for n in (1, 2, 3)] == [4 * FRAME_SAMPLES] * 2 + [2 * FRAME_SAMPLES]
+    assert stats["files"] == 4 and stats["audio_seconds"] == 2.75 and stats["dropped"] == 0
+
+
+def test_segments_from_before_the_lead_move_to_its_folder(tmp_path):
+    recorder = CallRecorder("intake-room", str(tmp_path), audio_format="wav", rotate_seconds=1.0)
+    for _ in range(4):
+        recorder.write("caller", Frame())
+    wait_until(lambda: recorder.stats["frames"] == 4)
+    recorder.set_lead_id("lead-1")
+    for _ in range(2):
+        recorder.write("caller", Frame())                  # Rotates: the next segment opens under the lead
+
+    recorder.close()
+    assert os.listdir(tmp_path) == ["lead-1"]
+    assert sorted(os.listdir(tmp_path / "lead-1")) == ["caller-002.wav", "early-caller-001.wav"]
+    assert wav_frames(tmp_path / "lead-1" / "early-caller-001.wav") == 4 * FRAME_SAMPLES
@@ -0,0 +1,92 @@
+"""
+Chat-context compaction tests: phase boundaries, the token threshold and
+the verbatim tail (no model).
+
+    python -m pytest test_context_compaction.py
+"""
+import json
+import asyncio
+
+import pytest
+
+llm = pytest.importorskip("livekit.agents.llm")
+
+from agent.context_compaction import SUMMARY_ITEM_ID, ContextCompactor
+
+ANSWERS = {"care_recipient_name": "Mary Smith", "phone_number": "248-555-0100", "email": ""}
+
+
+def message(role, text):
+    return llm.ChatMessage(role=role, content=[text])
+
+
+def save_call(name="save_personal_info", output="Saved. Lead ID: 0f8e2c1a-77b4-4c55-9d1e-2a6b7c8d9e0f"):
+    arguments = json.dumps(ANSWERS)
+    return [llm.FunctionCall(call_id=name, name=name, arguments=arguments),
+            llm.FunctionCallOutput(call_id=name, name=name, output=output, is_error=False)]
+
+
+def conversation(turns):
+    items = [message("system", "You are Sarah.")]
+    for n in range(turns):
+        items += [message("user", f"Caller line {n} " + "words " * 20), message("assistant", f"Sarah line {n}")]
+    return llm.ChatContext(items=items)
+
+
+def test_only_successful_saves_end_a_phase():
+    compactor = ContextCompactor()
+    assert not compactor.record_tool_result("lookup_location", "{}", "Troy")
+    assert not compactor.record_tool_result("save_personal_info", "{}", "Error: storage unavailable")
+    assert compactor.record_tool_result("save_personal_info", json.dumps(ANSWERS), save_call()[1].output)
+    assert compactor.confirmed == {"care_recipient_name": "Mary Smith", "phone_number": "248-555-0100",
+                                   "lead_id": "0f8e2c1a-77b4-4c55-9d1e-2a6b7c8d9e0f"}
+    assert compactor.should_compact(conversation(1))                   # Phase boundary, however short
+
+
+def test_phase_boundary_keeps_prompt_summary_and_tail():
+    compactor = ContextCompactor(keep_turns=3)
+    chat_ctx = conversation(4)
+    chat_ctx.items += save_call() + [message("assistant", "Thank you, Mary's details are saved.")]
+    compactor.record_tool_result("save_personal_info", json.dumps(ANSWERS), save_call()[1].output)
+
+    compacted = compactor.compact(chat_ctx)
+    assert [item.id for item in compacted.items[:2]] == [chat_ctx.items[0].id, SUMMARY_ITEM_ID]
+    assert compacted.items[2:] == chat_ctx.items[-3:]
+    summary = compacted.items[1].text_content
+    assert "Personal info (Phases 1-4)" in summary and "- care_recipient_name: Mary Smith" in summary
+    assert "Caller said earlier" not in summary                         # Covered by the confirmed answers
+    assert not compactor.should_compact(compacted)
+
+
+def test_token_threshold_carries_caller_notes_and_never_orphans_a_tool_output():
+    compactor = ContextCompactor(keep_turns=2, token_threshold=50)
+    chat_ctx = conversation(3)
+    chat_ctx.items += save_call("save_care_details", output="") + [message("assistant", "Let me try that again.")]
+    assert not compactor.record_tool_result("save_care_details", "{}", "")   # Empty output: not a phase boundary
+    assert compactor.should_compact(chat_ctx)
+
+    compacted = compactor.compact(chat_ctx)
+    assert compacted.items[2:] == chat_ctx.items[-1:]                  # Not the output whose call was collapsed
+    assert [note[:13] for note in compactor.caller_notes] == ["Caller line 0", "Caller line 1", "Caller line 2"]
+    assert "Caller said earlier (not yet confirmed):" in compacted.items[1].text_content
+
+
+def test_apply_swaps_the_live_context_and_survives_a_failed_update():
+    class Agent:
+        def __init__(self, fail=False):
+            self.chat_ctx = conversation(5)
+            self.fail = fail
+
+        async def update_chat_ctx(self, chat_ctx):
+            if self.fail:
+                raise RuntimeError("session closed")
+            self.chat_ctx = chat_ctx
+
+    compactor = ContextCompactor(keep_turns=2, token_threshold=50)
+    agent = Agent()
+    asyncio.run(compactor.apply(agent))
+    assert agent.chat_ctx.items[1].id == SUMMARY_ITEM_ID and compactor.compactions == 1
+
+    failing = Agent(fail=True)
+    asyncio.run(compactor.apply(failing))                               # Logged, not raised
+    assert not compactor._running and failing.chat_ctx.items[1].id != SUMMARY_ITEM_ID
@@ -0,0 +1,116 @@
+"""
+Worker drain tests: simulated calls are taken through a redeploy (drain
+notice -> wrap-up -> deadline -> job shutdown) and every lead must land.
+
+    python -m pytest test_drain.py
+"""
+import os
+import sys
+import asyncio
+import subprocess
+
+import pytest
+
+from agent.drain import DRAIN_NOTICE_ENV, DrainNotice, PendingSaves, watch_drain
+
+SAVE_LATENCY = 0.15
+
+
+class SlowStore:
+    """Stand-in for Supabase with a fixed round trip"""
+    def __init__(self):
+        self.leads = {}
+
+    async def save(self, lead_id: str, fields: dict) -> dict:
+        await asyncio.sleep(SAVE_LATENCY)
+        self.leads.setdefault(lead_id, {}).update(fields)
+        return {"success": True, "lead_id": lead_id}
+
+
+async def simulated_call(lead_id: str, store: SlowStore, saves: PendingSaves, notice: DrainNotice,
+                         turn_seconds: float, wrap_up_seconds: float):
+    """Personal info after a few turns, care details after a few more. On a
+    drain the caller is wrapped up: whatever was collected is saved at once."""
+    collected = {}
+    wrapped_up = asyncio.Event()
+    watcher = asyncio.create_task(watch_drain(wrapped_up.set, notice, wrap_up_seconds, poll_seconds=0.02))
+    try:
+        for phase, fields in (("personal", {"lead_name": lead_id}), ("care", {"mobility": "wheelchair"})):
+            for _ in range(3):
+                if wrapped_up.is_set():
+                    break
+                await asyncio.sleep(turn_seconds)
+                collected.update(fields)
+            await saves.track(store.save(lead_id, dict(collected)))
+            if wrapped_up.is_set():
+                return "wrapped up"
+        return "completed"
+    finally:
+        watcher.cancel()
+
+
+async def redeploy(calls: int, turn_seconds: float, drain_timeout: float, wrap_up_seconds: float, tmp_path):
+    """Start calls, drain, cancel whatever is still running at the deadline
+    (as the SDK's job shutdown does), then flush saves"""
+    store, saves = SlowStore(), PendingSaves()
+    notice = DrainNotice(str(tmp_path / "drain.json"))
+    jobs = [
+        asyncio.create_task(simulated_call(f"lead-{i}", store, saves, notice, turn_seconds, wrap_up_seconds))
+        for i in range(calls)
+    ]
+    await asyncio.sleep(turn_seconds * 2)
+    notice.announce(drain_timeout)
+    done, still_running = await asyncio.wait(jobs, timeout=drain_timeout)
+    for job in still_running:
+        job.cancel()
+    await asyncio.gather(*still_running, return_exceptions=True)
+    unfinished = await saves.flush(timeout=5.0)
+    return store, [job.result() for job in done], len(still_running), unfinished
+
+
+def test_calls_finish_within_deadline(tmp_path):
+    store, results, cut, unfinished = asyncio.run(
+        redeploy(calls=20, turn_seconds=0.05, drain_timeout=5.0, wrap_up_seconds=1.0, tmp_path=tmp_path))
+    assert results.count("completed") == 20
+    assert cut == 0 and unfinished == 0
+    assert all(lead["mobility"] == "wheelchair" for lead in store.leads.values())
+
+
+def test_long_calls_are_wrapped_up_without_losing_leads(tmp_path):
+    store, results, cut, unfinished = asyncio.run(
+        redeploy(calls=20, turn_seconds=0.2, drain_timeout=0.8, wrap_up_seconds=0.5, tmp_path=tmp_path))
+    assert results.count("wrapped up") == 20
+    assert unfinished == 0
+    assert sorted(store.leads) == sorted(f"lead-{i}" for i in range(20))
+    assert all(lead["lead_name"] for lead in store.leads.values())
+
+
+def test_save_in_flight_survives_job_shutdown(tmp_path):
+    async def scenario():
+        store, saves = SlowStore(), PendingSaves()
+        tool_call = asyncio.create_task(saves.track(store.save("lead-1", {"lead_name": "Ann"})))
+        await asyncio.sleep(SAVE_LATENCY / 3)
+        tool_call.cancel()   # the session closes mid-save
+        await asyncio.gather(tool_call, return_exceptions=True)
+        assert len(saves) == 1
+        assert await saves.flush(timeout=2.0) == 0
+        return store
+
+    assert asyncio.run(scenario()).leads == {"lead-1": {"lead_name": "Ann"}}
+
+
+def test_notice_reaches_job_processes(tmp_path):
+    notice = DrainNotice(str(tmp_path / "drain.json"))
+    assert notice.deadline() is None
+    deadline = notice.announce(120)
+
+    # Job processes find the notice through the environment the worker sets
+    child = subprocess.run(
+        [sys.executable, "-c", "from agent.drain import DrainNotice; print(DrainNotice().deadline())"],
+        env={**os.environ, DRAIN_NOTICE_ENV: notice.path},
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    assert float(child.stdout) == pytest.approx(deadline)
+
+    notice.clear()
+    assert notice.deadline() is None
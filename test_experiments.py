@@ -0,0 +1,92 @@
+"""
+Experiment assignment and report statistics tests (no network).
+
+    python -m pytest test_experiments.py
+"""
+import time
+
+import pytest
+
+from agent.experiments import Experiment
+from agent.live_config import CONFIG_PATH, ConfigError, IntakeConfig
+from agent.usage_accounting import CallUsage
+from experiment_report import compare_arms, mean_interval, rate_interval, t_quantile
+
+with open(CONFIG_PATH) as f:
+    SHIPPED = f.read()
+
+EXPERIMENT = """
+[experiment]
+name = "vad-test"
+
+[[experiment.arms]]
+name = "control"
+weight = 3
+
+[[experiment.arms]]
+name = "patient"
+weight = 1
+senior_pause_threshold = 1.2
+temperature = 0.8
+"""
+
+
+def test_assignment_is_deterministic_and_weighted():
+    config = IntakeConfig.parse((SHIPPED + EXPERIMENT).encode())
+    rooms = [f"intake-{i}" for i in range(4000)]
+    arms = [config.for_call(room).arm for room in rooms]
+    assert arms == [config.for_call(room).arm for room in rooms]
+    assert 0.22 < arms.count("patient") / len(arms) < 0.28
+
+    patient = config.for_call(rooms[arms.index("patient")])
+    control = config.for_call(rooms[arms.index("control")])
+    assert (patient.silence_duration_ms, patient.temperature, patient.vad_threshold) == (1200, 0.8, 0.7)
+    assert (control.silence_duration_ms, control.temperature) == (800, 0.7)
+    assert patient.version == control.version == config.version
+
+
+def test_invalid_arms_reject_the_file():
+    for bad in (EXPERIMENT.replace("temperature = 0.8", "temperature = 3"),
+                EXPERIMENT.replace("temperature = 0.8", 'voice = "alloy"'),
+                EXPERIMENT.replace('name = "patient"', 'name = "control"')):
+        with pytest.raises(ConfigError):
+            IntakeConfig.parse((SHIPPED + bad).encode())
+    with pytest.raises(ValueError):
+        Experiment.parse({"name": "one-arm", "arms": [{"name": "control"}]})
+
+
+def test_usage_records_turn_taking():
+    usage = CallUsage("room-1", "abc", experiment="vad-test", arm="patient")
+    for _ in range(2):
+        usage.user_state("speaking")
+        usage.user_state("listening")
+        time.sleep(0.02)
+        usage.agent_state("speaking")
+        usage.agent_state("listening")
+    usage.agent_state("speaking")
+    usage.user_state("speaking")                       # Caller talks over Sarah
+    usage.record_tool_result("save_personal_info")
+    usage.record_tool_result("save_care_details")
+    record = usage.to_record()
+    assert record["arm"] == "patient" and record["completed"] and record["interruptions"] == 1
+    assert 15 <= record["response_delay_ms"] < 200
+
+
+def test_report_intervals():
+    assert t_quantile(0.975, 10) == pytest.approx(2.228, abs=0.01)
+    mean, low, high = mean_interval([1.0, 2.0, 3.0, 4.0])
+    assert mean == 2.5 and low == pytest.approx(0.446, abs=0.02) and high == pytest.approx(4.554, abs=0.02)
+    assert rate_interval(8, 10)[1:] == pytest.approx((0.490, 0.943), abs=0.005)   # Wilson
+
+    calls = [{"arm": "control", "completed": i % 2 == 0, "response_delay_ms": 900 + i % 7, "interruptions": 1,
+              "duration_seconds": 300} for i in range(100)]
+    calls += [{"arm": "patient", "completed": i % 10 < 9, "response_delay_ms": 1100 + i % 7, "interruptions": 0,
+               "duration_seconds": 300} for i in range(100)]
+    report = compare_arms(calls)
+    assert list(report) == ["control", "patient"]
+    diff, low, high = report["patient"]["metrics"]["completion_rate"]["vs_control"]
+    assert diff == pytest.approx(0.4) and 0 < low < diff < high
+    diff, low, high = report["patient"]["metrics"]["response_delay_ms"]["vs_control"]
+    assert diff == pytest.approx(200, abs=1) and low < diff < high
+    with pytest.raises(ValueError):
+        compare_arms(calls, control="baseline")
@@ -0,0 +1,62 @@
+"""
+Filler speech tests: a slow save gets a filler line, a fast one does not
+(fake speech handles, no model).
+
+    python -m pytest test_filler_speech.py
+"""
+import asyncio
+
+from agent.filler_speech import next_phrase, with_filler
+
+
+class Speech:
+    """Stands in for a SpeechHandle"""
+    def __init__(self, finished=False):
+        self.finished = finished
+        self.interrupted = False
+
+    def done(self):
+        return self.finished
+
+    def interrupt(self):
+        self.interrupted = True
+
+
+async def save(seconds, result=None):
+    await asyncio.sleep(seconds)
+    return result or {"success": True}
+
+
+def run_with_filler(save_seconds, start_filler, threshold_ms=20):
+    return asyncio.run(with_filler(save(save_seconds), start_filler, "save_personal_info", threshold_ms))
+
+
+def test_fast_save_gets_no_filler():
+    started = []
+    assert run_with_filler(0, started.append) == {"success": True}
+    assert run_with_filler(0.05, started.append, threshold_ms=-1) == {"success": True}
+    assert started == []
+
+
+def test_slow_save_interrupts_its_filler():
+    speech = Speech()
+    phrases = []
+
+    def start_filler(phrase):
+        phrases.append(phrase)
+        return speech
+
+    assert run_with_filler(0.1, start_filler) == {"success": True}
+    assert len(phrases) == 1 and speech.interrupted
+    assert next_phrase("save_personal_info") != phrases[0]             # Rotates on the next save
+
+    finished = Speech(finished=True)
+    run_with_filler(0.1, lambda phrase: finished)
+    assert not finished.interrupted                                    # Already heard: nothing to cut off
+
+
+def test_failed_filler_does_not_fail_the_save():
+    def start_filler(phrase):
+        raise RuntimeError("generate_reply: session closing")
+
+    assert run_with_filler(0.1, start_filler) == {"success": True}
@@ -0,0 +1,90 @@
+"""
+Worker health endpoint tests (fake worker, no LiveKit server).
+
+    python -m pytest test_health.py
+"""
+import json
+import time
+import asyncio
+import http.client
+
+from agent.health import LoopMonitor, ProcessReport, WorkerHealth, read_process_reports, serve_health
+
+
+class FakeWorker:
+    def __init__(self):
+        self.active_jobs = []
+        self._draining = False
+
+
+def get(port: int, path: str) -> tuple[int, dict]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_loop_monitor_measures_blocking_and_goes_stale():
+    async def run():
+        monitor = LoopMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)                                # A blocking call on the loop
+        await asyncio.sleep(0.05)
+        return monitor
+
+    monitor = asyncio.run(run())
+    assert monitor.summary()["max_ms"] >= 80
+    assert monitor.alive(stale_seconds=1)
+    assert not monitor.alive(stale_seconds=0)
+
+
+def test_stale_process_reports_are_dropped(tmp_path):
+    report = ProcessReport(str(tmp_path))
+    report.track("notifications", lambda: 3)
+    fresh = report.snapshot()
+    (tmp_path / "1.json").write_text(json.dumps(fresh))
+    (tmp_path / "2.json").write_text(json.dumps({**fresh, "updated_at": time.time() - 60}))
+    assert [r["queues"] for r in read_process_reports(str(tmp_path), max_age=15)] == [{"notifications": 3}]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["1.json"]
+
+
+def test_endpoints(tmp_path):
+    worker = FakeWorker()
+    health = WorkerHealth(worker, str(tmp_path), spool_pending=lambda: 2)
+    server = serve_health(health, host="127.0.0.1", port=0)
+    port = server.server_address[1]
+
+    async def run():
+        health.monitor.interval = 0.01
+        health.monitor.start()
+        await asyncio.sleep(0.05)
+
+        status, body = get(port, "/readyz")
+        assert status == 503 and not body["registered"] and not body["storage_warm"]
+
+        health.registered = True
+        report = ProcessReport(str(tmp_path))
+        report.fields["storage_warm"] = True
+        report.track("pending_saves", lambda: 1)
+        (tmp_path / "100.json").write_text(json.dumps(report.snapshot()))
+        worker.active_jobs = ["call-1"]
+        await asyncio.sleep(0.05)
+
+        assert get(port, "/healthz")[0] == 200
+        assert get(port, "/readyz")[0] == 200
+        status, load = get(port, "/load")
+        assert status == 200 and load["active_sessions"] == 1
+        assert load["queues"] == {"pending_saves": 1, "storage_spool": 2}
+
+        worker._draining = True
+        await asyncio.sleep(0.05)
+        status, body = get(port, "/readyz")
+        assert status == 503 and not body["not_draining"]
+        assert get(port, "/nope")[0] == 404
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
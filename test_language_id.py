@@ -0,0 +1,38 @@
+"""
+Language gate tests: the shipped model against the labelled test set.
+
+    python -m pytest test_language_id.py
+"""
+import json
+
+from agent.language_id import MODEL_PATH, LanguageGate, LanguageModel, load_corpus, script
+
+
+def test_shipped_model_is_built_from_the_training_corpus():
+    with open(MODEL_PATH, encoding="utf-8") as f:
+        shipped = json.load(f)
+    rebuilt = json.loads(json.dumps(LanguageModel.train(load_corpus("train")).to_json(), ensure_ascii=False))
+    assert shipped == rebuilt, "training corpus changed - run: python -m agent.language_id build"
+
+
+def test_english_is_never_flagged_and_other_languages_are():
+    gate = LanguageGate()
+    gate.load()
+    samples = load_corpus("test")
+    english = [text for language, text in samples if language == "en"]
+    other = [text for language, text in samples if language != "en"]
+    assert [text for text in english if gate.check(text)] == []
+    assert sum(gate.check(text) is not None for text in other) >= 0.9 * len(other)
+
+    stats = gate.stats()
+    assert stats["checked"] == len(samples) and stats["mean_us"] > 0
+
+
+def test_names_short_replies_and_scripts():
+    gate = LanguageGate()
+    gate.load()
+    assert gate.check("Maria Gonzalez Rodriguez.") is None          # Names carry no marker word
+    assert gate.check("Sí, claro.") is None                         # Too short to be sure
+    assert gate.check("¿Me puede llamar alguien que hable español?") == "es"
+    assert script("Здравствуйте, моей маме нужна помощь.") == "cyrillic"
+    assert script("Bà tám mươi bảy tuổi.") is None                  # Vietnamese is Latin script
@@ -0,0 +1,90 @@
+"""
+Lead read API tests (SQLite backend, no network).
+
+    python -m pytest test_lead_api.py
+"""
+import pytest
+
+from lead_api import (
+    CARE_COLUMNS, PERSONAL_COLUMNS, LeadQuery, LeadQueryError, SQLiteLeadStore, decode_cursor, encode_cursor,
+    read_leads,
+)
+
+
+def lead_id(n: int) -> str:
+    return f"00000000-0000-4000-8000-{n:012d}"
+
+
+def add_lead(store, n: int, relationship: str = "adult_child", sms_consent: int | None = 1):
+    """Lead n, created n minutes into the day; sms_consent None leaves out care_details"""
+    created_at = f"2025-03-01T10:{n:02d}:00+00:00"
+    personal = {"id": lead_id(n), "created_at": created_at, "care_recipient_name": f"Senior {n}",
+                "relationship": relationship, "lead_name": f"Caller {n}", "location_confidence": 0.85}
+    store.conn.execute(
+        f"INSERT INTO lead_personal_info ({', '.join(PERSONAL_COLUMNS)}) VALUES ({', '.join('?' * len(PERSONAL_COLUMNS))})",
+        [personal.get(c) for c in PERSONAL_COLUMNS],
+    )
+    if sms_consent is not None:
+        care = {"mobility": "wheelchair", "sms_consent": sms_consent}
+        store.conn.execute(
+            f"INSERT INTO care_details (id, created_at, {', '.join(CARE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (len(CARE_COLUMNS) + 2))})",
+            [lead_id(n), created_at, *(care.get(c) for c in CARE_COLUMNS)],
+        )
+
+
+@pytest.fixture
+def store():
+    store = SQLiteLeadStore()
+    for n in range(7):
+        add_lead(store, n, "spouse_partner" if n % 3 == 0 else "adult_child",
+                 sms_consent=None if n == 6 else n % 2)
+    return store
+
+
+def test_keyset_pages_walk_every_lead_newest_first(store):
+    query = LeadQuery.from_query_string("limit=3")
+    seen, pages = [], 0
+    while True:
+        page = read_leads(store, query)
+        seen += [row["id"] for row in page["leads"]]
+        pages += 1
+        if not page["next_cursor"]:
+            break
+        query.after = decode_cursor(page["next_cursor"])
+    assert seen == [lead_id(n) for n in reversed(range(7))]
+    assert pages == 3
+
+
+def test_filters_and_projection(store):
+    page = read_leads(store, LeadQuery.from_query_string("relationship=spouse_partner&fields=lead_name"))
+    assert [row["id"] for row in page["leads"]] == [lead_id(6), lead_id(3), lead_id(0)]
+    assert set(page["leads"][0]) == {"id", "created_at", "lead_name"}
+
+    page = read_leads(store, LeadQuery.from_query_string("created_from=2025-03-01T10:04&created_to=2025-03-01T10:06"))
+    assert [row["id"] for row in page["leads"]] == [lead_id(5), lead_id(4)]
+
+
+def test_sqlite_values_match_postgrest_types(store):
+    rows = {row["id"]: row for row in read_leads(store, LeadQuery())["leads"]}
+    assert rows[lead_id(1)]["sms_consent"] is True and rows[lead_id(2)]["sms_consent"] is False
+    assert rows[lead_id(6)]["sms_consent"] is None                 # No care details yet
+    assert rows[lead_id(1)]["location_confidence"] == 0.85
+
+
+def test_bad_queries_are_rejected():
+    for query_string in ("limit=0", "limit=many", "fields=ssn", "relationship=cousin", "colour=red", "cursor=%%%"):
+        with pytest.raises(LeadQueryError):
+            LeadQuery.from_query_string(query_string)
+
+
+def test_cursor_must_hold_a_timestamp_and_a_uuid():
+    assert decode_cursor(encode_cursor("2025-03-01T10:04:00+00:00", lead_id(4))) == ("2025-03-01T10:04:00+00:00", lead_id(4))
+    for created_at, crafted_id in (
+        ("2025-03-01T10:04:00+00:00", "0),relationship.neq.x,id.gt.0"),    # Would widen the or= filter
+        ('2025-03-01",lead_name.not.is.null,created_at.eq."x', lead_id(4)),
+        ("yesterday", lead_id(4)),
+        (20250301, lead_id(4)),
+    ):
+        with pytest.raises(LeadQueryError):
+            decode_cursor(encode_cursor(created_at, crafted_id))
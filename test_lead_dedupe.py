@@ -0,0 +1,109 @@
+"""
+Repeat-caller matching tests, against an in-memory stand-in for the
+lead_personal_info query the deduper makes.
+
+    python -m pytest test_lead_dedupe.py
+"""
+import re
+
+from lead_dedupe import LeadDeduper, normalize_email, normalize_name, normalize_phone
+
+
+class FakeQuery:
+    """Just enough of the PostgREST builder for find_existing()"""
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, columns):
+        return self
+
+    def or_(self, filters):
+        wanted = [f.split(".eq.") for f in filters.split(",")]
+        self.rows = [r for r in self.rows if any(r[col] == value.strip('"') for col, value in wanted)]
+        return self
+
+    def order(self, column, desc=False):
+        self.rows = sorted(self.rows, key=lambda r: r[column], reverse=desc)
+        return self
+
+    def limit(self, n):
+        self.rows = self.rows[:n]
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": self.rows})()
+
+
+class FakeKeysetQuery(FakeQuery):
+    """The warm-up's keyset paging: gt() on created_at, or= on (created_at, id).
+    Filters come after limit() in the builder chain, so the limit waits for execute()"""
+    def limit(self, n):
+        self.page_size = n
+        return self
+
+    def execute(self):
+        self.rows = self.rows[:self.page_size]
+        return super().execute()
+
+    def gt(self, column, value):
+        self.rows = [r for r in self.rows if r[column] > value]
+        return self
+
+    def or_(self, filters):
+        created_at, lead_id = re.fullmatch(
+            r'created_at\.gt\."(.*)",and\(created_at\.eq\."\1",id\.gt\."(.*)"\)', filters
+        ).groups()
+        self.rows = [r for r in self.rows if (r["created_at"], r["id"]) > (created_at, lead_id)]
+        return self
+
+    def order(self, column, desc=False):
+        self.orders = getattr(self, "orders", []) + [column]
+        self.rows = sorted(self.rows, key=lambda r: tuple(r[c] for c in self.orders), reverse=desc)
+        return self
+
+
+class FakeSupabase:
+    def __init__(self, rows, query=FakeQuery):
+        self.rows = rows
+        self.query = query
+
+    def table(self, name):
+        return self.query(list(self.rows))
+
+
+def lead(lead_id, phone, email, recipient, created_at):
+    return {"id": lead_id, "phone_normalized": normalize_phone(phone), "email_normalized": normalize_email(email),
+            "care_recipient_name": recipient, "created_at": created_at}
+
+
+def test_normalize_name():
+    assert normalize_name("  Mary-Ann  O'Neil ") == "mary ann o neil"
+    assert normalize_name("MARY ANN O NEIL") == normalize_name("Mary-Ann O'Neil")
+    assert normalize_name("") is None and normalize_name(None) is None
+
+
+def test_repeat_caller_matches_only_the_same_care_recipient():
+    deduper = LeadDeduper(FakeSupabase([
+        lead("mom", "248-555-0100", "ann@example.com", "Mary Smith", "2026-01-01"),
+        lead("dad", "248-555-0100", "ann@example.com", "John Smith", "2026-02-01"),
+    ]))
+    phone, email = normalize_phone("(248) 555-0100"), normalize_email("Ann@Example.com")
+
+    assert deduper.find_existing(phone, email, "mary  smith") == "mom"      # Not the newer lead about dad
+    assert deduper.find_existing(phone, None, "John Smith") == "dad"
+    assert deduper.find_existing(phone, email, "Susan Smith") is None       # New person: new lead
+    assert deduper.find_existing(phone, email, "") is None
+    assert deduper.stats["matches"] == 2 and deduper.stats["other_recipient"] == 1
+
+
+def test_warm_pages_past_leads_sharing_a_timestamp(monkeypatch):
+    monkeypatch.setattr("lead_dedupe.WARM_PAGE_SIZE", 2)
+    rows = [lead(f"id-{n}", f"248-555-010{n}", None, "Mary Smith", "2099-01-01" if n < 4 else "2099-01-02")
+            for n in range(6)]
+    deduper = LeadDeduper(FakeSupabase(rows, FakeKeysetQuery))
+    assert deduper.warm() == 6                          # Four leads at one timestamp span two pages
+    assert all(deduper.might_exist(row["phone_normalized"], None) for row in rows)
+    assert deduper.last_seen == ("2099-01-02", "id-5")
+
+    rows.append(lead("id-6", "248-555-0106", None, "Mary Smith", "2099-01-02"))
+    assert deduper.warm() == 1                          # Refresh resumes after the last lead seen
@@ -0,0 +1,51 @@
+"""
+Lead export tests, CSV and Parquet (SQLite backend, no network).
+
+    python -m pytest test_lead_export.py
+"""
+import io
+import csv
+import gzip
+
+import pytest
+
+from lead_api import SQLiteLeadStore
+from lead_export import export_leads, parse_export_query
+from test_lead_api import add_lead, lead_id
+
+
+@pytest.fixture
+def store():
+    store = SQLiteLeadStore()
+    for n in range(12):
+        add_lead(store, n, sms_consent=None if n == 0 else n % 2)
+    return store
+
+
+def test_csv_export_streams_every_page(store, monkeypatch):
+    monkeypatch.setattr("lead_export.EXPORT_PAGE_SIZE", 5)
+    export_format, query = parse_export_query("format=csv&fields=lead_name,sms_consent")
+    out = io.BytesIO()
+    assert export_leads(store, query, out, export_format) == 12
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(out.getvalue()).decode())))
+    assert [row["id"] for row in rows] == [lead_id(n) for n in reversed(range(12))]
+    assert list(rows[0]) == ["id", "created_at", "lead_name", "sms_consent"]
+    assert [row["sms_consent"] for row in rows[-3:]] == ["False", "True", ""]
+
+
+def test_parquet_export_keeps_column_types(store):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    export_format, query = parse_export_query("format=parquet&fields=lead_name,location_confidence,sms_consent")
+    out = io.BytesIO()
+    assert export_leads(store, query, out, export_format) == 12
+
+    table = pyarrow_parquet.read_table(io.BytesIO(out.getvalue()))
+    assert str(table.schema.field("sms_consent").type) == "bool"
+    assert str(table.schema.field("location_confidence").type) == "double"
+    assert table.column("sms_consent").to_pylist()[-3:] == [False, True, None]
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        parse_export_query("format=xlsx")
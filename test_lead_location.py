@@ -0,0 +1,62 @@
+"""
+Michigan location normalizer tests: the bundled gazetteer, exact and fuzzy
+matches, and the columns written at save time.
+
+    python -m pytest test_lead_location.py
+"""
+import csv
+
+from lead_location import LOCATION_GAZETTEER_PATH, Gazetteer, edit_distance, location_columns, phonetic
+
+gazetteer = Gazetteer()
+gazetteer.load()
+
+
+def test_gazetteer_has_every_county_once():
+    with open(LOCATION_GAZETTEER_PATH, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    counties = {row["county_fips"]: row["name"] for row in rows if row["kind"] == "county"}
+    assert len(counties) == 83 and counties["26125"] == "Oakland County" and counties["26163"] == "Wayne County"
+    assert all(row["county_fips"] in counties for row in rows)
+    assert len({row["name"] for row in rows}) == len(rows)
+
+
+def test_exact_abbreviated_and_hedged():
+    assert gazetteer.match("Royal Oak")["confidence"] == 1.0
+    assert gazetteer.match("Sterling Hts, MI")["city"] == "Sterling Heights"
+    assert gazetteer.match("St. Clair Shores")["county_fips"] == "26099"
+    near = gazetteer.match("near Detroit")
+    assert near["city"] == "Detroit" and near["confidence"] < 1.0
+    county = gazetteer.match("Oakland County")
+    assert county["city"] is None and county["county_fips"] == "26125"
+    assert gazetteer.match("Lansing, Eaton County")["county_fips"] == "26045"   # The caller's county wins
+
+
+def test_misspellings_match_and_other_places_do_not():
+    for said, city in [("Royal Oaks", "Royal Oak"), ("Ipsilanti", "Ypsilanti"), ("Dearbourne", "Dearborn"),
+                       ("Hamtramic", "Hamtramck"), ("Farmington Hill", "Farmington Hills"),
+                       ("Saint Clare Shores", "St. Clair Shores")]:
+        location = gazetteer.match(said)
+        assert location["city"] == city and location["match"] == "fuzzy", said
+    assert gazetteer.match("Chicago") is None
+    assert gazetteer.match("Toledo, Ohio") is None
+
+
+def test_places_in_other_states_do_not_match():
+    for said in ("Portland Oregon", "Troy, New York", "Troy NY", "Portland, OR 97201", "Windsor, Ontario",
+                 "Michigan City, Indiana", "Seattle, Washington area"):
+        assert gazetteer.match(said) is None, said
+    # The same names in Michigan, and state names that are part of a Michigan name
+    assert gazetteer.match("Portland, MI")["city"] == "Portland"
+    assert gazetteer.match("Troy, Michigan 48084")["city"] == "Troy"
+    assert gazetteer.match("Washington Township")["county_fips"] == "26099"
+    assert gazetteer.match("Texas Township")["county_fips"] == "26077"
+    assert edit_distance("detriot", "detroit") == 1
+    assert phonetic("dearbourne") == phonetic("dearborn")
+
+
+def test_location_columns():
+    assert location_columns("Royal Oaks") == {
+        "location_city": "Royal Oak", "location_county_fips": "26125", "location_confidence": 0.82,
+    }
+    assert set(location_columns("somewhere up north").values()) == {None}
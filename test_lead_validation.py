@@ -0,0 +1,60 @@
+"""
+Save-tool argument validation tests (no network).
+
+    python -m pytest test_lead_validation.py
+"""
+import pytest
+
+from lead_validation import (
+    LeadValidationError, check_email, check_phone, validate_care_details, validate_mapped_row,
+    validate_personal_info,
+)
+
+REQUIRED = {"care_recipient_name": "Margaret", "lead_name": "Susan", "michigan_location": "Royal Oak"}
+
+
+@pytest.mark.parametrize("raw, e164", [
+    ("(248) 555-0134", "+12485550134"),
+    ("1-248-555-0134", "+12485550134"),
+    ("+1 248 555 0134", "+12485550134"),
+    ("+44 20 7946 0958", "+442079460958"),
+])
+def test_phone_to_e164(raw, e164):
+    assert check_phone(raw) == (e164, None)
+
+
+@pytest.mark.parametrize("raw", ["555-0134", "248 555 013", "(048) 555-0134", "248-155-0134", "", "+0 123"])
+def test_bad_phone_gets_correction(raw):
+    phone, correction = check_phone(raw)
+    assert phone is None and "phone_number" in correction
+
+
+def test_email():
+    assert check_email("Susan.M+care@Example.co.uk") == ("Susan.M+care@Example.co.uk", None)
+    assert check_email("no email") == (None, None)
+    for bad in ("susan at gmail dot com", "susan@gmail", "susan@@gmail.com", "@gmail.com"):
+        assert check_email(bad)[0] is None
+
+
+def test_personal_info_collects_every_problem():
+    with pytest.raises(LeadValidationError) as error:
+        validate_personal_info("seventy", "555-0134", "susan at gmail", {**REQUIRED, "lead_name": " "})
+    assert [c.split()[0] for c in error.value.corrections] == ["lead_name", "estimated_age", "phone_number", "email"]
+
+    clean = validate_personal_info("78", "248.555.0134", "none", REQUIRED)
+    assert clean == {"estimated_age": 78, "phone_number": "+12485550134", "email": None}
+
+
+def test_age_range():
+    with pytest.raises(LeadValidationError, match="outside"):
+        validate_personal_info(780, "248-555-0134", "", REQUIRED)
+
+
+def test_lead_id_and_enums():
+    assert validate_care_details("3F2B8C1E-9A4D-4E6F-8B7A-1C2D3E4F5A6B") == "3f2b8c1e-9a4d-4e6f-8b7a-1c2d3e4f5a6b"
+    with pytest.raises(LeadValidationError, match="lead_id"):
+        validate_care_details("lead_12345")
+
+    validate_mapped_row({"mobility": "wheelchair", "safety_concerns": "stairs"})
+    with pytest.raises(LeadValidationError, match="mobility"):
+        validate_mapped_row({"mobility": "scooter"})
@@ -0,0 +1,76 @@
+"""
+Intake config hot-reload tests (temp config files, no LiveKit).
+
+    python -m pytest test_live_config.py
+"""
+import os
+
+import pytest
+
+from agent.live_config import CONFIG_PATH, ConfigError, ConfigWatcher, IntakeConfig
+from agent.usage_accounting import CallUsage
+
+with open(CONFIG_PATH, "rb") as f:
+    SHIPPED = f.read().decode()
+
+
+def write(path, text: str):
+    """Replace the file the way a deploy should: temp file + rename"""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def test_shipped_config_is_valid():
+    config = IntakeConfig.parse(SHIPPED.encode())
+    assert config.version.endswith(f"+{config.digest}")
+    assert config.voice == "shimmer" and config.silence_duration_ms == 800
+    assert config.system_prompt.startswith("### IDENTITY & CONTEXT")
+    assert "save_personal_info" in config.instructions
+
+
+def test_new_calls_get_new_version_in_flight_calls_keep_theirs(tmp_path):
+    path = tmp_path / "intake_config.toml"
+    write(path, SHIPPED)
+    watcher = ConfigWatcher(str(path), poll_seconds=0)
+    in_flight = watcher.current()
+
+    write(path, SHIPPED.replace('version = "', 'version = "next-').replace("senior_pause_threshold = 0.8",
+                                                                          "senior_pause_threshold = 1.2"))
+    assert watcher.check()
+    new_call = watcher.current()
+    assert new_call.version.startswith("next-") and new_call.silence_duration_ms == 1200
+    assert in_flight.silence_duration_ms == 800 and not in_flight.version.startswith("next-")
+    assert not watcher.check()                          # Unchanged file is not re-read
+
+    record = CallUsage("room-1", "abc", config=new_call.summary(), config_version=new_call.version).to_record()
+    assert record["config_version"] == new_call.version and record["config"]["silence_duration_ms"] == 1200
+
+
+def test_bad_edits_keep_the_previous_version(tmp_path):
+    path = tmp_path / "intake_config.toml"
+    write(path, SHIPPED)
+    watcher = ConfigWatcher(str(path), poll_seconds=0)
+    good = watcher.current()
+
+    for bad in (SHIPPED.replace('voice = "shimmer"', 'voice = "shimer"'),
+                SHIPPED.replace("threshold = 0.7", "threshold = 7"),
+                SHIPPED[:len(SHIPPED) // 2]):                 # Half-written file
+        write(path, bad)
+        assert not watcher.check()
+        assert watcher.current() is good
+    assert watcher.errors == 3
+
+    # An edit without a version bump still gets a version of its own
+    write(path, SHIPPED.replace("prefix_padding_ms = 500", "prefix_padding_ms = 300"))
+    assert watcher.check()
+    edited = watcher.current()
+    assert edited.version.split("+")[0] == good.version.split("+")[0] and edited.version != good.version
+    # ...the same one a worker that starts on the edited file records
+    assert ConfigWatcher(str(path), poll_seconds=0).current().version == edited.version
+
+
+def test_missing_config_fails_loudly(tmp_path):
+    with pytest.raises(ConfigError):
+        ConfigWatcher(str(tmp_path / "missing.toml")).current()
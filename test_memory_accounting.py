@@ -0,0 +1,56 @@
+"""
+Per-session memory accounting tests: leaks are flagged, and the offline
+soak stays flat across sessions.
+
+    python -m pytest test_memory_accounting.py
+"""
+from agent.call_simulator import soak
+from agent.memory_accounting import MemoryLedger, retained_bytes
+
+
+class CallState:
+    def __init__(self):
+        self.lines = [str(i) * 1000 for i in range(50)]
+
+
+def test_survivors_are_flagged_with_retained_size():
+    ledger = MemoryLedger("objects")
+    forgotten = []
+
+    def run_call(leak: bool):
+        memory = ledger.session("room-1")
+        state = CallState()
+
+        def on_item(item):
+            state.lines.append(item)
+
+        memory.watch(state=state, on_item=on_item, tracker=[])    # A list cannot be watched: skipped
+        if leak:
+            forgotten.append(on_item)                               # Handler left registered somewhere global
+        return memory
+
+    clean = ledger.check(run_call(leak=False))
+    assert clean["survivors"] == [] and clean["retained_bytes"] == 0
+
+    leaked = ledger.check(run_call(leak=True))
+    assert leaked["survivors"] == ["state", "on_item"]
+    assert leaked["retained_bytes"] > 50 * 1000
+    assert ledger.stats()["sessions"] == 2 and ledger.leaked_sessions == 1
+
+
+def test_retained_bytes_skips_module_globals():
+    assert retained_bytes([test_retained_bytes_skips_module_globals]) < 10000
+
+
+def test_soak_memory_is_flat():
+    result = soak(250, checkpoint_every=50, warmup=50)
+    assert result["leaked_sessions"] == 0
+    assert result["bytes_per_session"] < 64
+    assert abs(result["objects_per_session"]) < 0.5
+
+
+def test_soak_catches_a_leak():
+    forgotten = []
+    result = soak(40, leak=forgotten.append, checkpoint_every=10, warmup=10)
+    assert result["leaked_sessions"] == 40
+    assert result["bytes_per_session"] > 1000
@@ -0,0 +1,90 @@
+"""
+Migration runner tests.
+
+The file/checksum checks run anywhere. The end-to-end test needs a
+throwaway local Postgres, e.g.:
+    createdb medhelp_test
+    TEST_DATABASE_URL=postgresql://localhost/medhelp_test python -m pytest test_migrate.py
+"""
+import os
+import shutil
+
+import pytest
+
+from migrate import (
+    MigrationError, connect, diff_schema, discover_migrations, migrate, plan, MIGRATIONS_DIR,
+)
+from lead_schema import ENUM_TYPES
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def test_migrations_are_ordered_and_checksummed():
+    migrations = discover_migrations()
+    versions = [m.version for m in migrations]
+    assert versions == sorted(versions)
+    assert versions[0] == "0001"
+    assert all(len(m.checksum) == 64 for m in migrations)
+
+
+def test_enum_migration_matches_lead_schema():
+    sql = {m.version: m.sql for m in discover_migrations()}["0002"]
+    for enum_type, values in ENUM_TYPES.items():
+        labels = ", ".join(f"'{v}'" for v in values)
+        assert f"CREATE TYPE {enum_type} AS ENUM ({labels});" in sql
+
+
+def test_plan_refuses_edited_migration():
+    migrations = discover_migrations()
+    applied = {m.version: m.checksum for m in migrations[:1]}
+    assert [m.version for m in plan(migrations, applied)] == [m.version for m in migrations[1:]]
+
+    applied[migrations[0].version] = "0" * 64
+    with pytest.raises(MigrationError):
+        plan(migrations, applied)
+
+
+def test_discover_rejects_bad_filenames(tmp_path):
+    shutil.copy(os.path.join(MIGRATIONS_DIR, "0001_initial_schema.sql"), tmp_path / "0001_initial_schema.sql")
+    (tmp_path / "2_oops.sql").write_text("SELECT 1;")
+    with pytest.raises(MigrationError):
+        discover_migrations(str(tmp_path))
+
+
+def test_diff_schema():
+    before = {"column care_details.mobility": "text"}
+    after = {"column care_details.mobility": "mobility_level", "enum mobility_level": "wheelchair"}
+    assert diff_schema(before, after) == [
+        "~ column care_details.mobility: text -> mobility_level",
+        "+ enum mobility_level: wheelchair",
+    ]
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_migrations_against_local_postgres():
+    migrations = discover_migrations()
+    with connect(TEST_DATABASE_URL) as conn:
+        conn.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+        conn.commit()
+
+        # Legacy rows, including one free-text value no enum accepts
+        conn.execute(migrations[0].sql)
+        conn.execute("""
+            INSERT INTO lead_personal_info (id, relationship, michigan_location)
+            VALUES ('00000000-0000-0000-0000-000000000001', 'adult_child', 'Royal Oak'),
+                   ('00000000-0000-0000-0000-000000000002', 'my neighbor', 'Troy');
+        """)
+        conn.commit()
+
+        preview = migrate(conn, migrations, dry_run=True)
+        assert "~ column lead_personal_info.relationship: text -> relationship_type" in preview["diff"]
+        assert conn.execute("SELECT count(*) FROM schema_migrations").fetchone()[0] == 0
+
+        result = migrate(conn, migrations)
+        assert [m.version for m in result["applied"]] == [m.version for m in migrations]
+        assert migrate(conn, migrations)["pending"] == []
+
+        rows = dict(conn.execute("SELECT michigan_location, relationship::text FROM lead_personal_info").fetchall())
+        assert rows == {"Royal Oak": "adult_child", "Troy": None}
+        rejects = conn.execute("SELECT column_name, value FROM enum_migration_rejects").fetchall()
+        assert rejects == [("relationship", "my neighbor")]
@@ -0,0 +1,118 @@
+"""
+Notification queue tests, against a local stand-in webhook receiver.
+
+    python -m pytest test_notifications.py
+"""
+import json
+import hmac
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from notifications import LeadNotifier, WebhookSink
+
+SECRET = "test-secret"
+
+
+class Receiver:
+    """Webhook stand-in that records batches and can fail or stall on demand"""
+    def __init__(self, fail_first: int = 0, delay: float = 0.0):
+        self.batches = []
+        self.requests = 0
+        self.fail_first = fail_first
+        self.delay = delay
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests += 1
+                time.sleep(receiver.delay)
+                if receiver.requests <= receiver.fail_first:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                expected = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+                assert self.headers["X-MedHelp-Signature"] == f"sha256={expected}"
+                receiver.batches.append(json.loads(body)["leads"])
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def receiver():
+    created = []
+
+    def make(**kwargs):
+        created.append(Receiver(**kwargs))
+        return created[-1]
+
+    yield make
+    for r in created:
+        r.close()
+
+
+def test_batches_and_enriches(receiver):
+    hook = receiver()
+    notifier = LeadNotifier(
+        WebhookSink(hook.url, SECRET), workers=1, batch_size=20, batch_wait=0.2,
+        enrich=lambda ids: {i: {"lead_name": f"Caller {i}"} for i in ids},
+    )
+    for i in range(10):
+        assert notifier.enqueue(f"lead-{i}", {"start_care_timing": "immediately"})
+    assert notifier.flush(timeout=5)
+
+    leads = [lead for batch in hook.batches for lead in batch]
+    assert sorted(lead["lead_id"] for lead in leads) == sorted(f"lead-{i}" for i in range(10))
+    assert all(lead["lead_name"] == f"Caller {lead['lead_id']}" for lead in leads)
+    assert len(hook.batches) < 10
+    metrics = notifier.metrics()
+    assert metrics["delivered"] == 10 and metrics["depth"] == 0
+    assert metrics["latency_p50_ms"] is not None
+
+
+def test_retries_failed_batches(receiver):
+    hook = receiver(fail_first=2)
+    notifier = LeadNotifier(WebhookSink(hook.url, SECRET), workers=1, batch_wait=0, retry_base=0.01)
+    notifier.enqueue("lead-1")
+    assert notifier.flush(timeout=5)
+    assert [b[0]["lead_id"] for b in hook.batches] == ["lead-1"]
+    assert notifier.stats["retries"] == 2 and notifier.stats["failed"] == 0
+
+
+def test_gives_up_after_max_attempts(receiver):
+    hook = receiver(fail_first=100)
+    notifier = LeadNotifier(WebhookSink(hook.url, SECRET), workers=1, batch_wait=0,
+                            max_attempts=3, retry_base=0.01)
+    notifier.enqueue("lead-1")
+    assert notifier.flush(timeout=5)
+    assert hook.requests == 3 and notifier.stats["failed"] == 1
+
+
+def test_full_queue_drops_without_blocking(receiver):
+    hook = receiver(delay=0.5)
+    notifier = LeadNotifier(WebhookSink(hook.url, SECRET), workers=1, queue_size=2, batch_size=1, batch_wait=0)
+    started = time.perf_counter()
+    results = [notifier.enqueue(f"lead-{i}") for i in range(10)]
+    assert time.perf_counter() - started < 0.1
+    assert results.count(False) == notifier.stats["dropped"] > 0
+
+
+def test_disabled_without_sink():
+    notifier = LeadNotifier(None)
+    assert not notifier.enqueue("lead-1")
+    assert notifier.flush(timeout=0)
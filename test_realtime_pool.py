@@ -0,0 +1,141 @@
+"""
+Pre-opened realtime session pool tests: a fake opener for the pool's
+bookkeeping, and the real OpenAI realtime plugin against a local WebSocket
+stand-in (skipped when aiohttp / the plugin are not installed).
+
+    python -m pytest test_realtime_pool.py
+"""
+import json
+import asyncio
+
+import pytest
+
+from agent.realtime_pool import SessionPool, open_realtime_session
+
+
+class FakeOpener:
+    """Opens numbered sessions after `delay`; the first `failures` attempts fail"""
+    def __init__(self, delay: float = 0.05, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.attempts = 0
+        self.closed = []
+
+    async def __call__(self):
+        self.attempts += 1
+        await asyncio.sleep(self.delay)
+        if self.attempts <= self.failures:
+            raise ConnectionError("handshake failed")
+        return f"session-{self.attempts}"
+
+    async def close(self, session):
+        self.closed.append(session)
+
+
+def test_ready_session_is_handed_over_at_once():
+    async def run():
+        opener = FakeOpener(delay=0.05)
+        pool = SessionPool(opener, size=1, max_idle=0, close=opener.close)
+        pool.start()
+        await asyncio.sleep(0.1)                         # Room connect / waiting for the caller
+        lease = await pool.checkout()
+        assert lease.session == "session-1"
+        assert lease.waited_seconds < 0.01 and lease.saved_seconds >= 0.04
+        await asyncio.sleep(0.1)                         # Refilled in the background
+        assert (await pool.checkout(timeout=0)).session == "session-2"
+        await pool.aclose()
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool.stats()["ready_at_checkout"] == 2 and pool.stats()["opened"] == 2
+
+
+def test_checkout_waits_for_the_session_being_opened():
+    async def run():
+        opener = FakeOpener(delay=0.1)
+        pool = SessionPool(opener, size=1, max_idle=0, close=opener.close)
+        pool.start()
+        await asyncio.sleep(0.04)
+        lease = await pool.checkout(refill=False)
+        assert 0.04 <= lease.waited_seconds and 0.02 <= lease.saved_seconds <= 0.07
+        assert await pool.checkout(timeout=0.05) is None
+        await pool.aclose()
+
+    asyncio.run(run())
+
+
+def test_failed_opens_are_retried_and_idle_sessions_replaced():
+    async def run():
+        opener = FakeOpener(delay=0.01, failures=1)
+        pool = SessionPool(opener, size=1, max_idle=0.05, retry_delays=(0.01,), close=opener.close)
+        pool.start()
+        await asyncio.sleep(0.12)
+        assert pool.failed == 1 and pool.refreshed >= 1 and opener.closed[0] == "session-2"
+        lease = await pool.checkout(refill=False)
+        assert lease.session not in opener.closed
+        await pool.aclose()
+
+        opener = FakeOpener(delay=0.01, failures=10)
+        pool = SessionPool(opener, size=1, retry_delays=(0.01,), close=opener.close)
+        pool.start()
+        assert await pool.checkout(timeout=1, refill=False) is None      # Gave up after two attempts
+        assert opener.attempts == 2
+        await pool.aclose()
+
+    asyncio.run(run())
+
+
+def test_realtime_plugin_against_local_websocket():
+    web = pytest.importorskip("aiohttp.web")
+    realtime = pytest.importorskip("livekit.plugins.openai.realtime")
+    from livekit.agents.llm import ChatContext, ChatMessage
+
+    HANDSHAKE_DELAY = 0.2
+    received = []
+
+    async def stand_in(request):
+        await asyncio.sleep(HANDSHAKE_DELAY)             # Connect + TLS + session setup upstream
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "session.created", "event_id": "ev_0", "session": {}})
+        previous = None
+        async for msg in ws:
+            event = json.loads(msg.data)
+            received.append(event["type"])
+            if event["type"] == "conversation.item.create":
+                await ws.send_json({"type": "conversation.item.added", "event_id": "ev_1",
+                                    "previous_item_id": previous, "item": event["item"]})
+                previous = event["item"]["id"]
+        return ws
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/v1/realtime", stand_in)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        model = realtime.RealtimeModel(base_url=f"http://127.0.0.1:{port}/v1", api_key="test")
+        chat_ctx = ChatContext(items=[ChatMessage(role="system", content=["You are Sarah."])])
+        pool = SessionPool(lambda: open_realtime_session(model.session, "Greet the caller.", chat_ctx, []),
+                           size=1, max_idle=0)
+        try:
+            pool.start()
+            await asyncio.sleep(HANDSHAKE_DELAY + 0.3)   # The caller joins
+            lease = await pool.checkout(refill=False)
+            assert lease is not None and lease.ready_seconds >= HANDSHAKE_DELAY
+            assert lease.saved_seconds >= HANDSHAKE_DELAY
+            assert received.count("conversation.item.create") == 1
+
+            await lease.session.update_chat_ctx(chat_ctx)   # AgentActivity on start: nothing left to send
+            await asyncio.sleep(0.05)
+            assert received.count("conversation.item.create") == 1
+            await lease.session.aclose()
+        finally:
+            await pool.aclose()
+            await model.aclose()
+            await runner.cleanup()
+
+    asyncio.run(run())
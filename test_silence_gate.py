@@ -0,0 +1,96 @@
+"""
+Silence gate tests: the speech classifier on synthetic audio, and the
+gate's hangover / pre-roll behaviour with scripted speech decisions.
+
+    python -m pytest test_silence_gate.py
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("livekit.agents.voice.io")
+
+from agent.silence_gate import ATTENUATION, SilenceGate, SpeechFrameClassifier  # noqa: E402
+
+SAMPLE_RATE = 24000
+FRAME_MS = 20
+SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+
+class Frame:
+    """Just the rtc.AudioFrame attributes the gate reads"""
+    def __init__(self, data, sample_rate: int = SAMPLE_RATE, num_channels: int = 1,
+                 samples_per_channel: int = SAMPLES):
+        self.data = memoryview(bytes(data)).cast("h")
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.samples_per_channel = samples_per_channel
+
+
+class Scripted:
+    """Classifier stand-in: speech decisions from a list, one per frame"""
+    def __init__(self, flags):
+        self.flags = iter(flags)
+
+    def classify(self, samples, sample_rate, num_channels=1):
+        return next(self.flags)
+
+
+def frames(count: int, level: int = 1000) -> list[Frame]:
+    return [Frame(np.full(SAMPLES, level + i, dtype=np.int16).tobytes()) for i in range(count)]
+
+
+def gate(mode: str, flags: list[bool], **kwargs) -> SilenceGate:
+    return SilenceGate(mode=mode, classifier=Scripted(flags), make_frame=Frame,
+                       hangover_ms=100, preroll_ms=60, tail_ms=50, **kwargs)
+
+
+def first_sample(frame) -> int:
+    return frame.data[0]
+
+
+def test_suppress_drops_silence_and_replays_preroll_on_onset():
+    flags = [False] * 5 + [True] * 2 + [False] * 8
+    g, audio = gate("suppress", flags), frames(len(flags))
+    out = [g.process(f) for f in audio]
+
+    assert out[:5] == [[]] * 5                                    # Closed: nothing sent
+    assert [first_sample(f) for f in out[5]] == [1002, 1003, 1004, 1005]   # 60ms pre-roll + onset frame
+    assert out[6] == [audio[6]]
+    assert out[7] == [audio[7]] and out[8] == [audio[8]]        # Tail untouched
+    assert first_sample(out[9][0]) == int(1009 * ATTENUATION)   # Rest of the hangover attenuated
+    assert out[12] == [] and not g.open                          # Hangover over: closed again
+    assert g.stats["onsets"] == 1
+
+
+def test_attenuate_sends_every_frame_exactly_once():
+    flags = [False] * 30 + [True] * 3 + [False] * 10 + [True] * 2
+    g, audio = gate("attenuate", flags), frames(len(flags))
+    out = [f for frame in audio for f in g.process(frame)]
+
+    assert len(out) == len(audio) and g.stats["onsets"] == 2
+    assert out[30] is audio[30]                                  # Onset: no pre-roll replayed before it
+    assert first_sample(out[29]) == int(1029 * ATTENUATION)
+    assert not g._preroll
+
+
+def test_off_passes_everything_through():
+    g, audio = gate("off", []), frames(4)
+    assert [f for frame in audio for f in g.process(frame)] == audio
+    assert g.savings() == 0.0
+
+
+def test_classifier_hears_voiced_speech_over_noise():
+    rng = np.random.default_rng(1)
+    t = np.arange(SAMPLES) / SAMPLE_RATE
+
+    def noise():
+        return rng.normal(0, 300, SAMPLES)
+
+    def voiced():
+        return noise() + sum(4000 / k * np.sin(2 * np.pi * 150 * k * t) for k in range(1, 12))
+
+    classifier = SpeechFrameClassifier()
+    for _ in range(50):                                          # Learn the noise floor
+        classifier.classify(noise().astype(np.int16), SAMPLE_RATE)
+    assert not classifier.classify(noise().astype(np.int16), SAMPLE_RATE)
+    assert classifier.classify(voiced().astype(np.int16), SAMPLE_RATE)
@@ -0,0 +1,40 @@
+"""
+Static asset tests: Accept-Encoding negotiation and ETags (no server).
+
+    python -m pytest test_static_assets.py
+"""
+import gzip
+
+from static_assets import Asset, etag_matches, parse_accept_encoding
+
+asset = Asset(b"<p>care</p>" * 100, "text/html; charset=utf-8", "no-cache")
+best = "br" if "br" in asset.encodings else "gzip"
+
+
+def test_accept_encoding_weights():
+    assert parse_accept_encoding("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
+    assert parse_accept_encoding("GZIP; Q=0.0") == {"gzip": 0.0}
+    assert parse_accept_encoding("gzip;q=high") == {"gzip": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+def test_q_zero_refuses_a_coding():
+    assert asset.negotiate("gzip") == "gzip"
+    for refused in ("gzip;q=0", "gzip;q=0.0", "gzip; q=0", "gzip;q=0.000", "*;q=0"):
+        assert asset.negotiate(refused) == "identity", refused
+    assert asset.negotiate("gzip;q=0, *") == ("br" if "br" in asset.encodings else "identity")
+    assert asset.negotiate("gzip;q=0.001") == "gzip"
+    assert asset.negotiate("") == asset.negotiate("identity") == "identity"
+
+
+def test_wildcard_accepts_every_coding_not_listed():
+    assert asset.negotiate("*") == best
+    assert asset.negotiate("br;q=0, *") == "gzip"
+    assert gzip.decompress(asset.encodings["gzip"][0]) == asset.encodings["identity"][0]
+
+
+def test_etags_per_representation():
+    identity_tag, gzip_tag = asset.encodings["identity"][1], asset.encodings["gzip"][1]
+    assert identity_tag != gzip_tag
+    assert etag_matches(f'W/{gzip_tag}, "other"', asset.etags)
+    assert etag_matches("*", asset.etags) and not etag_matches('"other"', asset.etags)
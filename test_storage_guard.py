@@ -0,0 +1,209 @@
+"""
+Storage deadline / circuit breaker / spool tests, against a local HTTP
+stand-in for PostgREST that can inject latency and errors.
+
+    python -m pytest test_storage_guard.py
+"""
+import json
+import time
+import asyncio
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from storage_guard import CircuitBreaker, SpoolStore, StorageGuard
+
+DEADLINE_MS = 200
+
+
+class PostgrestStandIn:
+    """Upserts JSON rows by id per table; `delay` and `status` are injected per request"""
+    def __init__(self):
+        self.tables: dict[str, dict] = {}
+        self.requests = 0
+        self.delay = 0.0
+        self.status = 201
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                stand_in.requests += 1
+                row = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(stand_in.delay)
+                if stand_in.status < 300:
+                    stand_in.tables.setdefault(self.path.strip("/"), {})[row["id"]] = row
+                self.send_response(stand_in.status)
+                self.end_headers()
+                self.wfile.write(json.dumps([row]).encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def upsert(self, table: str, row: dict) -> list:
+        request = urllib.request.Request(f"{self.url}/{table}", data=json.dumps(row).encode(), method="POST")
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    def close(self):
+        self.server.shutdown()
+
+
+@pytest.fixture
+def stand_in():
+    server = PostgrestStandIn()
+    yield server
+    server.close()
+
+
+def make_guard(tmp_path, **breaker) -> StorageGuard:
+    breaker = CircuitBreaker(slow_seconds=DEADLINE_MS / 1000, **{"min_calls": 3, "open_seconds": 0.3, **breaker})
+    return StorageGuard(breaker, SpoolStore(str(tmp_path / "spool")), deadline_ms=DEADLINE_MS)
+
+
+async def save(guard: StorageGuard, stand_in: PostgrestStandIn, table: str, row: dict):
+    started = time.perf_counter()
+    result, saved = await guard.call(lambda: stand_in.upsert(table, row), spool=(table, row))
+    return saved, time.perf_counter() - started
+
+
+def test_fast_storage_saves_directly(stand_in, tmp_path):
+    guard = make_guard(tmp_path)
+    saved, _ = asyncio.run(save(guard, stand_in, "lead_personal_info", {"id": "a", "lead_name": "Ann"}))
+    assert saved and stand_in.tables["lead_personal_info"]["a"]["lead_name"] == "Ann"
+    assert guard.spool.pending() == 0
+
+
+def test_slow_storage_returns_within_budget_and_replays_once(stand_in, tmp_path):
+    guard = make_guard(tmp_path)
+    stand_in.delay = 1.0
+    saved, seconds = asyncio.run(save(guard, stand_in, "lead_personal_info", {"id": "a", "lead_name": "Ann"}))
+    assert not saved
+    assert seconds < DEADLINE_MS / 1000 + 0.1
+    assert guard.spool.pending() == 1
+
+    # The abandoned write lands late; the replay upserts the same id - still one row
+    time.sleep(1.1)
+    stand_in.delay = 0.0
+    assert guard.replay(stand_in.upsert) == 1
+    assert list(stand_in.tables["lead_personal_info"]) == ["a"]
+    assert guard.spool.pending() == 0
+
+
+def test_breaker_opens_fails_fast_and_recovers(stand_in, tmp_path):
+    guard = make_guard(tmp_path)
+    stand_in.status = 500
+
+    async def calls(count):
+        return [await save(guard, stand_in, "care_details", {"id": str(i)}) for i in range(count)]
+
+    results = asyncio.run(calls(10))
+    assert not any(saved for saved, _ in results)
+    assert guard.breaker.state == "open"
+    assert stand_in.requests == 3                           # Then no more round trips
+    assert max(seconds for _, seconds in results[3:]) < 0.05
+    assert guard.spool.pending() == 10
+
+    # After the cool-down the spool drains; replays do not count for the breaker,
+    # the next live call is its probe and success closes it
+    stand_in.status = 201
+    time.sleep(0.35)
+    assert guard.replay(stand_in.upsert) == 10
+    assert sorted(stand_in.tables["care_details"], key=int) == [str(i) for i in range(10)]
+    assert guard.breaker.stats["calls"] == 3
+    saved, _ = asyncio.run(save(guard, stand_in, "care_details", {"id": "10"}))
+    assert saved and guard.breaker.state == "closed"
+
+
+def test_permanent_errors_are_raised_and_dead_lettered(stand_in, tmp_path):
+    guard = make_guard(tmp_path)
+    stand_in.status = 409                                   # e.g. care_details for a lead that does not exist
+    for _ in range(5):
+        with pytest.raises(urllib.error.HTTPError):
+            asyncio.run(save(guard, stand_in, "care_details", {"id": "missing"}))
+    assert guard.spool.pending() == 0 and guard.breaker.state == "closed"
+
+    # A poison row already in the spool is set aside; the rows behind it still land
+    for i in range(3):
+        guard.spool.append("care_details", {"id": str(i)})
+
+    def apply(table, row):
+        stand_in.status = 409 if row["id"] == "0" else 201
+        stand_in.upsert(table, row)
+
+    assert guard.replay(apply) == 2
+    assert guard.spool.pending() == 0 and guard.spool.dead_letters == 1
+    assert sorted(stand_in.tables["care_details"]) == ["1", "2"]
+    with open(guard.spool.dead_letter_path) as f:
+        assert json.loads(f.readline())["row"] == {"id": "0"}
+
+
+def test_child_of_a_spooled_lead_is_spooled_behind_it(stand_in, tmp_path):
+    guard = make_guard(tmp_path)
+
+    def upsert_with_foreign_key(table, row):
+        if table == "care_details" and row["id"] not in stand_in.tables.get("lead_personal_info", {}):
+            raise urllib.error.HTTPError(stand_in.url, 409, "23503 foreign key violation", None, None)
+        return stand_in.upsert(table, row)
+
+    async def save_lead_then_care(lead_id):
+        lead = {"id": lead_id, "lead_name": "Ann"}
+        _, lead_saved = await guard.call(lambda: stand_in.upsert("lead_personal_info", lead),
+                                         spool=("lead_personal_info", lead))
+        care = {"id": lead_id, "mobility": "wheelchair"}
+        _, care_saved = await guard.call(lambda: upsert_with_foreign_key("care_details", care),
+                                         spool=("care_details", care), after=("lead_personal_info", lead_id))
+        return lead_saved, care_saved
+
+    stand_in.delay = 1.0                                    # The lead misses its deadline and is spooled
+    assert asyncio.run(save_lead_then_care("a")) == (False, False)
+    assert stand_in.requests == 1                           # care_details never tried live
+    assert guard.spool.pending() == 2
+
+    time.sleep(1.1)
+    stand_in.delay = 0.0
+    assert guard.replay(upsert_with_foreign_key) == 2
+    assert "a" in stand_in.tables["care_details"] and guard.spool.dead_letters == 0
+
+    # Nothing spooled any more: the next call's care details go straight in
+    assert asyncio.run(save_lead_then_care("b")) == (True, True)
+    assert not guard.spool.holds("lead_personal_info", "a")
+
+
+def test_replay_keeps_order_after_partial_failure(tmp_path):
+    spool = SpoolStore(str(tmp_path / "spool"))
+    for i in range(5):
+        spool.append("lead_personal_info", {"id": str(i)})
+
+    applied, failures = [], ["2"]
+
+    def flaky(table, row):
+        if row["id"] in failures:
+            failures.remove(row["id"])
+            raise ConnectionError("injected")
+        applied.append(row["id"])
+
+    assert spool.replay(flaky) == (2, 3)
+    spool.append("care_details", {"id": "5"})   # Spooled after the failed replay
+    assert spool.replay(flaky) == (4, 0)
+    assert applied == ["0", "1", "2", "3", "4", "5"]
+
+
+def test_rows_out_of_attempts_are_dead_lettered(tmp_path):
+    spool = SpoolStore(str(tmp_path / "spool"), max_attempts=2)
+    spool.append("lead_personal_info", {"id": "0"})
+    spool.append("lead_personal_info", {"id": "1"})
+
+    def down_for_row_0(table, row):
+        if row["id"] == "0":
+            raise ConnectionError("injected")
+
+    assert spool.replay(down_for_row_0) == (0, 2)
+    assert spool.replay(down_for_row_0) == (1, 0)
+    assert spool.dead_letters == 1
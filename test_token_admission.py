@@ -0,0 +1,119 @@
+"""
+/token rate limit and admission tests (no LiveKit server).
+
+    python -m pytest test_token_admission.py
+"""
+import json
+import time
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+import token_service
+import token_admission
+from token_admission import AgentCapacity, KeyedBuckets, TokenAdmission, TokenBucket, client_ip
+from token_service import TokenHandlerMixin, TokenHTTPServer
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_client_ip_behind_a_trusted_proxy(monkeypatch):
+    class Request:
+        client_address = ("10.0.0.7", 51000)
+        headers = {"X-Forwarded-For": "198.51.100.9, 10.0.0.1", "X-Real-IP": "203.0.113.5"}
+
+    assert client_ip(Request) == "10.0.0.7"               # Not trusted: headers are ignored
+    monkeypatch.setattr(token_admission, "TOKEN_TRUST_PROXY", True)
+    assert client_ip(Request) == "203.0.113.5"
+    Request.headers = {"X-Forwarded-For": "198.51.100.9, 10.0.0.1"}
+    assert client_ip(Request) == "198.51.100.9"
+    Request.headers = {}
+    assert client_ip(Request) == "10.0.0.7"
+
+
+def test_bucket_burst_then_refill():
+    bucket = TokenBucket(rate=2, burst=3, now=0)
+    assert [bucket.take(0) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take(0) == 0.5                     # Next token in 1/rate seconds
+    assert bucket.take(0.5) == 0
+
+
+def test_per_ip_limit_leaves_other_callers_alone():
+    admission = TokenAdmission(KeyedBuckets(rate=0.1, burst=2), TokenBucket(rate=100, burst=100))
+    results = [admission.check("203.0.113.9").admitted for _ in range(5)]
+    assert results == [True, True, False, False, False]
+    assert admission.check("198.51.100.1").admitted
+    assert admission.stats == {"admitted": 3, "per_ip": 3, "global": 0, "capacity": 0}
+
+
+def test_capacity_counts_admitted_rooms_until_they_are_listed():
+    live = ["intake-a", "intake-b", "intake-c"]
+    capacity = AgentCapacity(5, lambda: list(live), refresh_seconds=60)
+    admission = TokenAdmission(KeyedBuckets(rate=100, burst=100), TokenBucket(rate=100, burst=100), capacity)
+    assert admission.check("10.0.0.0", new_room="intake-d").admitted
+    wait_until(lambda: capacity.listed_at)
+
+    assert admission.check("10.0.0.1", new_room="intake-e").admitted
+    decision = admission.check("10.0.0.2", new_room="intake-f")
+    assert not decision.admitted and decision.reason == "capacity"
+    assert admission.check("10.0.0.2").admitted      # Joining an existing room makes no job
+
+    # d joined (listed once, not twice); a, b and c hung up
+    live[:] = ["intake-d"]
+    capacity.refresh_seconds = 0
+    admission.check("10.0.0.3", new_room="intake-g")  # Triggers a background refresh
+    wait_until(lambda: capacity.active == {"intake-d"})
+    assert capacity.in_use() == 3                     # d + admitted e and g
+
+
+class Handler(TokenHandlerMixin, BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.handle_token_request(urlparse(self.path).query)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_rejected_request_gets_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(token_service, "token_admission",
+                        TokenAdmission(KeyedBuckets(rate=0.25, burst=0), TokenBucket(rate=100, burst=100)))
+    server = TokenHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.request("GET", "/token?identity=web-user")
+        response = conn.getresponse()
+        assert response.status == 429
+        assert response.getheader("Retry-After") == "4"
+        assert json.loads(response.read()) == {"error": "rate_limited", "retry_after": 4}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_failed_token_gives_back_its_capacity_slot(monkeypatch):
+    def issue_token(*args):
+        raise RuntimeError("LiveKit down")
+
+    capacity = AgentCapacity(1, lambda: [], refresh_seconds=60)
+    monkeypatch.setattr(token_service, "token_admission",
+                        TokenAdmission(KeyedBuckets(rate=100, burst=100), TokenBucket(rate=100, burst=100), capacity))
+    monkeypatch.setattr(token_service, "issue_token", issue_token)
+    server = TokenHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for _ in range(2):                            # Capacity 1: the second request needs the slot back
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            conn.request("GET", "/token?identity=web-user")
+            response = conn.getresponse()
+            assert response.status == 500
+            assert json.loads(response.read()) == {"error": "LiveKit down"}
+        assert capacity.in_use() == 0
+    finally:
+        server.shutdown()
+        server.server_close()
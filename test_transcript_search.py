@@ -0,0 +1,60 @@
+"""
+Transcript search tests (SQLite FTS5 backend, no network).
+
+    python -m pytest test_transcript_search.py
+"""
+import pytest
+
+from lead_api import LeadQueryError
+from transcript_search import (
+    SQLiteTranscriptIndex, fts5_query, parse_search_query, search_transcripts, transcript_record,
+)
+
+CALLS = [
+    ("lead-1", [("assistant", "Who are we arranging care for?"),
+                ("user", "My mother Margaret. My daughter says she had a fall last week.")]),
+    ("lead-2", [("user", "Dad keeps falling, the last one was in the bathroom.")]),
+    ("lead-1", [("user", "Calling back about Margaret, she fell again last week.")]),
+    (None, [("user", "Just asking about prices for dementia care.")]),
+]
+
+
+@pytest.fixture
+def index():
+    index = SQLiteTranscriptIndex()
+    for i, (lead_id, lines) in enumerate(CALLS):
+        index.add(transcript_record(f"room-{i}", f"2025-03-0{i + 1}T10:00:00Z", lines, lead_id))
+    return index
+
+
+def test_query_translation():
+    assert fts5_query("daughter mentioned a fall") == '"daughter" AND "mentioned" AND "fall"'
+    assert fts5_query('"fell in" or tripped -stairs') == '("fell in" OR "tripped") NOT "stairs"'
+    with pytest.raises(LeadQueryError):
+        fts5_query("the a -fall")
+
+
+def test_ranked_leads_with_snippets(index):
+    results = search_transcripts(index, "daughter fall last week")["results"]
+    assert [r["lead_id"] for r in results] == ["lead-1"]
+    assert "[daughter]" in results[0]["snippet"] and "[fall]" in results[0]["snippet"]
+
+    # Stemmed, one entry per lead, calls without a lead come back by room
+    assert {r["lead_id"] for r in search_transcripts(index, "falls")["results"]} == {"lead-1", "lead-2"}
+    assert search_transcripts(index, "falling -bathroom")["results"][0]["lead_id"] == "lead-1"
+    assert search_transcripts(index, "dementia")["results"][0]["room_name"] == "room-3"
+
+
+def test_indexing_is_incremental_and_replay_safe(index):
+    record = transcript_record("room-9", "2025-03-09T10:00:00Z", [("user", "He needs oxygen at night.")], "lead-9")
+    assert search_transcripts(index, "oxygen")["results"] == []
+    assert index.add(record) == 1
+    assert index.add(record) == 0                      # Replayed from the spool
+    assert [r["lead_id"] for r in search_transcripts(index, "oxygen")["results"]] == ["lead-9"]
+
+
+def test_parse_search_query():
+    assert parse_search_query("q=fall+last+week&limit=5") == ("fall last week", 5)
+    for bad in ("", "q=fall&limit=0", "q=fall&limit=x", "q=the"):
+        with pytest.raises(LeadQueryError):
+            parse_search_query(bad)
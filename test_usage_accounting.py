@@ -0,0 +1,92 @@
+"""
+Per-call usage accounting tests (fake clock, no network).
+
+    python -m pytest test_usage_accounting.py
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agent import usage_accounting
+from agent.usage_accounting import CallUsage
+
+
+class Clock:
+    """Stands in for the time module: monotonic() only moves when told to"""
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(usage_accounting, "time", clock)
+    return clock
+
+
+def realtime_metrics(text_in, audio_in, text_out, audio_out, cached_audio=0):
+    return SimpleNamespace(
+        type="realtime_model_metrics",
+        input_token_details=SimpleNamespace(
+            text_tokens=text_in, audio_tokens=audio_in,
+            cached_tokens_details=SimpleNamespace(text_tokens=0, audio_tokens=cached_audio),
+        ),
+        output_token_details=SimpleNamespace(text_tokens=text_out, audio_tokens=audio_out),
+    )
+
+
+def test_tokens_and_caller_audio_land_in_the_current_phase(clock):
+    usage = CallUsage("room-1", "abc")
+    usage.add_metrics(realtime_metrics(100, 400, 20, 300, cached_audio=50))
+    usage.add_metrics(SimpleNamespace(type="vad_metrics"))             # Ignored
+    usage.sync_input_audio(12.5)
+    usage.record_tool_result("save_personal_info", input_audio_seconds=20.0)
+    usage.add_metrics(realtime_metrics(10, 40, 2, 30))
+    usage.sync_input_audio(25.0)
+
+    record = usage.to_record()
+    assert record["phases"]["personal_info"]["input_cached_audio_tokens"] == 50
+    assert record["phases"]["personal_info"]["input_audio_seconds"] == 20.0
+    assert record["phases"]["care_details"]["input_audio_seconds"] == 5.0
+    assert record["responses"] == 2 and record["output_audio_tokens"] == 330
+    assert not record["completed"]
+
+
+def test_tool_result_mid_utterance_splits_speaking_time_without_ending_it(clock):
+    usage = CallUsage("room-1", "abc")
+    usage.agent_state("speaking")
+    clock.now += 3
+    usage.record_tool_result("save_personal_info")                     # Sarah keeps talking
+    clock.now += 2
+    usage.user_state("speaking")                                       # Caller cuts in: still an interruption
+    usage.agent_state("listening")
+
+    record = usage.to_record()
+    assert record["interruptions"] == 1
+    assert record["phases"]["personal_info"]["output_audio_seconds"] == 3.0
+    assert record["phases"]["care_details"]["output_audio_seconds"] == 2.0
+    assert record["output_audio_seconds"] == 5.0
+
+
+def test_response_delay_is_the_median_turn_gap(clock):
+    usage = CallUsage("room-1", "abc")
+    for gap in (0.4, 1.0, 0.7):
+        usage.user_state("listening")                                  # Caller stops speaking
+        clock.now += gap
+        usage.agent_state("speaking")
+        clock.now += 1
+        usage.agent_state("listening")
+    usage.record_tool_result("save_personal_info")
+    usage.record_tool_result("lookup_location")                        # Not a save tool: no phase change
+    usage.record_tool_result("save_care_details")
+
+    record = usage.to_record()
+    assert record["response_delay_ms"] == 700
+    assert record["completed"] and set(record["phases"]) == {"personal_info"}
@@ -0,0 +1,241 @@
+"""
+Token Endpoint Admission Control for Med Help USA
+=================================================
+Every /token request without a room dispatches an intake agent job. A
+burst of page loads or a browser retry loop could otherwise fill the
+workers and starve real callers. Before a token is minted the request
+must pass, in order:
+
+- a token bucket per client IP (TOKEN_RATE_PER_IP / TOKEN_BURST_PER_IP)
+- a global token bucket (TOKEN_RATE_GLOBAL / TOKEN_BURST_GLOBAL)
+- for new calls only: agent capacity. Calls in progress (occupied intake
+  rooms listed by the LiveKit API, refreshed in the background every
+  CAPACITY_REFRESH_SECONDS) plus rooms admitted but not yet joined must
+  stay below AGENT_CAPACITY. 0 turns the capacity check off.
+
+A rejected request costs a dictionary lookup. It gets a 429 with
+Retry-After and no job is created. Checks never wait on the LiveKit API:
+they use the last room count, which is at most CAPACITY_REFRESH_SECONDS old.
+
+State is per process. Under Vercel each warm function instance keeps its
+own buckets, so the limits hold per instance; demo_server.py has one.
+
+Usage:
+    decision = token_admission.check(client_ip, new_room=room_name)
+    if not decision.admitted:
+        ...  # 429, Retry-After: decision.retry_after
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+TOKEN_RATE_PER_IP = float(os.getenv("TOKEN_RATE_PER_IP", "0.2"))       # Tokens/second refill (one per 5s)
+TOKEN_BURST_PER_IP = float(os.getenv("TOKEN_BURST_PER_IP", "5"))
+TOKEN_RATE_GLOBAL = float(os.getenv("TOKEN_RATE_GLOBAL", "20"))
+TOKEN_BURST_GLOBAL = float(os.getenv("TOKEN_BURST_GLOBAL", "100"))
+TOKEN_TRUST_PROXY = os.getenv("TOKEN_TRUST_PROXY", "0") == "1"          # Client IP from the proxy's headers (Vercel)
+AGENT_CAPACITY = int(os.getenv("AGENT_CAPACITY", "0"))                  # Concurrent calls; 0 = no capacity check
+CAPACITY_REFRESH_SECONDS = float(os.getenv("CAPACITY_REFRESH_SECONDS", "5"))
+CAPACITY_RETRY_SECONDS = 20      # Retry hint when all agents are busy
+JOIN_SECONDS = 10                # Token -> caller in the room; newer admissions may be missing from a listing
+BUCKET_MAX_KEYS = 50000          # Per-IP buckets kept (least recently seen dropped first)
+
+
+class TokenBucket:
+    """`burst` tokens, refilled at `rate` per second"""
+    def __init__(self, rate: float, burst: float, now: float | None = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic() if now is None else now
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 if granted, else seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class KeyedBuckets:
+    """One TokenBucket per key (client IP) in a bounded LRU"""
+    def __init__(self, rate: float, burst: float, max_keys: int = BUCKET_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def take(self, key: str, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(now)
+
+
+class Decision:
+    """Outcome of one admission check"""
+    def __init__(self, admitted: bool, reason: str = "", retry_after: float = 0.0):
+        self.admitted = admitted
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+ADMITTED = Decision(True)
+
+
+# =============================================================================
+# AGENT CAPACITY
+# =============================================================================
+
+class AgentCapacity:
+    """Calls in progress vs AGENT_CAPACITY, from a background room listing.
+
+    `list_calls()` (blocking, e.g. a LiveKit ListRooms) returns the names of
+    occupied rooms and runs on a refresh thread. Rooms admitted here are
+    counted on top until a listing shows them, or until they are
+    JOIN_SECONDS older than the listing (the caller never joined). So a
+    burst cannot overshoot while the listing is stale, and no call is
+    counted twice.
+    """
+    def __init__(self, capacity: int, list_calls, refresh_seconds: float = CAPACITY_REFRESH_SECONDS,
+                 join_seconds: float = JOIN_SECONDS):
+        self.capacity = capacity
+        self.list_calls = list_calls
+        self.refresh_seconds = refresh_seconds
+        self.join_seconds = join_seconds
+        self.active: set[str] = set()
+        self.listed_at = 0.0
+        self._admitted: dict[str, float] = {}
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def in_use(self) -> int:
+        with self._lock:
+            self._admitted = {room: t for room, t in self._admitted.items()
+                              if room not in self.active and t > self.listed_at - self.join_seconds}
+            return len(self.active) + len(self._admitted)
+
+    def try_admit(self, room: str, now: float) -> bool:
+        if now - self.listed_at > self.refresh_seconds:
+            self._refresh()
+        if self.in_use() >= self.capacity:
+            return False
+        self._admitted[room] = now
+        return True
+
+    def release(self, room: str) -> None:
+        """Give back an admitted room whose token was never issued"""
+        with self._lock:
+            self._admitted.pop(room, None)
+
+    def _refresh(self) -> None:
+        if self._refreshing:
+            return
+        self._refreshing = True
+
+        def run():
+            started = time.monotonic()
+            try:
+                active = set(self.list_calls())
+                with self._lock:
+                    self.active, self.listed_at = active, started
+            except Exception as e:
+                logger.warning(f"Agent capacity refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="capacity-refresh", daemon=True).start()
+
+
+def list_intake_calls() -> list[str]:
+    """Intake rooms with a participant in them, from the LiveKit server API"""
+    from livekit import api
+    from token_service import ROOM_PREFIX, get_config
+
+    config = get_config()
+
+    async def list_rooms():
+        async with api.LiveKitAPI(config.api_url, config.api_key, config.api_secret) as lk:
+            response = await lk.room.list_rooms(api.ListRoomsRequest())
+            return [room.name for room in response.rooms if room.name.startswith(ROOM_PREFIX) and room.num_participants]
+
+    return asyncio.run(list_rooms())
+
+
+# =============================================================================
+# ADMISSION
+# =============================================================================
+
+class TokenAdmission:
+    """Per-IP and global rate limits plus the capacity check, under one lock"""
+    def __init__(self, per_ip: KeyedBuckets | None = None, global_bucket: TokenBucket | None = None,
+                 capacity: AgentCapacity | None = None):
+        self.per_ip = per_ip or KeyedBuckets(TOKEN_RATE_PER_IP, TOKEN_BURST_PER_IP)
+        self.global_bucket = global_bucket or TokenBucket(TOKEN_RATE_GLOBAL, TOKEN_BURST_GLOBAL)
+        self.capacity = capacity
+        if capacity is None and AGENT_CAPACITY > 0:
+            self.capacity = AgentCapacity(AGENT_CAPACITY, list_intake_calls)
+        self.stats = {"admitted": 0, "per_ip": 0, "global": 0, "capacity": 0}
+        self._lock = threading.Lock()
+
+    def check(self, client_ip: str, new_room: str | None = None) -> Decision:
+        """`new_room`: the room a new call would get (an agent job); None when
+        joining an existing room"""
+        now = time.monotonic()
+        with self._lock:
+            wait = self.per_ip.take(client_ip, now)
+            if wait:
+                return self._reject("per_ip", wait)
+            wait = self.global_bucket.take(now)
+            if wait:
+                return self._reject("global", wait)
+            if new_room and self.capacity is not None and not self.capacity.try_admit(new_room, now):
+                return self._reject("capacity", CAPACITY_RETRY_SECONDS)
+            self.stats["admitted"] += 1
+            return ADMITTED
+
+    def release(self, new_room: str | None) -> None:
+        """Undo check()'s capacity slot when the token could not be issued
+        (the rate-limit tokens stay spent)"""
+        if new_room and self.capacity is not None:
+            self.capacity.release(new_room)
+
+    def _reject(self, reason: str, retry_after: float) -> Decision:
+        self.stats[reason] += 1
+        return Decision(False, reason, retry_after)
+
+
+# Set by the proxy itself, most specific first (Vercel overwrites all three)
+FORWARDED_HEADERS = ("X-Vercel-Forwarded-For", "X-Real-IP", "X-Forwarded-For")
+
+
+def client_ip(handler) -> str:
+    """Caller's address; behind a trusted proxy, the client it forwarded for"""
+    if TOKEN_TRUST_PROXY:
+        for header in FORWARDED_HEADERS:
+            forwarded = handler.headers.get(header, "")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+    return handler.client_address[0]
+
+
+token_admission = TokenAdmission()
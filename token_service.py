@@ -0,0 +1,340 @@
+"""
+Token Service for Med Help USA
+==============================
+Shared LiveKit token endpoint used by both the local demo server
+(demo_server.py) and the Vercel function (api/token.py).
+
+- Config (API key/secret, LiveKit URL) is parsed once, on first use
+- Signed tokens are cached per (room, identity) until shortly before expiry
+- Callers that don't ask for a room get a unique one, and the intake agent
+  is dispatched to it while the browser is still negotiating WebRTC
+- TokenHandlerMixin adds /token and CORS preflight handling to any
+  http.server request handler, so it works under ThreadingHTTPServer
+- Requests are rate limited per IP and globally, and new calls are only
+  admitted while agents have capacity (token_admission.py); the rest get
+  a fast 429 with Retry-After
+
+Usage:
+    from token_service import TokenHandlerMixin
+
+    class Handler(TokenHandlerMixin, BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.handle_token_request(urlparse(self.path).query)
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import datetime
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from token_admission import client_ip, token_admission
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+DEFAULT_IDENTITY = "web-user"
+TOKEN_TTL_SECONDS = int(os.getenv("TOKEN_TTL_SECONDS", "3600"))
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "120"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# Agent dispatch - "explicit" dispatches via the LiveKit API at token issue time,
+# "token" embeds the dispatch in the token (runs when the browser creates the room),
+# "off" leaves dispatch to `main.py connect --room ...`
+AGENT_NAME = "intake_agent"
+AGENT_DISPATCH_MODES = ("explicit", "token", "off")
+AGENT_DISPATCH_MODE = os.getenv("AGENT_DISPATCH_MODE", "explicit").strip().lower()
+if AGENT_DISPATCH_MODE not in AGENT_DISPATCH_MODES:
+    # A typo would otherwise mint tokens that no agent ever joins
+    raise ValueError(f"AGENT_DISPATCH_MODE must be one of {', '.join(AGENT_DISPATCH_MODES)} "
+                     f"(got {AGENT_DISPATCH_MODE!r})")
+AGENT_DISPATCH_WAIT_SECONDS = float(os.getenv("AGENT_DISPATCH_WAIT_SECONDS", "0"))  # >0 on serverless
+ROOM_PREFIX = "intake-"
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_livekit_url(url: str) -> str:
+    """Strip protocols/trailing slashes and rebuild as https for signal discovery"""
+    if not url:
+        return url
+    clean = url.strip().lower()
+    for prefix in ['wss://', 'ws://', 'https://', 'http://']:
+        if clean.startswith(prefix):
+            clean = clean[len(prefix):]
+    clean = clean.rstrip('/')
+    return f"https://{clean}"
+
+
+def livekit_api_url(url: str) -> str:
+    """Server API URL: ws:// -> http:// (local --dev), wss:// -> https://"""
+    clean = (url or "").strip().rstrip('/')
+    if clean.startswith("ws://"):
+        return "http://" + clean[len("ws://"):]
+    if clean.startswith("wss://"):
+        return "https://" + clean[len("wss://"):]
+    return clean
+
+
+def new_room_name() -> str:
+    """Unique room per caller, so each call gets its own agent job"""
+    return f"{ROOM_PREFIX}{uuid.uuid4().hex[:12]}"
+
+
+class TokenConfig:
+    """LiveKit credentials and URL, read from the environment once"""
+    def __init__(self, api_key: str, api_secret: str, livekit_url: str, api_url: str = ""):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.livekit_url = livekit_url
+        self.api_url = api_url
+
+    @classmethod
+    def from_env(cls) -> "TokenConfig":
+        raw_url = os.getenv("LIVEKIT_URL", "")
+        return cls(
+            api_key=os.getenv("LIVEKIT_API_KEY"),
+            api_secret=os.getenv("LIVEKIT_API_SECRET"),
+            livekit_url=normalize_livekit_url(raw_url),
+            api_url=livekit_api_url(raw_url),
+        )
+
+    def is_valid(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
+
+_config: TokenConfig | None = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> TokenConfig:
+    """Return the process-wide config (parsed on first call)"""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = TokenConfig.from_env()
+    return _config
+
+
+# =============================================================================
+# TOKEN CACHE
+# =============================================================================
+
+class TokenCache:
+    """Thread-safe LRU of signed tokens keyed by (room, identity)"""
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, room: str, identity: str) -> str | None:
+        key = (room, identity)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, room: str, identity: str, token: str, ttl_seconds: float) -> None:
+        """Store a token until TOKEN_REFRESH_MARGIN_SECONDS before it expires"""
+        reuse_until = time.monotonic() + max(ttl_seconds - TOKEN_REFRESH_MARGIN_SECONDS, 0)
+        with self._lock:
+            self._entries[(room, identity)] = (token, reuse_until)
+            self._entries.move_to_end((room, identity))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+def dispatch_metadata(identity: str) -> str:
+    """Job metadata the agent uses to time dispatch -> first audio"""
+    return json.dumps({"identity": identity, "dispatched_at": time.time()})
+
+
+def mint_token(config: TokenConfig, room_name: str, identity: str, embed_dispatch: bool = False) -> str:
+    """Sign a fresh room-join JWT"""
+    from livekit import api
+
+    token = (
+        api.AccessToken(config.api_key, config.api_secret)
+        .with_identity(identity)
+        .with_ttl(datetime.timedelta(seconds=TOKEN_TTL_SECONDS))
+        .with_grants(api.VideoGrants(
+            room_join=True,
+            room=room_name,
+            can_publish=True,
+            can_subscribe=True,
+        ))
+    )
+    if embed_dispatch:
+        token = token.with_room_config(api.RoomConfiguration(
+            agents=[api.RoomAgentDispatch(agent_name=AGENT_NAME, metadata=dispatch_metadata(identity))],
+        ))
+    return token.to_jwt()
+
+
+# =============================================================================
+# AGENT DISPATCH
+# =============================================================================
+
+class AgentDispatcher:
+    """Creates explicit agent dispatches from a background event loop.
+
+    Request threads hand off and return immediately, so the agent starts
+    joining while the browser is still fetching the token and negotiating.
+    """
+    def __init__(self, config: TokenConfig):
+        self.config = config
+        self._loop = asyncio.new_event_loop()
+        self._api = None
+        threading.Thread(target=self._loop.run_forever, name="agent-dispatch", daemon=True).start()
+
+    async def _create(self, room_name: str, metadata: str):
+        from livekit import api
+
+        if self._api is None:
+            self._api = api.LiveKitAPI(self.config.api_url, self.config.api_key, self.config.api_secret)
+        return await self._api.agent_dispatch.create_dispatch(
+            api.CreateAgentDispatchRequest(agent_name=AGENT_NAME, room=room_name, metadata=metadata)
+        )
+
+    def dispatch(self, room_name: str, identity: str):
+        """Schedule a dispatch; returns a concurrent.futures.Future"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._create(room_name, dispatch_metadata(identity)), self._loop
+        )
+
+        def log_failure(f):
+            if f.exception():
+                logger.warning(f"Agent dispatch to {room_name} failed: {f.exception()}")
+
+        future.add_done_callback(log_failure)
+        return future
+
+
+_dispatcher: AgentDispatcher | None = None
+
+
+def get_dispatcher() -> AgentDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        with _config_lock:
+            if _dispatcher is None:
+                _dispatcher = AgentDispatcher(get_config())
+    return _dispatcher
+
+
+def issue_token(room_name: str | None = None, identity: str = DEFAULT_IDENTITY,
+                new_room: str | None = None) -> dict:
+    """Return the /token response body.
+
+    With no room requested, a unique room (`new_room` if given) is created
+    and the agent is dispatched to it. An explicit room keeps the old
+    behaviour (cached token, no dispatch) for `main.py connect --room ...`
+    workflows.
+    """
+    config = get_config()
+    if not config.is_valid():
+        raise ValueError("LIVEKIT_API_KEY or LIVEKIT_API_SECRET not set")
+
+    if room_name:
+        token = token_cache.get(room_name, identity)
+        if token is None:
+            token = mint_token(config, room_name, identity)
+            token_cache.put(room_name, identity, token, TOKEN_TTL_SECONDS)
+        dispatch = "off"
+    else:
+        room_name = new_room or new_room_name()
+        dispatch = AGENT_DISPATCH_MODE
+        future = get_dispatcher().dispatch(room_name, identity) if dispatch == "explicit" else None
+        token = mint_token(config, room_name, identity, embed_dispatch=(dispatch == "token"))
+        if future is not None and AGENT_DISPATCH_WAIT_SECONDS > 0:
+            # Serverless functions may freeze once the response is sent
+            try:
+                future.result(timeout=AGENT_DISPATCH_WAIT_SECONDS)
+            except Exception:
+                pass
+
+    return {
+        "token": token,
+        "url": config.livekit_url,
+        "room": room_name,
+        "identity": identity,
+        "dispatch": dispatch,
+    }
+
+
+# =============================================================================
+# HTTP SERVER
+# =============================================================================
+
+class TokenHTTPServer(ThreadingHTTPServer):
+    """Thread-per-request server with a listen backlog sized for page-load bursts"""
+    request_queue_size = 128
+
+
+# =============================================================================
+# HTTP HANDLER MIXIN
+# =============================================================================
+
+class TokenHandlerMixin:
+    """Adds /token handling to an http.server.BaseHTTPRequestHandler subclass"""
+
+    def send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+
+    def send_json(self, status: int, body: dict, headers: dict | None = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Cache-Control', 'no-store')
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_token_request(self, query_string: str):
+        try:
+            params = parse_qs(query_string)
+            room_name = params.get('room', [None])[0]
+            identity = params.get('identity', [DEFAULT_IDENTITY])[0]
+            # Only requests without a room create an agent job (and use up capacity)
+            new_room = None if room_name else new_room_name()
+            decision = token_admission.check(client_ip(self), new_room=new_room)
+            if not decision.admitted:
+                retry_after = decision.retry_after_header()
+                return self.send_json(429, {"error": "busy" if decision.reason == "capacity" else "rate_limited",
+                                            "retry_after": int(retry_after)}, {"Retry-After": retry_after})
+            try:
+                token = issue_token(room_name, identity, new_room)
+            except Exception:
+                token_admission.release(new_room)         # No job was created: free the slot
+                raise
+            self.send_json(200, token)
+        except Exception as e:
+            self.send_json(500, {"error": str(e)})
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_cors_headers()
+        self.end_headers()
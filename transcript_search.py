@@ -0,0 +1,269 @@
+"""
+Call Transcript Search for Med Help USA
+=======================================
+Care managers look for calls by what was said ("the one where the daughter
+mentioned a fall last week"). Every call's transcript (caller and Sarah)
+is stored at job shutdown and indexed straight away:
+
+- Supabase: call_transcripts (migrations/0006) with a generated tsvector
+  column under a GIN index; search_call_transcripts() ranks with
+  ts_rank_cd and builds snippets with ts_headline. Both are service role
+  only (migrations/0010)
+- SQLite (LEAD_STORE=sqlite:<path>, local development and
+  benchmarks/transcript_search_benchmark.py): an FTS5 index with the
+  porter stemmer, ranked by bm25
+
+Both take web-search style queries: words must all appear (stemmed),
+"quoted phrases" must appear in order, `or` between words accepts either
+and -word excludes calls that mention it.
+
+Results are lead_ids, best match first, each with a snippet where the
+matched words are [bracketed]. Calls that ended before the lead was saved
+have no lead_id and are returned by room_name.
+
+Usage:
+    GET /leads/search?q=daughter+fall+last+week&limit=20   (Bearer LEAD_API_TOKEN)
+"""
+
+import re
+import json
+import uuid
+import sqlite3
+import asyncio
+import threading
+from urllib.parse import parse_qs
+
+from lead_api import LEAD_STORE, LeadHandlerMixin, LeadQueryError, LEAD_API_TOKEN, lead_response_cache
+from static_assets import etag_matches
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+TRANSCRIPT_SEARCH_DEFAULT_LIMIT = 20
+TRANSCRIPT_SEARCH_MAX_LIMIT = 100
+SNIPPET_WORDS = 18
+SPEAKERS = {"user": "Caller", "assistant": "Sarah"}
+
+# Postgres' english config drops these; FTS5 would otherwise require them
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for if in into is it its of on or so such that the their then there "
+    "these they this to was will with i me my we our you your he she him her his".split()
+)
+QUERY_TOKEN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+WORD = re.compile(r"\w+")
+
+
+def transcript_record(room_name: str, started_at: str, lines: list[tuple[str, str]],
+                      lead_id: str | None = None) -> dict:
+    """call_transcripts row for one call; `lines` are (role, text) in order"""
+    lines = [{"role": role, "text": text.strip()} for role, text in lines if text and text.strip()]
+    return {
+        "id": str(uuid.uuid4()),   # Client id: a spooled row replayed later is still one row
+        "lead_id": lead_id,
+        "room_name": room_name,
+        "started_at": started_at,
+        "lines": lines,
+        "body": "\n".join(f"{SPEAKERS.get(line['role'], line['role'])}: {line['text']}" for line in lines),
+    }
+
+
+# =============================================================================
+# QUERY
+# =============================================================================
+
+def fts5_query(text: str) -> str:
+    """Web-search style query -> FTS5 MATCH expression (same meaning as
+    websearch_to_tsquery: AND of terms, `or` binds tighter, -term excludes)"""
+    groups, excluded, join_next = [], [], False
+    for negated, phrase, word in QUERY_TOKEN.findall(text):
+        if word:
+            negated, word = word.startswith("-"), word.lstrip("-")
+            if word.lower() == "or" and not negated:
+                join_next = bool(groups)
+                continue
+            words = WORD.findall(word.lower())
+            if len(words) == 1 and words[0] in STOP_WORDS:
+                continue
+        else:
+            words = WORD.findall(phrase.lower())
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if negated:
+            excluded.append(term)
+        elif join_next:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join_next = False
+
+    if not groups:
+        raise LeadQueryError("q needs at least one word to search for")
+    expression = " AND ".join(terms[0] if len(terms) == 1 else f"({' OR '.join(terms)})" for terms in groups)
+    return expression + "".join(f" NOT {term}" for term in excluded)
+
+
+def parse_search_query(query_string: str) -> tuple[str, int]:
+    """(q, limit) from /leads/search parameters"""
+    params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+    text = params.get("q", "").strip()
+    if not text:
+        raise LeadQueryError("q is required")
+    try:
+        limit = int(params.get("limit", TRANSCRIPT_SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        raise LeadQueryError("limit must be an integer")
+    if not 1 <= limit <= TRANSCRIPT_SEARCH_MAX_LIMIT:
+        raise LeadQueryError(f"limit must be between 1 and {TRANSCRIPT_SEARCH_MAX_LIMIT}")
+    fts5_query(text)   # Reject queries with nothing to search for on every backend
+    return text, limit
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class SQLiteTranscriptIndex:
+    """FTS5 index over call transcripts (local backend). The FTS table keeps no
+    copy of the text (content=call_transcripts), so the index is the only overhead."""
+    def __init__(self, path: str = ":memory:"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.create_schema()
+
+    def create_schema(self) -> None:
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS call_transcripts (
+                rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, lead_id TEXT,
+                room_name TEXT NOT NULL, started_at TEXT NOT NULL, body TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_call_transcripts_lead ON call_transcripts (lead_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS call_transcripts_fts USING fts5(
+                body, content='call_transcripts', content_rowid='rowid', tokenize='porter unicode61');
+        """)
+
+    def add_many(self, records: list[dict]) -> int:
+        """Index finished calls; a record already indexed (spool replay) is skipped"""
+        added = 0
+        with self._lock, self.conn:
+            for record in records:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO call_transcripts (id, lead_id, room_name, started_at, body) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (record["id"], record.get("lead_id"), record["room_name"], record["started_at"], record["body"]),
+                )
+                if cursor.rowcount:
+                    self.conn.execute("INSERT INTO call_transcripts_fts (rowid, body) VALUES (?, ?)",
+                                      (cursor.lastrowid, record["body"]))
+                    added += 1
+        return added
+
+    def add(self, record: dict) -> int:
+        return self.add_many([record])
+
+    def search(self, text: str, limit: int) -> list[dict]:
+        # FTS5 sorts by rank itself, so snippet() only runs for the rows within the LIMIT
+        sql = f"""
+            SELECT t.lead_id, t.room_name, t.started_at, -f.rank AS rank,
+                   snippet(call_transcripts_fts, 0, '[', ']', '...', {SNIPPET_WORDS}) AS snippet
+            FROM call_transcripts_fts f JOIN call_transcripts t ON t.rowid = f.rowid
+            WHERE call_transcripts_fts MATCH ?
+            ORDER BY f.rank LIMIT ?
+        """
+        with self._lock:
+            rows = self.conn.execute(sql, (fts5_query(text), limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+class SupabaseTranscriptIndex:
+    """Postgres backend: one RPC per search (search_call_transcripts, migrations/0006)"""
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def search(self, text: str, limit: int) -> list[dict]:
+        response = self.supabase.rpc(
+            "search_call_transcripts", {"search_query": text, "max_results": limit}).execute()
+        return response.data or []
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_transcript_index():
+    """Return the process-wide index for the backend selected by LEAD_STORE"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if LEAD_STORE.startswith("sqlite:"):
+                    _index = SQLiteTranscriptIndex(LEAD_STORE[len("sqlite:"):])
+                else:
+                    from supabase_client import supabase
+                    _index = SupabaseTranscriptIndex(supabase)
+    return _index
+
+
+async def index_call_transcript(record: dict) -> dict:
+    """Store one finished call's transcript (at job shutdown)"""
+    if not record["lines"]:
+        return {"success": True, "skipped": "empty transcript"}
+    if LEAD_STORE.startswith("sqlite:"):
+        try:
+            await asyncio.to_thread(get_transcript_index().add, record)
+            return {"success": True}
+        except Exception as e:
+            print(f"\n❌ ERROR indexing call transcript: {e}")
+            return {"success": False, "error": str(e)}
+    from supabase_client import save_call_transcript
+    return await save_call_transcript(record)
+
+
+def search_transcripts(index, text: str, limit: int = TRANSCRIPT_SEARCH_DEFAULT_LIMIT) -> dict:
+    """Best-matching leads with snippets; a lead with several calls appears once"""
+    results, seen = [], set()
+    # Over-fetch a little so repeat callers don't leave the page short
+    for hit in index.search(text, limit * 2):
+        key = hit["lead_id"] or hit["room_name"]
+        if key in seen:
+            continue
+        seen.add(key)
+        results.append({
+            "lead_id": hit["lead_id"], "room_name": hit["room_name"], "started_at": hit["started_at"],
+            "rank": round(float(hit["rank"]), 4), "snippet": hit["snippet"],
+        })
+        if len(results) == limit:
+            break
+    return {"query": text, "results": results}
+
+
+# =============================================================================
+# HTTP HANDLER MIXIN
+# =============================================================================
+
+class TranscriptSearchHandlerMixin(LeadHandlerMixin):
+    """Adds /leads/search; answers are cached like /leads pages"""
+
+    def handle_transcript_search_request(self, query_string: str):
+        if not LEAD_API_TOKEN:
+            return self.send_lead_error(503, "Lead API is disabled (LEAD_API_TOKEN not set)")
+        if not self.is_lead_request_authorized():
+            return self.send_lead_error(401, "Unauthorized")
+        try:
+            text, limit = parse_search_query(query_string)
+        except LeadQueryError as e:
+            return self.send_lead_error(400, str(e))
+
+        key = json.dumps(["search", text, limit])
+        cached = lead_response_cache.get(key)
+        if cached is None:
+            try:
+                body = json.dumps(search_transcripts(get_transcript_index(), text, limit), default=str).encode()
+            except Exception as e:
+                return self.send_lead_error(500, str(e))
+            cached = (lead_response_cache.put(key, body), body)
+
+        etag, body = cached
+        if etag_matches(self.headers.get("If-None-Match", ""), {etag}):
+            return self.send_lead_response(304, etag=etag)
+        self.send_lead_response(200, body, etag)
@@ -0,0 +1,84 @@
+"""
+Call Usage Report for Med Help USA
+==================================
+Reads the call_usage views (migrations/0005_call_usage.sql):
+
+- the most expensive calls (estimated USD from usage_prices), with lead,
+  prompt version and caller type
+- average tokens / audio seconds per prompt version, caller type and phase
+- connect latency, usage and cost per intake config version
+  (migrations/0007_call_config_version.sql)
+
+Usage:
+    python usage_report.py [limit]          (default: 20)
+"""
+
+import sys
+
+from supabase_client import supabase
+
+REPORT_COLUMNS = ("lead_id,room_name,prompt_version,caller_relationship,started_at,duration_seconds,"
+                  "input_audio_tokens,output_audio_tokens,input_cached_audio_tokens,estimated_cost_usd")
+
+
+def expensive_calls(limit: int = 20) -> list[dict]:
+    response = (
+        supabase.table("call_usage_cost").select(REPORT_COLUMNS)
+        .order("estimated_cost_usd", desc=True, nullsfirst=False).limit(limit).execute()
+    )
+    return response.data or []
+
+
+def usage_rollup() -> list[dict]:
+    response = (
+        supabase.table("call_usage_rollup").select("*")
+        .order("prompt_version").order("phase").execute()
+    )
+    return response.data or []
+
+
+def config_versions() -> list[dict]:
+    response = (
+        supabase.table("call_usage_by_config").select("*")
+        .order("first_call", desc=True).execute()
+    )
+    return response.data or []
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print("\n" + "="*96)
+    print(f"   💸 MOST EXPENSIVE CALLS (top {limit})")
+    print("="*96)
+    print(f"   {'cost $':>8}  {'started':<20}{'prompt':<14}{'caller':<24}{'secs':>6}{'audio in':>10}{'audio out':>10}{'cached':>8}")
+    for call in expensive_calls(limit):
+        cost = call["estimated_cost_usd"]
+        print(f"   {cost if cost is not None else '-':>8}  {call['started_at'][:19]:<20}{call['prompt_version']:<14}"
+              f"{call['caller_relationship'] or '-':<24}{call['duration_seconds'] or 0:>6.0f}"
+              f"{call['input_audio_tokens']:>10}{call['output_audio_tokens']:>10}{call['input_cached_audio_tokens']:>8}"
+              f"   {call['lead_id'] or call['room_name']}")
+
+    print("\n" + "="*96)
+    print("   📊 AVERAGE PER CALL BY PROMPT VERSION / CALLER / PHASE")
+    print("="*96)
+    print(f"   {'prompt':<14}{'caller':<24}{'phase':<14}{'calls':>6}{'audio in':>10}{'audio out':>10}{'cached':>8}{'secs in':>9}")
+    for row in usage_rollup():
+        print(f"   {row['prompt_version']:<14}{row['caller_relationship'] or '-':<24}{row['phase']:<14}{row['calls']:>6}"
+              f"{float(row['avg_input_audio_tokens']):>10.0f}{float(row['avg_output_audio_tokens']):>10.0f}"
+              f"{float(row['cached_share'] or 0):>8.0%}{float(row['avg_input_audio_seconds']):>9.1f}")
+
+    print("\n" + "="*96)
+    print("   ⚙️  BY INTAKE CONFIG VERSION (agent/intake_config.toml)")
+    print("="*96)
+    print(f"   {'version':<24}{'calls':>6}{'1st audio p50':>15}{'p95':>7}{'secs':>7}{'audio out':>10}{'cost $':>9}{'saved':>7}")
+    for row in config_versions():
+        print(f"   {row['config_version'] or '-':<24}{row['calls']:>6}{float(row['p50_first_audio_ms'] or 0):>13.0f}ms"
+              f"{float(row['p95_first_audio_ms'] or 0):>7.0f}{float(row['avg_duration_seconds'] or 0):>7.0f}"
+              f"{float(row['avg_output_audio_tokens']):>10.0f}{float(row['avg_cost_usd'] or 0):>9.4f}"
+              f"{float(row['lead_saved_share']):>7.0%}")
+    print("="*96 + "\n")
+
+
+if __name__ == "__main__":
+    main()